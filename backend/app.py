@@ -18,6 +18,8 @@ from models import (  # noqa: F401
     ATSAnalysis,
     Document,
     EmailAccount,
+    GenerationJob,
+    GenerationJobEvent,
     InterviewQuestion,
     JobRecommendation,
     JobRequirement,
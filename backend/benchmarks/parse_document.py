@@ -0,0 +1,150 @@
+"""Benchmark: parse-once document model vs. the previous two-tree extraction.
+
+The previous pipeline ran charset detection over the whole body
+(``response.apparent_encoding``), then built two ``html.parser`` trees: one for the
+board parser and one for text/link extraction. The new one resolves the charset from
+headers/meta and builds a single tree (lxml when installed). Both run the generic
+parser plus text and link extraction, and the outputs are compared.
+
+    python benchmarks/parse_document.py saved/stepstone.html saved/indeed.html
+    python benchmarks/parse_document.py            # synthetic pages
+    python benchmarks/parse_document.py --no-board-parser
+
+Saved pages are read as bytes; pass ``--content-type`` to mimic the response header.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from urllib.parse import urljoin
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import requests  # noqa: E402
+from bs4 import BeautifulSoup  # noqa: E402
+
+from services.scrapers import GenericJobParser  # noqa: E402
+from services.scrapers.document import DEFAULT_PARSER, ParsedPage  # noqa: E402
+
+URL = "https://example.com/jobs/python-entwickler"
+NO_BOARD_PARSER = False
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("pages", nargs="*", help="saved HTML pages (default: synthetic pages)")
+    parser.add_argument("--content-type", default="text/html; charset=utf-8")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--no-board-parser", action="store_true", help="measure decoding, tree building and extraction only"
+    )
+    return parser.parse_args()
+
+
+def synthetic_page(sections: int) -> bytes:
+    """A posting page of roughly ``sections`` * 1.5 KB with navigation, scripts and JSON-LD."""
+    nav = "".join(f'<li><a href="/kategorie/{i}">Kategorie {i}</a></li>' for i in range(40))
+    body = "".join(
+        f"<section><h2>Abschnitt {i}</h2><p>Wir suchen eine engagierte Fachkraft für Softwareentwicklung "
+        f"mit Erfahrung in Python, Flask und SQL. Zu deinen Aufgaben gehören Planung, Umsetzung und "
+        f"Betrieb unserer Plattform – Teamgröße {i % 9 + 3}, Standort München.</p>"
+        f"<ul><li>Gleitzeit</li><li>Weiterbildung</li><li><a href='/bewerbung/{i}'>Jetzt bewerben</a></li></ul>"
+        f"<script>window.tracking_{i} = {{id: {i}, payload: '{'x' * 200}'}};</script></section>"
+        for i in range(sections)
+    )
+    json_ld = (
+        '<script type="application/ld+json">{"@type": "JobPosting", "title": "Python Entwickler (m/w/d)", '
+        '"hiringOrganization": {"name": "Beispiel GmbH"}, "jobLocation": {"address": "München"}}</script>'
+    )
+    html = (
+        f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>Python Entwickler</title>{json_ld}"
+        f"<style>{'.c{color:red}' * 300}</style></head><body><header><nav><ul>{nav}</ul></nav></header>"
+        f"<main><h1>Python Entwickler (m/w/d)</h1>{body}"
+        "<a href='mailto:jobs@beispiel.de'>jobs@beispiel.de</a></main><footer>Impressum</footer></body></html>"
+    )
+    return html.encode("utf-8")
+
+
+def make_response(body: bytes, content_type: str) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response._content = body
+    response.headers["Content-Type"] = content_type
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    return response
+
+
+def board_parser(soup: BeautifulSoup) -> dict | None:
+    return None if NO_BOARD_PARSER else GenericJobParser().parse(soup, URL)
+
+
+def two_tree_pipeline(response: requests.Response) -> tuple[dict | None, str, list]:
+    response.encoding = response.apparent_encoding
+    structured = board_parser(BeautifulSoup(response.text, "html.parser"))
+    soup_for_text = BeautifulSoup(response.text, "html.parser")
+    for tag in soup_for_text(["script", "style", "nav", "header", "footer"]):
+        tag.decompose()
+    text = soup_for_text.get_text(separator="\n", strip=True)
+    text = "\n".join(line.strip() for line in text.splitlines() if line.strip())
+    links = [
+        {"url": urljoin(URL, link["href"]), "text": link.get_text(strip=True)}
+        for link in soup_for_text.find_all("a", href=True)
+    ]
+    return structured, text, links
+
+
+def parse_once_pipeline(response: requests.Response) -> tuple[dict | None, str, list]:
+    page = ParsedPage.from_response(response, URL)
+    structured = board_parser(page.soup)
+    return structured, page.text, page.links["all_links"]
+
+
+def measure(pipeline, body: bytes, content_type: str, repeat: int) -> tuple[float, float, tuple]:
+    """Return (median seconds, peak MiB, output) for *pipeline* on *body*."""
+    timings = []
+    for _ in range(repeat):
+        response = make_response(body, content_type)
+        started = time.perf_counter()
+        output = pipeline(response)
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    pipeline(make_response(body, content_type))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak / 2**20, output
+
+
+def main() -> int:
+    global NO_BOARD_PARSER
+    args = parse_args()
+    NO_BOARD_PARSER = args.no_board_parser
+    pages = []
+    for path in args.pages:
+        with open(path, "rb") as f:
+            pages.append((os.path.basename(path), f.read()))
+    if not pages:
+        pages = [(f"synthetic-{n}", synthetic_page(n)) for n in (20, 100, 400)]
+
+    print(f"tree builder: {DEFAULT_PARSER}")
+    print(
+        f"{'page':<24}{'size':>9}{'before ms':>11}{'after ms':>10}{'speedup':>9}{'before MiB':>12}{'after MiB':>11}  same"
+    )
+    mismatches = 0
+    for name, body in pages:
+        old_time, old_peak, old_output = measure(two_tree_pipeline, body, args.content_type, args.repeat)
+        new_time, new_peak, new_output = measure(parse_once_pipeline, body, args.content_type, args.repeat)
+        same = old_output[1:] == new_output[1:]
+        mismatches += not same
+        print(
+            f"{name[:23]:<24}{len(body) // 1024:>7}KB{old_time * 1000:>11.1f}{new_time * 1000:>10.1f}"
+            f"{old_time / new_time:>8.1f}x{old_peak:>12.1f}{new_peak:>11.1f}  {'yes' if same else 'NO'}"
+        )
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
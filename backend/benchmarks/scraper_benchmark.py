@@ -0,0 +1,281 @@
+"""Benchmark and accuracy harness for the job posting parsers on a saved-page corpus.
+
+Every page in ``benchmarks/scraper_corpus`` (``<board>_<name>.html``) has a golden
+``<board>_<name>.json`` next to it:
+
+    {
+      "url": "https://www.stepstone.de/stellenangebote--...",   # decides the parser
+      "content_type": "text/html; charset=utf-8",              # optional response header
+      "source": "stepstone",
+      "fields": {"title": "...", "salary": null},              # exact match, null = must be empty
+      "contains": {"description": ["substring", ...]},         # every substring must occur
+      "strategies": ["json-ld", "html-patterns"],              # generic pages: expected strategies
+      "search_results_page": true,                             # generic pages: expected flag
+      "known_failures": ["salary"]                             # reported, but not a regression
+    }
+
+Each page goes through ``WebScraper.fetch_structured_job_posting`` with the download
+stubbed out (``_fetch_page`` returns the saved bytes), so charset resolution, tree
+building, board/generic parsing and the result merge are all measured. Reported:
+
+- median parse time and peak traced allocation per page,
+- field-level accuracy against the golden values, per board and per field,
+- how often each ``GenericJobParser`` strategy contributed data on generic pages.
+
+    python benchmarks/scraper_benchmark.py
+    python benchmarks/scraper_benchmark.py --board stepstone --repeat 50
+    python benchmarks/scraper_benchmark.py --corpus ~/saved-pages -v
+
+Exits non-zero when a golden value that is not listed in ``known_failures`` is missed.
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from unittest.mock import patch
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import requests  # noqa: E402
+
+from services.scrapers import GenericJobParser  # noqa: E402
+from services.web_scraper import WebScraper  # noqa: E402
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scraper_corpus")
+GENERIC_STRATEGIES = ("json-ld", "opengraph", "meta-tags", "title-tag", "html-patterns", "heuristics")
+
+
+@dataclass
+class CorpusPage:
+    name: str
+    body: bytes
+    golden: dict
+
+    @property
+    def board(self) -> str:
+        return self.golden.get("source") or self.name.split("_")[0]
+
+
+@dataclass
+class Check:
+    field: str
+    expected: object
+    actual: object
+    ok: bool
+    known_failure: bool
+
+
+@dataclass
+class PageRun:
+    page: CorpusPage
+    result: dict
+    strategies: list[str] = field(default_factory=list)
+    search_results_page: bool = False
+    seconds: float = 0.0
+    peak_bytes: int = 0
+    checks: list[Check] = field(default_factory=list)
+
+    @property
+    def regressions(self) -> list[Check]:
+        return [check for check in self.checks if not check.ok and not check.known_failure]
+
+
+class _RecordingGenericParser(GenericJobParser):
+    """GenericJobParser that remembers its strategies and search-page flag for the last page."""
+
+    last: dict = {}
+
+    def parse(self, soup, url):
+        result = super().parse(soup, url)
+        _RecordingGenericParser.last = {
+            "strategies": list(self.extraction_methods),
+            "search_results_page": bool(result.get("is_search_results_page")),
+        }
+        return result
+
+
+def load_corpus(directory: str = CORPUS_DIR, board: str | None = None) -> list[CorpusPage]:
+    """Return the saved pages of *directory* that have a golden file, sorted by name."""
+    pages = []
+    for filename in sorted(os.listdir(directory)):
+        name, ext = os.path.splitext(filename)
+        golden_path = os.path.join(directory, name + ".json")
+        if ext != ".html" or not os.path.exists(golden_path):
+            continue
+        with open(os.path.join(directory, filename), "rb") as f:
+            body = f.read()
+        with open(golden_path, encoding="utf-8") as f:
+            page = CorpusPage(name=name, body=body, golden=json.load(f))
+        if board is None or page.board == board:
+            pages.append(page)
+    return pages
+
+
+def _response(page: CorpusPage) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response._content = page.body
+    response.headers["Content-Type"] = page.golden.get("content_type", "text/html; charset=utf-8")
+    response.url = page.golden["url"]
+    return response
+
+
+def parse_page(page: CorpusPage) -> tuple[dict, dict]:
+    """Run *page* through ``fetch_structured_job_posting`` without network access.
+
+    Returns the result and the generic parser's strategies/flag (empty for board parsers).
+    """
+    scraper = WebScraper()
+    _RecordingGenericParser.last = {}
+    with (
+        patch.object(scraper, "_fetch_page", side_effect=lambda *args, **kwargs: _response(page)),
+        patch("services.web_scraper.GenericJobParser", _RecordingGenericParser),
+    ):
+        result = scraper.fetch_structured_job_posting(page.golden["url"], _follow_external=False)
+    return result, _RecordingGenericParser.last
+
+
+def _normalize(value):
+    return re.sub(r"\s+", " ", value).strip() if isinstance(value, str) else value
+
+
+def check_page(page: CorpusPage, result: dict, generic: dict) -> list[Check]:
+    """Compare one result with the golden values of *page*."""
+    golden = page.golden
+    known = set(golden.get("known_failures", []))
+    checks = []
+
+    def add(name, expected, actual, ok):
+        checks.append(Check(name, expected, actual, ok, name in known))
+
+    add("source", page.board, result.get("source"), result.get("source") == page.board)
+    for name, expected in golden.get("fields", {}).items():
+        actual = result.get(name)
+        if expected is None:
+            add(name, None, actual, not actual)
+        else:
+            add(name, expected, actual, _normalize(actual) == _normalize(expected))
+    for name, fragments in golden.get("contains", {}).items():
+        actual = _normalize(result.get(name)) or ""
+        add(name, fragments, result.get(name), all(_normalize(fragment) in actual for fragment in fragments))
+    if "strategies" in golden:
+        actual = generic.get("strategies", [])
+        add("strategies", golden["strategies"], actual, actual == golden["strategies"])
+    if "search_results_page" in golden:
+        actual = generic.get("search_results_page", False)
+        add("search_results_page", golden["search_results_page"], actual, actual == golden["search_results_page"])
+    return checks
+
+
+def run_page(page: CorpusPage, repeat: int = 1) -> PageRun:
+    """Parse *page* ``repeat`` times for timing, once more under tracemalloc, and check it."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result, generic = parse_page(page)
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    parse_page(page)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return PageRun(
+        page=page,
+        result=result,
+        strategies=generic.get("strategies", []),
+        search_results_page=generic.get("search_results_page", False),
+        seconds=statistics.median(timings),
+        peak_bytes=peak,
+        checks=check_page(page, result, generic),
+    )
+
+
+def _ratio(counter: dict, key) -> str:
+    ok, total = counter[key]
+    return f"{ok}/{total} ({ok / total:.0%})" if total else "-"
+
+
+def report(runs: list[PageRun], verbose: bool = False) -> None:
+    print(f"{'page':<28}{'source':<16}{'size':>8}{'parse ms':>10}{'peak KiB':>10}  fields")
+    for run in runs:
+        ok = sum(check.ok for check in run.checks)
+        print(
+            f"{run.page.name[:27]:<28}{run.page.board:<16}{len(run.page.body) // 1024:>6}KB"
+            f"{run.seconds * 1000:>10.2f}{run.peak_bytes / 1024:>10.0f}  {ok}/{len(run.checks)}"
+        )
+
+    by_board: dict[str, list[int]] = defaultdict(lambda: [0, 0])
+    by_field: dict[str, list[int]] = defaultdict(lambda: [0, 0])
+    times: dict[str, list[float]] = defaultdict(list)
+    for run in runs:
+        times[run.page.board].append(run.seconds)
+        for check in run.checks:
+            for bucket in (by_board[run.page.board], by_field[check.field]):
+                bucket[0] += check.ok
+                bucket[1] += 1
+
+    print(f"\n{'board':<16}{'pages':>6}{'median ms':>11}  accuracy")
+    for board in sorted(by_board):
+        print(
+            f"{board:<16}{len(times[board]):>6}{statistics.median(times[board]) * 1000:>11.2f}  "
+            f"{_ratio(by_board, board)}"
+        )
+
+    print(f"\n{'field':<22}accuracy")
+    for name in sorted(by_field):
+        print(f"{name:<22}{_ratio(by_field, name)}")
+
+    generic_runs = [run for run in runs if run.page.board == "generic"]
+    if generic_runs:
+        hits = Counter(strategy for run in generic_runs for strategy in run.strategies)
+        print(f"\ngeneric strategy hit rate ({len(generic_runs)} pages)")
+        for strategy in GENERIC_STRATEGIES:
+            print(f"{strategy:<22}{hits[strategy]}/{len(generic_runs)}")
+        flagged = sum(run.search_results_page for run in generic_runs)
+        print(f"{'search results page':<22}{flagged}/{len(generic_runs)}")
+
+    misses = [(run, check) for run in runs for check in run.checks if not check.ok]
+    if misses:
+        print("\nmisses")
+    for run, check in misses:
+        label = "known" if check.known_failure else "REGRESSION"
+        print(f"  {label:<10} {run.page.name}.{check.field}")
+        if verbose:
+            print(f"             expected: {check.expected!r}\n             actual:   {check.actual!r}")
+    fixed = [(run, check) for run in runs for check in run.checks if check.ok and check.known_failure]
+    for run, check in fixed:
+        print(f"  fixed      {run.page.name}.{check.field} (remove from known_failures)")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--corpus", default=CORPUS_DIR, help="directory with <name>.html + <name>.json pairs")
+    parser.add_argument("--board", help="only pages whose golden source is this board")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("-v", "--verbose", action="store_true", help="print expected and actual values of misses")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    # The parsers log every page; keep the report readable
+    logging.basicConfig(level=logging.ERROR)
+    pages = load_corpus(args.corpus, args.board)
+    if not pages:
+        print(f"no pages with golden files in {args.corpus}")
+        return 1
+    runs = [run_page(page, args.repeat) for page in pages]
+    report(runs, args.verbose)
+    return 1 if any(run.regressions for run in runs) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
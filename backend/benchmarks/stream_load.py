@@ -0,0 +1,207 @@
+"""Load benchmark: concurrent SSE generation streams per gunicorn worker.
+
+Serves the real app (JWT auth, credit check, event log, token batching, SSE framing)
+under gunicorn, with only the generation itself replaced by a fake that streams tokens
+for ``--generation-seconds``. When the worker class serves the streams concurrently, the
+wall time stays close to a single generation; with sync workers it grows with
+streams / workers.
+
+    python benchmarks/stream_load.py --worker-class gthread --threads 64 --streams 64
+    python benchmarks/stream_load.py --worker-class sync --workers 2 --streams 8
+
+Exits non-zero if a stream fails or the streams did not run concurrently.
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--worker-class", default="gthread", choices=["gthread", "gevent", "sync"])
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--threads", type=int, default=64, help="gthread: threads per worker")
+    parser.add_argument("--worker-connections", type=int, default=256, help="gevent: greenlets per worker")
+    parser.add_argument("--streams", type=int, default=64, help="concurrent generation streams")
+    parser.add_argument("--generation-seconds", type=float, default=5.0)
+    parser.add_argument("--tokens", type=int, default=400, help="streamed tokens per generation")
+    return parser.parse_args()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port: int = sock.getsockname()[1]
+        return port
+
+
+def build_app(workdir: str, generation_seconds: float, tokens: int):
+    """Create the app on a scratch SQLite database; return (app, access_token)."""
+    os.environ.update(
+        {
+            "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+            "CACHE_DIR": "",
+            "TESTING": "1",  # no background scheduler
+            "FIREWORKS_API_KEY": os.environ.get("FIREWORKS_API_KEY", "benchmark"),
+            "OPENROUTER_API_KEY": os.environ.get("OPENROUTER_API_KEY", "benchmark"),
+        }
+    )
+    sys.path.insert(0, BACKEND_DIR)
+
+    from flask_jwt_extended import create_access_token
+
+    import routes.applications.generation as generation_routes
+    from app import create_app
+    from models import User, db
+    from services.stream_frames import TokenBatcher
+
+    def fake_generation(payload, emit):
+        frames = TokenBatcher(emit)
+        frames.emit({"step": 1, "total_steps": 4, "message": "Stellenanzeige wird geladen..."})
+        for _ in range(tokens):
+            frames.token("content", "Wort ")
+            time.sleep(generation_seconds / tokens)
+        frames.emit({"step": 4, "total_steps": 4, "message": "PDF wird erstellt..."})
+        frames.close()
+        return {"success": True, "pdf_path": "benchmark.pdf"}
+
+    generation_routes.run_url_generation = fake_generation
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        user = User(email="benchmark@example.com", full_name="Benchmark", email_verified=True)
+        user.set_password("Benchmark123")
+        user.credits_remaining = 1_000_000
+        db.session.add(user)
+        db.session.commit()
+        token = create_access_token(identity=str(user.id))
+    return app, token
+
+
+def serve(app, options: dict) -> None:
+    from gunicorn.app.base import BaseApplication
+
+    class BenchmarkServer(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return app
+
+    BenchmarkServer().run()
+
+
+def run_stream(client, token: str) -> dict:
+    started = time.perf_counter()
+    first_byte = None
+    events = 0
+    completed = False
+    with client.stream(
+        "POST",
+        "/api/applications/generate-from-url-stream",
+        json={"url": "https://example.com/job"},
+        headers={"Authorization": f"Bearer {token}"},
+        timeout=300,
+    ) as response:
+        for line in response.iter_lines():
+            if first_byte is None:
+                first_byte = time.perf_counter() - started
+            if line.startswith("data: "):
+                events += 1
+                completed = completed or json.loads(line[6:]).get("type") == "complete"
+    return {
+        "ok": response.status_code == 200 and completed,
+        "first_byte": first_byte or 0.0,
+        "duration": time.perf_counter() - started,
+        "events": events,
+    }
+
+
+def wait_until_up(base_url: str, timeout: float = 30.0) -> None:
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/api/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise SystemExit("gunicorn did not start")
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main() -> int:
+    args = parse_args()
+    if args.worker_class == "gevent":
+        from gevent import monkey  # same early patching as gunicorn.conf.py
+
+        monkey.patch_all()
+
+    import multiprocessing
+
+    import httpx
+
+    workdir = tempfile.mkdtemp(prefix="obojobs-bench-")
+    app, token = build_app(workdir, args.generation_seconds, args.tokens)
+    port = free_port()
+    options = {
+        "bind": f"127.0.0.1:{port}",
+        "workers": args.workers,
+        "worker_class": args.worker_class,
+        # gunicorn silently turns sync into gthread when threads > 1
+        "threads": args.threads if args.worker_class == "gthread" else 1,
+        "worker_connections": args.worker_connections,
+        "timeout": 120,
+        "loglevel": "warning",
+    }
+    server = multiprocessing.get_context("fork").Process(target=serve, args=(app, options), daemon=True)
+    server.start()
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        wait_until_up(base_url)
+        # One client for all streams: per-stream clients spend the benchmark building SSL contexts
+        limits = httpx.Limits(max_connections=args.streams, max_keepalive_connections=args.streams)
+        with httpx.Client(base_url=base_url, limits=limits) as client, ThreadPoolExecutor(args.streams) as pool:
+            started = time.perf_counter()
+            results = list(pool.map(lambda _: run_stream(client, token), range(args.streams)))
+            wall = time.perf_counter() - started
+    finally:
+        server.terminate()
+        server.join(timeout=10)
+
+    ok = [r for r in results if r["ok"]]
+    first_bytes = [r["first_byte"] for r in ok] or [0.0]
+    durations = [r["duration"] for r in ok] or [0.0]
+    # Concurrent streams finish in about one generation; serialized ones need several
+    concurrent = bool(ok) and wall < args.generation_seconds * 1.5 + 1.0
+    per_worker = len(ok) // max(args.workers, 1) if concurrent else None
+
+    print(f"worker class:        {args.worker_class} ({args.workers} worker(s))")
+    print(f"streams ok:          {len(ok)}/{args.streams}")
+    print(f"wall time:           {wall:.2f}s (one generation: {args.generation_seconds:.2f}s)")
+    print(f"first byte p50/p95:  {statistics.median(first_bytes):.3f}s / {percentile(first_bytes, 95):.3f}s")
+    print(f"stream duration p95: {percentile(durations, 95):.2f}s")
+    print(f"events per stream:   {statistics.mean(r['events'] for r in ok) if ok else 0:.0f}")
+    print(f"concurrent streams per worker: {per_worker if per_worker is not None else 'no (serialized)'}")
+    return 0 if len(ok) == args.streams and concurrent else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
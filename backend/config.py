@@ -17,6 +17,17 @@ class Config:
     # Database
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", "sqlite:///obojobs.db")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Threaded/cooperative gunicorn workers run many requests per process; every running
+    # generation holds a connection, so the pool defaults to GUNICORN_THREADS (PostgreSQL only).
+    # gevent workers serve GUNICORN_WORKER_CONNECTIONS greenlets: set DB_POOL_SIZE within the
+    # server's max_connections, greenlets beyond pool and overflow wait for a free connection.
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", os.getenv("GUNICORN_THREADS", "32")))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    SQLALCHEMY_ENGINE_OPTIONS = (
+        {"pool_size": DB_POOL_SIZE, "max_overflow": DB_MAX_OVERFLOW, "pool_pre_ping": True}
+        if SQLALCHEMY_DATABASE_URI.startswith("postgresql")
+        else {}
+    )
 
     # JWT
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", SECRET_KEY)
@@ -32,6 +43,14 @@ class Config:
         else os.path.join(os.path.dirname(_backend_dir), _upload_folder_env)
     )
     MAX_CONTENT_LENGTH = int(os.getenv("MAX_CONTENT_LENGTH", 10 * 1024 * 1024))  # 10MB
+
+    # Local cache files (SQLite), shared by all workers on the host. Empty string disables the durable tier.
+    _cache_dir_env = os.getenv("CACHE_DIR", "cache")
+    CACHE_DIR = (
+        _cache_dir_env
+        if not _cache_dir_env or os.path.isabs(_cache_dir_env)
+        else os.path.join(os.path.dirname(_backend_dir), _cache_dir_env)
+    )
     ALLOWED_EXTENSIONS = {"pdf"}  # Nur PDFs erlaubt
 
     # Qwen3.5-Plus (via OpenRouter)
@@ -51,6 +70,119 @@ class Config:
     KIMI_TEMPERATURE = float(os.getenv("KIMI_TEMPERATURE", "1.0"))
     KIMI_THINKING_BUDGET = int(os.getenv("KIMI_THINKING_BUDGET", "4096"))
 
+    # Pooled HTTP transports for LLM providers (one pool per provider and worker process).
+    # Size for worker threads plus background fan-out (e.g. RECOMMENDER_SCORING_WORKERS).
+    AI_HTTP_MAX_CONNECTIONS = int(os.getenv("AI_HTTP_MAX_CONNECTIONS", "16"))
+    AI_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("AI_HTTP_KEEPALIVE_EXPIRY", "60"))
+
+    # Provider circuit breakers (rolling window) and per-process retry budget
+    LLM_CIRCUIT_BREAKER_ENABLED = os.getenv("LLM_CIRCUIT_BREAKER_ENABLED", "true").lower() == "true"
+    LLM_BREAKER_WINDOW_SECONDS = float(os.getenv("LLM_BREAKER_WINDOW_SECONDS", "60"))
+    LLM_BREAKER_MIN_CALLS = int(os.getenv("LLM_BREAKER_MIN_CALLS", "5"))
+    LLM_BREAKER_ERROR_RATE = float(os.getenv("LLM_BREAKER_ERROR_RATE", "0.5"))
+    LLM_BREAKER_SLOW_CALL_SECONDS = float(os.getenv("LLM_BREAKER_SLOW_CALL_SECONDS", "60"))
+    LLM_BREAKER_OPEN_SECONDS = float(os.getenv("LLM_BREAKER_OPEN_SECONDS", "30"))
+    LLM_RETRY_BUDGET_ENABLED = os.getenv("LLM_RETRY_BUDGET_ENABLED", "true").lower() == "true"
+    LLM_RETRY_BUDGET_RATIO = float(os.getenv("LLM_RETRY_BUDGET_RATIO", "0.2"))
+    LLM_RETRY_BUDGET_MIN = int(os.getenv("LLM_RETRY_BUDGET_MIN", "10"))
+    # Hedged cover letter generation: race Kimi against Qwen calls slower than the TTFT percentile
+    LLM_HEDGING_ENABLED = os.getenv("LLM_HEDGING_ENABLED", "false").lower() == "true"
+    LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+    LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+    LLM_HEDGE_DEFAULT_DELAY = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY", "10"))
+    LLM_HEDGE_MAX_RATE = float(os.getenv("LLM_HEDGE_MAX_RATE", "0.1"))
+
+    # Write letter and application email body in one LLM response (falls back to two calls)
+    LLM_COMBINED_EMAIL_ENABLED = os.getenv("LLM_COMBINED_EMAIL_ENABLED", "true").lower() == "true"
+
+    # Local industry/size classifier; below this confidence the LLM is asked instead
+    INDUSTRY_CLASSIFIER_MIN_CONFIDENCE = float(os.getenv("INDUSTRY_CLASSIFIER_MIN_CONFIDENCE", "0.5"))
+
+    # LLM response cache (deterministic extraction/analysis calls only, callers opt in with a TTL)
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_MEMORY_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_MAX_ENTRIES", "512"))
+    LLM_CACHE_STORE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_STORE_MAX_ENTRIES", "5000"))
+    # Coalesce identical in-flight cached calls; cross-worker mode uses file locks under CACHE_DIR
+    LLM_SINGLEFLIGHT_TIMEOUT = float(os.getenv("LLM_SINGLEFLIGHT_TIMEOUT", "120"))
+    LLM_SINGLEFLIGHT_CROSS_WORKER = os.getenv("LLM_SINGLEFLIGHT_CROSS_WORKER", "false").lower() == "true"
+
+    # Job posting page cache in front of WebScraper (memory LRU + SQLite under CACHE_DIR)
+    HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE_ENABLED", "true").lower() == "true"
+    HTTP_CACHE_TTL = float(os.getenv("HTTP_CACHE_TTL", "900"))
+    # Stale pages are kept this long for ETag/Last-Modified revalidation
+    HTTP_CACHE_STALE_TTL = float(os.getenv("HTTP_CACHE_STALE_TTL", "86400"))
+    HTTP_CACHE_MAX_ENTRY_BYTES = int(os.getenv("HTTP_CACHE_MAX_ENTRY_BYTES", str(2 * 1024 * 1024)))
+    HTTP_CACHE_MEMORY_MAX_BYTES = int(os.getenv("HTTP_CACHE_MEMORY_MAX_BYTES", str(32 * 1024 * 1024)))
+    HTTP_CACHE_STORE_MAX_ENTRIES = int(os.getenv("HTTP_CACHE_STORE_MAX_ENTRIES", "2000"))
+
+    # Per-host ordering of the WebScraper fetch chain (direct, ScraperAPI, cloudscraper) by observed cost
+    FETCH_STRATEGY_ENABLED = os.getenv("FETCH_STRATEGY_ENABLED", "true").lower() == "true"
+    # Observations lose half their weight after this many seconds
+    FETCH_STRATEGY_HALF_LIFE = float(os.getenv("FETCH_STRATEGY_HALF_LIFE", "21600"))
+    FETCH_STRATEGY_MIN_WEIGHT = float(os.getenv("FETCH_STRATEGY_MIN_WEIGHT", "0.5"))
+    # Seconds of latency one paid ScraperAPI call is worth when comparing methods
+    FETCH_STRATEGY_PROXY_COST = float(os.getenv("FETCH_STRATEGY_PROXY_COST", "3"))
+
+    # Hard ceiling for a downloaded posting page (decoded bytes); longer pages are cut off
+    SCRAPER_MAX_PAGE_BYTES = int(os.getenv("SCRAPER_MAX_PAGE_BYTES", str(5 * 1024 * 1024)))
+
+    # Long-lived cloudscraper sessions per host (keeps Cloudflare clearance cookies); 0 disables pooling
+    CLOUDSCRAPER_POOL_SIZE = int(os.getenv("CLOUDSCRAPER_POOL_SIZE", "8"))
+    CLOUDSCRAPER_SESSION_MAX_AGE = float(os.getenv("CLOUDSCRAPER_SESSION_MAX_AGE", "1800"))
+
+    # Bundesagentur search: keyword queries of one search run in parallel (per-query timeout in seconds)
+    BA_SEARCH_WORKERS = int(os.getenv("BA_SEARCH_WORKERS", "5"))
+    BA_SEARCH_TIMEOUT = float(os.getenv("BA_SEARCH_TIMEOUT", "15"))
+    # Pooled connections to the Bundesagentur API per worker process; further requests wait for one
+    BA_MAX_CONNECTIONS = int(os.getenv("BA_MAX_CONNECTIONS", "8"))
+    # Bundesagentur search results shared across users: fresh for TTL seconds, then served
+    # for STALE_TTL more seconds while one background request refreshes them
+    BA_SEARCH_CACHE_ENABLED = os.getenv("BA_SEARCH_CACHE_ENABLED", "true").lower() == "true"
+    BA_SEARCH_CACHE_TTL = int(os.getenv("BA_SEARCH_CACHE_TTL", "900"))
+    BA_SEARCH_CACHE_STALE_TTL = int(os.getenv("BA_SEARCH_CACHE_STALE_TTL", "3600"))
+    BA_SEARCH_CACHE_MEMORY_MAX_ENTRIES = int(os.getenv("BA_SEARCH_CACHE_MEMORY_MAX_ENTRIES", "256"))
+    BA_SEARCH_CACHE_STORE_MAX_ENTRIES = int(os.getenv("BA_SEARCH_CACHE_STORE_MAX_ENTRIES", "5000"))
+    # Local job posting index: searches are answered from postings seen within MAX_AGE seconds
+    # and only go to the BA API for freshness gaps; postings unseen for RETENTION_DAYS are deleted
+    POSTING_INDEX_ENABLED = os.getenv("POSTING_INDEX_ENABLED", "true").lower() == "true"
+    POSTING_INDEX_MAX_AGE = int(os.getenv("POSTING_INDEX_MAX_AGE", "21600"))
+    POSTING_INDEX_RETENTION_DAYS = int(os.getenv("POSTING_INDEX_RETENTION_DAYS", "30"))
+
+    # Scheduled job search: "reverse" routes each cycle's new postings to users with matching skills,
+    # "per_user" runs a full keyword search and scoring for every user
+    AUTO_SEARCH_MODE = os.getenv("AUTO_SEARCH_MODE", "reverse")
+    # Scheduled jobs run only on the holder of a database lease (renewed every TTL/3 seconds). The
+    # auto-search splits the users into batches processed by a worker pool; finished batches are
+    # checkpointed, so a run interrupted by a restart or lost lease resumes on the next leader
+    SCHEDULER_LEASE_TTL = float(os.getenv("SCHEDULER_LEASE_TTL", "300"))
+    SCHEDULER_BATCH_SIZE = int(os.getenv("SCHEDULER_BATCH_SIZE", "50"))
+    SCHEDULER_WORKERS = int(os.getenv("SCHEDULER_WORKERS", "4"))
+    SCHEDULER_BATCH_TIMEOUT = float(os.getenv("SCHEDULER_BATCH_TIMEOUT", "1800"))
+    SCHEDULER_RUN_RETENTION_DAYS = int(os.getenv("SCHEDULER_RUN_RETENTION_DAYS", "30"))
+
+    # Job recommendations: parallel requirement analysis per search
+    RECOMMENDER_SCORING_WORKERS = int(os.getenv("RECOMMENDER_SCORING_WORKERS", "5"))
+    RECOMMENDER_SCORING_TIMEOUT = float(os.getenv("RECOMMENDER_SCORING_TIMEOUT", "60"))
+
+    # Durable generation queue: web workers enqueue and stream, generation_worker.py runs the jobs
+    GENERATION_QUEUE_ENABLED = os.getenv("GENERATION_QUEUE_ENABLED", "false").lower() == "true"
+    GENERATION_WORKER_CONCURRENCY = int(os.getenv("GENERATION_WORKER_CONCURRENCY", "4"))
+    GENERATION_JOB_POLL_INTERVAL = float(os.getenv("GENERATION_JOB_POLL_INTERVAL", "0.5"))
+    # Running jobs without a heartbeat for this long are requeued (worker crashed or was killed)
+    GENERATION_JOB_STALE_AFTER = float(os.getenv("GENERATION_JOB_STALE_AFTER", "300"))
+    GENERATION_JOB_MAX_ATTEMPTS = int(os.getenv("GENERATION_JOB_MAX_ATTEMPTS", "2"))
+    GENERATION_JOB_RETENTION_DAYS = int(os.getenv("GENERATION_JOB_RETENTION_DAYS", "7"))
+
+    # Replayable SSE streams of in-process generations (reconnect with Last-Event-ID)
+    SSE_EVENT_LOG_MAX_EVENTS = int(os.getenv("SSE_EVENT_LOG_MAX_EVENTS", "5000"))
+    SSE_EVENT_LOG_RETENTION = float(os.getenv("SSE_EVENT_LOG_RETENTION", "600"))
+    # Mirror events to CACHE_DIR so a reconnect may land on any worker of the host
+    SSE_EVENT_LOG_SHARED = os.getenv("SSE_EVENT_LOG_SHARED", "true").lower() == "true"
+    SSE_EVENT_LOG_STALL_TIMEOUT = float(os.getenv("SSE_EVENT_LOG_STALL_TIMEOUT", "180"))
+    # Coalesce streamed tokens into frames of at most this age/size (window 0 disables batching)
+    SSE_TOKEN_BATCH_WINDOW_MS = float(os.getenv("SSE_TOKEN_BATCH_WINDOW_MS", "50"))
+    SSE_TOKEN_BATCH_MAX_BYTES = int(os.getenv("SSE_TOKEN_BATCH_MAX_BYTES", "256"))
+
     # CORS
     CORS_ORIGINS = os.getenv("CORS_ORIGINS", "http://localhost:3000").split(",")
 
@@ -0,0 +1,26 @@
+"""Entry point for generation worker processes.
+
+Runs queued generation jobs (GENERATION_QUEUE_ENABLED) until SIGTERM/SIGINT; jobs that
+are already running finish first. Start as many processes as needed:
+
+    python generation_worker.py
+"""
+
+import logging
+import signal
+import threading
+
+from app import create_app
+from config import config
+from services.job_queue import run_worker
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+app = create_app()
+config.validate_config()
+
+if __name__ == "__main__":
+    stop = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stop.set())
+    run_worker(app, stop=stop)
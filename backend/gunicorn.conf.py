@@ -0,0 +1,43 @@
+"""Gunicorn settings (loaded by entrypoint.sh).
+
+``GUNICORN_WORKER_CLASS`` selects the serving model:
+
+- ``gthread`` (default): every worker process serves ``GUNICORN_THREADS`` requests at
+  once. A 30-90s SSE generation stream holds one thread instead of a whole process, and
+  the worker heartbeat runs on its own thread, so long streams no longer hit ``timeout``.
+- ``gevent``: cooperative greenlets, ``GUNICORN_WORKER_CONNECTIONS`` per process. Needs
+  the ``gevent`` package (and ``psycogreen`` for cooperative PostgreSQL queries).
+- ``sync``: one request per process (previous behaviour; needs ``GUNICORN_THREADS=1``,
+  otherwise gunicorn runs gthread anyway).
+
+``DB_POOL_SIZE`` defaults to ``GUNICORN_THREADS``; with gevent set it explicitly, see config.py.
+"""
+
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5002")
+workers = int(os.getenv("GUNICORN_WORKERS", "2"))
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.getenv("GUNICORN_THREADS", "32"))
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "256"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+# Running generations get time to finish on deploys
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "90"))
+keepalive = 5
+accesslog = "-"
+preload_app = True
+
+if worker_class == "gevent":
+    # Patch before --preload imports the app: module-level locks, sockets and thread
+    # pools (HTTP transports, breakers, event logs) are created at import time.
+    try:
+        from gevent import monkey
+    except ImportError as e:
+        raise RuntimeError("GUNICORN_WORKER_CLASS=gevent benötigt das Paket 'gevent'") from e
+    monkey.patch_all()
+    try:
+        from psycogreen.gevent import patch_psycopg
+
+        patch_psycopg()
+    except ImportError:
+        pass
@@ -0,0 +1,74 @@
+"""add generation jobs
+
+Revision ID: i3j4k5l6m7n8
+Revises: 6d7e02aecd4d
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "i3j4k5l6m7n8"
+down_revision = "6d7e02aecd4d"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "generation_jobs",
+        sa.Column("id", sa.String(length=32), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(length=50), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("payload_json", sa.Text(), nullable=False),
+        sa.Column("result_json", sa.Text(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("worker_id", sa.String(length=100), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("heartbeat_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["users.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    with op.batch_alter_table("generation_jobs", schema=None) as batch_op:
+        batch_op.create_index(batch_op.f("ix_generation_jobs_user_id"), ["user_id"], unique=False)
+        batch_op.create_index(batch_op.f("ix_generation_jobs_status"), ["status"], unique=False)
+        batch_op.create_index(batch_op.f("ix_generation_jobs_created_at"), ["created_at"], unique=False)
+
+    op.create_table(
+        "generation_job_events",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("job_id", sa.String(length=32), nullable=False),
+        sa.Column("seq", sa.Integer(), nullable=False),
+        sa.Column("event_json", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["job_id"],
+            ["generation_jobs.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("job_id", "seq", name="uq_generation_job_events_job_seq"),
+    )
+    with op.batch_alter_table("generation_job_events", schema=None) as batch_op:
+        batch_op.create_index(batch_op.f("ix_generation_job_events_job_id"), ["job_id"], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table("generation_job_events", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_generation_job_events_job_id"))
+
+    op.drop_table("generation_job_events")
+    with op.batch_alter_table("generation_jobs", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_generation_jobs_created_at"))
+        batch_op.drop_index(batch_op.f("ix_generation_jobs_status"))
+        batch_op.drop_index(batch_op.f("ix_generation_jobs_user_id"))
+
+    op.drop_table("generation_jobs")
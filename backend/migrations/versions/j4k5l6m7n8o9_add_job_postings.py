@@ -0,0 +1,66 @@
+"""add job postings index
+
+Revision ID: j4k5l6m7n8o9
+Revises: i3j4k5l6m7n8
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "j4k5l6m7n8o9"
+down_revision = "i3j4k5l6m7n8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "job_postings",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("dedup_key", sa.String(length=500), nullable=False),
+        sa.Column("source", sa.String(length=100), nullable=False),
+        sa.Column("refnr", sa.String(length=100), nullable=True),
+        sa.Column("url", sa.String(length=500), nullable=True),
+        sa.Column("title", sa.String(length=255), nullable=False),
+        sa.Column("occupation", sa.String(length=255), nullable=False),
+        sa.Column("company", sa.String(length=255), nullable=False),
+        sa.Column("location", sa.String(length=255), nullable=False),
+        sa.Column("postal_code", sa.String(length=20), nullable=False),
+        sa.Column("working_time", sa.String(length=50), nullable=False),
+        sa.Column("description", sa.Text(), nullable=False),
+        sa.Column("published_at", sa.String(length=20), nullable=False),
+        sa.Column("first_seen_at", sa.DateTime(), nullable=True),
+        sa.Column("last_seen_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("dedup_key"),
+    )
+    with op.batch_alter_table("job_postings", schema=None) as batch_op:
+        batch_op.create_index(batch_op.f("ix_job_postings_source"), ["source"], unique=False)
+        batch_op.create_index(batch_op.f("ix_job_postings_last_seen_at"), ["last_seen_at"], unique=False)
+
+    op.create_table(
+        "job_posting_searches",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("query_key", sa.String(length=64), nullable=False),
+        sa.Column("total", sa.Integer(), nullable=False),
+        sa.Column("fetched_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("query_key"),
+    )
+    with op.batch_alter_table("job_posting_searches", schema=None) as batch_op:
+        batch_op.create_index(batch_op.f("ix_job_posting_searches_fetched_at"), ["fetched_at"], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table("job_posting_searches", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_job_posting_searches_fetched_at"))
+
+    op.drop_table("job_posting_searches")
+    with op.batch_alter_table("job_postings", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_job_postings_last_seen_at"))
+        batch_op.drop_index(batch_op.f("ix_job_postings_source"))
+
+    op.drop_table("job_postings")
@@ -0,0 +1,82 @@
+"""add scheduler leases and runs
+
+Revision ID: k5l6m7n8o9p0
+Revises: j4k5l6m7n8o9
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "k5l6m7n8o9p0"
+down_revision = "j4k5l6m7n8o9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "scheduler_leases",
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column("holder", sa.String(length=150), nullable=False),
+        sa.Column("acquired_at", sa.DateTime(), nullable=True),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+    op.create_table(
+        "scheduler_runs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("job", sa.String(length=100), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("holder", sa.String(length=150), nullable=True),
+        sa.Column("since", sa.DateTime(), nullable=True),
+        sa.Column("batches_total", sa.Integer(), nullable=False),
+        sa.Column("batches_failed", sa.Integer(), nullable=False),
+        sa.Column("users_total", sa.Integer(), nullable=False),
+        sa.Column("users_processed", sa.Integer(), nullable=False),
+        sa.Column("users_failed", sa.Integer(), nullable=False),
+        sa.Column("stats_json", sa.Text(), nullable=True),
+        sa.Column("resumed", sa.Integer(), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("heartbeat_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    with op.batch_alter_table("scheduler_runs", schema=None) as batch_op:
+        batch_op.create_index(batch_op.f("ix_scheduler_runs_job"), ["job"], unique=False)
+        batch_op.create_index(batch_op.f("ix_scheduler_runs_status"), ["status"], unique=False)
+        batch_op.create_index(batch_op.f("ix_scheduler_runs_started_at"), ["started_at"], unique=False)
+
+    op.create_table(
+        "scheduler_run_batches",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("run_id", sa.Integer(), nullable=False),
+        sa.Column("batch_no", sa.Integer(), nullable=False),
+        sa.Column("user_ids_json", sa.Text(), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["run_id"], ["scheduler_runs.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("run_id", "batch_no", name="uq_scheduler_run_batches_run_batch"),
+    )
+    with op.batch_alter_table("scheduler_run_batches", schema=None) as batch_op:
+        batch_op.create_index(batch_op.f("ix_scheduler_run_batches_run_id"), ["run_id"], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table("scheduler_run_batches", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_scheduler_run_batches_run_id"))
+
+    op.drop_table("scheduler_run_batches")
+    with op.batch_alter_table("scheduler_runs", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_scheduler_runs_started_at"))
+        batch_op.drop_index(batch_op.f("ix_scheduler_runs_status"))
+        batch_op.drop_index(batch_op.f("ix_scheduler_runs_job"))
+
+    op.drop_table("scheduler_runs")
+    op.drop_table("scheduler_leases")
@@ -0,0 +1,26 @@
+"""add posting keys to job posting searches
+
+Revision ID: l6m7n8o9p0q1
+Revises: k5l6m7n8o9p0
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "l6m7n8o9p0q1"
+down_revision = "k5l6m7n8o9p0"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("job_posting_searches", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("posting_keys", sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table("job_posting_searches", schema=None) as batch_op:
+        batch_op.drop_column("posting_keys")
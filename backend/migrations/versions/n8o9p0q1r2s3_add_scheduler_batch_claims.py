@@ -0,0 +1,36 @@
+"""add claims to scheduler run batches
+
+Revision ID: n8o9p0q1r2s3
+Revises: m7n8o9p0q1r2
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "n8o9p0q1r2s3"
+down_revision = "m7n8o9p0q1r2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("scheduler_run_batches", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("holder", sa.String(length=150), nullable=True))
+        batch_op.add_column(sa.Column("heartbeat_at", sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column("stats_json", sa.Text(), nullable=True))
+
+    with op.batch_alter_table("scheduler_runs", schema=None) as batch_op:
+        batch_op.drop_column("since")
+
+
+def downgrade():
+    with op.batch_alter_table("scheduler_runs", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("since", sa.DateTime(), nullable=True))
+
+    with op.batch_alter_table("scheduler_run_batches", schema=None) as batch_op:
+        batch_op.drop_column("stats_json")
+        batch_op.drop_column("heartbeat_at")
+        batch_op.drop_column("holder")
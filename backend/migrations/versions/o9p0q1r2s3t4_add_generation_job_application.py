@@ -0,0 +1,26 @@
+"""add application_id to generation jobs
+
+Revision ID: o9p0q1r2s3t4
+Revises: n8o9p0q1r2s3
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "o9p0q1r2s3t4"
+down_revision = "n8o9p0q1r2s3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("generation_jobs", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("application_id", sa.Integer(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table("generation_jobs", schema=None) as batch_op:
+        batch_op.drop_column("application_id")
@@ -8,10 +8,13 @@ from .application import Application  # noqa: E402
 from .ats_analysis import ATSAnalysis  # noqa: E402
 from .document import Document  # noqa: E402
 from .email_account import EmailAccount, decrypt_token, encrypt_token  # noqa: E402
+from .generation_job import GenerationJob, GenerationJobEvent  # noqa: E402
 from .interview_question import InterviewQuestion  # noqa: E402
+from .job_posting import JobPosting, JobPostingSearch  # noqa: E402
 from .job_recommendation import JobRecommendation  # noqa: E402
 from .job_requirement import JobRequirement  # noqa: E402
 from .salary_coach_data import SalaryCoachData  # noqa: E402
+from .scheduler_run import SchedulerLease, SchedulerRun, SchedulerRunBatch  # noqa: E402
 from .seele_antwort import SeeleAntwort  # noqa: E402
 from .seele_profile import SeeleProfile  # noqa: E402
 from .seele_session import SeeleSession  # noqa: E402
@@ -41,9 +44,16 @@ __all__ = [
     "JobRequirement",
     "InterviewQuestion",
     "JobRecommendation",
+    "JobPosting",
+    "JobPostingSearch",
     "SalaryCoachData",
     "WebhookEvent",
     "SeeleProfile",
     "SeeleSession",
     "SeeleAntwort",
+    "GenerationJob",
+    "GenerationJobEvent",
+    "SchedulerLease",
+    "SchedulerRun",
+    "SchedulerRunBatch",
 ]
@@ -0,0 +1,52 @@
+import json
+from datetime import datetime
+
+from . import db
+
+
+class GenerationJob(db.Model):  # type: ignore[name-defined]
+    __tablename__ = "generation_jobs"
+
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex, handed to clients for reattaching
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False, index=True)
+    kind = db.Column(db.String(50), nullable=False)  # e.g. generate_from_url
+    # queued, running, succeeded, failed
+    status = db.Column(db.String(20), nullable=False, default="queued", index=True)
+    payload_json = db.Column(db.Text, nullable=False)
+    result_json = db.Column(db.Text, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    worker_id = db.Column(db.String(100), nullable=True)
+    # Application saved by an attempt; a rerun after a worker crash returns it instead of generating again
+    application_id = db.Column(db.Integer, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    started_at = db.Column(db.DateTime, nullable=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    user = db.relationship("User", backref=db.backref("generation_jobs", lazy="dynamic", cascade="all, delete-orphan"))
+    events = db.relationship("GenerationJobEvent", backref="job", cascade="all, delete-orphan", lazy="dynamic")
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "result": json.loads(self.result_json) if self.result_json else None,
+            "error": self.error,
+            "attempts": self.attempts,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class GenerationJobEvent(db.Model):  # type: ignore[name-defined]
+    __tablename__ = "generation_job_events"
+    __table_args__ = (db.UniqueConstraint("job_id", "seq", name="uq_generation_job_events_job_seq"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.String(32), db.ForeignKey("generation_jobs.id"), nullable=False, index=True)
+    seq = db.Column(db.Integer, nullable=False)  # 1-based, increasing per job
+    event_json = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -0,0 +1,52 @@
+"""
+JobPosting Model - Local index of job postings seen in Bundesagentur searches and scraped pages.
+
+Each posting is stored once (``dedup_key``: ``ba:<refnr>`` or the canonical URL).
+"""
+
+from datetime import datetime
+
+from . import db
+
+
+class JobPosting(db.Model):  # type: ignore[name-defined]
+    __tablename__ = "job_postings"
+
+    id = db.Column(db.Integer, primary_key=True)
+    dedup_key = db.Column(db.String(500), nullable=False, unique=True)  # ba:<refnr> or canonical URL
+    source = db.Column(db.String(100), nullable=False, index=True)  # arbeitsagentur, stepstone, ...
+    refnr = db.Column(db.String(100), nullable=True)  # Bundesagentur reference number
+    url = db.Column(db.String(500), nullable=True)
+    title = db.Column(db.String(255), nullable=False, default="")
+    occupation = db.Column(db.String(255), nullable=False, default="")  # BA "beruf"
+    company = db.Column(db.String(255), nullable=False, default="")
+    location = db.Column(db.String(255), nullable=False, default="")
+    postal_code = db.Column(db.String(20), nullable=False, default="")
+    working_time = db.Column(db.String(50), nullable=False, default="")
+    description = db.Column(db.Text, nullable=False, default="")
+    published_at = db.Column(db.String(20), nullable=False, default="")  # ISO date as delivered
+    first_seen_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_seen_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    def to_job_data(self) -> dict:
+        """Convert to the standard job data format used by the recommender."""
+        return {
+            "title": self.title,
+            "company": self.company,
+            "location": self.location,
+            "url": self.url,
+            "source": self.source,
+            "description": self.description,
+        }
+
+
+class JobPostingSearch(db.Model):  # type: ignore[name-defined]
+    """When a live Bundesagentur search was last ingested into the posting index."""
+
+    __tablename__ = "job_posting_searches"
+
+    id = db.Column(db.Integer, primary_key=True)
+    query_key = db.Column(db.String(64), nullable=False, unique=True)  # sha256 of the normalized parameters
+    total = db.Column(db.Integer, nullable=False, default=0)  # maxErgebnisse of the live search
+    posting_keys = db.Column(db.Text, nullable=True)  # JSON list of the dedup keys it returned, in order
+    fetched_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
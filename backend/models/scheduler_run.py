@@ -0,0 +1,77 @@
+import json
+from datetime import datetime
+
+from . import db
+
+
+class SchedulerLease(db.Model):  # type: ignore[name-defined]
+    """Leader lease of a scheduled job: only the holder of an unexpired lease runs it."""
+
+    __tablename__ = "scheduler_leases"
+
+    name = db.Column(db.String(100), primary_key=True)  # scheduled job id
+    holder = db.Column(db.String(150), nullable=False)  # host:pid:token of the leader
+    acquired_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+
+class SchedulerRun(db.Model):  # type: ignore[name-defined]
+    __tablename__ = "scheduler_runs"
+
+    id = db.Column(db.Integer, primary_key=True)
+    job = db.Column(db.String(100), nullable=False, index=True)
+    # running, succeeded, failed
+    status = db.Column(db.String(20), nullable=False, default="running", index=True)
+    holder = db.Column(db.String(150), nullable=True)
+    batches_total = db.Column(db.Integer, nullable=False, default=0)
+    batches_failed = db.Column(db.Integer, nullable=False, default=0)
+    users_total = db.Column(db.Integer, nullable=False, default=0)
+    users_processed = db.Column(db.Integer, nullable=False, default=0)
+    users_failed = db.Column(db.Integer, nullable=False, default=0)
+    stats_json = db.Column(db.Text, nullable=True)  # summed counters of the finished batches
+    resumed = db.Column(db.Integer, nullable=False, default=0)  # times another leader picked the run up
+    started_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    batches = db.relationship("SchedulerRunBatch", backref="run", cascade="all, delete-orphan", lazy="dynamic")
+
+    def to_dict(self) -> dict:
+        duration = ((self.finished_at or datetime.utcnow()) - self.started_at).total_seconds()
+        return {
+            "id": self.id,
+            "job": self.job,
+            "status": self.status,
+            "batches_total": self.batches_total,
+            "batches_failed": self.batches_failed,
+            "users_total": self.users_total,
+            "users_processed": self.users_processed,
+            "users_failed": self.users_failed,
+            "resumed": self.resumed,
+            "duration_seconds": round(duration, 1),
+            "users_per_second": round(self.users_processed / duration, 2) if duration > 0 else 0.0,
+            "stats": json.loads(self.stats_json) if self.stats_json else {},
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class SchedulerRunBatch(db.Model):  # type: ignore[name-defined]
+    __tablename__ = "scheduler_run_batches"
+    __table_args__ = (db.UniqueConstraint("run_id", "batch_no", name="uq_scheduler_run_batches_run_batch"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    run_id = db.Column(db.Integer, db.ForeignKey("scheduler_runs.id"), nullable=False, index=True)
+    batch_no = db.Column(db.Integer, nullable=False)
+    user_ids_json = db.Column(db.Text, nullable=False)  # partition fixed when the run starts
+    # pending, running, done, failed
+    status = db.Column(db.String(20), nullable=False, default="pending")
+    holder = db.Column(db.String(150), nullable=True)  # leader that claimed the batch
+    heartbeat_at = db.Column(db.DateTime, nullable=True)  # renewed while the claim is held
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    stats_json = db.Column(db.Text, nullable=True)  # counters returned for the batch
+    error = db.Column(db.Text, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def user_ids(self) -> list[int]:
+        return json.loads(self.user_ids_json)
@@ -54,6 +54,8 @@ class User(db.Model):  # type: ignore[name-defined]
     preferred_working_time = db.Column(
         db.String(10), nullable=True
     )  # 'vz' (Vollzeit), 'tz' (Teilzeit), 'ho' (Homeoffice)
+    # Reverse matching: postings the index first saw before this were already routed to the user
+    postings_routed_until = db.Column(db.DateTime, nullable=True)
 
     # Personal contact details (for templates/PDFs)
     phone = db.Column(db.String(50), nullable=True)
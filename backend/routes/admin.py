@@ -40,6 +40,12 @@ def get_stats(current_user: Any) -> Response:
     )
 
 
+@admin_bp.route("/metrics", methods=["GET"])
+@admin_required
+def get_runtime_metrics(current_user: Any) -> Response:
+    return jsonify(admin_service.get_runtime_metrics())
+
+
 @admin_bp.route("/users", methods=["GET"])
 @admin_required
 def list_users(current_user: Any) -> Response:
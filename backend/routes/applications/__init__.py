@@ -8,6 +8,7 @@ from routes.applications import (  # noqa: E402
     crud,  # noqa: F401
     export,  # noqa: F401
     generation,  # noqa: F401
+    generation_jobs,  # noqa: F401
     interview,  # noqa: F401
     requirements,  # noqa: F401
     scraping,  # noqa: F401
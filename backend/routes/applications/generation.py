@@ -4,16 +4,16 @@ Route handlers for application generation.
 Handles generate, generate-from-url, generate-from-url-stream, and generate-from-text endpoints.
 """
 
-import json
 import logging
 import os
-import queue
 import tempfile
 import threading
+from collections.abc import Callable
 from typing import Any
 
 from flask import Response, current_app, jsonify, request
 
+from config import config
 from middleware.api_key_required import api_key_required
 from middleware.jwt_required import jwt_required_custom
 from middleware.subscription_limit import (
@@ -22,15 +22,22 @@ from middleware.subscription_limit import (
     get_subscription_usage,
 )
 from routes.applications import applications_bp
+from routes.applications.generation_jobs import job_event_stream, sse_response
 from services import application_service
+from services.event_log import get_event_log_registry
 from services.generator import BewerbungsGenerator
+from services.industry_rules import VALID_BRANCHES, VALID_SIZES
 from services.job_fit_calculator import JobFitCalculator
+from services.job_queue import enqueue_job, register_job_handler, set_job_application
 from services.requirement_analyzer import RequirementAnalyzer
+from services.stream_frames import TokenBatcher
 from services.subscription_data_service import get_user as get_user_by_id
 from services.web_scraper import WebScraper
 
 logger = logging.getLogger(__name__)
 
+URL_GENERATION_JOB = "generate_from_url"
+
 # Fields to check for profile completeness warnings
 _PROFILE_FIELDS = ["full_name", "phone", "address", "city", "postal_code"]
 
@@ -47,9 +54,9 @@ def _get_profile_warning(user: Any) -> dict[str, Any] | None:
     return None
 
 
-def _add_generation_warnings(result: dict, generator: BewerbungsGenerator, user: Any) -> None:
+def _add_generation_warnings(result: dict, generator: BewerbungsGenerator | None, user: Any) -> None:
     """Attach pipeline warnings and profile completeness warnings to the response."""
-    if generator.warnings:
+    if generator is not None and generator.warnings:
         result["warnings"] = generator.warnings
     profile_warning = _get_profile_warning(user)
     if profile_warning:
@@ -98,6 +105,11 @@ def _build_user_details(data: dict[str, Any]) -> dict[str, Any] | None:
         "location": data.get("location", "").strip(),
         "description": user_description,
         "quelle": data.get("quelle", "").strip() or None,
+        # Classification from the preview step, so generation does not redo it
+        "branche": data.get("branche") if data.get("branche") in VALID_BRANCHES else None,
+        "unternehmensgroesse": data.get("unternehmensgroesse")
+        if data.get("unternehmensgroesse") in VALID_SIZES
+        else None,
     }
 
 
@@ -105,7 +117,7 @@ def _build_generation_result(
     latest: Any,
     pdf_path: str,
     usage: dict,
-    generator: BewerbungsGenerator,
+    generator: BewerbungsGenerator | None,
     user: Any,
     company: str,
 ) -> dict[str, Any]:
@@ -279,6 +291,90 @@ def generate_from_url(current_user: Any) -> tuple[Response, int]:
         return jsonify({"success": False, "error": f"Fehler bei der Generierung: {str(e)}"}), 500
 
 
+def run_url_generation(payload: dict[str, Any], emit: Callable[[dict], None]) -> dict[str, Any]:
+    """Generate an application from a URL, emitting progress events; return the ``complete`` payload.
+
+    Runs in the streaming endpoint's background thread or, with the generation queue
+    enabled, as a job in generation_worker.py. On failure the credit is refunded and a
+    ValueError with a user-facing message is raised.
+    """
+    user_id = payload["user_id"]
+    model = payload.get("model", "qwen")
+    user = get_user_by_id(user_id)
+
+    saved = payload.get("application_id") and application_service.get_application(payload["application_id"], user_id)
+    if saved:
+        # An earlier attempt of this queued job saved the application before its worker died
+        logger.info("Job %s: Bewerbung %s bereits gespeichert, keine erneute Generierung", payload["job_id"], saved.id)
+        return _build_generation_result(saved, saved.pdf_path, get_subscription_usage(user), None, user, saved.firma)
+
+    frames = TokenBatcher(emit)
+
+    def thinking_cb(text):
+        frames.token("thinking", text)
+
+    def content_cb(text):
+        frames.token("content", text)
+
+    try:
+        company, job_text = _resolve_job_data(
+            payload["url"], payload.get("company", ""), payload.get("description", "")
+        )
+
+        generator = BewerbungsGenerator(
+            user_id=user_id,
+            progress_callback=frames.emit,
+            model=model,
+            thinking_callback=thinking_cb if model == "kimi" else None,
+            content_callback=content_cb if model == "kimi" else None,
+        )
+        job_id = payload.get("job_id")
+        if job_id:
+            generator.on_application_saved = lambda application_id: set_job_application(job_id, application_id)
+        generator.prepare()
+        pdf_path = generator.generate_bewerbung(
+            payload["url"],
+            company,
+            user_details=payload.get("user_details"),
+            tonalitaet=payload.get("tone", "modern"),
+        )
+
+        if model == "kimi":
+            frames.emit({"type": "thinking_done"})
+
+        latest = application_service.get_latest_application(user_id)
+        if latest:
+            fit_score = payload.get("fit_score")
+            if fit_score is not None:
+                application_service.update_application_fields(latest, job_fit_score=int(fit_score))
+            elif job_text:
+                calculate_and_store_job_fit(latest, job_text, user_id)
+
+        usage = get_subscription_usage(user)
+        return _build_generation_result(latest, pdf_path, usage, generator, user, company)
+
+    except ValueError:
+        decrement_application_count(user)
+        raise
+    except Exception as e:
+        decrement_application_count(user)
+        logger.exception("SSE generation failed for user %s", user_id)
+        raise ValueError(f"Fehler bei der Generierung: {str(e)}") from e
+    finally:
+        frames.close()
+
+
+def _refund_abandoned_generation(payload: dict[str, Any]) -> None:
+    """Refund the credit of a queued generation whose worker died on the last attempt."""
+    if payload.get("application_id"):
+        # The application was saved, so the credit was used
+        return
+    decrement_application_count(get_user_by_id(payload["user_id"]))
+
+
+register_job_handler(URL_GENERATION_JOB, run_url_generation, on_abandon=_refund_abandoned_generation)
+
+
 @applications_bp.route("/generate-from-url-stream", methods=["POST"])
 @jwt_required_custom
 @check_subscription_limit
@@ -288,10 +384,13 @@ def generate_from_url_stream(current_user: Any) -> Response:
     Streams progress events as Server-Sent Events (SSE) while the generation
     pipeline runs in a background thread. Falls back gracefully -- the original
     generate-from-url endpoint remains available as a non-streaming alternative.
+
+    The first event carries a ``job_id``; a client whose connection dropped resumes via
+    ``/generation-jobs/<job_id>/stream`` with ``Last-Event-ID``. With
+    ``GENERATION_QUEUE_ENABLED`` the generation is enqueued for generation_worker.py instead.
     """
     data = request.json
     url = data.get("url", "").strip()
-    tone = data.get("tone", "modern")
     model = data.get("model", "qwen")
 
     if not url:
@@ -300,103 +399,40 @@ def generate_from_url_stream(current_user: Any) -> Response:
     if not url.startswith(("http://", "https://")):
         return jsonify({"success": False, "error": "Ungültige URL. Bitte mit http:// oder https:// beginnen."}), 400
 
-    # Capture Flask app and user_id for the background thread (avoids detached instances)
-    flask_app = current_app._get_current_object()
-    user_id = current_user.id
-    user_company = data.get("company", "").strip()
-    user_description = data.get("description", "").strip()
-    user_details = _build_user_details(data)
-    fit_score = data.get("fit_score")
-
-    progress_queue = queue.Queue()
-    result_holder = {"result": None, "error": None}
+    payload = {
+        "user_id": current_user.id,
+        "url": url,
+        "tone": data.get("tone", "modern"),
+        "model": model,
+        "company": data.get("company", "").strip(),
+        "description": data.get("description", "").strip(),
+        "user_details": _build_user_details(data),
+        "fit_score": data.get("fit_score"),
+    }
 
-    def thinking_cb(text):
-        progress_queue.put({"type": "thinking", "text": text})
+    if config.GENERATION_QUEUE_ENABLED:
+        job = enqueue_job(current_user.id, URL_GENERATION_JOB, payload)
+        return job_event_stream(job.id, initial_event={"type": "job", "job_id": job.id})
 
-    def content_cb(text):
-        progress_queue.put({"type": "content", "text": text})
+    # Events go to a replayable log: the generation keeps running when the client drops,
+    # and the client resumes via /generation-jobs/<id>/stream with its Last-Event-ID.
+    log = get_event_log_registry().create(current_user.id)
+    log.append({"type": "job", "job_id": log.id})
+    # Capture Flask app for the background thread (avoids detached instances)
+    flask_app = current_app._get_current_object()
 
     def run_generation():
         with flask_app.app_context():
-            user = get_user_by_id(user_id)
+            final_event = {"type": "error", "error": "Fehler bei der Generierung"}
             try:
-                company, job_text = _resolve_job_data(url, user_company, user_description)
-
-                generator = BewerbungsGenerator(
-                    user_id=user_id,
-                    progress_callback=progress_queue.put,
-                    model=model,
-                    thinking_callback=thinking_cb if model == "kimi" else None,
-                    content_callback=content_cb if model == "kimi" else None,
-                )
-                generator.prepare()
-                pdf_path = generator.generate_bewerbung(
-                    url,
-                    company,
-                    user_details=user_details,
-                    tonalitaet=tone,
-                )
-
-                if model == "kimi":
-                    progress_queue.put({"type": "thinking_done"})
-
-                latest = application_service.get_latest_application(user_id)
-                if latest:
-                    if fit_score is not None:
-                        application_service.update_application_fields(latest, job_fit_score=int(fit_score))
-                    elif job_text:
-                        calculate_and_store_job_fit(latest, job_text, user_id)
-
-                usage = get_subscription_usage(user)
-                result_holder["result"] = _build_generation_result(
-                    latest,
-                    pdf_path,
-                    usage,
-                    generator,
-                    user,
-                    company,
-                )
-
+                final_event = {"type": "complete", **run_url_generation(payload, log.append)}
             except ValueError as e:
-                decrement_application_count(user)
-                result_holder["error"] = str(e)
-            except Exception as e:
-                decrement_application_count(user)
-                logger.exception("SSE generation failed for user %s", user_id)
-                result_holder["error"] = f"Fehler bei der Generierung: {str(e)}"
+                final_event = {"type": "error", "error": str(e)}
             finally:
-                progress_queue.put(None)  # Signal: generation complete
+                log.close(final_event)
 
-    def generate_events():
-        gen_thread = threading.Thread(target=run_generation, daemon=True)
-        gen_thread.start()
-
-        while True:
-            try:
-                event = progress_queue.get(timeout=120)
-                if event is None:
-                    break
-                yield f"data: {json.dumps(event)}\n\n"
-            except queue.Empty:
-                yield f"data: {json.dumps({'type': 'keepalive'})}\n\n"
-
-        gen_thread.join(timeout=5)
-
-        if result_holder["error"]:
-            yield f"data: {json.dumps({'type': 'error', 'error': result_holder['error']})}\n\n"
-        elif result_holder["result"]:
-            yield f"data: {json.dumps({'type': 'complete', **result_holder['result']})}\n\n"
-
-    return Response(
-        generate_events(),
-        mimetype="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "X-Accel-Buffering": "no",
-            "Connection": "keep-alive",
-        },
-    )
+    threading.Thread(target=run_generation, daemon=True).start()
+    return sse_response(log.subscribe())
 
 
 @applications_bp.route("/generate-from-text", methods=["POST"])
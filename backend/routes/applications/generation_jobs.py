@@ -0,0 +1,91 @@
+"""
+Route handlers for reattaching to generation streams.
+
+Clients that lost their generation stream reattach here: poll a queued job's state with
+its events, or resume the SSE stream after the last event id they received (sent as
+``Last-Event-ID`` header or ``?after=``). Resuming works for queued jobs as well as for
+in-process generations, whose events are kept in an event log.
+"""
+
+import json
+import logging
+from collections.abc import Iterable
+from typing import Any
+
+from flask import Response, current_app, jsonify, request
+
+from middleware.jwt_required import jwt_required_custom
+from routes.applications import applications_bp
+from services.event_log import subscribe_to_log
+from services.job_queue import get_job, iter_job_events, load_events
+from services.stream_frames import record_sse_sent
+
+logger = logging.getLogger(__name__)
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+    "Connection": "keep-alive",
+}
+
+
+def format_sse(events: Iterable[tuple[int | None, dict]]):
+    """Format ``(id, event)`` pairs as SSE frames; events with an id carry it as SSE ``id``."""
+    for event_id, event in events:
+        id_line = f"id: {event_id}\n" if event_id is not None else ""
+        frame = f"{id_line}data: {json.dumps(event)}\n\n"
+        record_sse_sent(len(frame))
+        yield frame
+
+
+def sse_response(events: Iterable[tuple[int | None, dict]]) -> Response:
+    return Response(format_sse(events), mimetype="text/event-stream", headers=SSE_HEADERS)
+
+
+def job_event_stream(job_id: str, after_seq: int = 0, initial_event: dict | None = None) -> Response:
+    """SSE response replaying a job's events after *after_seq*, then following it until it finishes.
+
+    Persisted events carry their sequence number as SSE ``id``.
+    """
+    flask_app = current_app._get_current_object()  # type: ignore[attr-defined]
+
+    def events():
+        if initial_event:
+            yield None, initial_event
+        with flask_app.app_context():
+            yield from iter_job_events(job_id, after_seq)
+
+    return sse_response(events())
+
+
+def _after_param() -> int:
+    """Last event id the client received: ``Last-Event-ID`` header (browser reconnects) or ``?after=``."""
+    try:
+        return max(0, int(request.headers.get("Last-Event-ID") or request.args.get("after", "0")))
+    except ValueError:
+        return 0
+
+
+@applications_bp.route("/generation-jobs/<job_id>", methods=["GET"])
+@jwt_required_custom
+def get_generation_job(job_id: str, current_user: Any) -> tuple[Response, int]:
+    """Return a generation job's state and its events after ``?after=<seq>`` (polling)."""
+    job = get_job(job_id, current_user.id)
+    if job is None:
+        return jsonify({"success": False, "error": "Generierung nicht gefunden"}), 404
+
+    events = [{"id": seq, **event} for seq, event in load_events(job.id, _after_param())]
+    return jsonify({"success": True, "job": job.to_dict(), "events": events}), 200
+
+
+@applications_bp.route("/generation-jobs/<job_id>/stream", methods=["GET"])
+@jwt_required_custom
+def stream_generation_job(job_id: str, current_user: Any) -> Response:
+    """Reattach to a generation's SSE stream after ``Last-Event-ID`` (or ``?after=<id>``)."""
+    after_id = _after_param()
+    events = subscribe_to_log(job_id, current_user.id, after_id)
+    if events is not None:
+        return sse_response(events)
+    if get_job(job_id, current_user.id) is None:
+        return jsonify({"success": False, "error": "Generierung nicht gefunden"}), 404
+    return job_event_stream(job_id, after_seq=after_id)
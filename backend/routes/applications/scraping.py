@@ -12,6 +12,7 @@ from flask import Response, jsonify, request
 from middleware.jwt_required import jwt_required_custom
 from routes.applications import applications_bp
 from services.contact_extractor import ContactExtractor
+from services.industry_classifier import classify_industry_local
 from services.web_scraper import WebScraper
 
 logger = logging.getLogger(__name__)
@@ -99,6 +100,7 @@ def quick_extract(current_user: Any) -> tuple[Response, int]:
                     "portal": PORTAL_DISPLAY_NAMES.get(job_board, "Sonstige"),
                     "portal_id": job_board or "generic",
                     "url": url,
+                    **classify_industry_local(description),
                 },
             }
         ), 200
@@ -182,6 +184,7 @@ def preview_job(current_user: Any) -> tuple[Response, int]:
                     "salary": job_data.get("salary"),
                     "company_profile_url": job_data.get("company_profile_url"),
                     "missing_fields": missing_fields,
+                    **classify_industry_local(job_data.get("description") or job_data.get("text") or ""),
                 },
             }
         ), 200
@@ -1,5 +1,6 @@
 """Service layer for admin data access."""
 
+import os
 from datetime import datetime, timedelta
 from typing import Any
 
@@ -7,6 +8,48 @@ from sqlalchemy import func
 
 from models import Application, Subscription, User, db
 from models.subscription import SubscriptionPlan, SubscriptionStatus
+from services.ai_client import LLM_RETRY_BUDGET
+from services.ai_transport import transport_stats
+from services.ba_search_cache import get_ba_search_cache
+from services.circuit_breaker import breaker_stats
+from services.event_log import get_event_log_registry
+from services.fetch_strategy import get_fetch_strategy
+from services.hedging import hedging_stats
+from services.http_cache import get_http_cache
+from services.job_queue import queue_stats
+from services.llm_cache import get_llm_cache
+from services.posting_index import get_posting_index
+from services.scheduled_runs import scheduler_run_stats
+from services.scraper_sessions import cloudscraper_pool_stats
+from services.singleflight import get_llm_singleflight
+from services.stream_frames import stream_stats
+
+
+def get_runtime_metrics() -> dict[str, Any]:
+    """Return in-process performance counters of the worker serving this request."""
+    llm_cache = get_llm_cache()
+    http_cache = get_http_cache()
+    fetch_strategy = get_fetch_strategy()
+    ba_search_cache = get_ba_search_cache()
+    posting_index = get_posting_index()
+    return {
+        "pid": os.getpid(),
+        "llm_cache": llm_cache.stats() if llm_cache else None,
+        "http_cache": http_cache.stats() if http_cache else None,
+        "fetch_strategy": fetch_strategy.stats() if fetch_strategy else None,
+        "ba_search_cache": ba_search_cache.stats() if ba_search_cache else None,
+        "posting_index": posting_index.stats() if posting_index else None,
+        "cloudscraper_pool": cloudscraper_pool_stats(),
+        "llm_singleflight": get_llm_singleflight().stats(),
+        "ai_transports": transport_stats(),
+        "llm_circuit_breakers": breaker_stats(),
+        "llm_retry_budget": LLM_RETRY_BUDGET.stats(),
+        "llm_hedging": hedging_stats(),
+        "generation_queue": queue_stats(),
+        "scheduled_runs": scheduler_run_stats(),
+        "sse_streams": get_event_log_registry().stats(),
+        "sse_throughput": stream_stats(),
+    }
 
 
 def get_user(user_id: int) -> User | None:
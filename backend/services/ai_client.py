@@ -1,24 +1,50 @@
 import json
 import logging
-import re
+import time
 
-import httpx
 from openai import OpenAI
 
 from config import config
+from services.ai_streaming import stream_completion
+from services.ai_transport import get_http_client
+from services.anschreiben_text import (
+    EmailSectionFilter,
+    postprocess_anschreiben,
+    remove_forbidden_phrases,
+    split_letter_and_email,
+)
+from services.circuit_breaker import CircuitOpenError, get_breaker
+from services.hedging import Hedger, get_anschreiben_hedger
+from services.llm_cache import MISS, LLMResponseCache, get_llm_cache
 from services.prompts import (
-    FORBIDDEN_PHRASES,
-    build_anschreiben_system_prompt,
+    build_anschreiben_messages,
     create_email_body_prompt,
     create_extraction_prompt,
+    create_industry_prompt,
 )
-from services.retry import retry_with_backoff
+from services.retry import RetryBudget, retry_with_backoff
+from services.singleflight import get_llm_singleflight
 
 logger = logging.getLogger(__name__)
 
+# Shared by all AIClient instances of this process
+LLM_RETRY_BUDGET = RetryBudget(
+    ratio=config.LLM_RETRY_BUDGET_RATIO,
+    min_retries=config.LLM_RETRY_BUDGET_MIN,
+    enabled=config.LLM_RETRY_BUDGET_ENABLED,
+)
+
 
 class AIClient:
+    """Facade over the Qwen (OpenRouter) and Kimi (Fireworks) chat APIs.
+
+    Cheap to construct: the HTTP connection pools are process-wide (see ``ai_transport``).
+    """
+
     IGNORED_VALUES = {"keine angabe", "nicht vorhanden", "n/a", ""}
+    EXTRACTION_CACHE_TTL = 24 * 3600
+    # Extra output budget for the email body in combined generation
+    EMAIL_SECTION_MAX_TOKENS = 250
 
     def __init__(self, api_key: str | None = None):
         # Qwen3 via OpenRouter
@@ -29,10 +55,7 @@ class AIClient:
             api_key=qwen_key,
             base_url=config.QWEN_API_BASE,
             timeout=90.0,
-            http_client=httpx.Client(
-                timeout=90.0,
-                limits=httpx.Limits(keepalive_expiry=30),
-            ),
+            http_client=get_http_client("openrouter", timeout=90.0),
         )
         # Kimi K2.5 via Fireworks AI
         kimi_key = config.FIREWORKS_API_KEY
@@ -42,38 +65,102 @@ class AIClient:
             api_key=kimi_key,
             base_url=config.KIMI_API_BASE,
             timeout=120.0,
-            http_client=httpx.Client(
-                timeout=120.0,
-                limits=httpx.Limits(keepalive_expiry=30),
-            ),
+            http_client=get_http_client("fireworks", timeout=120.0),
         )
         self.model = config.QWEN_MODEL
         self.kimi_model = config.KIMI_MODEL
         self.max_tokens = config.QWEN_MAX_TOKENS
         self.temperature = config.QWEN_TEMPERATURE
 
-    @retry_with_backoff(max_attempts=3, base_delay=2.0)
-    def _call_api_with_retry(self, messages, max_tokens, temperature, model=None):
-        """Send a chat completion request with automatic retry on failure."""
-        return self._call_api(messages=messages, max_tokens=max_tokens, temperature=temperature, model=model)
+    @retry_with_backoff(max_attempts=3, base_delay=2.0, non_retryable=(CircuitOpenError,), budget=LLM_RETRY_BUDGET)
+    def _call_api_with_retry(
+        self,
+        messages,
+        max_tokens,
+        temperature,
+        model=None,
+        cache_ttl: int | None = None,
+        bypass_cache=False,
+        cache_durable=True,
+    ):
+        """Send a chat completion request with automatic retry on failure.
+
+        With ``cache_ttl`` set, identical requests are answered from the LLM response cache
+        (``cache_durable=False`` keeps the response out of the on-disk tier).
+        """
+        return self._cached_call(
+            self._call_api, "text", messages, max_tokens, temperature, model, cache_ttl, bypass_cache, cache_durable
+        )
 
     def _call_api_json(
         self, messages: list[dict], max_tokens: int, temperature: float, model: str | None = None
     ) -> dict:
         """Send a chat completion request expecting JSON response."""
-        response = self.client.chat.completions.create(
-            model=model or self.model,
-            max_tokens=max_tokens,
-            temperature=temperature,
-            messages=messages,
-            response_format={"type": "json_object"},
+        response = self._guarded(
+            "openrouter",
+            lambda: self.client.chat.completions.create(
+                model=model or self.model,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                messages=messages,
+                response_format={"type": "json_object"},
+            ),
         )
         return json.loads(response.choices[0].message.content.strip())
 
-    @retry_with_backoff(max_attempts=3, base_delay=2.0)
-    def _call_api_json_with_retry(self, messages, max_tokens, temperature, model=None):
-        """Send a JSON chat completion request with automatic retry on failure."""
-        return self._call_api_json(messages=messages, max_tokens=max_tokens, temperature=temperature, model=model)
+    @retry_with_backoff(max_attempts=3, base_delay=2.0, non_retryable=(CircuitOpenError,), budget=LLM_RETRY_BUDGET)
+    def _call_api_json_with_retry(
+        self,
+        messages,
+        max_tokens,
+        temperature,
+        model=None,
+        cache_ttl: int | None = None,
+        bypass_cache=False,
+        cache_durable=True,
+    ):
+        """Send a JSON chat completion request with automatic retry on failure.
+
+        With ``cache_ttl`` set, identical requests are answered from the LLM response cache
+        (``cache_durable=False`` keeps the response out of the on-disk tier).
+        """
+        return self._cached_call(
+            self._call_api_json,
+            "json",
+            messages,
+            max_tokens,
+            temperature,
+            model,
+            cache_ttl,
+            bypass_cache,
+            cache_durable,
+        )
+
+    def _cached_call(self, call, kind, messages, max_tokens, temperature, model, cache_ttl, bypass_cache, durable):
+        """Run *call*, reading from and writing to the response cache when the caller opted in.
+
+        Opted-in calls are also coalesced: concurrent identical requests share one provider
+        round-trip. ``bypass_cache`` calls always go to the provider on their own.
+        """
+        if not cache_ttl:
+            return call(messages=messages, max_tokens=max_tokens, temperature=temperature, model=model)
+
+        cache = get_llm_cache()
+        key = LLMResponseCache.make_key(kind, model or self.model, messages, temperature, max_tokens)
+
+        def fetch():
+            if cache is not None and not bypass_cache:
+                cached = cache.get(key)
+                if cached is not MISS:
+                    return cached
+            result = call(messages=messages, max_tokens=max_tokens, temperature=temperature, model=model)
+            if cache is not None:
+                cache.set(key, result, cache_ttl, durable=durable)
+            return result
+
+        if bypass_cache:
+            return fetch()
+        return get_llm_singleflight().do(key, fetch, timeout=config.LLM_SINGLEFLIGHT_TIMEOUT)
 
     def extract_bewerbung_details(self, stellenanzeige_text: str, firma_name: str) -> dict:
         prompt = create_extraction_prompt(stellenanzeige_text, firma_name)
@@ -83,6 +170,7 @@ class AIClient:
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=800,
                 temperature=0.3,
+                cache_ttl=self.EXTRACTION_CACHE_TTL,
             )
             return self._normalize_extracted_details(data, firma_name)
         except Exception:
@@ -93,6 +181,17 @@ class AIClient:
             ]
             return defaults
 
+    def classify_industry(self, stellenanzeige_text: str) -> dict:
+        """Short LLM classification of branche/unternehmensgroesse (fallback for the local classifier)."""
+        data = self._call_api_json_with_retry(
+            messages=[{"role": "user", "content": create_industry_prompt(stellenanzeige_text)}],
+            max_tokens=60,
+            temperature=0.0,
+            cache_ttl=self.EXTRACTION_CACHE_TTL,
+        )
+        normalized = self._normalize_extracted_details(data, "")
+        return {"branche": normalized["branche"], "unternehmensgroesse": normalized["unternehmensgroesse"]}
+
     def generate_email_body(
         self,
         position: str,
@@ -124,60 +223,6 @@ class AIClient:
             logger.warning("E-Mail-Body-Generierung fehlgeschlagen, verwende Fallback")
             return None
 
-    def _prepare_anschreiben_messages(
-        self,
-        cv_text: str,
-        stellenanzeige_text: str,
-        firma_name: str,
-        position: str,
-        ansprechpartner: str,
-        quelle: str,
-        zeugnis_text: str | None,
-        bewerber_vorname: str | None,
-        bewerber_name: str | None,
-        user_skills: list | None,
-        tonalitaet: str,
-        details: dict | None,
-        user_city: str | None = None,
-        seele_profil_text: str | None = None,
-    ) -> list[dict]:
-        """Build the system/user message pair shared by all Anschreiben generators."""
-        if details and details.get("stellenanzeige_kompakt"):
-            stellenanzeige_text = details["stellenanzeige_kompakt"]
-
-        branche = details.get("branche") if details else None
-        unternehmensgroesse = details.get("unternehmensgroesse") if details else None
-        logger.debug("Industry routing: branche=%s, groesse=%s", branche, unternehmensgroesse)
-
-        system_prompt = build_anschreiben_system_prompt(
-            cv_text=cv_text,
-            position=position,
-            quelle=quelle,
-            ansprechpartner=ansprechpartner,
-            bewerber_vorname=bewerber_vorname,
-            bewerber_name=bewerber_name,
-            user_skills=user_skills,
-            tonalitaet=tonalitaet,
-            user_city=user_city,
-            branche=branche,
-            unternehmensgroesse=unternehmensgroesse,
-            seele_profil_text=seele_profil_text,
-        )
-
-        if zeugnis_text:
-            system_prompt += f"\n\n## ARBEITSZEUGNIS (LETZTE POSITION):\n{zeugnis_text[:500]}"
-
-        firma_info = f" (Firma: {firma_name})" if firma_name else ""
-        user_prompt = f"""STELLENANZEIGE / FIRMENBESCHREIBUNG{firma_info}:
-{stellenanzeige_text[:2000]}
-
-Schreibe jetzt das vollständige Anschreiben (Anrede bis Grußformel):"""
-
-        return [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ]
-
     def generate_anschreiben(
         self,
         cv_text: str,
@@ -197,10 +242,12 @@ Schreibe jetzt das vollständige Anschreiben (Anrede bis Grußformel):"""
     ) -> str | None:
         """Generate a complete cover letter body (greeting through closing).
 
-        API-level retries are handled by _call_api_with_retry. Forbidden phrases
-        are removed via post-processing instead of re-generation.
+        API-level retries are handled by _call_api_with_retry. With hedging enabled
+        (``LLM_HEDGING_ENABLED``), a slow Qwen call is instead raced against Kimi and
+        the first successful letter wins. Forbidden phrases are removed via
+        post-processing instead of re-generation.
         """
-        messages = self._prepare_anschreiben_messages(
+        messages = build_anschreiben_messages(
             cv_text,
             stellenanzeige_text,
             firma_name,
@@ -217,15 +264,7 @@ Schreibe jetzt das vollständige Anschreiben (Anrede bis Grußformel):"""
             seele_profil_text=seele_profil_text,
         )
 
-        raw = self._call_api_with_retry(
-            messages=messages,
-            max_tokens=config.QWEN_ANSCHREIBEN_MAX_TOKENS,
-            temperature=config.QWEN_ANSCHREIBEN_TEMPERATURE,
-        )
-
-        result = self._postprocess_anschreiben(raw)
-        result = self._remove_forbidden_phrases(result)
-        return result
+        return self._finish_letter(self._complete_qwen(messages, config.QWEN_ANSCHREIBEN_MAX_TOKENS))
 
     def generate_anschreiben_stream(
         self,
@@ -252,8 +291,9 @@ Schreibe jetzt das vollständige Anschreiben (Anrede bis Grußformel):"""
         streamed via content_callback as they arrive for real-time display.
 
         No @retry_with_backoff -- streaming responses cannot be retried mid-stream.
+        Raises CircuitOpenError without calling Fireworks while its circuit is open.
         """
-        messages = self._prepare_anschreiben_messages(
+        messages = build_anschreiben_messages(
             cv_text,
             stellenanzeige_text,
             firma_name,
@@ -270,45 +310,99 @@ Schreibe jetzt das vollständige Anschreiben (Anrede bis Grußformel):"""
             seele_profil_text=seele_profil_text,
         )
 
-        try:
-            response = self.kimi_client.chat.completions.create(
-                model=self.kimi_model,
-                messages=messages,
-                max_tokens=config.KIMI_MAX_TOKENS,
-                temperature=config.KIMI_TEMPERATURE,
-                stream=True,
-                extra_body={"thinking": {"type": "enabled", "budget_tokens": config.KIMI_THINKING_BUDGET}},
-            )
+        result = self._stream_kimi(messages, thinking_callback, content_callback)
+        if not result.strip():
+            logger.error("Kimi stream returned empty output")
+            return None
+        return self._finish_letter(result)
 
-            output_parts = []
+    def generate_anschreiben_with_email(
+        self, model: str = "qwen", thinking_callback=None, content_callback=None, **letter_kwargs
+    ) -> tuple[str | None, str | None]:
+        """Generate letter body and application email body in one response.
 
-            for chunk in response:
-                if not chunk.choices:
-                    continue
-                delta = chunk.choices[0].delta
-                # Forward reasoning tokens via callback (Fireworks uses reasoning_content)
-                reasoning = getattr(delta, "reasoning_content", None)
-                if reasoning and thinking_callback:
-                    thinking_callback(reasoning)
-                content = delta.content
-                if content:
-                    output_parts.append(content)
-                    if content_callback:
-                        content_callback(content)
-
-            result = "".join(output_parts)
-            if not result.strip():
-                logger.error("Kimi stream returned empty output")
-                return None
-
-            result = self._postprocess_anschreiben(result)
-            result = self._remove_forbidden_phrases(result)
-            return result
+        ``letter_kwargs`` are those of ``generate_anschreiben``. ``model`` selects the
+        Qwen or the streamed Kimi path; only the letter part is streamed to
+        ``content_callback``. The email body is None when the response has no
+        usable email section, so callers fall back to ``generate_email_body``.
+        """
+        messages = build_anschreiben_messages(**letter_kwargs, with_email=True)
+        if model == "kimi":
+            email_filter = EmailSectionFilter(content_callback) if content_callback else None
+            raw = self._stream_kimi(messages, thinking_callback, email_filter.feed if email_filter else None)
+            if email_filter:
+                email_filter.flush()
+        else:
+            raw = self._complete_qwen(messages, config.QWEN_ANSCHREIBEN_MAX_TOKENS + self.EMAIL_SECTION_MAX_TOKENS)
+
+        letter, email_body = split_letter_and_email(raw)
+        if not letter.strip():
+            logger.error("Kombinierte Generierung lieferte kein Anschreiben")
+            return None, None
+        if email_body is None:
+            logger.info("Keine E-Mail-Sektion in der Antwort, E-Mail wird separat generiert")
+        return self._finish_letter(letter), email_body
+
+    def _complete_qwen(self, messages: list[dict], max_tokens: int) -> str:
+        hedger = get_anschreiben_hedger()
+        if hedger is not None:
+            return self._generate_hedged(hedger, messages, max_tokens)
+        return self._call_api_with_retry(
+            messages=messages, max_tokens=max_tokens, temperature=config.QWEN_ANSCHREIBEN_TEMPERATURE
+        )
 
+    def _stream_kimi(self, messages: list[dict], thinking_callback=None, content_callback=None) -> str:
+        try:
+            return stream_completion(
+                self.kimi_client,
+                "fireworks",
+                thinking_callback=thinking_callback,
+                content_callback=content_callback,
+                **self._kimi_request(messages),
+            )
         except Exception as e:
             logger.error("Kimi streaming Fehler: %s", e)
             raise
 
+    def _finish_letter(self, raw: str) -> str:
+        """Post-process a letter body; forbidden phrases are removed instead of re-generated."""
+        return self._remove_forbidden_phrases(self._postprocess_anschreiben(raw))
+
+    def _kimi_request(self, messages: list[dict]) -> dict:
+        return {
+            "model": self.kimi_model,
+            "messages": messages,
+            "max_tokens": config.KIMI_MAX_TOKENS,
+            "temperature": config.KIMI_TEMPERATURE,
+            "extra_body": {"thinking": {"type": "enabled", "budget_tokens": config.KIMI_THINKING_BUDGET}},
+        }
+
+    def _generate_hedged(self, hedger: Hedger, messages: list[dict], max_tokens: int) -> str:
+        """Race Qwen against a Kimi hedge; both stream so the loser can be cancelled."""
+
+        def qwen(cancel, on_first_token):
+            return stream_completion(
+                self.client,
+                "openrouter",
+                cancel=cancel,
+                on_first_token=on_first_token,
+                model=self.model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=config.QWEN_ANSCHREIBEN_TEMPERATURE,
+            )
+
+        def kimi(cancel, on_first_token):
+            return stream_completion(
+                self.kimi_client,
+                "fireworks",
+                cancel=cancel,
+                on_first_token=on_first_token,
+                **self._kimi_request(messages),
+            )
+
+        return hedger.run(qwen, kimi)
+
     def chat_complete(self, messages: list[dict], max_tokens: int = 2000, temperature: float = 0.7) -> str:
         return self._call_api(messages=messages, max_tokens=max_tokens, temperature=temperature)
 
@@ -316,14 +410,32 @@ Schreibe jetzt das vollständige Anschreiben (Anrede bis Grußformel):"""
 
     def _call_api(self, messages: list[dict], max_tokens: int, temperature: float, model: str | None = None) -> str:
         """Send a chat completion request and return the stripped response text."""
-        response = self.client.chat.completions.create(
-            model=model or self.model,
-            max_tokens=max_tokens,
-            temperature=temperature,
-            messages=messages,
+        response = self._guarded(
+            "openrouter",
+            lambda: self.client.chat.completions.create(
+                model=model or self.model,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                messages=messages,
+            ),
         )
         return response.choices[0].message.content.strip()
 
+    def _guarded(self, provider: str, request):
+        """Run a provider request through its circuit breaker, recording outcome and latency."""
+        breaker = get_breaker(provider)
+        if breaker is None:
+            return request()
+        breaker.before_call()
+        start = time.monotonic()
+        try:
+            response = request()
+        except Exception:
+            breaker.record_failure(time.monotonic() - start)
+            raise
+        breaker.record_success(time.monotonic() - start)
+        return response
+
     def _normalize_extracted_details(self, data: dict, firma_name: str) -> dict:
         """Normalize JSON response from API into standard details dict."""
         defaults = self._get_default_details(firma_name)
@@ -371,78 +483,10 @@ Schreibe jetzt das vollständige Anschreiben (Anrede bis Grußformel):"""
         }
 
     def _postprocess_anschreiben(self, text: str) -> str:
-        """Clean up AI-generated cover letter text."""
-        # Remove preambles like "Hier ist das Anschreiben:" or "Gerne, hier..."
-        preamble_patterns = [
-            r"^(?:Hier ist|Gerne|Natürlich|Klar|Selbstverständlich)[^\n]*:\s*\n+",
-            r"^```[^\n]*\n",
-            r"\n```\s*$",
-        ]
-        for pattern in preamble_patterns:
-            text = re.sub(pattern, "", text, flags=re.IGNORECASE)
-
-        # Strip everything before the greeting line (address block, duplicate subject)
-        # Kimi sometimes generates "Firma GmbH\nz. Hd. ...\n[Datum]\n**Betreff**\n\nSehr geehrte..."
-        greeting_match = re.search(
-            r"^((?:Sehr geehrte|Moin|Liebe[rs]?\s|Hallo|Guten Tag)[^\n]*)",
-            text,
-            flags=re.MULTILINE,
-        )
-        if greeting_match:
-            text = text[greeting_match.start() :]
-
-        # Remove markdown bold markers (**text**)
-        text = re.sub(r"\*\*([^*]+)\*\*", r"\1", text)
-
-        # Remove placeholder date tags like [Datum: aktuelles Datum]
-        text = re.sub(r"\[Datum:[^\]]*\]", "", text)
-
-        # Replace dashes used as punctuation (en-dash, em-dash)
-        text = text.replace(" – ", ", ").replace(" — ", ", ")
-        text = text.replace("–", ",").replace("—", ",")
-
-        # Normalize excessive line breaks
-        text = re.sub(r"\n{3,}", "\n\n", text)
-
-        # Strip surrounding quotes
-        text = text.strip()
-        if text.startswith('"') and text.endswith('"'):
-            text = text[1:-1].strip()
-
-        return text
+        return postprocess_anschreiben(text)
 
     def _remove_forbidden_phrases(self, text: str) -> str:
-        """Remove sentences containing forbidden phrases from the text."""
-        # Split into sentences by ". " or ".\n" while preserving paragraph structure
-        paragraphs = text.split("\n")
-        cleaned_paragraphs = []
-
-        removed = []
-        for paragraph in paragraphs:
-            if not paragraph.strip():
-                cleaned_paragraphs.append(paragraph)
-                continue
-
-            # Split paragraph into sentences
-            sentences = re.split(r"(?<=\.)\s+", paragraph)
-            kept = []
-            for sentence in sentences:
-                sentence_lower = sentence.lower()
-                matched_phrases = [p for p in FORBIDDEN_PHRASES if p.lower() in sentence_lower]
-                if matched_phrases:
-                    removed.extend(matched_phrases)
-                else:
-                    kept.append(sentence)
-
-            cleaned_paragraphs.append(" ".join(kept))
-
-        if removed:
-            logger.warning("Verbotene Phrasen entfernt: %s", removed)
-
-        # Clean up empty paragraphs that resulted from removal
-        result = "\n".join(cleaned_paragraphs)
-        result = re.sub(r"\n{3,}", "\n\n", result)
-        return result.strip()
+        return remove_forbidden_phrases(text)
 
 
 QwenAPIClient = AIClient
@@ -0,0 +1,70 @@
+"""Streaming chat completions with circuit-breaker accounting and cancellation."""
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+
+from services.circuit_breaker import get_breaker
+from services.hedging import HedgeCancelled
+
+logger = logging.getLogger(__name__)
+
+
+def stream_completion(
+    client,
+    provider: str,
+    *,
+    cancel: threading.Event | None = None,
+    on_first_token: Callable[[], None] | None = None,
+    thinking_callback: Callable[[str], None] | None = None,
+    content_callback: Callable[[str], None] | None = None,
+    **request,
+) -> str:
+    """Stream a chat completion from *client* and return the concatenated content.
+
+    The provider's circuit is judged on time-to-first-token, since a full letter
+    legitimately streams for a minute. Raises ``CircuitOpenError`` without calling
+    the provider while its circuit is open, and ``HedgeCancelled`` (after closing
+    the stream) once *cancel* is set.
+    """
+    breaker = get_breaker(provider)
+    if breaker is not None:
+        breaker.before_call()
+    start = time.monotonic()
+    first_token_seen = False
+
+    try:
+        response = client.chat.completions.create(stream=True, **request)
+        output_parts = []
+        for chunk in response:
+            if cancel is not None and cancel.is_set():
+                close = getattr(response, "close", None)
+                if close is not None:
+                    close()
+                raise HedgeCancelled(f"{provider}-Stream abgebrochen")
+            if not chunk.choices:
+                continue
+            if not first_token_seen:
+                first_token_seen = True
+                if breaker is not None:
+                    breaker.record_success(time.monotonic() - start)
+                if on_first_token is not None:
+                    on_first_token()
+            delta = chunk.choices[0].delta
+            # Forward reasoning tokens via callback (Fireworks uses reasoning_content)
+            reasoning = getattr(delta, "reasoning_content", None)
+            if reasoning and thinking_callback:
+                thinking_callback(reasoning)
+            content = delta.content
+            if content:
+                output_parts.append(content)
+                if content_callback:
+                    content_callback(content)
+        return "".join(output_parts)
+    except HedgeCancelled:
+        raise
+    except Exception:
+        if breaker is not None and not first_token_seen:
+            breaker.record_failure(time.monotonic() - start)
+        raise
@@ -0,0 +1,96 @@
+"""Process-wide pooled HTTP transports for the LLM providers.
+
+``AIClient`` is constructed per service instance (and often per request), but the
+underlying ``httpx.Client`` — connection pool, TLS sessions, keep-alive sockets —
+lives here once per provider and process. Clients are built lazily and rebuilt
+after a fork, so gunicorn ``--preload`` workers never share sockets with the master.
+"""
+
+import logging
+import os
+import threading
+
+import httpx
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+
+class _ConnectionStats:
+    """Counts requests and newly opened connections via the httpcore trace extension."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+
+    def on_request(self, request: httpx.Request) -> None:
+        request.extensions["trace"] = self._trace
+        with self._lock:
+            self.requests += 1
+
+    def _trace(self, event_name: str, info: dict) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            with self._lock:
+                self.new_connections += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            requests, connections = self.requests, self.new_connections
+        reused = max(requests - connections, 0)
+        return {
+            "requests": requests,
+            "new_connections": connections,
+            "reused_connections": reused,
+            "reuse_rate": round(reused / requests, 3) if requests else 0.0,
+        }
+
+
+_clients: dict[str, httpx.Client] = {}
+_stats: dict[str, _ConnectionStats] = {}
+_owner_pid: int | None = None
+_lock = threading.Lock()
+
+
+def get_http_client(provider: str, timeout: float) -> httpx.Client:
+    """Return the shared ``httpx.Client`` for *provider* in this process."""
+    global _owner_pid
+    pid = os.getpid()
+    with _lock:
+        if _owner_pid != pid:
+            # Inherited from the parent across fork: drop without closing the parent's sockets.
+            _clients.clear()
+            _stats.clear()
+            _owner_pid = pid
+
+        client = _clients.get(provider)
+        if client is None or client.is_closed:
+            stats = _stats.setdefault(provider, _ConnectionStats())
+            client = httpx.Client(
+                timeout=timeout,
+                limits=httpx.Limits(
+                    max_connections=config.AI_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=config.AI_HTTP_MAX_CONNECTIONS,
+                    keepalive_expiry=config.AI_HTTP_KEEPALIVE_EXPIRY,
+                ),
+                event_hooks={"request": [stats.on_request]},
+            )
+            _clients[provider] = client
+            logger.debug("HTTP-Pool für %s angelegt (pid %d)", provider, pid)
+        return client
+
+
+def transport_stats() -> dict:
+    """Return per-provider request and connection-reuse counters for this process."""
+    with _lock:
+        return {provider: stats.snapshot() for provider, stats in _stats.items()}
+
+
+def close_transports() -> None:
+    """Close all pooled clients of this process (shutdown hook and tests)."""
+    with _lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+        _stats.clear()
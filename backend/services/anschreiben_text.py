@@ -0,0 +1,172 @@
+"""Text clean-up applied to every generated cover letter body, whichever model wrote it."""
+
+import logging
+import re
+
+from services.prompts import FORBIDDEN_PHRASES
+
+logger = logging.getLogger(__name__)
+
+# The "=== E-MAIL ===" marker line, piece by piece. Tolerates extra "=" / spaces and markdown
+# emphasis the model may add around it; every piece accepts any prefix of what it matches
+_MARKER_PARTS = (r"[*#\s]*", "=+", r"\s*", "E", "-?", "M", "A", "I", "L", r"\s*", "=+", r"[*\s]*")
+_EMAIL_MARKER_RE = re.compile("^" + "".join(_MARKER_PARTS) + "$", re.IGNORECASE | re.MULTILINE)
+# Text that may still grow into the marker line: the pieces as nested optional groups
+_MARKER_PREFIX_RE = re.compile(
+    "".join(f"(?:{part}" for part in _MARKER_PARTS) + ")?" * len(_MARKER_PARTS), re.IGNORECASE
+)
+_EMAIL_CLOSING_RE = re.compile(r"(Mit freundlichen Grüßen|Viele Grüße|Beste Grüße|Freundliche Grüße),?", re.IGNORECASE)
+
+
+def postprocess_anschreiben(text: str) -> str:
+    """Clean up AI-generated cover letter text."""
+    # Remove preambles like "Hier ist das Anschreiben:" or "Gerne, hier..."
+    preamble_patterns = [
+        r"^(?:Hier ist|Gerne|Natürlich|Klar|Selbstverständlich)[^\n]*:\s*\n+",
+        r"^```[^\n]*\n",
+        r"\n```\s*$",
+    ]
+    for pattern in preamble_patterns:
+        text = re.sub(pattern, "", text, flags=re.IGNORECASE)
+
+    # Strip everything before the greeting line (address block, duplicate subject)
+    # Kimi sometimes generates "Firma GmbH\nz. Hd. ...\n[Datum]\n**Betreff**\n\nSehr geehrte..."
+    greeting_match = re.search(
+        r"^((?:Sehr geehrte|Moin|Liebe[rs]?\s|Hallo|Guten Tag)[^\n]*)",
+        text,
+        flags=re.MULTILINE,
+    )
+    if greeting_match:
+        text = text[greeting_match.start() :]
+
+    # Remove markdown bold markers (**text**)
+    text = re.sub(r"\*\*([^*]+)\*\*", r"\1", text)
+
+    # Remove placeholder date tags like [Datum: aktuelles Datum]
+    text = re.sub(r"\[Datum:[^\]]*\]", "", text)
+
+    # Replace dashes used as punctuation (en-dash, em-dash)
+    text = text.replace(" – ", ", ").replace(" — ", ", ")
+    text = text.replace("–", ",").replace("—", ",")
+
+    # Normalize excessive line breaks
+    text = re.sub(r"\n{3,}", "\n\n", text)
+
+    # Strip surrounding quotes
+    text = text.strip()
+    if text.startswith('"') and text.endswith('"'):
+        text = text[1:-1].strip()
+
+    return text
+
+
+def remove_forbidden_phrases(text: str) -> str:
+    """Remove sentences containing forbidden phrases from the text."""
+    # Split into sentences by ". " or ".\n" while preserving paragraph structure
+    paragraphs = text.split("\n")
+    cleaned_paragraphs = []
+
+    removed = []
+    for paragraph in paragraphs:
+        if not paragraph.strip():
+            cleaned_paragraphs.append(paragraph)
+            continue
+
+        # Split paragraph into sentences
+        sentences = re.split(r"(?<=\.)\s+", paragraph)
+        kept = []
+        for sentence in sentences:
+            sentence_lower = sentence.lower()
+            matched_phrases = [p for p in FORBIDDEN_PHRASES if p.lower() in sentence_lower]
+            if matched_phrases:
+                removed.extend(matched_phrases)
+            else:
+                kept.append(sentence)
+
+        cleaned_paragraphs.append(" ".join(kept))
+
+    if removed:
+        logger.warning("Verbotene Phrasen entfernt: %s", removed)
+
+    # Clean up empty paragraphs that resulted from removal
+    result = "\n".join(cleaned_paragraphs)
+    result = re.sub(r"\n{3,}", "\n\n", result)
+    return result.strip()
+
+
+def split_letter_and_email(text: str) -> tuple[str, str | None]:
+    """Split combined generation output into (letter, email body).
+
+    The email body is None when the marker is missing or nothing follows it, so the
+    caller can fall back to a separate email generation call. Anything after the
+    email's closing formula (a stray signature) is dropped.
+    """
+    match = _EMAIL_MARKER_RE.search(text)
+    if not match:
+        return text, None
+
+    letter = text[: match.start()].rstrip()
+    email = text[match.end() :].strip()
+    closing = _EMAIL_CLOSING_RE.search(email)
+    if closing:
+        email = email[: closing.end()].rstrip(",")
+    email = re.sub(r"^```[^\n]*\n|\n```\s*$", "", email).strip()
+    return letter, email or None
+
+
+class EmailSectionFilter:
+    """Forwards streamed letter tokens to *callback* and withholds the email section.
+
+    Complete lines are checked against the same marker pattern as
+    ``split_letter_and_email``; the current line is held back while it could still
+    become the marker line, so the UI never shows the email part.
+    """
+
+    def __init__(self, callback):
+        self.callback = callback
+        self._pending = ""
+        # Whether _pending begins at the start of a line (the marker must fill a whole line)
+        self._at_line_start = True
+        self._done = False
+
+    def feed(self, chunk: str) -> None:
+        if self._done:
+            return
+        self._pending += chunk
+        line_start = 0
+        while (line_end := self._pending.find("\n", line_start)) != -1:
+            if self._is_marker(line_start, self._pending[line_start:line_end]):
+                self._finish(line_start)
+                return
+            line_start = line_end + 1
+
+        # Keep the last line if it may still grow into the marker, plus the whitespace before it
+        keep_from = len(self._pending)
+        if (line_start > 0 or self._at_line_start) and _MARKER_PREFIX_RE.fullmatch(self._pending[line_start:]):
+            keep_from = line_start
+        while keep_from > 0 and self._pending[keep_from - 1].isspace():
+            keep_from -= 1
+        self._emit(self._pending[:keep_from])
+        self._at_line_start = self._at_line_start if keep_from == 0 else self._pending[keep_from - 1] == "\n"
+        self._pending = self._pending[keep_from:]
+
+    def flush(self) -> None:
+        if not self._done:
+            line_start = self._pending.rfind("\n") + 1
+            if self._is_marker(line_start, self._pending[line_start:]):
+                self._finish(line_start)
+            else:
+                self._emit(self._pending)
+        self._pending = ""
+
+    def _is_marker(self, line_start: int, line: str) -> bool:
+        return (line_start > 0 or self._at_line_start) and _EMAIL_MARKER_RE.fullmatch(line) is not None
+
+    def _finish(self, marker_start: int) -> None:
+        self._emit(self._pending[:marker_start].rstrip())
+        self._pending = ""
+        self._done = True
+
+    def _emit(self, text: str) -> None:
+        if text:
+            self.callback(text)
@@ -28,6 +28,9 @@ CATEGORY_WEIGHTS = {
 class ATSService:
     """Service for analyzing CVs against job descriptions."""
 
+    # The prompt contains the CV, so results are not written to the on-disk cache
+    CACHE_TTL = 3600
+
     def __init__(self):
         self.client = AIClient()
 
@@ -64,6 +67,8 @@ class ATSService:
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=2000,
                 temperature=0.3,
+                cache_ttl=self.CACHE_TTL,
+                cache_durable=False,
             )
             return self._parse_analysis_response(data)
         except ValueError:
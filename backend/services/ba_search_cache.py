@@ -0,0 +1,208 @@
+"""Shared cache for Bundesagentur job search responses.
+
+Interactive searches and ``auto_search_jobs`` query the BA API per user, although many
+users search the same keywords in the same city. Responses are cached per normalized
+query (keyword and location case/whitespace-folded, radius, working time, page, page
+size, publication window), so API calls scale with distinct queries, not with users.
+
+- Entries are fresh for ``BA_SEARCH_CACHE_TTL``. For ``BA_SEARCH_CACHE_STALE_TTL``
+  afterwards they are still served, and one background request per query refreshes them
+  (stale-while-revalidate); if that request fails the stale entry stays.
+- Concurrent misses for the same query share one API call (``SingleFlight``).
+- Failed requests are never cached. The memory tier is an LRU; the SQLite tier
+  (``SQLiteKVStore`` under ``CACHE_DIR``) is shared by all workers on the host.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+
+from config import config
+from services.local_store import SQLiteKVStore
+from services.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+def _fold(value) -> str:
+    return " ".join(str(value).split()).casefold()
+
+
+def search_cache_key(params: dict) -> str:
+    """Normalized cache key for the query parameters of a BA search request."""
+    normalized = {
+        name: _fold(value) if name in ("was", "wo", "arbeitszeit") else value for name, value in params.items()
+    }
+    if not normalized.get("wo"):
+        # The radius only applies to a location search
+        normalized.pop("wo", None)
+        normalized.pop("umkreis", None)
+    return json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+
+
+class BASearchCache:
+    """Two-tier (memory LRU + durable store) search response cache with stale-while-revalidate."""
+
+    def __init__(
+        self,
+        ttl: float,
+        stale_ttl: float,
+        memory_max_entries: int = 256,
+        store: SQLiteKVStore | None = None,
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.memory_max_entries = memory_max_entries
+        self.store = store
+        self._memory: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._refreshing: set[str] = set()
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+        self._stats = {
+            "memory_hits": 0,
+            "store_hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "refreshes": 0,
+            "refresh_failures": 0,
+        }
+
+    def fetch(self, key: str, loader: Callable[[], dict]) -> dict:
+        """Return the response for *key*, calling *loader* on a miss or refreshing a stale entry.
+
+        Exceptions of *loader* propagate on a miss; nothing is cached then.
+        """
+        cached = self._lookup(key)
+        if cached is not None:
+            data, fresh = cached
+            if not fresh:
+                self._refresh_in_background(key, loader)
+            return data
+        self._count("misses")
+        return self._flight.do(key, lambda: self._load(key, loader), timeout=config.BA_SEARCH_TIMEOUT * 2)
+
+    def _lookup(self, key: str) -> tuple[dict, bool] | None:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[1] + self.stale_ttl <= now:
+                del self._memory[key]
+                entry = None
+            if entry is not None:
+                self._memory.move_to_end(key)
+                fresh = entry[1] > now
+                self._stats["memory_hits" if fresh else "stale_hits"] += 1
+                return json.loads(entry[0]), fresh
+
+        if self.store is None:
+            return None
+        raw = self.store.get(key)
+        if raw is None:
+            return None
+        try:
+            stored = json.loads(raw)
+            fresh_until, data = stored["fresh_until"], stored["data"]
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning("Defekter BA-Suchcache-Eintrag: %s", e)
+            self.store.delete(key)
+            return None
+        self._remember(key, json.dumps(data, ensure_ascii=False), fresh_until)
+        fresh = fresh_until > now
+        self._count("store_hits" if fresh else "stale_hits")
+        return data, fresh
+
+    def _load(self, key: str, loader: Callable[[], dict]) -> dict:
+        data = loader()
+        self.put(key, data)
+        return data
+
+    def put(self, key: str, data: dict) -> None:
+        """Store a successful search response in both tiers."""
+        fresh_until = time.time() + self.ttl
+        raw = json.dumps(data, ensure_ascii=False)
+        self._remember(key, raw, fresh_until)
+        if self.store is not None:
+            stored = json.dumps({"fresh_until": fresh_until, "data": data}, ensure_ascii=False)
+            self.store.set(key, stored, self.ttl + self.stale_ttl)
+        self._count("writes")
+
+    def _refresh_in_background(self, key: str, loader: Callable[[], dict]) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            self._stats["refreshes"] += 1
+
+        def refresh():
+            try:
+                self._load(key, loader)
+            except Exception as e:
+                self._count("refresh_failures")
+                logger.warning("Aktualisierung der BA-Suche fehlgeschlagen, veraltetes Ergebnis bleibt: %s", e)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        # A thread per refresh (at most one per query) survives gunicorn's fork, unlike a pool
+        threading.Thread(target=refresh, name="ba-search-refresh", daemon=True).start()
+
+    def _remember(self, key: str, raw: str, fresh_until: float) -> None:
+        with self._lock:
+            self._memory[key] = (raw, fresh_until)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_max_entries:
+                self._memory.popitem(last=False)
+
+    def _count(self, outcome: str) -> None:
+        with self._lock:
+            self._stats[outcome] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+            stats["refreshing"] = len(self._refreshing)
+        stats["coalesced"] = self._flight.stats()["coalesced"]
+        hits = stats["memory_hits"] + stats["store_hits"] + stats["stale_hits"]
+        lookups = hits + stats["misses"]
+        stats["hit_rate"] = round(hits / lookups, 3) if lookups else 0.0
+        return stats
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        if self.store is not None:
+            self.store.clear()
+
+
+_cache: BASearchCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_ba_search_cache() -> BASearchCache | None:
+    """Return the process-wide search cache, or None when ``BA_SEARCH_CACHE_ENABLED`` is off."""
+    global _cache
+    if not config.BA_SEARCH_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                store = None
+                if config.CACHE_DIR:
+                    store = SQLiteKVStore(
+                        os.path.join(config.CACHE_DIR, "ba_search_cache.sqlite3"),
+                        table="ba_searches",
+                        max_entries=config.BA_SEARCH_CACHE_STORE_MAX_ENTRIES,
+                    )
+                _cache = BASearchCache(
+                    ttl=config.BA_SEARCH_CACHE_TTL,
+                    stale_ttl=config.BA_SEARCH_CACHE_STALE_TTL,
+                    memory_max_entries=config.BA_SEARCH_CACHE_MEMORY_MAX_ENTRIES,
+                    store=store,
+                )
+    return _cache
@@ -3,16 +3,79 @@ Bundesagentur für Arbeit Job Search API Client.
 
 Uses the free public API at rest.arbeitsagentur.de to search for jobs.
 API docs: https://jobsuche.api.bund.dev/
+
+All clients of a worker process share one pooled session, so parallel keyword
+queries reuse keep-alive connections. The pool blocks at ``BA_MAX_CONNECTIONS``
+connections, which caps the concurrent requests to the API per process. Search
+responses are shared across users through ``services.ba_search_cache``.
 """
 
 import logging
+import os
+import threading
 import warnings
 from dataclasses import dataclass, field
 
 import requests
+from requests.adapters import HTTPAdapter
+
+from config import config
+from services.ba_search_cache import get_ba_search_cache, search_cache_key
 
 logger = logging.getLogger(__name__)
 
+_session: requests.Session | None = None
+_owner_pid: int | None = None
+_session_lock = threading.Lock()
+
+
+def get_ba_session() -> requests.Session:
+    """Return this process's pooled session for the Bundesagentur API."""
+    global _session, _owner_pid
+    pid = os.getpid()
+    with _session_lock:
+        if _session is None or _owner_pid != pid:
+            # Inherited across fork: drop without closing the parent's sockets
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=config.BA_MAX_CONNECTIONS, pool_block=True)
+            session.mount("https://", adapter)
+            session.headers.update(
+                {
+                    "X-API-Key": BundesagenturClient.API_KEY,
+                    "User-Agent": "obojobs/1.0",
+                }
+            )
+            _session = session
+            _owner_pid = pid
+        return _session
+
+
+def build_search_params(
+    keywords: str,
+    location: str = "",
+    radius_km: int = 50,
+    working_time: str = "",
+    published_since_days: int = 14,
+    page: int = 1,
+    size: int = 25,
+) -> dict:
+    """Query parameters of a job search request (see ``BundesagenturClient.search_jobs``)."""
+    params = {
+        "was": keywords,
+        "page": page,
+        "size": min(size, 100),
+        "veroeffentlichtseit": published_since_days,
+    }
+
+    if location:
+        params["wo"] = location
+        params["umkreis"] = radius_km
+
+    if working_time:
+        params["arbeitszeit"] = working_time
+
+    return params
+
 
 @dataclass
 class BundesagenturJob:
@@ -48,14 +111,8 @@ class BundesagenturClient:
     BASE_URL = "https://rest.arbeitsagentur.de/jobboerse/jobsuche-service/pc/v4/jobs"
     API_KEY = "jobboerse-jobsuche"
 
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update(
-            {
-                "X-API-Key": self.API_KEY,
-                "User-Agent": "obojobs/1.0",
-            }
-        )
+    def __init__(self, session: requests.Session | None = None):
+        self.session = session or get_ba_session()
 
     def search_jobs(
         self,
@@ -66,27 +123,17 @@ class BundesagenturClient:
         published_since_days: int = 14,
         page: int = 1,
         size: int = 25,
+        timeout: float | None = None,
     ) -> tuple[list[BundesagenturJob], int]:
         """Search for jobs. working_time: 'vz' (Vollzeit), 'tz' (Teilzeit), 'ho' (Homeoffice)."""
-        params = {
-            "was": keywords,
-            "page": page,
-            "size": min(size, 100),
-            "veroeffentlichtseit": published_since_days,
-        }
-
-        if location:
-            params["wo"] = location
-            params["umkreis"] = radius_km
-
-        if working_time:
-            params["arbeitszeit"] = working_time
-
+        params = build_search_params(keywords, location, radius_km, working_time, published_since_days, page, size)
+        cache = get_ba_search_cache()
         try:
-            response = self.session.get(self.BASE_URL, params=params, timeout=15)
-            response.raise_for_status()
-            data = response.json()
-        except requests.RequestException as e:
+            if cache is None:
+                data = self._request_search(params, timeout)
+            else:
+                data = cache.fetch(search_cache_key(params), lambda: self._request_search(params, timeout))
+        except (requests.RequestException, TimeoutError) as e:
             logger.error("Bundesagentur API error: %s", e)
             return [], 0
         except ValueError:
@@ -100,6 +147,14 @@ class BundesagenturClient:
 
         return jobs, total
 
+    def _request_search(self, params: dict, timeout: float | None) -> dict:
+        """Run one search request; raises on HTTP errors and invalid JSON, so failures are never cached."""
+        response = self.session.get(self.BASE_URL, params=params, timeout=timeout or config.BA_SEARCH_TIMEOUT)
+        response.raise_for_status()
+        data = response.json()
+        # Only the fields search_jobs reads are kept (and cached)
+        return {"maxErgebnisse": data.get("maxErgebnisse", 0), "stellenangebote": data.get("stellenangebote", [])}
+
     def get_job_details(self, refnr: str) -> BundesagenturJob | None:
         """DEPRECATED: Detail endpoint returns 403. Use search results instead."""
         warnings.warn(
@@ -0,0 +1,162 @@
+"""Per-provider circuit breakers for the LLM APIs.
+
+Each breaker keeps a rolling window of call outcomes and latencies. When the error
+rate or the share of slow calls in the window crosses its threshold, the circuit
+opens and calls fail fast with ``CircuitOpenError`` — callers then take their
+existing fallback paths instead of holding a gunicorn worker through a full retry
+chain. After ``open_seconds`` a single probe call is let through (half-open); its
+outcome closes or re-opens the circuit.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose circuit is open."""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"Provider {name} vorübergehend deaktiviert (erneuter Versuch in {retry_in:.0f}s)")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        window_seconds: float = 60.0,
+        min_calls: int = 5,
+        error_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 60.0,
+        slow_rate_threshold: float = 0.8,
+        open_seconds: float = 30.0,
+    ):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.error_rate_threshold = error_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_rate_threshold = slow_rate_threshold
+        self.open_seconds = open_seconds
+
+        self.state = self.CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+        # (timestamp, ok, latency)
+        self._calls: deque[tuple[float, bool, float]] = deque()
+        self._lock = threading.Lock()
+        self._counters = {"successes": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    def before_call(self) -> None:
+        """Raise ``CircuitOpenError`` if the call must not go to the provider."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            now = time.monotonic()
+            if self.state == self.OPEN and now - self._opened_at >= self.open_seconds:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            # A probe whose outcome was never recorded must not block the circuit forever
+            probe_stale = now - self._probe_started > self.open_seconds
+            if self.state == self.HALF_OPEN and (not self._probe_in_flight or probe_stale):
+                self._probe_in_flight = True
+                self._probe_started = now
+                return
+            self._counters["rejected"] += 1
+            retry_in = max(self.open_seconds - (now - self._opened_at), 0.0)
+        raise CircuitOpenError(self.name, retry_in)
+
+    def record_success(self, latency: float) -> None:
+        self._record(True, latency)
+
+    def record_failure(self, latency: float) -> None:
+        self._record(False, latency)
+
+    def _record(self, ok: bool, latency: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._counters["successes" if ok else "failures"] += 1
+            if self.state == self.HALF_OPEN:
+                self._probe_in_flight = False
+                if ok and latency < self.slow_call_seconds:
+                    self.state = self.CLOSED
+                    self._calls.clear()
+                    logger.info("Circuit %s wieder geschlossen", self.name)
+                else:
+                    self._open(now)
+                return
+
+            self._calls.append((now, ok, latency))
+            while self._calls and now - self._calls[0][0] > self.window_seconds:
+                self._calls.popleft()
+
+            if self.state == self.CLOSED and len(self._calls) >= self.min_calls:
+                total = len(self._calls)
+                error_rate = sum(1 for _, call_ok, _ in self._calls if not call_ok) / total
+                slow_rate = (
+                    sum(1 for _, _, call_latency in self._calls if call_latency >= self.slow_call_seconds) / total
+                )
+                if error_rate >= self.error_rate_threshold or slow_rate >= self.slow_rate_threshold:
+                    logger.warning(
+                        "Circuit %s geöffnet (Fehlerquote %.0f%%, langsame Aufrufe %.0f%%)",
+                        self.name,
+                        error_rate * 100,
+                        slow_rate * 100,
+                    )
+                    self._open(now)
+
+    def _open(self, now: float) -> None:
+        self.state = self.OPEN
+        self._opened_at = now
+        self._calls.clear()
+        self._counters["opened"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["state"] = self.state
+            stats["window_calls"] = len(self._calls)
+            if self._calls:
+                latencies = sorted(latency for _, _, latency in self._calls)
+                stats["window_p50_latency"] = round(latencies[len(latencies) // 2], 3)
+        return stats
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker | None:
+    """Return the process-wide breaker for provider *name*, or None when disabled."""
+    if not config.LLM_CIRCUIT_BREAKER_ENABLED:
+        return None
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                name,
+                window_seconds=config.LLM_BREAKER_WINDOW_SECONDS,
+                min_calls=config.LLM_BREAKER_MIN_CALLS,
+                error_rate_threshold=config.LLM_BREAKER_ERROR_RATE,
+                slow_call_seconds=config.LLM_BREAKER_SLOW_CALL_SECONDS,
+                open_seconds=config.LLM_BREAKER_OPEN_SECONDS,
+            )
+            _breakers[name] = breaker
+        return breaker
+
+
+def breaker_stats() -> dict:
+    with _breakers_lock:
+        return {name: breaker.stats() for name, breaker in _breakers.items()}
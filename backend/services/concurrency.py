@@ -0,0 +1,63 @@
+"""Bounded-concurrency helpers for fanning out blocking I/O (LLM and HTTP calls)."""
+
+import logging
+import threading
+import time
+from collections.abc import Callable, Generator, Iterable
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+def map_bounded(
+    func: Callable[[Any], Any],
+    items: Iterable[Any],
+    max_workers: int = 4,
+    timeout: float | None = None,
+    thread_name_prefix: str = "obojobs-worker",
+) -> Generator[tuple[Any, Any, Exception | None], None, None]:
+    """Run *func* over *items* on a bounded thread pool, yielding results in input order.
+
+    Yields ``(item, result, error)`` tuples. ``error`` is the exception raised by
+    *func* (or a ``TimeoutError`` if the call did not finish within *timeout*
+    seconds of starting); ``result`` is ``None`` in that case. Each call's deadline
+    counts from when a worker picked it up, not from when the caller got to it.
+
+    Stopping iteration early (``break``) cancels all work that has not started
+    yet, so callers can stop as soon as they have enough results. Calls that are
+    already running finish in the background; their results are discarded.
+    """
+    items = list(items)
+    if not items:
+        return
+
+    executor = ThreadPoolExecutor(
+        max_workers=max(1, min(max_workers, len(items))), thread_name_prefix=thread_name_prefix
+    )
+    started_at: dict[int, float] = {}
+    started = [threading.Event() for _ in items]
+
+    def run(index: int) -> Any:
+        started_at[index] = time.monotonic()
+        started[index].set()
+        return func(items[index])
+
+    try:
+        futures = [executor.submit(run, index) for index in range(len(items))]
+        for index, (item, future) in enumerate(zip(items, futures, strict=True)):
+            try:
+                if timeout is None:
+                    yield item, future.result(), None
+                    continue
+                started[index].wait()
+                remaining = started_at[index] + timeout - time.monotonic()
+                yield item, future.result(timeout=max(0.0, remaining)), None
+            except FutureTimeoutError:
+                future.cancel()
+                logger.warning("%s: Zeitlimit von %.1fs überschritten", thread_name_prefix, timeout)
+                yield item, None, TimeoutError(f"Keine Antwort innerhalb von {timeout}s")
+            except Exception as e:
+                yield item, None, e
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -141,6 +141,9 @@ class ContactExtractor:
     # Sentinel values indicating "not found" in AI responses
     NOT_FOUND_VALUES = {"nicht_gefunden", "nicht gefunden", "n/a", "keine angabe", "null", "none", ""}
 
+    # Seconds an AI extraction result for identical posting text is reused
+    CACHE_TTL = 7 * 24 * 3600
+
     # German salutation patterns for contact person detection
     SALUTATION_PATTERNS = [
         r"Ansprechpartner(?:in)?[:\s]+(?:Frau|Herr)\s+([A-ZÄÖÜ][a-zäöüß]+(?:\s+[A-ZÄÖÜ][a-zäöüß]+)?)",
@@ -310,6 +313,7 @@ Antworte NUR als JSON-Objekt mit diesen Keys:
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=300,
                 temperature=0.1,
+                cache_ttl=self.CACHE_TTL,
             )
             return self._normalize_nlp_response(data)
         except Exception as e:
@@ -45,11 +45,15 @@ def _send_email(to_email: str, subject: str, html_body: str) -> bool:
 
     try:
         server = smtplib.SMTP(config.MAIL_SERVER, config.MAIL_PORT, timeout=10)
-        if config.MAIL_USE_TLS:
-            server.starttls()
-            server.login(config.MAIL_USERNAME, config.MAIL_PASSWORD)
-        server.sendmail(config.MAIL_DEFAULT_SENDER, to_email, msg.as_string())
-        server.quit()
+        try:
+            if config.MAIL_USE_TLS:
+                server.starttls()
+                server.login(config.MAIL_USERNAME, config.MAIL_PASSWORD)
+            server.sendmail(config.MAIL_DEFAULT_SENDER, to_email, msg.as_string())
+            server.quit()
+        finally:
+            # Also on errors: threaded workers would otherwise keep the socket for the process lifetime
+            server.close()
         logger.info(f"Email sent to {to_email}: {subject}")
         return True
     except Exception as e:
@@ -0,0 +1,260 @@
+"""Replayable event logs for streamed generations.
+
+Every generation started via ``/generate-from-url-stream`` gets an ``EventLog``: a ring
+buffer of its SSE events with increasing ids. Any number of subscribers can follow the
+same log, and a client whose connection dropped reattaches with ``Last-Event-ID``
+instead of starting (and paying for) a new generation.
+
+With ``CACHE_DIR`` set, events are also written to a SQLite file shared by all workers
+on the host, so a reconnect served by another gunicorn worker can replay them as well.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from collections.abc import Iterator
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+KEEPALIVE_EVENT = {"type": "keepalive"}
+
+
+class SQLiteEventStore:
+    """Events of all logs on the host, readable by every worker.
+
+    Like ``SQLiteKVStore``, failures are logged and swallowed: the shared tier only
+    improves reconnects and must never break a running generation.
+    """
+
+    def __init__(self, path: str, retention: float):
+        self.path = path
+        self.retention = retention
+        self._local = threading.local()
+        self._writes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # Per thread and per process: gunicorn --preload forks after import
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS stream_events ("
+                "log_id TEXT NOT NULL, event_id INTEGER NOT NULL, user_id INTEGER NOT NULL, "
+                "event TEXT NOT NULL, final INTEGER NOT NULL, stored_at REAL NOT NULL, "
+                "PRIMARY KEY (log_id, event_id))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_stream_events_stored_at ON stream_events (stored_at)")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def append(self, log_id: str, user_id: int, event_id: int, event: dict, final: bool = False) -> None:
+        try:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO stream_events VALUES (?, ?, ?, ?, ?, ?)",
+                (log_id, event_id, user_id, json.dumps(event), int(final), time.time()),
+            )
+            self._writes += 1
+            if self._writes % 500 == 0:
+                conn.execute("DELETE FROM stream_events WHERE stored_at < ?", (time.time() - self.retention,))
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Stream-Event konnte nicht geteilt werden: %s", e)
+
+    def owner(self, log_id: str) -> int | None:
+        try:
+            row = (
+                self._connect()
+                .execute("SELECT user_id FROM stream_events WHERE log_id = ? LIMIT 1", (log_id,))
+                .fetchone()
+            )
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Stream-Events konnten nicht gelesen werden: %s", e)
+            return None
+        return row[0] if row else None
+
+    def read(self, log_id: str, after_id: int) -> list[tuple[int, dict, bool]]:
+        try:
+            rows = (
+                self._connect()
+                .execute(
+                    "SELECT event_id, event, final FROM stream_events WHERE log_id = ? AND event_id > ? "
+                    "ORDER BY event_id",
+                    (log_id, after_id),
+                )
+                .fetchall()
+            )
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Stream-Events konnten nicht gelesen werden: %s", e)
+            return []
+        return [(event_id, json.loads(event), bool(final)) for event_id, event, final in rows]
+
+    def subscribe(
+        self, log_id: str, after_id: int = 0, keepalive: float = 15.0, poll_interval: float = 0.5
+    ) -> Iterator[tuple[int | None, dict]]:
+        """Follow a log written by another worker until its final event.
+
+        Gives up with an error event when nothing arrives for ``SSE_EVENT_LOG_STALL_TIMEOUT``
+        (the owning worker died).
+        """
+        last_event = last_yield = time.monotonic()
+        while True:
+            events = self.read(log_id, after_id)
+            now = time.monotonic()
+            for event_id, event, final in events:
+                after_id = event_id
+                yield event_id, event
+                if final:
+                    return
+            if events:
+                last_event = last_yield = now
+            elif now - last_event >= config.SSE_EVENT_LOG_STALL_TIMEOUT:
+                yield None, {"type": "error", "error": "Verbindung zur Generierung verloren. Bitte versuche es erneut."}
+                return
+            elif now - last_yield >= keepalive:
+                last_yield = now
+                yield None, KEEPALIVE_EVENT
+            time.sleep(poll_interval)
+
+
+class EventLog:
+    """Ring buffer of one generation's events; ids start at 1 and never repeat."""
+
+    def __init__(self, log_id: str, user_id: int, max_events: int, store: SQLiteEventStore | None = None):
+        self.id = log_id
+        self.user_id = user_id
+        self.closed_at: float | None = None
+        self._events: deque[tuple[int, dict]] = deque(maxlen=max_events)
+        self._next_id = 1
+        self._cond = threading.Condition()
+        self._store = store
+
+    @property
+    def closed(self) -> bool:
+        return self.closed_at is not None
+
+    def append(self, event: dict) -> int | None:
+        """Add *event* and wake all subscribers; returns its id (None once closed)."""
+        return self._append(event, final=False)
+
+    def close(self, final_event: dict) -> None:
+        """Append the terminal ``complete``/``error`` event; subscribers end after it."""
+        self._append(final_event, final=True)
+
+    def _append(self, event: dict, final: bool) -> int | None:
+        with self._cond:
+            if self.closed:
+                logger.debug("Event nach Abschluss von %s verworfen", self.id)
+                return None
+            event_id = self._next_id
+            self._next_id += 1
+            self._events.append((event_id, event))
+            if final:
+                self.closed_at = time.monotonic()
+            self._cond.notify_all()
+        if self._store:
+            self._store.append(self.id, self.user_id, event_id, event, final=final)
+        return event_id
+
+    def subscribe(self, after_id: int = 0, keepalive: float = 15.0) -> Iterator[tuple[int | None, dict]]:
+        """Yield ``(id, event)`` after *after_id*, following the log until it is closed.
+
+        Yields ``(None, keepalive)`` after *keepalive* idle seconds. Events that already
+        dropped out of the ring buffer are skipped.
+        """
+        while True:
+            with self._cond:
+                if not self.closed and (not self._events or self._events[-1][0] <= after_id):
+                    self._cond.wait(keepalive)
+                events = [(event_id, event) for event_id, event in self._events if event_id > after_id]
+                finished = self.closed
+            if events and events[0][0] > after_id + 1:
+                logger.info("Stream %s: %d Events nicht mehr im Puffer", self.id, events[0][0] - after_id - 1)
+            if not events and not finished:
+                yield None, KEEPALIVE_EVENT
+                continue
+            for event_id, event in events:
+                after_id = event_id
+                yield event_id, event
+            if finished:
+                return
+
+
+class EventLogRegistry:
+    """Event logs of this process, kept ``retention`` seconds after they were closed."""
+
+    def __init__(self, max_events: int, retention: float, store: SQLiteEventStore | None = None):
+        self.max_events = max_events
+        self.retention = retention
+        self.store = store
+        self._logs: dict[str, EventLog] = {}
+        self._lock = threading.Lock()
+
+    def create(self, user_id: int) -> EventLog:
+        log = EventLog(uuid.uuid4().hex, user_id, self.max_events, store=self.store)
+        with self._lock:
+            self._prune()
+            self._logs[log.id] = log
+        return log
+
+    def get(self, log_id: str) -> EventLog | None:
+        with self._lock:
+            return self._logs.get(log_id)
+
+    def _prune(self) -> None:
+        cutoff = time.monotonic() - self.retention
+        for log_id in [
+            log_id for log_id, log in self._logs.items() if log.closed_at is not None and log.closed_at < cutoff
+        ]:
+            del self._logs[log_id]
+
+    def stats(self) -> dict:
+        with self._lock:
+            open_logs = sum(1 for log in self._logs.values() if not log.closed)
+            return {"open": open_logs, "retained": len(self._logs) - open_logs, "shared": self.store is not None}
+
+
+_registry: EventLogRegistry | None = None
+_registry_lock = threading.Lock()
+
+
+def get_event_log_registry() -> EventLogRegistry:
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                store = None
+                if config.SSE_EVENT_LOG_SHARED and config.CACHE_DIR:
+                    store = SQLiteEventStore(
+                        os.path.join(config.CACHE_DIR, "stream_events.sqlite3"),
+                        retention=config.SSE_EVENT_LOG_RETENTION,
+                    )
+                _registry = EventLogRegistry(
+                    max_events=config.SSE_EVENT_LOG_MAX_EVENTS, retention=config.SSE_EVENT_LOG_RETENTION, store=store
+                )
+    return _registry
+
+
+def subscribe_to_log(log_id: str, user_id: int, after_id: int = 0) -> Iterator[tuple[int | None, dict]] | None:
+    """Return an event iterator for *log_id* owned by *user_id*, or None if unknown here.
+
+    Prefers the in-process log and falls back to the shared store for logs of other workers.
+    """
+    registry = get_event_log_registry()
+    log = registry.get(log_id)
+    if log is not None:
+        return log.subscribe(after_id) if log.user_id == user_id else None
+    if registry.store is not None and registry.store.owner(log_id) == user_id:
+        return registry.store.subscribe(log_id, after_id)
+    return None
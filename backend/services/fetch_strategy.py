@@ -0,0 +1,197 @@
+"""Per-host memory of which fetch method works, used to order WebScraper's fallback chain.
+
+``WebScraper`` can load a page directly, through ScraperAPI or through cloudscraper. The
+static chain made hosts that always block direct requests pay a failed round-trip (or a
+timeout) on every fetch. This module records, per host and method, decayed success and
+failure counts and a latency average, and orders the chain by expected cost:
+
+- A method's attempt cost is its average latency (successes and failures alike) plus
+  ``FETCH_STRATEGY_PROXY_COST`` seconds for paid ScraperAPI calls; its success chance is
+  ``(successes + 1) / (attempts + 2)``. Trying methods by ascending cost / chance
+  minimises the expected time until a page loads.
+- Counts halve every ``FETCH_STRATEGY_HALF_LIFE`` seconds. Methods with less than
+  ``FETCH_STRATEGY_MIN_WEIGHT`` of evidence keep their default position, after the
+  methods known to work and before those known to fail, so forgotten knowledge is
+  re-learned instead of trusted.
+- With ``CACHE_DIR`` set the records live in a ``SQLiteKVStore`` shared by all workers
+  and survive restarts.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+
+from config import config
+from services.local_store import SQLiteKVStore
+
+logger = logging.getLogger(__name__)
+
+DIRECT = "direct"
+SCRAPER_API = "scraper_api"
+CLOUDSCRAPER = "cloudscraper"
+
+# Records of hosts not fetched for this long are dropped from the store
+_RETENTION_SECONDS = 30 * 24 * 3600
+# Weight of the newest sample in the latency average
+_LATENCY_ALPHA = 0.3
+
+
+@dataclass
+class MethodRecord:
+    successes: float = 0.0
+    failures: float = 0.0
+    latency: float = 0.0
+    updated: float = 0.0
+
+    def decayed(self, now: float, half_life: float) -> "MethodRecord":
+        factor = 0.5 ** (max(now - self.updated, 0.0) / half_life) if half_life > 0 else 1.0
+        return MethodRecord(self.successes * factor, self.failures * factor, self.latency, now)
+
+    @property
+    def weight(self) -> float:
+        return self.successes + self.failures
+
+    @property
+    def success_chance(self) -> float:
+        return (self.successes + 1) / (self.weight + 2)
+
+
+class FetchStrategyMemory:
+    """Thread-safe per-host method records with cost-based chain ordering."""
+
+    def __init__(
+        self,
+        half_life: float,
+        min_weight: float,
+        proxy_cost: float,
+        store: SQLiteKVStore | None = None,
+    ):
+        self.half_life = half_life
+        self.min_weight = min_weight
+        self.proxy_cost = proxy_cost
+        self.store = store
+        self._hosts: dict[str, dict[str, MethodRecord]] = {}
+        self._lock = threading.Lock()
+        self._stats = {"fetches": 0, "reordered": 0, "attempts": 0, "first_try_success": 0}
+
+    def _parse(self, host: str, raw: bytes | str | None) -> dict[str, MethodRecord] | None:
+        """Records of a store entry, or None if it is missing or corrupt."""
+        if raw is None:
+            return None
+        try:
+            return {method: MethodRecord(**record) for method, record in json.loads(raw).items()}
+        except (ValueError, TypeError) as e:
+            logger.warning("Defekter Abrufstrategie-Eintrag für %s: %s", host, e)
+            return None
+
+    def _load(self, host: str) -> dict[str, MethodRecord]:
+        """Current records for *host*; the shared store wins over this worker's copy."""
+        if self.store is not None:
+            raw = self.store.get(host)
+            records = self._parse(host, raw)
+            if records is not None:
+                return records
+            if raw is not None:
+                self.store.delete(host)
+        with self._lock:
+            return dict(self._hosts.get(host, {}))
+
+    def _cost(self, method: str, record: MethodRecord) -> float:
+        attempt_cost = record.latency + (self.proxy_cost if method == SCRAPER_API else 0.0)
+        return attempt_cost / record.success_chance
+
+    def order(self, host: str, chain: list[str]) -> list[str]:
+        """Return *chain* ordered by expected cost for *host* (unchanged without evidence)."""
+        now = time.time()
+        records = {method: record.decayed(now, self.half_life) for method, record in self._load(host).items()}
+
+        def rank(indexed: tuple[int, str]) -> tuple[int, float]:
+            position, method = indexed
+            record = records.get(method)
+            if record is None or record.weight < self.min_weight:
+                return 1, position
+            return (0 if record.success_chance >= 0.5 else 2), self._cost(method, record)
+
+        ordered = [method for _, method in sorted(enumerate(chain), key=rank)]
+        with self._lock:
+            self._stats["fetches"] += 1
+            if ordered != chain:
+                self._stats["reordered"] += 1
+        return ordered
+
+    def record(self, host: str, method: str, success: bool, latency: float, first_attempt: bool = False) -> None:
+        """Record the outcome of one *method* attempt against *host* taking *latency* seconds.
+
+        The read-modify-write runs under the lock and, with a store, in one store
+        transaction, so concurrent outcomes from other threads and workers are not lost.
+        """
+        now = time.time()
+
+        def updated(records: dict[str, MethodRecord]) -> dict[str, MethodRecord]:
+            previous = records.get(method)
+            record = previous.decayed(now, self.half_life) if previous else MethodRecord(updated=now)
+            if success:
+                record.successes += 1
+            else:
+                record.failures += 1
+            record.latency = (
+                latency if previous is None else record.latency + _LATENCY_ALPHA * (latency - record.latency)
+            )
+            return {**records, method: record}
+
+        with self._lock:
+            records = updated(self._hosts.get(host, {}))
+            if self.store is not None:
+
+                def merge(raw: bytes | str | None) -> str:
+                    nonlocal records
+                    stored = self._parse(host, raw)
+                    if stored is not None:
+                        records = updated(stored)
+                    return json.dumps({method: asdict(record) for method, record in records.items()})
+
+                self.store.update(host, merge, _RETENTION_SECONDS)
+            self._hosts[host] = records
+            self._stats["attempts"] += 1
+            if success and first_attempt:
+                self._stats["first_try_success"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["hosts"] = len(self._hosts)
+        stats["attempts_per_fetch"] = round(stats["attempts"] / stats["fetches"], 2) if stats["fetches"] else 0.0
+        return stats
+
+    def clear(self) -> None:
+        with self._lock:
+            self._hosts.clear()
+        if self.store is not None:
+            self.store.clear()
+
+
+_memory: FetchStrategyMemory | None = None
+_memory_lock = threading.Lock()
+
+
+def get_fetch_strategy() -> FetchStrategyMemory | None:
+    """Return the process-wide strategy memory, or None when ``FETCH_STRATEGY_ENABLED`` is off."""
+    global _memory
+    if not config.FETCH_STRATEGY_ENABLED:
+        return None
+    if _memory is None:
+        with _memory_lock:
+            if _memory is None:
+                store = None
+                if config.CACHE_DIR:
+                    store = SQLiteKVStore(os.path.join(config.CACHE_DIR, "fetch_strategy.sqlite3"), table="hosts")
+                _memory = FetchStrategyMemory(
+                    half_life=config.FETCH_STRATEGY_HALF_LIFE,
+                    min_weight=config.FETCH_STRATEGY_MIN_WEIGHT,
+                    proxy_cost=config.FETCH_STRATEGY_PROXY_COST,
+                    store=store,
+                )
+    return _memory
@@ -3,6 +3,8 @@ import json
 import logging
 import os
 import re
+import threading
+from collections.abc import Callable
 from datetime import datetime
 from typing import Any
 from urllib.parse import urlparse
@@ -13,11 +15,14 @@ from config import config
 from models import Application, Document, User, db
 
 from .ai_client import AIClient
+from .circuit_breaker import CircuitOpenError
 from .contact_extractor import ContactExtractor
 from .doc_cache import get_cached_doc_text
 from .email_formatter import EmailFormatter
+from .industry_classifier import classify_industry
 from .output_validator import OutputValidator
 from .pdf_handler import create_anschreiben_pdf, is_url, read_document
+from .pipeline import Stage, run_pipeline
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +45,24 @@ _GERMAN_MONTHS = [
     "Dezember",
 ]
 
+# Pipeline stage -> (progress step, message). Kimi shows 4 consolidated steps
+# because everything except loading the posting and the letter itself is quick.
+_QWEN_PROGRESS = {
+    "posting": (1, "Stellenanzeige wird geladen..."),
+    "details": (2, "Details werden extrahiert..."),
+    "letter": (3, "Anschreiben wird generiert..."),
+    "letter_full": (4, "Anschreiben wird formatiert..."),
+    "pdf": (5, "PDF wird erstellt..."),
+    "email": (6, "E-Mail wird personalisiert..."),
+    "save": (7, "Bewerbung wird gespeichert..."),
+}
+_KIMI_PROGRESS = {
+    "posting": (1, "Stellenanzeige wird analysiert..."),
+    "letter": (2, "obo denkt nach..."),
+    "letter_full": (3, "Anschreiben wird finalisiert..."),
+    "save": (4, "Bewerbung wird gespeichert..."),
+}
+
 
 class BewerbungsGenerator:
     def __init__(
@@ -58,18 +81,25 @@ class BewerbungsGenerator:
         self.model = model
         self.thinking_callback = thinking_callback
         self.content_callback = content_callback
-
-    def _emit_progress(self, step, total_steps, message):
+        # Email body written in the same response as the letter (combined generation)
+        self._email_body_draft = None
+        # Wall-clock seconds per pipeline stage of the last generate_bewerbung() run
+        self.stage_timings: dict[str, float] = {}
+        # Called with the new application's ID before it is committed, to record it in the same transaction
+        self.on_application_saved: Callable[[int], None] | None = None
+
+    def _emit_progress(self, step, total_steps, message, stage_timings=None):
         """Emit progress event if callback is set."""
         if self.progress_callback:
-            self.progress_callback(
-                {
-                    "step": step,
-                    "total_steps": total_steps,
-                    "message": message,
-                    "progress": round(step / total_steps * 100),
-                }
-            )
+            event = {
+                "step": step,
+                "total_steps": total_steps,
+                "message": message,
+                "progress": round(step / total_steps * 100),
+            }
+            if stage_timings:
+                event["stage_timings"] = stage_timings
+            self.progress_callback(event)
 
     def prepare(self) -> None:
         """Load user data and documents from database.
@@ -136,70 +166,94 @@ class BewerbungsGenerator:
                 - quelle: Source/portal name
             tonalitaet: Tone of the cover letter (default: "modern")
         """
-        # Auto-prepare if not already done (backwards compatibility)
-        if not self._prepared:
-            self.prepare()
-
-        logger.info("Generiere Bewerbung fuer: %s", firma_name)
-
-        is_kimi = self.model == "kimi"
-
-        if is_kimi:
-            # Kimi: 4 consolidated steps (steps 1-2 and 4-7 are instant)
-            self._emit_progress(1, 4, "Stellenanzeige wird analysiert...")
-            stellenanzeige_text = self._load_job_posting(stellenanzeige_path, user_details)
-            details = self._extract_details(stellenanzeige_text, firma_name, user_details)
-
-            self._emit_progress(2, 4, "obo denkt nach...")
-            anschreiben_body = self._generate_letter_body(stellenanzeige_text, firma_name, details, tonalitaet)
-
-            self._emit_progress(3, 4, "Anschreiben wird finalisiert...")
-            anschreiben_vollstaendig = self._build_complete_letter(firma_name, details, anschreiben_body)
-            output_path = self._create_pdf(firma_name, anschreiben_vollstaendig, output_filename)
-            betreff, email_text = self._generate_email_data(firma_name, details, anschreiben_body)
-
-            self._emit_progress(4, 4, "Bewerbung wird gespeichert...")
-        else:
-            # Qwen: 7 granular steps (each takes meaningful time)
-            self._emit_progress(1, 7, "Stellenanzeige wird geladen...")
-            stellenanzeige_text = self._load_job_posting(stellenanzeige_path, user_details)
-
-            self._emit_progress(2, 7, "Details werden extrahiert...")
-            details = self._extract_details(stellenanzeige_text, firma_name, user_details)
-
-            self._emit_progress(3, 7, "Anschreiben wird generiert...")
-            anschreiben_body = self._generate_letter_body(stellenanzeige_text, firma_name, details, tonalitaet)
-
-            self._emit_progress(4, 7, "Anschreiben wird formatiert...")
-            anschreiben_vollstaendig = self._build_complete_letter(firma_name, details, anschreiben_body)
-
-            self._emit_progress(5, 7, "PDF wird erstellt...")
-            output_path = self._create_pdf(firma_name, anschreiben_vollstaendig, output_filename)
-
-            self._emit_progress(6, 7, "E-Mail wird personalisiert...")
-            betreff, email_text = self._generate_email_data(firma_name, details, anschreiben_body)
-
-            self._emit_progress(7, 7, "Bewerbung wird gespeichert...")
-
+        progress_steps = _KIMI_PROGRESS if self.model == "kimi" else _QWEN_PROGRESS
         job_url = stellenanzeige_path if is_url(stellenanzeige_path) else None
 
-        # Use domain as quelle when a URL is present but quelle is still the default
-        if job_url and details.get("quelle") in ("Manuelle Eingabe", None, ""):
-            with contextlib.suppress(Exception):
-                details["quelle"] = urlparse(job_url).hostname.removeprefix("www.")
-
-        self._save_application(
-            firma_name,
-            details,
-            output_path,
-            betreff,
-            email_text,
-            anschreiben_body,
-            stellenanzeige_text,
-            job_url=job_url,
+        def save(posting, details, letter, pdf, email):
+            # Use domain as quelle when a URL is present but quelle is still the default
+            if job_url and details.get("quelle") in ("Manuelle Eingabe", None, ""):
+                with contextlib.suppress(Exception):
+                    details["quelle"] = urlparse(job_url).hostname.removeprefix("www.")
+            betreff, email_text = email
+            self._save_application(firma_name, details, pdf, betreff, email_text, letter, posting, job_url=job_url)
+
+        # DB-bound stages (prepare, Seele profile, user contact data, letter, save) run inline
+        # on this thread; pool stages get plain values only, never ORM objects. The Seele
+        # profile loads while the posting is fetched and its details extracted, and the PDF
+        # renders while the email body is generated.
+        stages = [
+            # Auto-prepare if not already done (backwards compatibility)
+            Stage("prepare", self.prepare, inline=True),
+            Stage("seele", self._load_seele_profil, inline=True, after=("prepare",)),
+            Stage("contact", self._user_contact_kwargs, inline=True, after=("prepare",)),
+            Stage("posting", lambda: self._load_job_posting(stellenanzeige_path, user_details)),
+            Stage(
+                "details",
+                lambda posting: self._extract_details(posting, firma_name, user_details),
+                deps=("posting",),
+            ),
+            Stage(
+                "letter",
+                lambda posting, details, seele: self._generate_letter_body(
+                    posting, firma_name, details, tonalitaet, seele
+                ),
+                deps=("posting", "details", "seele"),
+                inline=True,
+            ),
+            Stage(
+                "letter_full",
+                lambda details, letter: self._build_complete_letter(firma_name, details, letter),
+                deps=("details", "letter"),
+                inline=True,
+            ),
+            Stage(
+                "pdf",
+                lambda letter_full: self._create_pdf(firma_name, letter_full, output_filename),
+                deps=("letter_full",),
+            ),
+            Stage(
+                "email",
+                lambda details, letter, contact: self._generate_email_data(firma_name, details, letter, contact),
+                deps=("details", "letter", "contact"),
+            ),
+            Stage("save", save, deps=("posting", "details", "letter", "pdf", "email"), inline=True),
+        ]
+
+        logger.info("Generiere Bewerbung fuer: %s", firma_name)
+        self.stage_timings = {}
+        results, _ = run_pipeline(
+            stages,
+            max_workers=2,
+            on_stage_start=self._progress_reporter(progress_steps),
+            on_stage_done=self.stage_timings.__setitem__,
+            thread_name_prefix="obojobs-generation",
         )
+        logger.info("Pipeline-Zeiten: %s", ", ".join(f"{name}={sec:.2f}s" for name, sec in self.stage_timings.items()))
+        return results["pdf"]
 
-        return output_path
+    def _progress_reporter(self, progress_steps: dict[str, tuple[int, str]]):
+        """Return an ``on_stage_start`` hook emitting each step once, in increasing order.
+
+        Stages run concurrently, so when a later step starts first the steps before it
+        are emitted right away. Finished stage timings (ms) are attached to every event.
+        """
+        messages = dict(progress_steps.values())
+        total_steps = max(messages)
+        lock = threading.Lock()
+        last_step = 0
+
+        def on_stage_start(name: str) -> None:
+            nonlocal last_step
+            if name not in progress_steps:
+                return
+            with lock:
+                timings = {stage: round(sec * 1000) for stage, sec in dict(self.stage_timings).items()}
+                for step in range(last_step + 1, progress_steps[name][0] + 1):
+                    if step in messages:
+                        self._emit_progress(step, total_steps, messages[step], stage_timings=timings)
+                last_step = max(last_step, progress_steps[name][0])
+
+        return on_stage_start
 
     def _load_job_posting(self, stellenanzeige_path: str, user_details: dict[str, Any] | None) -> str:
         """Load job posting text from user-provided data, URL, or file path."""
@@ -246,10 +300,11 @@ class BewerbungsGenerator:
                 "quelle": user_details.get("quelle") or "Manuelle Eingabe",
                 "email": user_details.get("contact_email") or "",
                 "stellenanzeige_kompakt": stellenanzeige_text[:500] if stellenanzeige_text else "",
-                "branche": None,
-                "unternehmensgroesse": None,
+                "branche": user_details.get("branche"),
+                "unternehmensgroesse": user_details.get("unternehmensgroesse"),
             }
-            self._classify_industry(details, stellenanzeige_text, firma_name)
+            if not details["branche"]:
+                self._classify_industry(details, stellenanzeige_text)
             logger.info("Details aus Vorschau verwendet")
         else:
             logger.info("2/5 Extrahiere Details (Position, Ansprechpartner, Quelle)...")
@@ -260,14 +315,17 @@ class BewerbungsGenerator:
         logger.info("Position: %s, Ansprechpartner: %s", details["position"], details["ansprechpartner"])
         return details
 
-    def _classify_industry(self, details: dict, stellenanzeige_text: str, firma_name: str) -> None:
-        """Classify branche/unternehmensgroesse via AI extraction if enough text is available."""
+    def _classify_industry(self, details: dict, stellenanzeige_text: str) -> None:
+        """Classify branche/unternehmensgroesse locally (short LLM fallback) if enough text is available.
+
+        Only used when the preview did not already provide a classification.
+        """
         if not stellenanzeige_text or len(stellenanzeige_text) < 50:
             return
         try:
-            extracted = self.api_client.extract_bewerbung_details(stellenanzeige_text, firma_name)
-            details["branche"] = extracted.get("branche")
-            details["unternehmensgroesse"] = extracted.get("unternehmensgroesse")
+            classified = classify_industry(stellenanzeige_text, self.api_client)
+            details["branche"] = classified["branche"]
+            details["unternehmensgroesse"] = details.get("unternehmensgroesse") or classified["unternehmensgroesse"]
         except Exception:
             logger.warning("Branchenklassifizierung fehlgeschlagen")
 
@@ -299,8 +357,12 @@ class BewerbungsGenerator:
         firma_name: str,
         details: dict[str, str],
         tonalitaet: str,
+        seele_profil_text: str | None = None,
     ) -> str:
-        """Generate the AI-written cover letter body via Qwen or Kimi."""
+        """Generate the AI-written cover letter body via Qwen or Kimi.
+
+        ``seele_profil_text`` is loaded by its own pipeline stage, see ``_load_seele_profil``.
+        """
         if self.model == "kimi":
             logger.info("3/5 Kimi K2.5 generiert Anschreiben (Reasoning-Modell)...")
         else:
@@ -309,9 +371,6 @@ class BewerbungsGenerator:
         # Prepare user inputs
         full_name, bewerber_vorname, user_skills = self._extract_user_inputs()
 
-        # Load Seele profile for personalization
-        seele_profil_text = self._load_seele_profil()
-
         # Shared kwargs for both generation methods
         gen_kwargs = {
             "cv_text": self.cv_text,
@@ -332,13 +391,14 @@ class BewerbungsGenerator:
 
         # Generate body via API -- route based on model
         if self.model == "kimi":
-            anschreiben_body = self.api_client.generate_anschreiben_stream(
-                **gen_kwargs,
-                thinking_callback=self.thinking_callback,
-                content_callback=self.content_callback,
-            )
+            try:
+                anschreiben_body = self._generate_body("kimi", gen_kwargs)
+            except CircuitOpenError:
+                logger.warning("Kimi-Circuit offen, generiere Anschreiben mit Qwen")
+                self.warnings.append("Kimi ist gerade nicht erreichbar. Das Anschreiben wurde mit Qwen erstellt.")
+                anschreiben_body = self._generate_body("qwen", gen_kwargs)
         else:
-            anschreiben_body = self.api_client.generate_anschreiben(**gen_kwargs)
+            anschreiben_body = self._generate_body("qwen", gen_kwargs)
         logger.info("Anschreiben generiert (%d Zeichen)", len(anschreiben_body))
 
         # Fix gray-zone skill claims before validation
@@ -368,6 +428,44 @@ class BewerbungsGenerator:
 
         return anschreiben_body
 
+    def _generate_body(self, model: str, gen_kwargs: dict) -> str:
+        """Generate the letter body with *model*.
+
+        With ``LLM_COMBINED_EMAIL_ENABLED`` the email body comes from the same response
+        and is kept for ``_generate_email_data``, saving a separate LLM round-trip. A
+        combined response without letter text falls back to the letter-only call.
+        """
+        callbacks = {}
+        if model == "kimi":
+            callbacks = {"thinking_callback": self.thinking_callback, "content_callback": self.content_callback}
+
+        body = None
+        if config.LLM_COMBINED_EMAIL_ENABLED:
+            body, self._email_body_draft = self.api_client.generate_anschreiben_with_email(
+                model=model, **callbacks, **gen_kwargs
+            )
+            if not body:
+                logger.warning("Kombinierte Antwort ohne Anschreiben, generiere es separat")
+        if not body:
+            if model == "kimi":
+                body = self.api_client.generate_anschreiben_stream(**gen_kwargs, **callbacks)
+            else:
+                body = self.api_client.generate_anschreiben(**gen_kwargs)
+        if not body:
+            raise ValueError("Das Anschreiben konnte nicht generiert werden. Bitte versuche es erneut.")
+        return body
+
+    def _take_email_body_draft(self) -> str | None:
+        """Return the combined-generation email body if it passes validation."""
+        draft, self._email_body_draft = self._email_body_draft, None
+        if not draft:
+            return None
+        validation = self.validator.validate_email_body(draft)
+        if validation.errors:
+            logger.info("E-Mail aus kombinierter Generierung verworfen: %s", validation.errors)
+            return None
+        return draft
+
     def _build_complete_letter(
         self,
         firma_name: str,
@@ -421,6 +519,7 @@ class BewerbungsGenerator:
         return output_path
 
     def _user_contact_kwargs(self) -> dict:
+        """Read the user's contact fields into plain values (safe to hand to pool threads)."""
         user = self.user
         return {
             "user_name": user.full_name,
@@ -431,16 +530,23 @@ class BewerbungsGenerator:
         }
 
     def _generate_email_data(
-        self, firma_name: str, details: dict[str, str], anschreiben_body: str | None = None
+        self,
+        firma_name: str,
+        details: dict[str, str],
+        anschreiben_body: str | None = None,
+        contact: dict | None = None,
     ) -> tuple[str, str]:
-        """Generate email subject and body text (AI-personalized with static fallback)."""
+        """Generate email subject and body text (AI-personalized with static fallback).
+
+        ``contact`` holds the user fields read by ``_user_contact_kwargs`` on the request thread.
+        """
+        contact = contact or self._user_contact_kwargs()
         betreff = EmailFormatter.generate_betreff(
-            details["position"], firma_name, style="professional", user_name=self.user.full_name
+            details["position"], firma_name, style="professional", user_name=contact["user_name"]
         )
-        contact = self._user_contact_kwargs()
 
-        ai_email_body = None
-        if anschreiben_body:
+        ai_email_body = self._take_email_body_draft() if anschreiben_body else None
+        if anschreiben_body and not ai_email_body:
             ai_email_body = self.api_client.generate_email_body(
                 position=details["position"],
                 firma_name=firma_name,
@@ -497,6 +603,9 @@ class BewerbungsGenerator:
         )
         application.add_status_change("erstellt")
         db.session.add(application)
+        if self.on_application_saved is not None:
+            db.session.flush()
+            self.on_application_saved(application.id)
         db.session.commit()
 
         logger.info("Email an: %s", details.get("email") or "Keine E-Mail-Adresse gefunden")
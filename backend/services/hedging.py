@@ -0,0 +1,212 @@
+"""Hedged requests: race a backup attempt against a slow primary.
+
+The primary attempt starts immediately. If it has not produced its first token
+after an adaptive delay (a high percentile of recent primary time-to-first-token),
+a secondary attempt is launched on the other provider. The first successful
+result wins and the other attempt is cancelled. Hedges are additionally capped by
+a ``RetryBudget`` so a provider-wide slowdown cannot double the request volume.
+
+Attempts are callables ``attempt(cancel, on_first_token)``: they must call
+``on_first_token()`` once output starts arriving and stop early (returning or
+raising) once ``cancel`` is set.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any
+
+from config import config
+from services.retry import RetryBudget
+
+logger = logging.getLogger(__name__)
+
+Attempt = Callable[[threading.Event, Callable[[], None]], Any]
+
+
+class HedgeCancelled(Exception):
+    """Raised by an attempt that stopped because the other attempt won."""
+
+
+class LatencyTracker:
+    """Rolling window of latency samples with percentile lookup."""
+
+    def __init__(self, window: int = 200):
+        self._samples: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, pct: float) -> float | None:
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(int(len(ordered) * pct / 100), len(ordered) - 1)
+        return ordered[index]
+
+
+class Hedger:
+    """Runs a primary attempt and hedges it with a secondary one when it is slow."""
+
+    def __init__(
+        self,
+        name: str,
+        percentile: float = 95.0,
+        min_samples: int = 20,
+        default_delay: float = 10.0,
+        min_delay: float = 0.5,
+        budget: RetryBudget | None = None,
+    ):
+        self.name = name
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self.budget = budget
+        self.ttft = LatencyTracker()
+        self._lock = threading.Lock()
+        self._stats = {
+            "calls": 0,
+            "hedged": 0,
+            "fallbacks": 0,
+            "primary_wins": 0,
+            "secondary_wins": 0,
+            "failures": 0,
+            "budget_denied": 0,
+        }
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait for the primary's first token before hedging."""
+        delay = self.ttft.percentile(self.percentile)
+        if delay is None or len(self.ttft) < self.min_samples:
+            return self.default_delay
+        return max(delay, self.min_delay)
+
+    def run(self, primary: Attempt, secondary: Attempt) -> Any:
+        """Return the first successful result of *primary* and (if needed) *secondary*."""
+        self._count("calls")
+        if self.budget is not None:
+            self.budget.record_attempt()
+        executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix=f"hedge-{self.name}")
+        try:
+            return self._race(executor, primary, secondary)
+        finally:
+            executor.shutdown(wait=False)
+
+    def _race(self, executor: ThreadPoolExecutor, primary: Attempt, secondary: Attempt) -> Any:
+        start = time.monotonic()
+        primary_ready = threading.Event()
+
+        def primary_first_token():
+            self.ttft.record(time.monotonic() - start)
+            primary_ready.set()
+
+        # future -> (label, cancel, first token seen)
+        attempts: dict[Future, tuple[str, threading.Event, threading.Event]] = {}
+        primary_future = self._launch(executor, attempts, "primary", primary, primary_first_token)
+        primary_future.add_done_callback(lambda _: primary_ready.set())
+
+        delay = self.hedge_delay()
+        if not primary_ready.wait(delay):
+            if self.budget is None or self.budget.try_acquire_retry():
+                logger.info("%s: kein erstes Token nach %.1fs, starte Hedge-Anfrage", self.name, delay)
+                self._count("hedged")
+                self._launch(executor, attempts, "secondary", secondary)
+            else:
+                self._count("budget_denied")
+
+        pending = set(attempts)
+        errors: list[BaseException] = []
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                label, _, _ = attempts[future]
+                error = future.exception()
+                if error is None:
+                    self._finish(attempts, future, start)
+                    return future.result()
+                errors.append(error)
+                logger.warning("%s: %s-Anfrage fehlgeschlagen: %s", self.name, label, error)
+                if label == "primary" and len(attempts) == 1:
+                    self._count("fallbacks")
+                    pending.add(self._launch(executor, attempts, "secondary", secondary))
+
+        self._count("failures")
+        raise errors[0]
+
+    def _launch(self, executor, attempts, label, attempt, on_first_token=None) -> Future:
+        cancel = threading.Event()
+        first_token = threading.Event()
+
+        def first_token_seen():
+            if self._claim(first_token) and on_first_token is not None:
+                on_first_token()
+
+        future = executor.submit(attempt, cancel, first_token_seen)
+        attempts[future] = (label, cancel, first_token)
+        return future
+
+    def _claim(self, first_token: threading.Event) -> bool:
+        """Set *first_token* once; True for the caller that set it (one TTFT sample per attempt)."""
+        with self._lock:
+            if first_token.is_set():
+                return False
+            first_token.set()
+            return True
+
+    def _finish(self, attempts: dict, winner: Future, start: float) -> None:
+        label, _, _ = attempts[winner]
+        for future, (other_label, cancel, first_token) in attempts.items():
+            if future is not winner:
+                cancel.set()
+                if other_label == "primary" and not future.done() and self._claim(first_token):
+                    # Censored sample: the primary has not produced a token and was at least this slow
+                    self.ttft.record(time.monotonic() - start)
+        self._count(f"{label}_wins")
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["hedge_rate"] = round(stats["hedged"] / stats["calls"], 3) if stats["calls"] else 0.0
+        stats["hedge_delay"] = round(self.hedge_delay(), 3)
+        stats["ttft_samples"] = len(self.ttft)
+        return stats
+
+
+_hedger: Hedger | None = None
+_hedger_lock = threading.Lock()
+
+
+def get_anschreiben_hedger() -> Hedger | None:
+    """Return the process-wide hedger for cover letter generation, or None when disabled."""
+    global _hedger
+    if not config.LLM_HEDGING_ENABLED:
+        return None
+    with _hedger_lock:
+        if _hedger is None:
+            _hedger = Hedger(
+                "anschreiben",
+                percentile=config.LLM_HEDGE_PERCENTILE,
+                min_samples=config.LLM_HEDGE_MIN_SAMPLES,
+                default_delay=config.LLM_HEDGE_DEFAULT_DELAY,
+                budget=RetryBudget(ratio=config.LLM_HEDGE_MAX_RATE, min_retries=1),
+            )
+        return _hedger
+
+
+def hedging_stats() -> dict | None:
+    with _hedger_lock:
+        return _hedger.stats() if _hedger is not None else None
@@ -0,0 +1,245 @@
+"""Shared HTTP response cache for job posting fetches.
+
+One posting URL is loaded by preview, quick-extract, generation, ATS analysis, job fit
+and interview prep, often within minutes, and each fetch may be a paid ScraperAPI call.
+``WebScraper._fetch_page`` consults this cache first.
+
+Policy (postings hardly change while a user works on them):
+
+- 200 responses are fresh for ``HTTP_CACHE_TTL`` regardless of the site's own
+  ``max-age``; ``Cache-Control: no-store`` responses are never stored.
+- Afterwards they are kept for ``HTTP_CACHE_STALE_TTL`` and revalidated with
+  ``If-None-Match``/``If-Modified-Since`` when the site sent an ETag or Last-Modified;
+  a 304 makes the stored body fresh again.
+- Bodies above ``HTTP_CACHE_MAX_ENTRY_BYTES`` are not cached. The memory tier is an
+  LRU capped at ``HTTP_CACHE_MEMORY_MAX_BYTES``; the SQLite tier (``SQLiteKVStore``,
+  zlib-compressed bodies) is shared by all workers on the host.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from urllib.parse import urldefrag
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from config import config
+from services.local_store import SQLiteKVStore
+
+logger = logging.getLogger(__name__)
+
+# Response headers worth keeping: content decoding and revalidation
+_KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+@dataclass
+class CachedPage:
+    url: str
+    body: bytes
+    headers: dict[str, str]
+    encoding: str | None
+    fresh_until: float
+    stored_at: float = field(default_factory=time.time)
+
+    @property
+    def fresh(self) -> bool:
+        return self.fresh_until > time.time()
+
+    def validators(self) -> dict[str, str]:
+        """Conditional request headers for revalidation (empty without ETag/Last-Modified)."""
+        headers = {}
+        if self.headers.get("ETag"):
+            headers["If-None-Match"] = self.headers["ETag"]
+        if self.headers.get("Last-Modified"):
+            headers["If-Modified-Since"] = self.headers["Last-Modified"]
+        return headers
+
+    def to_response(self) -> requests.Response:
+        """Rebuild a ``requests.Response`` so callers cannot tell a hit from a fetch."""
+        response = requests.Response()
+        response.status_code = 200
+        response._content = self.body
+        response.headers = CaseInsensitiveDict(self.headers)
+        response.encoding = self.encoding
+        response.url = self.url
+        return response
+
+    def dump(self) -> bytes:
+        meta = {
+            "url": self.url,
+            "headers": self.headers,
+            "encoding": self.encoding,
+            "fresh_until": self.fresh_until,
+            "stored_at": self.stored_at,
+        }
+        return json.dumps(meta).encode("utf-8") + b"\n" + zlib.compress(self.body, 6)
+
+    @classmethod
+    def load(cls, raw: bytes) -> "CachedPage":
+        meta, body = raw.split(b"\n", 1)
+        return cls(body=zlib.decompress(body), **json.loads(meta))
+
+
+def cache_key(url: str) -> str:
+    return urldefrag(url).url
+
+
+class HTTPResponseCache:
+    """Two-tier (memory LRU by bytes + durable store) page cache with hit/revalidation counters."""
+
+    def __init__(
+        self,
+        ttl: float,
+        stale_ttl: float,
+        max_entry_bytes: int,
+        memory_max_bytes: int,
+        store: SQLiteKVStore | None = None,
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entry_bytes = max_entry_bytes
+        self.memory_max_bytes = memory_max_bytes
+        self.store = store
+        self._memory: OrderedDict[str, CachedPage] = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "store_hits": 0, "revalidated": 0, "misses": 0, "writes": 0, "too_large": 0}
+
+    def get(self, url: str) -> CachedPage | None:
+        """Return the stored page for *url*, fresh or stale (check ``fresh``), or None.
+
+        Fresh pages count as hits; callers record the outcome of stale ones and misses.
+        """
+        key = cache_key(url)
+        with self._lock:
+            page = self._memory.get(key)
+            if page is not None and page.fresh_until + self.stale_ttl <= time.time():
+                self._forget(key)
+                page = None
+            if page is not None:
+                self._memory.move_to_end(key)
+                if page.fresh:
+                    self._stats["memory_hits"] += 1
+                return page
+
+        if self.store is None:
+            return None
+        raw = self.store.get(key)
+        if raw is None:
+            return None
+        try:
+            page = CachedPage.load(raw)
+        except (ValueError, zlib.error) as e:
+            logger.warning("Defekter HTTP-Cache-Eintrag für %s: %s", key, e)
+            self.store.delete(key)
+            return None
+        self._remember(key, page)
+        if page.fresh:
+            self.record("store_hits")
+        return page
+
+    def record(self, outcome: str) -> None:
+        """Count an outcome: revalidated, misses, writes or too_large."""
+        with self._lock:
+            self._stats[outcome] += 1
+
+    def put(self, url: str, response: requests.Response) -> None:
+        """Store a 200 *response* for *url* unless it is ``no-store``, partial or too large."""
+        if response.status_code != 200:
+            return
+        if "no-store" in response.headers.get("Cache-Control", "").lower():
+            return
+        if getattr(response, "truncated", None):
+            # Partial body (size cap or early JSON-LD stop): a later full fetch must not get it
+            return
+        body = response.content
+        if len(body) > self.max_entry_bytes:
+            self.record("too_large")
+            return
+        headers = {name: response.headers[name] for name in _KEPT_HEADERS if response.headers.get(name)}
+        page = CachedPage(
+            url=cache_key(url),
+            body=body,
+            headers=headers,
+            encoding=response.encoding,
+            fresh_until=time.time() + self.ttl,
+        )
+        self._save(page)
+        self.record("writes")
+
+    def refresh(self, page: CachedPage) -> CachedPage:
+        """Mark *page* fresh again after a 304 Not Modified."""
+        page.fresh_until = time.time() + self.ttl
+        self._save(page)
+        return page
+
+    def _save(self, page: CachedPage) -> None:
+        self._remember(page.url, page)
+        if self.store is not None:
+            self.store.set(page.url, page.dump(), self.ttl + self.stale_ttl)
+
+    def _forget(self, key: str) -> None:
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous.body)
+
+    def _remember(self, key: str, page: CachedPage) -> None:
+        with self._lock:
+            self._forget(key)
+            self._memory[key] = page
+            self._memory_bytes += len(page.body)
+            while self._memory_bytes > self.memory_max_bytes and self._memory:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted.body)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+            stats["memory_bytes"] = self._memory_bytes
+        lookups = stats["memory_hits"] + stats["store_hits"] + stats["revalidated"] + stats["misses"]
+        hits = lookups - stats["misses"]
+        stats["hit_rate"] = round(hits / lookups, 3) if lookups else 0.0
+        return stats
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+        if self.store is not None:
+            self.store.clear()
+
+
+_cache: HTTPResponseCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_http_cache() -> HTTPResponseCache | None:
+    """Return the process-wide page cache, or None when ``HTTP_CACHE_ENABLED`` is off."""
+    global _cache
+    if not config.HTTP_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                store = None
+                if config.CACHE_DIR:
+                    store = SQLiteKVStore(
+                        os.path.join(config.CACHE_DIR, "http_cache.sqlite3"),
+                        table="http_responses",
+                        max_entries=config.HTTP_CACHE_STORE_MAX_ENTRIES,
+                    )
+                _cache = HTTPResponseCache(
+                    ttl=config.HTTP_CACHE_TTL,
+                    stale_ttl=config.HTTP_CACHE_STALE_TTL,
+                    max_entry_bytes=config.HTTP_CACHE_MAX_ENTRY_BYTES,
+                    memory_max_bytes=config.HTTP_CACHE_MEMORY_MAX_BYTES,
+                    store=store,
+                )
+    return _cache
@@ -0,0 +1,193 @@
+"""Local industry and company-size classification for job postings.
+
+A small TF-IDF keyword model built from the vocabularies in ``industry_rules``
+classifies most postings without an LLM call. Only when the local result is
+not confident enough does ``classify_industry`` fall back to a short LLM
+classification (not the full detail extraction).
+"""
+
+import logging
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+from config import config
+from services.industry_rules import (
+    INDUSTRY_KEYWORDS,
+    INDUSTRY_RULES,
+    KONZERN_MIN_EMPLOYEES,
+    SIZE_KEYWORDS,
+    VALID_BRANCHES,
+    VALID_SIZES,
+)
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"[a-zäöüß0-9+#]+")
+_EMPLOYEES_RE = re.compile(
+    r"(\d{1,3}(?:[.,]\d{3})+|\d+)\s*\+?\s*(?:mitarbeiter|mitarbeitende|beschäftigte|employees)",
+    re.IGNORECASE,
+)
+# An employee count only sizes the company next to company wording; "5 Mitarbeitende im Team" is a team size
+_COMPANY_CONTEXT_RE = re.compile(
+    r"unternehmen|firma|konzern|gruppe|verbund|arbeitgeber|standort|weltweit|insgesamt|company", re.IGNORECASE
+)
+_COMPANY_CONTEXT_WINDOW = 60
+# Terms of this length or longer also match as prefixes of posting tokens
+_MIN_PREFIX_LEN = 5
+# Rule texts describe letter style more than the industry itself, so they count less than seed keywords
+_RULE_TEXT_WEIGHT = 0.5
+_MIN_EVIDENCE = 2.0
+# With fewer distinct matching terms the result stays below the default threshold, so the LLM decides
+_MIN_DISTINCT_TERMS = 2
+_SINGLE_SIGNAL_MAX_CONFIDENCE = 0.4
+
+
+@dataclass
+class IndustryClassification:
+    """Result of a local classification; fields are None when unsure."""
+
+    branche: str | None
+    unternehmensgroesse: str | None
+    confidence: float
+    size_confidence: float
+
+
+def _tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _rule_text(rules: dict) -> str:
+    base = rules["base_rules"]
+    return " ".join([rules["label"], *base.values(), *rules["size_rules"].values()])
+
+
+class IndustryClassifier:
+    """Keyword/TF-IDF classifier over the industries defined in ``INDUSTRY_RULES``."""
+
+    def __init__(self):
+        documents = {
+            branche: (set(INDUSTRY_KEYWORDS.get(branche, ())), {t for t in _tokenize(_rule_text(rules)) if len(t) >= 5})
+            for branche, rules in INDUSTRY_RULES.items()
+        }
+        df = Counter()
+        for keywords, rule_terms in documents.values():
+            df.update(keywords | rule_terms)
+
+        n_docs = len(documents)
+        self._weights: dict[str, dict[str, float]] = {}
+        for branche, (keywords, rule_terms) in documents.items():
+            for term in keywords | rule_terms:
+                idf = math.log(n_docs / df[term])
+                weight = 1.0 + idf if term in keywords else _RULE_TEXT_WEIGHT * idf
+                if weight > 0:
+                    self._weights.setdefault(term, {})[branche] = weight
+
+        self._size_terms = {term: size for size, terms in SIZE_KEYWORDS.items() for term in terms}
+
+    def _lookup(self, token: str, table: dict):
+        """Return the entry for *token*, by exact match or its longest known prefix."""
+        if token in table:
+            return table[token]
+        for end in range(len(token) - 1, _MIN_PREFIX_LEN - 1, -1):
+            entry = table.get(token[:end])
+            if entry is not None:
+                return entry
+        return None
+
+    def classify(self, text: str) -> IndustryClassification:
+        counts = Counter(_tokenize(text or ""))
+        branche, confidence = self._classify_branche(counts)
+        size, size_confidence = self._classify_size(text or "", counts)
+        return IndustryClassification(branche, size, confidence, size_confidence)
+
+    def _classify_branche(self, counts: Counter) -> tuple[str | None, float]:
+        scores: Counter = Counter()
+        terms: Counter = Counter()
+        for token, count in counts.items():
+            weights = self._lookup(token, self._weights)
+            if weights:
+                tf = 1.0 + math.log(count)
+                for branche, weight in weights.items():
+                    scores[branche] += weight * tf
+                    terms[branche] += 1
+
+        if not scores:
+            return None, 0.0
+        ranked = scores.most_common(2)
+        top_branche, top = ranked[0]
+        if top < _MIN_EVIDENCE:
+            return None, 0.0
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        confidence = 1.0 - runner_up / top
+        if terms[top_branche] < _MIN_DISTINCT_TERMS:
+            confidence = min(confidence, _SINGLE_SIGNAL_MAX_CONFIDENCE)
+        return top_branche, round(confidence, 3)
+
+    def _classify_size(self, text: str, counts: Counter) -> tuple[str | None, float]:
+        for match in _EMPLOYEES_RE.finditer(text):
+            context = text[max(0, match.start() - _COMPANY_CONTEXT_WINDOW) : match.end() + _COMPANY_CONTEXT_WINDOW]
+            if not _COMPANY_CONTEXT_RE.search(context):
+                continue
+            employees = int(re.sub(r"[.,]", "", match.group(1)))
+            if employees >= KONZERN_MIN_EMPLOYEES:
+                return "konzern", 1.0
+            if employees > 0:
+                return "kmu", 1.0
+
+        votes: Counter = Counter()
+        for token in counts:
+            size = self._lookup(token, self._size_terms)
+            if size:
+                votes[size] += 1
+        if sum(votes.values()) < _MIN_DISTINCT_TERMS:
+            return None, 0.0
+        ranked = votes.most_common(2)
+        size, top = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0
+        # +1 keeps a lone pair of votes from claiming full confidence
+        return size, round((top - runner_up) / (top + runner_up + 1), 3)
+
+
+_classifier: IndustryClassifier | None = None
+
+
+def get_industry_classifier() -> IndustryClassifier:
+    global _classifier
+    if _classifier is None:
+        _classifier = IndustryClassifier()
+    return _classifier
+
+
+def classify_industry_local(text: str) -> dict:
+    """Return ``{"branche", "unternehmensgroesse"}`` from the local model, None where unsure."""
+    result = get_industry_classifier().classify(text)
+    threshold = config.INDUSTRY_CLASSIFIER_MIN_CONFIDENCE
+    return {
+        "branche": result.branche if result.confidence >= threshold else None,
+        "unternehmensgroesse": result.unternehmensgroesse if result.size_confidence >= threshold else None,
+    }
+
+
+def classify_industry(text: str, api_client=None) -> dict:
+    """Classify *text* locally; ask the LLM only when the industry itself is unsure.
+
+    An unknown company size alone does not trigger the fallback - the letter prompt
+    simply omits the size overlay then.
+    """
+    local = classify_industry_local(text)
+    if api_client is None or local["branche"]:
+        return local
+
+    logger.info("Lokale Branchenklassifizierung unsicher, frage LLM")
+    try:
+        remote = api_client.classify_industry(text)
+    except Exception:
+        logger.warning("LLM-Branchenklassifizierung fehlgeschlagen")
+        return local
+    return {
+        "branche": local["branche"] or (remote.get("branche") if remote.get("branche") in VALID_BRANCHES else None),
+        "unternehmensgroesse": local["unternehmensgroesse"]
+        or (remote.get("unternehmensgroesse") if remote.get("unternehmensgroesse") in VALID_SIZES else None),
+    }
@@ -121,6 +121,8 @@ INDUSTRY_RULES = {
 
 VALID_BRANCHES = set(INDUSTRY_RULES.keys())
 VALID_SIZES = {"kmu", "konzern"}
+# Employee count from which a company counts as "konzern"; shared by the local classifier and the LLM prompts
+KONZERN_MIN_EMPLOYEES = 500
 
 
 def get_industry_prompt_block(
@@ -156,3 +158,172 @@ def get_industry_prompt_block(
         lines.append(f"- {rules['mandatory_fields']}")
 
     return "\n".join(lines)
+
+
+# Seed vocabulary for the local industry classifier (services/industry_classifier.py).
+# Lower-case terms; those with 5+ characters also match as prefixes ("entwickl" covers
+# "entwickler", "entwicklung"). Combined with the rule texts above for TF-IDF weighting.
+# Avoid prefixes that are common in any posting ("praxis" -> "Praxiserfahrung",
+# "intensiv" -> "intensive Einarbeitung", "kommunikation" -> "Kommunikationsstärke").
+INDUSTRY_KEYWORDS = {
+    "it_software": (
+        "software",
+        "entwickl",
+        "developer",
+        "frontend",
+        "backend",
+        "fullstack",
+        "devops",
+        "cloud",
+        "kubernetes",
+        "docker",
+        "python",
+        "java",
+        "javascript",
+        "typescript",
+        "react",
+        "angular",
+        "vue",
+        "microservice",
+        "saas",
+        "api",
+        "informatik",
+        "programm",
+        "git",
+        "scrum",
+        "datenbank",
+        "sql",
+        "machine",
+        "learning",
+        "rechenzentrum",
+        "cyber",
+        "security",
+        "app",
+    ),
+    "consulting": (
+        "beratung",
+        "berater",
+        "consult",
+        "unternehmensberatung",
+        "klient",
+        "mandant",
+        "strategie",
+        "transformation",
+        "projektgeschäft",
+        "advisory",
+        "mbb",
+        "big4",
+        "workshop",
+        "stakeholder",
+        "business",
+        "analyst",
+        "case",
+        "due",
+        "diligence",
+        "restrukturierung",
+        "prozessoptimierung",
+    ),
+    "maschinenbau": (
+        "maschinenbau",
+        "ingenieur",
+        "konstruktion",
+        "cad",
+        "solidworks",
+        "catia",
+        "fertigung",
+        "produktion",
+        "mechatronik",
+        "anlagenbau",
+        "automatisierung",
+        "sps",
+        "fahrzeug",
+        "automotive",
+        "werkstoff",
+        "montage",
+        "instandhaltung",
+        "qualitätssicherung",
+        "industrie",
+        "maschinen",
+        "elektrotechnik",
+        "verfahrenstechnik",
+        "prototyp",
+    ),
+    "marketing": (
+        "marketing",
+        "kampagne",
+        "marke",
+        "brand",
+        "social",
+        "media",
+        "content",
+        "seo",
+        "sea",
+        "agentur",
+        "werbung",
+        "copywriting",
+        "influencer",
+        "performance",
+        "conversion",
+        "newsletter",
+        "redaktion",
+        "grafik",
+        "design",
+        "creative",
+        "kreativ",
+    ),
+    "gesundheit": (
+        "pflege",
+        "patient",
+        "klinik",
+        "krankenhaus",
+        "station",
+        "gesundheits",
+        "medizin",
+        "arzt",
+        "ärzt",
+        "therapie",
+        "therapeut",
+        "altenheim",
+        "senioren",
+        "hospiz",
+        "ambulant",
+        "examiniert",
+        "reha",
+        "notaufnahme",
+        "pflegefach",
+    ),
+}
+
+# Indicators for company size (prefix match, like INDUSTRY_KEYWORDS)
+SIZE_KEYWORDS = {
+    "kmu": (
+        "startup",
+        "mittelstand",
+        "mittelständ",
+        "familienunternehmen",
+        "familiengeführt",
+        "inhabergeführt",
+        "kleines",
+        "junges",
+        "agentur",
+        "boutique",
+        "flache",
+        "hierarchien",
+    ),
+    "konzern": (
+        "konzern",
+        "weltweit",
+        "global",
+        "international",
+        "dax",
+        "börsennotiert",
+        "weltmarktführer",
+        "tochtergesellschaft",
+        "standorten",
+        "niederlassungen",
+        "fortune",
+        "mbb",
+        "big4",
+        "matrix",
+    ),
+}
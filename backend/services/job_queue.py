@@ -0,0 +1,411 @@
+"""Durable background job queue on the application database.
+
+Web workers only enqueue generation jobs and stream their persisted events; dedicated
+worker processes (``generation_worker.py``) claim and run them, so web capacity no
+longer depends on LLM latency. Jobs and events live in the main database (SQLite or
+PostgreSQL), which means no extra service, event replay after a client disconnects,
+and requeueing of jobs whose worker died (stale heartbeat).
+"""
+
+import json
+import logging
+import os
+import queue
+import random
+import socket
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterator
+from datetime import datetime, timedelta
+
+from flask import Flask
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from config import config
+from models import GenerationJob, GenerationJobEvent, db
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+TERMINAL_STATES = frozenset({JOB_SUCCEEDED, JOB_FAILED})
+
+ABANDONED_JOB_ERROR = "Die Generierung wurde abgebrochen. Bitte versuche es erneut."
+_EVENT_PAGE_SIZE = 500
+_MAINTENANCE_INTERVAL = 60.0
+
+# A handler gets (payload, emit) and returns the result dict. Raising ValueError fails the
+# job with that message; other exceptions fail it with a generic message. The payload
+# also carries the job's ``job_id`` and, once an earlier attempt recorded one with
+# ``set_job_application``, its ``application_id``.
+JobHandler = Callable[[dict, Callable[[dict], None]], dict]
+_handlers: dict[str, tuple[JobHandler, Callable[[dict], None] | None]] = {}
+
+
+def register_job_handler(kind: str, handler: JobHandler, on_abandon: Callable[[dict], None] | None = None) -> None:
+    """Register the handler for jobs of *kind*.
+
+    ``on_abandon(payload)`` runs when a job is given up without its handler finishing
+    (worker died on the last attempt), e.g. to refund a credit; its payload has the
+    ``application_id`` if an attempt saved its application before dying.
+    """
+    _handlers[kind] = (handler, on_abandon)
+
+
+def enqueue_job(user_id: int, kind: str, payload: dict) -> GenerationJob:
+    job = GenerationJob(
+        id=uuid.uuid4().hex,
+        user_id=user_id,
+        kind=kind,
+        status=JOB_QUEUED,
+        payload_json=json.dumps(payload),
+        attempts=0,
+    )
+    db.session.add(job)
+    db.session.commit()
+    logger.info("Job %s (%s) eingereiht", job.id, kind)
+    return job
+
+
+def get_job(job_id: str, user_id: int | None = None) -> GenerationJob | None:
+    """Return the job, or None if it does not exist or belongs to another user."""
+    job = db.session.get(GenerationJob, job_id, populate_existing=True)
+    if job is None or (user_id is not None and job.user_id != user_id):
+        return None
+    return job
+
+
+def load_events(job_id: str, after_seq: int = 0, limit: int = _EVENT_PAGE_SIZE) -> list[tuple[int, dict]]:
+    """Return ``(seq, event)`` pairs with ``seq > after_seq`` in order."""
+    rows = db.session.execute(
+        select(GenerationJobEvent.seq, GenerationJobEvent.event_json)
+        .where(GenerationJobEvent.job_id == job_id, GenerationJobEvent.seq > after_seq)
+        .order_by(GenerationJobEvent.seq)
+        .limit(limit)
+    ).all()
+    return [(seq, json.loads(event_json)) for seq, event_json in rows]
+
+
+def terminal_event(status: str, result_json: str | None, error: str | None) -> dict:
+    """Build the final stream event (same shape as the in-process SSE stream)."""
+    if status == JOB_SUCCEEDED:
+        return {"type": "complete", **(json.loads(result_json) if result_json else {})}
+    return {"type": "error", "error": error or ABANDONED_JOB_ERROR}
+
+
+def iter_job_events(
+    job_id: str, after_seq: int = 0, poll_interval: float | None = None, keepalive: float = 15.0
+) -> Iterator[tuple[int | None, dict]]:
+    """Yield ``(seq, event)`` for persisted events after *after_seq* until the job has finished.
+
+    The last item is the terminal ``complete``/``error`` event with ``seq`` None; keepalive
+    events (also ``seq`` None) are yielded after *keepalive* idle seconds. Needs an app
+    context. Every poll ends its read transaction so rows written meanwhile become visible.
+    """
+    poll_interval = poll_interval or config.GENERATION_JOB_POLL_INTERVAL
+    last_yield = time.monotonic()
+    while True:
+        # Read the state first: events are all written before a job is marked finished
+        state = db.session.execute(
+            select(GenerationJob.status, GenerationJob.result_json, GenerationJob.error).where(
+                GenerationJob.id == job_id
+            )
+        ).first()
+        events = load_events(job_id, after_seq)
+        db.session.rollback()
+
+        for seq, event in events:
+            after_seq = seq
+            yield seq, event
+        if events:
+            last_yield = time.monotonic()
+
+        if state is None:
+            yield None, {"type": "error", "error": "Generierung nicht gefunden"}
+            return
+        if len(events) == _EVENT_PAGE_SIZE:
+            continue
+        if state.status in TERMINAL_STATES:
+            yield None, terminal_event(state.status, state.result_json, state.error)
+            return
+        if time.monotonic() - last_yield >= keepalive:
+            last_yield = time.monotonic()
+            yield None, {"type": "keepalive"}
+        time.sleep(poll_interval)
+
+
+def claim_next_job(worker_id: str) -> GenerationJob | None:
+    """Atomically move the oldest queued job to ``running`` for *worker_id*.
+
+    A conditional UPDATE decides the race between workers, which works the same on
+    SQLite and PostgreSQL.
+    """
+    candidates = (
+        db.session.execute(
+            select(GenerationJob.id)
+            .where(GenerationJob.status == JOB_QUEUED)
+            .order_by(GenerationJob.created_at)
+            .limit(5)
+        )
+        .scalars()
+        .all()
+    )
+    for job_id in candidates:
+        now = datetime.utcnow()
+        claimed = db.session.execute(
+            update(GenerationJob)
+            .where(GenerationJob.id == job_id, GenerationJob.status == JOB_QUEUED)
+            .values(
+                status=JOB_RUNNING,
+                worker_id=worker_id,
+                started_at=now,
+                heartbeat_at=now,
+                attempts=GenerationJob.attempts + 1,
+            )
+        )
+        db.session.commit()
+        if claimed.rowcount == 1:
+            return db.session.get(GenerationJob, job_id, populate_existing=True)
+    return None
+
+
+def finish_job(job_id: str, worker_id: str, result: dict | None = None, error: str | None = None) -> bool:
+    """Store the outcome of the attempt *worker_id* runs; False if the job was requeued or reclaimed meanwhile."""
+    status = JOB_FAILED if error else JOB_SUCCEEDED
+    finished = db.session.execute(
+        update(GenerationJob)
+        .where(GenerationJob.id == job_id, GenerationJob.worker_id == worker_id, GenerationJob.status == JOB_RUNNING)
+        .values(
+            status=status,
+            result_json=json.dumps(result) if result is not None else None,
+            error=error,
+            finished_at=datetime.utcnow(),
+        )
+    )
+    db.session.commit()
+    if finished.rowcount != 1:
+        logger.warning("Job %s wurde inzwischen neu vergeben, Ergebnis von %s verworfen", job_id, worker_id)
+        return False
+    logger.info("Job %s beendet: %s", job_id, status)
+    return True
+
+
+def set_job_application(job_id: str, application_id: int) -> None:
+    """Record the application a job saved, in the caller's transaction (commit it with the application)."""
+    db.session.execute(update(GenerationJob).where(GenerationJob.id == job_id).values(application_id=application_id))
+
+
+def requeue_stale_jobs() -> int:
+    """Requeue running jobs without a recent heartbeat; give up after the last attempt.
+
+    Every worker runs this, so each transition is a conditional UPDATE that only applies
+    while the job is still running with a stale heartbeat; only the worker whose update
+    wins requeues the job or runs ``on_abandon``.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=config.GENERATION_JOB_STALE_AFTER)
+    stale = db.session.execute(
+        select(
+            GenerationJob.id,
+            GenerationJob.kind,
+            GenerationJob.payload_json,
+            GenerationJob.attempts,
+            GenerationJob.application_id,
+        ).where(GenerationJob.status == JOB_RUNNING, GenerationJob.heartbeat_at < cutoff)
+    ).all()
+    db.session.rollback()
+    handled = 0
+    for job in stale:
+        abandon = job.attempts >= config.GENERATION_JOB_MAX_ATTEMPTS
+        if abandon:
+            values = {"status": JOB_FAILED, "error": ABANDONED_JOB_ERROR, "finished_at": datetime.utcnow()}
+        else:
+            values = {"status": JOB_QUEUED, "worker_id": None}
+        changed = db.session.execute(
+            update(GenerationJob)
+            .where(
+                GenerationJob.id == job.id,
+                GenerationJob.status == JOB_RUNNING,
+                GenerationJob.heartbeat_at < cutoff,
+            )
+            .values(**values)
+        )
+        db.session.commit()
+        if changed.rowcount != 1:
+            continue
+        handled += 1
+        if not abandon:
+            logger.warning("Job %s ohne Heartbeat, wird neu eingereiht", job.id)
+            continue
+        logger.warning("Job %s nach %d Versuchen aufgegeben", job.id, job.attempts)
+        _, on_abandon = _handlers.get(job.kind, (None, None))
+        if on_abandon:
+            payload = json.loads(job.payload_json)
+            if job.application_id is not None:
+                payload["application_id"] = job.application_id
+            try:
+                on_abandon(payload)
+            except Exception:
+                logger.exception("Aufräumen für Job %s fehlgeschlagen", job.id)
+    return handled
+
+
+def cleanup_finished_jobs(retention_days: int | None = None) -> int:
+    """Delete finished jobs (and their events) older than the retention period."""
+    days = retention_days if retention_days is not None else config.GENERATION_JOB_RETENTION_DAYS
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    old_ids = select(GenerationJob.id).where(
+        GenerationJob.status.in_(TERMINAL_STATES), GenerationJob.finished_at < cutoff
+    )
+    db.session.execute(delete(GenerationJobEvent).where(GenerationJobEvent.job_id.in_(old_ids)))
+    deleted = db.session.execute(delete(GenerationJob).where(GenerationJob.id.in_(old_ids))).rowcount
+    db.session.commit()
+    return deleted
+
+
+def queue_stats() -> dict[str, int]:
+    """Job counts per status, for the admin metrics."""
+    rows = db.session.execute(select(GenerationJob.status, func.count()).group_by(GenerationJob.status)).all()
+    return dict(rows)
+
+
+class JobEventRecorder:
+    """Persists a job's events in batches and keeps its heartbeat fresh.
+
+    ``emit`` may be called from any thread (pipeline stages, streaming callbacks); a
+    background thread writes through the engine directly, so callers need no app context
+    and slow database writes never stall token streaming.
+    """
+
+    _STOP = object()
+
+    def __init__(self, engine, job_id: str, start_seq: int = 0, flush_interval: float = 0.2, heartbeat: float = 10.0):
+        self._engine = engine
+        self.job_id = job_id
+        self._seq = start_seq
+        self._flush_interval = flush_interval
+        self._heartbeat = heartbeat
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=f"job-events-{job_id[:8]}", daemon=True)
+        self._thread.start()
+
+    def emit(self, event: dict) -> None:
+        self._queue.put(event)
+
+    def close(self) -> None:
+        """Flush pending events and stop the writer thread."""
+        self._queue.put(self._STOP)
+        self._thread.join()
+
+    def _run(self) -> None:
+        stopped = False
+        while not stopped:
+            batch = []
+            try:
+                item = self._queue.get(timeout=self._heartbeat)
+            except queue.Empty:
+                item = None
+            if item is self._STOP:
+                stopped = True
+            elif item is not None:
+                batch.append(item)
+                # Let a burst (e.g. streamed tokens) accumulate into one write
+                time.sleep(self._flush_interval)
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is self._STOP:
+                        stopped = True
+                        break
+                    batch.append(item)
+            self._write(batch)
+
+    def _write(self, batch: list[dict]) -> None:
+        now = datetime.utcnow()
+        rows = [
+            {"job_id": self.job_id, "seq": self._seq + i, "event_json": json.dumps(event), "created_at": now}
+            for i, event in enumerate(batch, start=1)
+        ]
+        try:
+            with self._engine.begin() as conn:
+                if rows:
+                    conn.execute(GenerationJobEvent.__table__.insert(), rows)
+                conn.execute(
+                    GenerationJob.__table__.update().where(GenerationJob.id == self.job_id).values(heartbeat_at=now)
+                )
+            self._seq += len(rows)
+        except SQLAlchemyError as e:
+            logger.warning("Job-Events für %s konnten nicht gespeichert werden: %s", self.job_id, e)
+
+
+def run_job(job: GenerationJob) -> None:
+    """Run a claimed job with its registered handler and store the outcome."""
+    job_id, kind, worker_id = job.id, job.kind, job.worker_id
+    handler, _ = _handlers.get(kind, (None, None))
+    if handler is None:
+        finish_job(job_id, worker_id, error=f"Unbekannter Job-Typ: {kind}")
+        return
+
+    payload = {**json.loads(job.payload_json), "job_id": job_id}
+    if job.application_id is not None:
+        payload["application_id"] = job.application_id
+
+    start_seq = db.session.execute(
+        select(func.coalesce(func.max(GenerationJobEvent.seq), 0)).where(GenerationJobEvent.job_id == job_id)
+    ).scalar_one()
+    recorder = JobEventRecorder(db.engine, job_id, start_seq=start_seq)
+    result, error = None, None
+    try:
+        result = handler(payload, recorder.emit)
+    except ValueError as e:
+        error = str(e)
+    except Exception:
+        logger.exception("Job %s (%s) fehlgeschlagen", job_id, kind)
+        error = "Interner Fehler bei der Generierung"
+    finally:
+        recorder.close()
+    db.session.rollback()
+    finish_job(job_id, worker_id, result=result, error=error)
+
+
+def _worker_loop(app: Flask, worker_id: str, stop: threading.Event) -> None:
+    # Jitter the first maintenance pass so threads and processes started together don't all run it at once
+    last_maintenance = time.monotonic() - random.uniform(0, _MAINTENANCE_INTERVAL)
+    while not stop.is_set():
+        with app.app_context():
+            try:
+                if time.monotonic() - last_maintenance >= _MAINTENANCE_INTERVAL:
+                    last_maintenance = time.monotonic()
+                    requeue_stale_jobs()
+                    cleanup_finished_jobs()
+                job = claim_next_job(worker_id)
+                if job is not None:
+                    logger.info("%s übernimmt Job %s (Versuch %d)", worker_id, job.id, job.attempts)
+                    run_job(job)
+                    continue
+            except Exception:
+                logger.exception("Fehler in der Job-Schleife von %s", worker_id)
+                db.session.rollback()
+        stop.wait(config.GENERATION_JOB_POLL_INTERVAL)
+
+
+def run_worker(app: Flask, concurrency: int | None = None, stop: threading.Event | None = None) -> None:
+    """Process jobs with *concurrency* threads until *stop* is set; running jobs finish first."""
+    concurrency = concurrency or config.GENERATION_WORKER_CONCURRENCY
+    stop = stop or threading.Event()
+    base_id = f"{socket.gethostname()}:{os.getpid()}"
+    threads = [
+        threading.Thread(target=_worker_loop, args=(app, f"{base_id}:{i}", stop), name=f"generation-worker-{i}")
+        for i in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    logger.info("Generation-Worker %s gestartet (%d Threads)", base_id, concurrency)
+    for thread in threads:
+        thread.join()
+    logger.info("Generation-Worker %s beendet", base_id)
@@ -2,16 +2,22 @@
 Job Recommender Service - Finds and recommends jobs based on user skills and profile.
 """
 
+import logging
 from datetime import datetime, timedelta
 
 from sqlalchemy import func
 
+from config import config
 from models import JobRecommendation, UserSkill, db
-from services.bundesagentur_client import BundesagenturClient
+from services.bundesagentur_client import BundesagenturClient, build_search_params
+from services.concurrency import map_bounded
 from services.job_fit_calculator import JobFitCalculator
+from services.posting_index import get_posting_index
 from services.requirement_analyzer import RequirementAnalyzer
 from services.web_scraper import WebScraper
 
+logger = logging.getLogger(__name__)
+
 
 class JobRecommender:
     """Service to find and recommend jobs based on user profile."""
@@ -41,8 +47,11 @@ class JobRecommender:
 
     def get_user_search_keywords(self, user_id: int) -> list[str]:
         """Extract top search keywords from user's skills, prioritizing technical skills."""
-        skills = UserSkill.query.filter_by(user_id=user_id).all()
+        return self.search_keywords_from_skills(UserSkill.query.filter_by(user_id=user_id).all())
 
+    @staticmethod
+    def search_keywords_from_skills(skills: list[UserSkill]) -> list[str]:
+        """Top search keywords of one user's skills (see ``get_user_search_keywords``)."""
         if not skills:
             return []
 
@@ -67,16 +76,49 @@ class JobRecommender:
         return keywords[:5]
 
     def _search_deduplicated(self, search_keywords: list[str], **search_params) -> tuple[list, int]:
-        """Search Bundesagentur API per keyword and deduplicate results by refnr.
+        """Search jobs per keyword, local posting index first, and deduplicate results by refnr.
+
+        Keywords the posting index cannot answer with fresh postings go to the Bundesagentur
+        API; those queries run in parallel, so they take as long as the slowest one, and their
+        results are ingested into the index. Results are merged in keyword order, which keeps
+        the order of the serial search; a query that fails or exceeds BA_SEARCH_TIMEOUT is
+        skipped.
 
         Returns (unique_jobs, total_found_across_searches).
         """
+        keywords = search_keywords[:5]
+        index = get_posting_index()
+        responses = {}
+        if index:
+            for keyword in keywords:
+                local = index.search(build_search_params(keyword, **search_params))
+                if local is not None:
+                    responses[keyword] = local
+
+        searches = map_bounded(
+            lambda keyword: self.ba_client.search_jobs(
+                keywords=keyword, timeout=config.BA_SEARCH_TIMEOUT, **search_params
+            ),
+            [keyword for keyword in keywords if keyword not in responses],
+            max_workers=config.BA_SEARCH_WORKERS,
+            timeout=config.BA_SEARCH_TIMEOUT,
+            thread_name_prefix="ba-search",
+        )
+        for keyword, response, error in searches:
+            if error:
+                logger.warning("Bundesagentur-Suche nach '%s' fehlgeschlagen: %s", keyword, error)
+                continue
+            responses[keyword] = response
+            if index:
+                index.ingest_search(build_search_params(keyword, **search_params), *response)
+
         seen_refnrs = set()
         all_jobs = []
         total = 0
-
-        for keyword in search_keywords[:5]:
-            jobs, found = self.ba_client.search_jobs(keywords=keyword, **search_params)
+        for keyword in keywords:
+            if keyword not in responses:
+                continue
+            jobs, found = responses[keyword]
             total += found
             for job in jobs:
                 if job.refnr not in seen_refnrs:
@@ -144,34 +186,35 @@ class JobRecommender:
         if not user_skills:
             return {"results": [], "total_found": total, "saved_count": 0, "page": page, "has_more": False}
 
-        results = []
-
+        candidates = []
         for job in all_jobs[: max_results * 2]:
             job_data = job.to_job_data()
-
             if job_data.get("url") and self.check_duplicate(user_id, job_data["url"]):
                 continue
+            candidates.append((job, job_data))
 
-            description = job_data.get("description", "")
-            fit_result = None
-            if description and len(description) > 50:
-                requirements = self.requirement_analyzer.analyze_requirements(job_text=description)
-                if requirements:
-                    fit_result = self._calculate_fit_from_requirements(user_skills, requirements)
-
-            if not fit_result:
-                fit_result = self._title_based_score(job, user_skills)
-                fit_result["missing"] = []
+        results = []
 
-            job_data["fit_score"] = fit_result["score"]
-            job_data["fit_category"] = fit_result["category"]
-            job_data["matched_skills"] = fit_result["matched"]
-            job_data["missing_skills"] = fit_result["missing"]
+        # Requirement analysis is one LLM round-trip per job: run it on a bounded pool,
+        # consume results in candidate order and cancel the rest once enough are scored.
+        scored = map_bounded(
+            self._analyze_candidate,
+            candidates,
+            max_workers=config.RECOMMENDER_SCORING_WORKERS,
+            timeout=config.RECOMMENDER_SCORING_TIMEOUT,
+            thread_name_prefix="job-scoring",
+        )
+        try:
+            for (job, job_data), requirements, error in scored:
+                if error:
+                    logger.warning("Anforderungsanalyse für '%s' fehlgeschlagen: %s", job.titel, error)
 
-            results.append(job_data)
+                results.append(self.score_job(job, job_data, user_skills, requirements))
 
-            if len(results) >= max_results:
-                break
+                if len(results) >= max_results:
+                    break
+        finally:
+            scored.close()
 
         results.sort(key=lambda x: x.get("fit_score", 0), reverse=True)
 
@@ -183,12 +226,40 @@ class JobRecommender:
             "has_more": total > page * max_results,
         }
 
+    def score_job(self, job, job_data: dict, user_skills: list, requirements: list[dict] | None) -> dict:
+        """Add fit score fields to *job_data*: from the requirements, else from the title."""
+        fit_result = None
+        if requirements:
+            fit_result = self._calculate_fit_from_requirements(user_skills, requirements)
+
+        if not fit_result:
+            fit_result = self._title_based_score(job, user_skills)
+            fit_result["missing"] = []
+
+        job_data["fit_score"] = fit_result["score"]
+        job_data["fit_category"] = fit_result["category"]
+        job_data["matched_skills"] = fit_result["matched"]
+        job_data["missing_skills"] = fit_result["missing"]
+        return job_data
+
+    def _analyze_candidate(self, candidate: tuple) -> list[dict] | None:
+        """Extract requirements for a search candidate (runs on a scoring worker thread)."""
+        _job, job_data = candidate
+        description = job_data.get("description", "")
+        if not description or len(description) <= 50:
+            return None
+        return self.requirement_analyzer.analyze_requirements(job_text=description)
+
     def analyze_job_for_user(self, user_id: int, job_url: str) -> dict | None:
         """Analyze a job posting URL and calculate fit score for the user."""
         try:
-            job_data = self.scraper.fetch_structured_job_posting(job_url)
+            # Only the structured fields are scored: the download may end at the JSON-LD posting
+            job_data = self.scraper.fetch_structured_job_posting(job_url, stop_at_job_posting=True)
             if not job_data or not job_data.get("description"):
                 return None
+            index = get_posting_index()
+            if index:
+                index.ingest_job_data(job_data)
             return self._score_job_data(user_id, job_data, job_data.get("description", ""))
         except Exception as e:
             return {
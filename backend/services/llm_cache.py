@@ -0,0 +1,129 @@
+"""Content-addressed response cache for deterministic LLM calls.
+
+Two tiers: a per-process LRU for hot entries and a SQLite file (``SQLiteKVStore``)
+shared by all workers on the host. Keys are a SHA-256 over model, messages,
+temperature and max_tokens, so identical prompts hit regardless of caller.
+Callers opt in per call with a TTL; nothing is cached without one. Responses derived
+from personal data (CV contents) are kept in the memory tier only (``durable=False``)
+so they never land in the plaintext SQLite file.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from config import config
+from services.local_store import SQLiteKVStore
+
+logger = logging.getLogger(__name__)
+
+MISS = object()
+
+
+class LLMResponseCache:
+    """Two-tier (memory LRU + durable store) cache with hit/miss counters."""
+
+    def __init__(self, max_entries: int = 512, store: SQLiteKVStore | None = None):
+        self.max_entries = max_entries
+        self.store = store
+        self._memory: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "store_hits": 0, "misses": 0, "writes": 0}
+
+    @staticmethod
+    def make_key(kind: str, model: str, messages: list[dict], temperature: float, max_tokens: int) -> str:
+        """Hash the request parameters that determine the response."""
+        payload = json.dumps(
+            {"kind": kind, "model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Any:
+        """Return the cached value or ``MISS``. Store hits are promoted into memory."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and entry[1] > now:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return json.loads(entry[0])
+            if entry:
+                del self._memory[key]
+
+        if self.store is not None:
+            stored = self.store.get_entry(key)
+            if stored is not None:
+                raw, expires_at, _ = stored
+                self._remember(key, raw, expires_at)
+                with self._lock:
+                    self._stats["store_hits"] += 1
+                return json.loads(raw)
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return MISS
+
+    def set(self, key: str, value: Any, ttl: float, durable: bool = True) -> None:
+        """Cache a JSON-serialisable *value* for *ttl* seconds; ``durable=False`` skips the store tier."""
+        try:
+            raw = json.dumps(value, ensure_ascii=False)
+        except (TypeError, ValueError):
+            logger.debug("LLM-Antwort nicht serialisierbar, wird nicht gecacht")
+            return
+        self._remember(key, raw, time.time() + ttl)
+        if durable and self.store is not None:
+            self.store.set(key, raw, ttl)
+        with self._lock:
+            self._stats["writes"] += 1
+
+    def _remember(self, key: str, raw: str, expires_at: float) -> None:
+        with self._lock:
+            self._memory[key] = (raw, expires_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def stats(self) -> dict:
+        """Return hit/miss counters plus the current memory tier size."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+        lookups = stats["memory_hits"] + stats["store_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["store_hits"]) / lookups, 3) if lookups else 0.0
+        return stats
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        if self.store is not None:
+            self.store.clear()
+
+
+_cache: LLMResponseCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache | None:
+    """Return the process-wide cache, or None when ``LLM_CACHE_ENABLED`` is off."""
+    global _cache
+    if not config.LLM_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                store = None
+                if config.CACHE_DIR:
+                    store = SQLiteKVStore(
+                        os.path.join(config.CACHE_DIR, "llm_cache.sqlite3"),
+                        table="llm_responses",
+                        max_entries=config.LLM_CACHE_STORE_MAX_ENTRIES,
+                    )
+                _cache = LLMResponseCache(max_entries=config.LLM_CACHE_MEMORY_MAX_ENTRIES, store=store)
+    return _cache
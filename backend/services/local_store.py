@@ -0,0 +1,144 @@
+"""Durable key/value store on a local SQLite file, shared by all workers on a host.
+
+Used as the second cache tier for services that want results to survive restarts
+and be visible across gunicorn workers without an external service.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteKVStore:
+    """Thread-safe key/value table with per-entry expiry and a row cap.
+
+    Every operation swallows ``sqlite3.Error``/``OSError`` and logs it: callers treat the store
+    as an optimisation, so a locked or corrupt file must never fail a request.
+    """
+
+    def __init__(self, path: str, table: str, max_entries: int = 5000):
+        if not table.isidentifier():
+            raise ValueError(f"Ungültiger Tabellenname: {table}")
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connections are per thread and per process: gunicorn --preload forks after import.
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL, stored_at REAL NOT NULL)"
+            )
+            conn.execute(f"CREATE INDEX IF NOT EXISTS ix_{self.table}_stored_at ON {self.table} (stored_at)")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get_entry(self, key: str, include_expired: bool = False) -> tuple[bytes | str, float, float] | None:
+        """Return ``(value, expires_at, stored_at)`` or None. Expired rows only with *include_expired*."""
+        try:
+            row = (
+                self._connect()
+                .execute(f"SELECT value, expires_at, stored_at FROM {self.table} WHERE key = ?", (key,))
+                .fetchone()
+            )
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Cache-Lesefehler (%s): %s", self.table, e)
+            return None
+        if row is None:
+            return None
+        if not include_expired and row[1] <= time.time():
+            return None
+        return row[0], row[1], row[2]
+
+    def get(self, key: str) -> bytes | str | None:
+        """Return the stored value if present and not expired."""
+        entry = self.get_entry(key)
+        return entry[0] if entry else None
+
+    def set(self, key: str, value: bytes | str, ttl: float) -> None:
+        """Store *value* for *ttl* seconds, pruning the table every 100 writes."""
+        now = time.time()
+        try:
+            self._connect().execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at, stored_at) VALUES (?, ?, ?, ?)",
+                (key, value, now + ttl, now),
+            )
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Cache-Schreibfehler (%s): %s", self.table, e)
+            return
+        self._writes += 1
+        if self._writes % 100 == 0:
+            self.prune()
+
+    def update(self, key: str, func: Callable[[bytes | str | None], bytes | str], ttl: float) -> bool:
+        """Replace *key*'s value with ``func(current)`` in one write transaction; returns False on a store error.
+
+        *current* is None when the key is missing or expired. Concurrent updates from other
+        threads and workers wait for each other, so none of them is lost.
+        """
+        now = time.time()
+        try:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)).fetchone()
+                current = row[0] if row is not None and row[1] > now else None
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at, stored_at) VALUES (?, ?, ?, ?)",
+                    (key, func(current), now + ttl, now),
+                )
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Cache-Schreibfehler (%s): %s", self.table, e)
+            return False
+        self._writes += 1
+        if self._writes % 100 == 0:
+            self.prune()
+        return True
+
+    def delete(self, key: str) -> None:
+        try:
+            self._connect().execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Cache-Löschfehler (%s): %s", self.table, e)
+
+    def prune(self, keep_expired_for: float = 0) -> int:
+        """Drop expired rows and the oldest rows beyond ``max_entries``. Returns rows removed."""
+        try:
+            conn = self._connect()
+            removed = conn.execute(
+                f"DELETE FROM {self.table} WHERE expires_at < ?", (time.time() - keep_expired_for,)
+            ).rowcount
+            removed += conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN "
+                f"(SELECT key FROM {self.table} ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            ).rowcount
+            return removed
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Cache-Bereinigung fehlgeschlagen (%s): %s", self.table, e)
+            return 0
+
+    def clear(self) -> None:
+        try:
+            self._connect().execute(f"DELETE FROM {self.table}")
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Cache-Leeren fehlgeschlagen (%s): %s", self.table, e)
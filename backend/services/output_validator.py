@@ -41,6 +41,8 @@ class OutputValidator:
     MAX_WORDS = 500
     MIN_PARAGRAPHS = 2
     MAX_PARAGRAPHS = 8
+    EMAIL_MIN_WORDS = 20
+    EMAIL_MAX_WORDS = 150
 
     VALID_GREETINGS = [
         "sehr geehrte",
@@ -123,6 +125,30 @@ class OutputValidator:
 
         return result
 
+    def validate_email_body(self, text: str) -> ValidationResult:
+        """Check an AI-written application email body (from combined generation).
+
+        Errors mean the body should be discarded in favour of a separate email generation.
+        """
+        result = ValidationResult()
+        text_lower = text.lower().strip()
+        word_count = len(text.split())
+        result.metrics["word_count"] = word_count
+
+        if word_count < self.EMAIL_MIN_WORDS:
+            result.errors.append(f"E-Mail zu kurz ({word_count} Wörter)")
+        elif word_count > self.EMAIL_MAX_WORDS:
+            result.errors.append(f"E-Mail zu lang ({word_count} Wörter, Maximum: {self.EMAIL_MAX_WORDS})")
+        if not any(text_lower.startswith(g) for g in self.VALID_GREETINGS):
+            result.errors.append("E-Mail ohne Anrede")
+        if not any(text_lower.endswith(c) for c in self.VALID_CLOSINGS):
+            result.errors.append("E-Mail endet nicht mit einer Grußformel")
+        if text_lower.startswith("betreff") or "\nbetreff:" in text_lower:
+            result.errors.append("E-Mail enthält eine Betreffzeile")
+
+        result.is_valid = len(result.errors) == 0
+        return result
+
     def _check_length(self, text: str, result: ValidationResult) -> None:
         """Check word count is within acceptable range."""
         words = text.split()
@@ -0,0 +1,118 @@
+"""Small dependency-graph executor for multi-stage pipelines.
+
+Stages declare the stages they depend on and receive those results as keyword
+arguments. Independent stages run concurrently on a bounded thread pool, so
+e.g. loading the user's profile overlaps with scraping and extracting the job
+posting.
+
+Stages marked ``inline`` run on the calling thread instead. Anything that
+touches the SQLAlchemy session must be inline: sessions are bound to the app
+context of the thread that created them.
+"""
+
+import logging
+import time
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Stage:
+    """One pipeline step; ``func`` is called with the results of ``deps`` as keyword arguments.
+
+    ``after`` lists stages that must finish first without passing their result.
+    """
+
+    name: str
+    func: Callable[..., Any]
+    deps: tuple[str, ...] = ()
+    inline: bool = False
+    after: tuple[str, ...] = ()
+
+    @property
+    def requires(self) -> tuple[str, ...]:
+        return self.deps + self.after
+
+
+class PipelineError(ValueError):
+    """Raised for invalid stage graphs (unknown dependency, cycle, duplicate name)."""
+
+
+def _validate(stages: list[Stage]) -> None:
+    names = [stage.name for stage in stages]
+    if len(names) != len(set(names)):
+        raise PipelineError("Doppelte Stage-Namen in der Pipeline")
+    known = set(names)
+    for stage in stages:
+        missing = set(stage.requires) - known
+        if missing:
+            raise PipelineError(f"Stage '{stage.name}' hängt von unbekannten Stages ab: {sorted(missing)}")
+
+
+def run_pipeline(
+    stages: list[Stage],
+    max_workers: int = 4,
+    on_stage_start: Callable[[str], None] | None = None,
+    on_stage_done: Callable[[str, float], None] | None = None,
+    thread_name_prefix: str = "obojobs-pipeline",
+) -> tuple[dict[str, Any], dict[str, float]]:
+    """Run *stages* respecting their dependencies; return ``(results, timings)``.
+
+    ``timings`` maps each stage name to its wall-clock duration in seconds.
+    ``on_stage_start``/``on_stage_done`` may be called from worker threads.
+
+    The first stage that raises aborts the pipeline: stages that have not started
+    yet are skipped, running ones are awaited, and the exception propagates.
+    """
+    _validate(stages)
+    pending = {stage.name: stage for stage in stages}
+    results: dict[str, Any] = {}
+    timings: dict[str, float] = {}
+    running: dict[Future, str] = {}
+
+    def execute(stage: Stage) -> Any:
+        if on_stage_start:
+            on_stage_start(stage.name)
+        start = time.monotonic()
+        result = stage.func(**{dep: results[dep] for dep in stage.deps})
+        timings[stage.name] = time.monotonic() - start
+        logger.debug("Stage %s fertig nach %.2fs", stage.name, timings[stage.name])
+        if on_stage_done:
+            on_stage_done(stage.name, timings[stage.name])
+        return result
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+    try:
+        while pending or running:
+            for future in [future for future in running if future.done()]:
+                results[running.pop(future)] = future.result()
+
+            ready = [stage for stage in pending.values() if all(dep in results for dep in stage.requires)]
+            for stage in ready:
+                if not stage.inline:
+                    del pending[stage.name]
+                    running[executor.submit(execute, stage)] = stage.name
+
+            inline = next((stage for stage in ready if stage.inline), None)
+            if inline is not None:
+                # Worker stages submitted above keep running while this one executes
+                del pending[inline.name]
+                results[inline.name] = execute(inline)
+                continue
+
+            if not running:
+                if pending:
+                    raise PipelineError(f"Zyklische Abhängigkeiten zwischen Stages: {sorted(pending)}")
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[running.pop(future)] = future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    return results, timings
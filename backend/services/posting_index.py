@@ -0,0 +1,240 @@
+"""Local job posting index.
+
+Every posting a live Bundesagentur search returns, and every page scraped for an
+analysis, is stored once in ``job_postings`` (deduplicated by refnr or canonical URL).
+
+``JobRecommender`` asks the index before the API. A query is answered locally only
+when the same query (keywords, location, radius, filters, page) was searched live
+within ``POSTING_INDEX_MAX_AGE``: the postings that search returned are replayed in
+their original order, with its ``maxErgebnisse`` as total - including neighbouring
+towns within the BA radius and working-time filtered results. Pages of one query are
+therefore always in the API's order, whether they come live or from a replay.
+
+Everything else is a freshness gap and goes to the API; its results are ingested and
+the search is recorded.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import threading
+from datetime import datetime, timedelta
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from config import config
+from models import JobPosting, JobPostingSearch, db
+from services.ba_search_cache import search_cache_key
+from services.bundesagentur_client import BundesagenturJob
+
+logger = logging.getLogger(__name__)
+
+TRACKING_PARAMS = re.compile(r"^(utm_\w+|gclid|fbclid|mc_\w+|trk\w*|ref|source)$", re.I)
+BA_DETAIL_URL = re.compile(r"arbeitsagentur\.de/jobsuche/jobdetail/([^/?#]+)")
+
+
+def canonical_url(url: str) -> str:
+    """URL without fragment, tracking parameters and trailing slash; scheme and host lower-cased."""
+    parts = urlsplit(url.strip())
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True) if not TRACKING_PARAMS.match(key)
+    ]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(sorted(query)), ""))
+
+
+def posting_key(refnr: str = "", url: str = "") -> str | None:
+    """Deduplication key of a posting: its BA refnr if known, else its canonical URL."""
+    if not refnr and url:
+        match = BA_DETAIL_URL.search(url)
+        refnr = match.group(1) if match else ""
+    if refnr:
+        return f"ba:{refnr}"
+    return canonical_url(url) if url else None
+
+
+def _query_key(params: dict) -> str:
+    # Keywords are free text; the hash keeps the key within the column size
+    return hashlib.sha256(search_cache_key(params).encode("utf-8")).hexdigest()
+
+
+def posting_to_job(posting: JobPosting) -> BundesagenturJob:
+    """The indexed posting in the shape of a Bundesagentur search result."""
+    return BundesagenturJob(
+        refnr=posting.refnr or "",
+        titel=posting.title,
+        beruf=posting.occupation,
+        arbeitgeber=posting.company,
+        arbeitsort=posting.location,
+        arbeitsort_plz=posting.postal_code,
+        veroeffentlicht_am=posting.published_at,
+        arbeitszeit=posting.working_time,
+        beschreibung=posting.description,
+        url=posting.url or "",
+    )
+
+
+class PostingIndex:
+    """Ingests postings into ``job_postings`` and answers keyword searches from it."""
+
+    def __init__(self, max_age: float):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._stats = {"local_hits": 0, "gaps": 0, "ingested": 0, "ingest_errors": 0}
+
+    def search(self, params: dict) -> tuple[list[BundesagenturJob], int] | None:
+        """Answer a BA search (``build_search_params`` dict) from its recorded live result, or None on a gap.
+
+        Unrecorded queries are not answered by a local text match: it could not apply
+        the BA radius, would order by date instead of the API's order (repeating or skipping
+        postings between a local and a live page) and would count its own total.
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=self.max_age)
+        searched = JobPostingSearch.query.filter(
+            JobPostingSearch.query_key == _query_key(params), JobPostingSearch.fetched_at >= cutoff
+        ).first()
+        if searched is None or searched.posting_keys is None:
+            self._count("gaps")
+            return None
+        return self._replay(searched)
+
+    def _replay(self, searched: JobPostingSearch) -> tuple[list[BundesagenturJob], int] | None:
+        """The postings a recorded live search returned, or None if some are gone (pruned)."""
+        keys = json.loads(searched.posting_keys)
+        postings = {}
+        if keys:
+            postings = {
+                posting.dedup_key: posting for posting in JobPosting.query.filter(JobPosting.dedup_key.in_(keys))
+            }
+        if len(postings) < len(set(keys)):
+            self._count("gaps")
+            return None
+        self._count("local_hits")
+        return [posting_to_job(postings[key]) for key in keys], searched.total
+
+    def ingest_search(self, params: dict, jobs: list[BundesagenturJob], total: int) -> None:
+        """Store the results of a live BA search and record when it ran."""
+        postings = {
+            posting_key(refnr=job.refnr): {
+                "source": "arbeitsagentur",
+                "refnr": job.refnr,
+                "url": job.url,
+                "title": job.titel,
+                "occupation": job.beruf,
+                "company": job.arbeitgeber,
+                "location": job.arbeitsort,
+                "postal_code": job.arbeitsort_plz,
+                "working_time": job.arbeitszeit,
+                "description": job.beschreibung,
+                "published_at": job.veroeffentlicht_am,
+            }
+            for job in jobs
+            if job.refnr
+        }
+        # search_jobs reports API errors as an empty result: never record one as covered
+        self._upsert(postings, query_key=_query_key(params) if total else None, total=total)
+
+    def _record_search(self, query_key: str, total: int, keys: list[str], now: datetime) -> None:
+        searched = JobPostingSearch.query.filter_by(query_key=query_key).first()
+        if searched is None:
+            searched = JobPostingSearch(query_key=query_key)
+            db.session.add(searched)
+        searched.total, searched.posting_keys, searched.fetched_at = total, json.dumps(keys), now
+
+    def ingest_job_data(self, job_data: dict) -> None:
+        """Store a scraped posting (``fetch_structured_job_posting`` result)."""
+        url = job_data.get("url") or job_data.get("source_url") or ""
+        key = posting_key(url=url)
+        if key is None or len(key) > 500 or not job_data.get("title"):
+            return
+        fields = {
+            "source": job_data.get("source") or "unknown",
+            "url": url,
+            "title": job_data.get("title") or "",
+            "company": job_data.get("company") or "",
+            "location": job_data.get("location") or "",
+            "working_time": job_data.get("employment_type") or "",
+            "description": job_data.get("description") or "",
+        }
+        if key.startswith("ba:"):
+            fields["refnr"] = key[3:]
+        self._upsert({key: fields})
+
+    def prune(self, retention_days: int) -> int:
+        """Delete postings not seen for *retention_days* and expired search records."""
+        cutoff = datetime.utcnow() - timedelta(days=retention_days)
+        deleted = JobPosting.query.filter(JobPosting.last_seen_at < cutoff).delete(synchronize_session=False)
+        JobPostingSearch.query.filter(
+            JobPostingSearch.fetched_at < datetime.utcnow() - timedelta(seconds=self.max_age)
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        return deleted
+
+    def _upsert(self, postings: dict[str, dict], query_key: str | None = None, total: int = 0) -> None:
+        # Two workers may insert the same new posting; the loser retries against the winner's row
+        for attempt in range(2):
+            try:
+                now = datetime.utcnow()
+                existing = {}
+                if postings:
+                    existing = {
+                        posting.dedup_key: posting
+                        for posting in JobPosting.query.filter(JobPosting.dedup_key.in_(list(postings)))
+                    }
+                for key, fields in postings.items():
+                    posting = existing.get(key)
+                    if posting is None:
+                        posting = JobPosting(dedup_key=key, first_seen_at=now)
+                        db.session.add(posting)
+                    for name, value in fields.items():
+                        # Empty values (e.g. no description in a search result) keep the stored ones
+                        if value or not getattr(posting, name):
+                            setattr(posting, name, value)
+                    posting.last_seen_at = now
+                if query_key is not None:
+                    # Dict order is the order of the live result
+                    self._record_search(query_key, total, list(postings), now)
+                db.session.commit()
+                self._count("ingested", len(postings))
+                return
+            except IntegrityError:
+                db.session.rollback()
+                if not attempt:
+                    continue
+                error = "Doppelter Eintrag"
+            except SQLAlchemyError as e:
+                db.session.rollback()
+                error = e
+            # The index is an optimization: a failed write must not fail the search
+            self._count("ingest_errors")
+            logger.warning("Stellenangebote konnten nicht indexiert werden: %s", error)
+            return
+
+    def _count(self, outcome: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[outcome] += amount
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["local_hits"] + stats["gaps"]
+        stats["hit_rate"] = round(stats["local_hits"] / lookups, 3) if lookups else 0.0
+        return stats
+
+
+_index: PostingIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_posting_index() -> PostingIndex | None:
+    """Return the process-wide posting index, or None when ``POSTING_INDEX_ENABLED`` is off."""
+    global _index
+    if not config.POSTING_INDEX_ENABLED:
+        return None
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = PostingIndex(max_age=config.POSTING_INDEX_MAX_AGE)
+    return _index
@@ -14,6 +14,9 @@ class ProfileExtractor:
 
     PROFILE_FIELDS = ["full_name", "phone", "email", "address", "city", "postal_code", "website"]
 
+    # CV contents are personal data: cache in memory only (never in the SQLite tier) and briefly
+    CACHE_TTL = 3600
+
     def __init__(self):
         self.client = AIClient()
 
@@ -36,6 +39,8 @@ class ProfileExtractor:
                 max_tokens=500,
                 temperature=0.1,
                 model=self.client.model,
+                cache_ttl=self.CACHE_TTL,
+                cache_durable=False,
             )
             return self._normalize_profile(data)
         except Exception as e:
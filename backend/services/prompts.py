@@ -1,6 +1,13 @@
 """Prompt templates and constants for AI cover letter generation."""
 
-from services.industry_rules import get_industry_prompt_block
+import logging
+
+from services.industry_rules import KONZERN_MIN_EMPLOYEES, get_industry_prompt_block
+
+logger = logging.getLogger(__name__)
+
+# Separates the cover letter from the email body in combined generation output
+EMAIL_SECTION_MARKER = "=== E-MAIL ==="
 
 FORBIDDEN_PHRASES = [
     # Generic application openers
@@ -68,7 +75,7 @@ Return a JSON object with these keys:
 
 5. "branche": Company industry. Pick ONE: "it_software", "consulting", "maschinenbau", "marketing", "gesundheit", "andere".
 
-6. "unternehmensgroesse": Company size. Pick ONE: "kmu" (under ~500 employees, startup, Mittelstand, agency), "konzern" (over ~500, DAX, MBB, Big4), "unbekannt".
+6. "unternehmensgroesse": Company size. Pick ONE: "kmu" (under {KONZERN_MIN_EMPLOYEES} employees, startup, Mittelstand, agency), "konzern" ({KONZERN_MIN_EMPLOYEES} or more, DAX, MBB, Big4), "unbekannt".
 
 7. "analyse": A compact analytical summary in German. Go beyond the surface. Include:
    - Core facts: company, industry, position (max 2 lines)
@@ -82,6 +89,19 @@ Reply ONLY with the JSON object. Example:
 {{"ansprechpartner": "Sehr geehrte Frau Schmidt", "position": "Frontend Developer", "quelle": "LinkedIn", "email": "bewerbung@firma.de", "branche": "it_software", "unternehmensgroesse": "kmu", "analyse": "- Mittelstaendisches IT-Unternehmen, Webentwicklung\\n- Brauchen jemanden der eigenstaendig React-Frontends baut\\n- 'wachsendes Team' = akuter Bedarf, wenig Onboarding\\n- Duzen, Remote-Option = lockere Startup-Kultur\\n- Kernaufgaben: React-SPAs, API-Integration, Code-Reviews"}}}}"""
 
 
+def create_industry_prompt(stellenanzeige_text: str) -> str:
+    return f"""Classify the company behind this German job posting.
+
+JOB POSTING:
+{stellenanzeige_text[:3000]}
+
+Return a JSON object with two keys:
+1. "branche": Pick ONE: "it_software", "consulting", "maschinenbau", "marketing", "gesundheit", "andere".
+2. "unternehmensgroesse": Pick ONE: "kmu" (under {KONZERN_MIN_EMPLOYEES} employees, startup, Mittelstand, agency), "konzern" ({KONZERN_MIN_EMPLOYEES} or more, DAX, MBB, Big4), "unbekannt".
+
+Reply ONLY with the JSON object, e.g. {{"branche": "it_software", "unternehmensgroesse": "kmu"}}"""
+
+
 def _build_persona(user_skills: list | None, position: str) -> str:
     """Derive a career-stage persona from skills and target position."""
     if user_skills and len(user_skills) >= 8:
@@ -317,3 +337,83 @@ Rules:
 - Sound professional but natural, not robotic.
 
 Write ONLY the email body in German. No explanation, no markdown."""
+
+
+def build_anschreiben_messages(
+    cv_text: str,
+    stellenanzeige_text: str,
+    firma_name: str,
+    position: str,
+    ansprechpartner: str,
+    quelle: str = "Manuelle Eingabe",
+    zeugnis_text: str | None = None,
+    bewerber_vorname: str | None = None,
+    bewerber_name: str | None = None,
+    user_skills: list | None = None,
+    tonalitaet: str = "modern",
+    details: dict | None = None,
+    user_city: str | None = None,
+    seele_profil_text: str | None = None,
+    with_email: bool = False,
+) -> list[dict]:
+    """Build the system/user message pair shared by all Anschreiben generators.
+
+    With ``with_email`` the model also writes the short application email body,
+    after an ``EMAIL_SECTION_MARKER`` line, in the same response.
+    """
+    if details and details.get("stellenanzeige_kompakt"):
+        stellenanzeige_text = details["stellenanzeige_kompakt"]
+
+    branche = details.get("branche") if details else None
+    unternehmensgroesse = details.get("unternehmensgroesse") if details else None
+    logger.debug("Industry routing: branche=%s, groesse=%s", branche, unternehmensgroesse)
+
+    system_prompt = build_anschreiben_system_prompt(
+        cv_text=cv_text,
+        position=position,
+        quelle=quelle,
+        ansprechpartner=ansprechpartner,
+        bewerber_vorname=bewerber_vorname,
+        bewerber_name=bewerber_name,
+        user_skills=user_skills,
+        tonalitaet=tonalitaet,
+        user_city=user_city,
+        branche=branche,
+        unternehmensgroesse=unternehmensgroesse,
+        seele_profil_text=seele_profil_text,
+    )
+
+    if zeugnis_text:
+        system_prompt += f"\n\n## ARBEITSZEUGNIS (LETZTE POSITION):\n{zeugnis_text[:500]}"
+
+    if with_email:
+        system_prompt += create_email_section_instructions(ansprechpartner)
+
+    firma_info = f" (Firma: {firma_name})" if firma_name else ""
+    task = (
+        "Schreibe jetzt das vollständige Anschreiben (Anrede bis Grußformel) und danach die E-Mail:"
+        if with_email
+        else "Schreibe jetzt das vollständige Anschreiben (Anrede bis Grußformel):"
+    )
+    user_prompt = f"""STELLENANZEIGE / FIRMENBESCHREIBUNG{firma_info}:
+{stellenanzeige_text[:2000]}
+
+{task}"""
+
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+def create_email_section_instructions(ansprechpartner: str) -> str:
+    """System prompt addendum asking for the email body after the letter (combined generation)."""
+    return f"""
+
+## SECOND OUTPUT: APPLICATION EMAIL
+After the cover letter, output a line containing only "{EMAIL_SECTION_MARKER}", then the body of the
+email that carries the application (cover letter and CV are attached).
+- Start with "{ansprechpartner}," followed by a blank line.
+- 3-5 sentences in German: name the position and company, mention the attachments, ask for a conversation.
+- Do NOT repeat sentences from the cover letter. No subject line.
+- End with "Mit freundlichen Grüßen" and NOTHING after it (the signature is added separately)."""
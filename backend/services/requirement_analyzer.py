@@ -31,6 +31,8 @@ class RequirementAnalyzer:
         "education": "certifications",
     }
 
+    CACHE_TTL = 7 * 24 * 3600
+
     def __init__(self):
         self.client = AIClient()
 
@@ -62,6 +64,7 @@ class RequirementAnalyzer:
             messages=[{"role": "user", "content": prompt}],
             max_tokens=2000,
             temperature=0.2,
+            cache_ttl=self.CACHE_TTL,
         )
 
     def _create_extraction_prompt(self, job_text: str) -> str:
@@ -2,13 +2,69 @@
 
 import logging
 import random
+import threading
 import time
+from collections import deque
 from functools import wraps
 
 logger = logging.getLogger(__name__)
 
 
-def retry_with_backoff(max_attempts=3, base_delay=2.0, max_delay=30.0, exceptions=(Exception,)):
+class RetryBudget:
+    """Per-process cap on retries: at most ``ratio`` retries per first attempt in a rolling window.
+
+    A small floor (``min_retries``) keeps occasional retries possible at low traffic. When a
+    provider degrades, the budget runs dry and further failures surface immediately instead
+    of every request sleeping through its own backoff chain.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries: int = 10, window_seconds: float = 60.0, enabled: bool = True):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window_seconds = window_seconds
+        self.enabled = enabled
+        self._attempts: deque[float] = deque()
+        self._retries: deque[float] = deque()
+        self._lock = threading.Lock()
+        self.exhausted = 0
+
+    def _trim(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        for timestamps in (self._attempts, self._retries):
+            while timestamps and timestamps[0] <= cutoff:
+                timestamps.popleft()
+
+    def record_attempt(self) -> None:
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            self._attempts.append(now)
+
+    def try_acquire_retry(self) -> bool:
+        """Consume one retry from the budget; False if none is left."""
+        if not self.enabled:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            allowed = max(self.min_retries, int(len(self._attempts) * self.ratio))
+            if len(self._retries) >= allowed:
+                self.exhausted += 1
+                return False
+            self._retries.append(now)
+            return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._trim(time.monotonic())
+            return {"attempts": len(self._attempts), "retries": len(self._retries), "exhausted": self.exhausted}
+
+
+def retry_with_backoff(
+    max_attempts=3, base_delay=2.0, max_delay=30.0, exceptions=(Exception,), non_retryable=(), budget=None
+):
     """Decorator for retrying functions with exponential backoff and jitter.
 
     Args:
@@ -16,6 +72,8 @@ def retry_with_backoff(max_attempts=3, base_delay=2.0, max_delay=30.0, exception
         base_delay: Base delay in seconds (doubled each retry).
         max_delay: Maximum delay cap in seconds.
         exceptions: Tuple of exception types to catch and retry on.
+        non_retryable: Exception types that are re-raised immediately (e.g. an open circuit).
+        budget: Optional RetryBudget shared by all callers; no retry once it is exhausted.
 
     Raises:
         The last caught exception after all attempts are exhausted.
@@ -25,14 +83,21 @@ def retry_with_backoff(max_attempts=3, base_delay=2.0, max_delay=30.0, exception
         @wraps(func)
         def wrapper(*args, **kwargs):
             last_exception = None
+            if budget is not None:
+                budget.record_attempt()
             for attempt in range(max_attempts):
                 try:
                     return func(*args, **kwargs)
+                except non_retryable:
+                    raise
                 except exceptions as e:
                     last_exception = e
                     is_last_attempt = attempt >= max_attempts - 1
                     if is_last_attempt:
                         break
+                    if budget is not None and not budget.try_acquire_retry():
+                        logger.warning("%s fehlgeschlagen: %s. Retry-Budget erschöpft, kein Retry", func.__name__, e)
+                        break
                     delay = min(base_delay * (2**attempt) + random.uniform(0, 1), max_delay)
                     logger.warning(
                         "%s fehlgeschlagen (Versuch %d/%d): %s. Retry in %.1fs",
@@ -0,0 +1,341 @@
+"""Reverse matching for the scheduled job search: route new postings to interested users.
+
+The per-user auto-search ran every user's keyword searches and scored the results for
+that user alone, so a cycle cost users x keywords API calls plus an LLM requirement
+analysis per user and posting. ``ReverseMatcher.run`` works the other way round:
+
+1. Every distinct (keyword, location, working time) search of the active users runs
+   once, and its postings are ingested into the posting index.
+2. ``SkillRouter`` - an inverted index from normalized skill tokens (technical skills,
+   tools, certifications and their ``SKILL_VARIATIONS``) to user IDs - sends each new
+   posting only to users with an overlapping skill whose location/working time it
+   reaches. Users without such a skill (only languages or soft skills) get the postings
+   their own keyword searches found, as in the per-user search.
+3. Requirements are analyzed once per routed posting and every candidate is scored
+   against them in one batch; recommendations are written in a single commit.
+
+API calls now scale with distinct searches and LLM calls with new postings, not with
+users. The scheduler runs the cycle per user batch (``services.scheduled_runs``);
+searches and analyses shared between batches are served by the Bundesagentur search
+cache, the posting index and the LLM cache. Each user keeps a routing watermark
+(``User.postings_routed_until``), taken once the cycle's searches are ingested: postings
+the index first saw before it were routed to the user already and are skipped.
+"""
+
+import logging
+import re
+import threading
+from collections import defaultdict
+from collections.abc import Callable, Iterable
+from contextlib import closing
+from datetime import datetime
+from typing import Any
+
+from config import config
+from models import JobPosting, JobRecommendation, User, UserSkill, db
+from services.bundesagentur_client import BundesagenturJob, build_search_params
+from services.concurrency import map_bounded
+from services.job_fit_calculator import JobFitCalculator
+from services.job_recommender import JobRecommender
+from services.posting_index import get_posting_index, posting_key, posting_to_job
+from services.scheduled_runs import BatchCancelled
+
+logger = logging.getLogger(__name__)
+
+# Languages and soft skills appear in nearly every posting and would route it to everyone
+ROUTING_CATEGORIES = ("technical", "tools", "certifications")
+TOKEN = re.compile(r"[\w+#]+(?:\.[\w+#]+)*")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-cased word tokens; keeps ``c++``, ``c#`` and dotted names like ``node.js``."""
+    return TOKEN.findall(text.casefold())
+
+
+def _fold(text: str | None) -> str:
+    return " ".join((text or "").split()).casefold()
+
+
+def skill_phrases(skill_name: str) -> set[tuple[str, ...]]:
+    """Token phrases that indicate *skill_name* in a posting, including known variations."""
+    name = _fold(skill_name)
+    phrases = {tuple(tokenize(name))}
+    for base_skill, alternatives in JobFitCalculator.SKILL_VARIATIONS.items():
+        if name == base_skill:
+            phrases.update(tuple(tokenize(alternative)) for alternative in alternatives)
+        elif name in alternatives:
+            phrases.add(tuple(tokenize(base_skill)))
+    phrases.discard(())
+    return phrases
+
+
+class SkillRouter:
+    """Inverted index from skill tokens to the users holding the skill."""
+
+    def __init__(self, skills: Iterable[UserSkill]):
+        # First token of a phrase -> (phrase, user_id); the remaining tokens are checked per posting
+        self._phrases: dict[str, list[tuple[tuple[str, ...], int]]] = defaultdict(list)
+        for skill in skills:
+            if skill.skill_category not in ROUTING_CATEGORIES:
+                continue
+            for phrase in skill_phrases(skill.skill_name):
+                self._phrases[phrase[0]].append((phrase, skill.user_id))
+
+    def route(self, text: str) -> dict[int, int]:
+        """Users with a skill mentioned in *text*, mapped to the number of matching phrases."""
+        tokens = set(tokenize(text))
+        matches: dict[int, set] = defaultdict(set)
+        for token in tokens & self._phrases.keys():
+            for phrase, user_id in self._phrases[token]:
+                if all(part in tokens for part in phrase[1:]):
+                    matches[user_id].add(phrase)
+        return {user_id: len(phrases) for user_id, phrases in matches.items()}
+
+
+def _profile(user: User) -> tuple[str, str]:
+    return _fold(user.preferred_location), user.preferred_working_time or ""
+
+
+def _unrouted(user: User, first_seen: datetime | None) -> bool:
+    """Whether a posting first seen at *first_seen* is newer than *user*'s routing watermark."""
+    return first_seen is None or user.postings_routed_until is None or first_seen >= user.postings_routed_until
+
+
+def _found_by(user: User, keywords: list[str], found_for: set[tuple[str, str, str]]) -> bool:
+    """Whether one of *user*'s own keyword searches found the posting."""
+    location, working_time = _profile(user)
+    return any((keyword, location, working_time) in found_for for keyword in keywords)
+
+
+def _reaches(user: User, job: BundesagenturJob, found_for: set[tuple[str, str, str]]) -> bool:
+    """Whether *job* lies within *user*'s search: found by a search of their profile, or in their town."""
+    location, working_time = _profile(user)
+    if any((searched_in, searched_for) == (location, working_time) for _, searched_in, searched_for in found_for):
+        return True
+    # Only the BA search can filter by working time
+    if working_time:
+        return False
+    return not location or location in _fold(job.arbeitsort)
+
+
+def _raise_if_cancelled(cancelled: threading.Event | None) -> None:
+    if cancelled is not None and cancelled.is_set():
+        raise BatchCancelled("Batch-Zeitlimit überschritten")
+
+
+def _check_cancelled(cancelled: threading.Event | None) -> None:
+    if cancelled is not None and cancelled.is_set():
+        db.session.rollback()
+        raise BatchCancelled("Batch-Zeitlimit überschritten")
+
+
+def _unless_cancelled(func: Callable[[Any], Any], cancelled: threading.Event | None) -> Callable[[Any], Any]:
+    """Wrap a pool task so that calls not started before *cancelled* is set do no work."""
+
+    def run(item: Any) -> Any:
+        _raise_if_cancelled(cancelled)
+        return func(item)
+
+    return run
+
+
+class ReverseMatcher:
+    """One scheduled recommendation cycle in reverse-matching mode."""
+
+    MAX_PER_USER = 5
+    SEARCH_SIZE = 25
+
+    def __init__(self, recommender: JobRecommender | None = None):
+        self.recommender = recommender or JobRecommender()
+
+    def run(self, user_ids: list[int] | None = None, cancelled: threading.Event | None = None) -> dict:
+        """Search, route, score and store recommendations; returns the cycle's counters.
+
+        *user_ids* limits the cycle to one batch of a partitioned scheduler run. Once
+        *cancelled* is set (batch timeout) the cycle raises ``BatchCancelled`` before it
+        writes anything.
+        """
+        query = (
+            db.session.query(User).join(UserSkill, User.id == UserSkill.user_id).filter(User.is_active == True)  # noqa: E712
+        )
+        if user_ids is not None:
+            query = query.filter(User.id.in_(user_ids))
+        users = query.distinct().all()
+        skills_by_user: dict[int, list[UserSkill]] = defaultdict(list)
+        for skill in UserSkill.query.filter(UserSkill.user_id.in_([user.id for user in users])).all():
+            skills_by_user[skill.user_id].append(skill)
+
+        keywords_by_user = {
+            user.id: JobRecommender.search_keywords_from_skills(skills_by_user[user.id]) for user in users
+        }
+        searches = sorted(
+            {
+                (keyword, user.preferred_location or "", user.preferred_working_time or "")
+                for user in users
+                for keyword in keywords_by_user[user.id]
+            }
+        )
+        found = self._search(searches, cancelled)
+        # Everything this cycle's searches found is ingested; later postings go to the next cycle
+        watermark = datetime.utcnow()
+        routed_until = [user.postings_routed_until for user in users]
+        since = min(routed_until) if routed_until and None not in routed_until else None
+        postings = self._new_postings(found, since, watermark)
+
+        router = SkillRouter(skill for skills in skills_by_user.values() for skill in skills)
+        users_by_id = {user.id: user for user in users}
+        # The router cannot reach these users; they keep the results of their own searches
+        search_only = [
+            user
+            for user in users
+            if not any(skill.skill_category in ROUTING_CATEGORIES for skill in skills_by_user[user.id])
+        ]
+        candidates = []
+        for job, found_for, first_seen in postings:
+            routed = [
+                user_id
+                for user_id in router.route(f"{job.titel} {job.beruf} {job.beschreibung}")
+                if _unrouted(users_by_id[user_id], first_seen) and _reaches(users_by_id[user_id], job, found_for)
+            ]
+            routed.extend(
+                user.id
+                for user in search_only
+                if _unrouted(user, first_seen) and _found_by(user, keywords_by_user[user.id], found_for)
+            )
+            if routed:
+                candidates.append((job, routed))
+
+        _check_cancelled(cancelled)
+        recommendations = self._score(candidates, skills_by_user, cancelled)
+        _check_cancelled(cancelled)
+        for user in users:
+            user.postings_routed_until = watermark
+        # The watermarks are committed together with the recommendations
+        db.session.commit()
+        stats = {
+            "users": len(users),
+            "searches": len(searches),
+            "postings": len(postings),
+            "routed": sum(len(routed) for _, routed in candidates),
+            "recommendations": recommendations,
+        }
+        logger.info("Reverse-Matching abgeschlossen: %s", stats)
+        return stats
+
+    def _search(
+        self, searches: list[tuple[str, str, str]], cancelled: threading.Event | None = None
+    ) -> dict[str, tuple[BundesagenturJob, set]]:
+        """Run each distinct search once; returns refnr -> (job, (keyword, location, working time) that found it).
+
+        Once *cancelled* is set no further search starts and ``BatchCancelled`` is raised.
+        """
+        found: dict[str, tuple[BundesagenturJob, set]] = {}
+        index = get_posting_index()
+        results = map_bounded(
+            _unless_cancelled(
+                lambda search: self.recommender.ba_client.search_jobs(
+                    keywords=search[0],
+                    location=search[1],
+                    working_time=search[2],
+                    size=self.SEARCH_SIZE,
+                    timeout=config.BA_SEARCH_TIMEOUT,
+                ),
+                cancelled,
+            ),
+            searches,
+            max_workers=config.BA_SEARCH_WORKERS,
+            timeout=config.BA_SEARCH_TIMEOUT,
+            thread_name_prefix="ba-search",
+        )
+        with closing(results):
+            for (keyword, location, working_time), response, error in results:
+                _check_cancelled(cancelled)
+                if error:
+                    logger.warning("Bundesagentur-Suche nach '%s' fehlgeschlagen: %s", keyword, error)
+                    continue
+                jobs, total = response
+                if index:
+                    params = build_search_params(keyword, location, working_time=working_time, size=self.SEARCH_SIZE)
+                    index.ingest_search(params, jobs, total)
+                for job in jobs:
+                    if job.refnr:
+                        found.setdefault(job.refnr, (job, set()))[1].add((keyword, _fold(location), working_time))
+        return found
+
+    def _new_postings(
+        self, found: dict[str, tuple[BundesagenturJob, set]], since: datetime | None, watermark: datetime
+    ) -> list[tuple[BundesagenturJob, set, datetime | None]]:
+        """Found postings plus postings the index first saw in [*since*, *watermark*), with first-seen times.
+
+        Without a posting index the first-seen time is unknown (None) and only found postings are returned.
+        """
+        if get_posting_index() is None:
+            return [(job, found_for, None) for job, found_for in found.values()]
+        keys = {posting_key(refnr=refnr): refnr for refnr in found}
+        first_seen = dict(
+            db.session.query(JobPosting.dedup_key, JobPosting.first_seen_at).filter(
+                JobPosting.dedup_key.in_(list(keys)), JobPosting.first_seen_at < watermark
+            )
+        )
+        postings = [(*found[keys[key]], seen_at) for key, seen_at in first_seen.items()]
+        if since is None:
+            return postings
+        # Postings ingested by interactive searches since the batch's oldest watermark
+        others = JobPosting.query.filter(
+            JobPosting.source == "arbeitsagentur",
+            JobPosting.first_seen_at >= since,
+            JobPosting.first_seen_at < watermark,
+            JobPosting.dedup_key.not_in(list(keys)),
+        )
+        postings.extend((posting_to_job(posting), set(), posting.first_seen_at) for posting in others)
+        return postings
+
+    def _score(
+        self,
+        candidates: list[tuple[BundesagenturJob, list[int]]],
+        skills_by_user: dict,
+        cancelled: threading.Event | None = None,
+    ) -> int:
+        """Analyze each posting once, score its users in batch and add the best matches to the session.
+
+        Once *cancelled* is set no further analysis starts and ``BatchCancelled`` is raised.
+        """
+        urls = [job.to_job_data()["url"] for job, _ in candidates]
+        existing = set(
+            db.session.query(JobRecommendation.user_id, JobRecommendation.job_url).filter(
+                JobRecommendation.job_url.in_(urls)
+            )
+        )
+        by_user: dict[int, list[dict]] = defaultdict(list)
+        analyzed = map_bounded(
+            _unless_cancelled(
+                lambda candidate: self.recommender._analyze_candidate((candidate[0], candidate[0].to_job_data())),
+                cancelled,
+            ),
+            candidates,
+            max_workers=config.RECOMMENDER_SCORING_WORKERS,
+            timeout=config.RECOMMENDER_SCORING_TIMEOUT,
+            thread_name_prefix="job-scoring",
+        )
+        with closing(analyzed):
+            for (job, user_ids), requirements, error in analyzed:
+                _check_cancelled(cancelled)
+                if error:
+                    logger.warning("Anforderungsanalyse für '%s' fehlgeschlagen: %s", job.titel, error)
+                for user_id in user_ids:
+                    job_data = job.to_job_data()
+                    if (user_id, job_data["url"]) in existing:
+                        continue
+                    scored = self.recommender.score_job(job, job_data, skills_by_user[user_id], requirements)
+                    if scored["fit_score"] >= JobRecommender.MIN_FIT_SCORE:
+                        by_user[user_id].append(scored)
+
+        created = 0
+        for user_id, results in by_user.items():
+            results.sort(key=lambda result: result["fit_score"], reverse=True)
+            for job_data in results[: self.MAX_PER_USER]:
+                db.session.add(
+                    JobRecommendation.from_job_data(user_id, job_data, job_data["fit_score"], job_data["fit_category"])
+                )
+                created += 1
+        return created
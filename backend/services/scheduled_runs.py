@@ -0,0 +1,401 @@
+"""Leader election and resumable, partitioned runs for the scheduled jobs.
+
+Every web worker starts the APScheduler ``BackgroundScheduler``, so each trigger fires
+once per process. A job only runs on the holder of its row in ``scheduler_leases``:
+the lease is taken with a conditional UPDATE (or INSERT for a new job), which works
+the same on SQLite and PostgreSQL, and ``LeaseKeeper`` renews it in the background
+every TTL/3 seconds. A leader that dies simply stops renewing and the lease expires.
+
+``run_partitioned`` records each run in ``scheduler_runs`` and splits the users into
+``scheduler_run_batches`` when it starts. The leader claims batches (status ``running``
+with its holder ID) before handing them to a bounded worker pool, and its
+``LeaseKeeper`` renews their heartbeat; finished batches are checkpointed with their
+counters. A run left ``running`` by a dead or demoted leader is resumed by the next
+leader, which skips batches whose claim still has a fresh heartbeat: a demoted leader
+starts no new batches but finishes the ones already running. A batch exceeding
+``SCHEDULER_BATCH_TIMEOUT`` is asked to stop through its ``cancelled`` event and only
+checkpointed once its thread has returned, so nothing it writes lands after the run
+is tallied or the lease released. The run row keeps duration, throughput and failure
+counters, tallied from the batches, for the admin metrics.
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+import uuid
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from flask import Flask
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from config import config
+from models import SchedulerLease, SchedulerRun, SchedulerRunBatch, db
+from services.concurrency import map_bounded
+
+logger = logging.getLogger(__name__)
+
+RUN_RUNNING = "running"
+RUN_SUCCEEDED = "succeeded"
+RUN_FAILED = "failed"
+
+BATCH_PENDING = "pending"
+BATCH_RUNNING = "running"
+BATCH_DONE = "done"
+BATCH_FAILED = "failed"
+
+# A run counts as due slightly before the full interval so trigger jitter never skips a cycle
+DUE_FRACTION = 0.9
+
+# process_batch(user_ids, cancelled) -> counters; see run_partitioned
+BatchProcessor = Callable[[list[int], threading.Event], dict]
+
+
+class BatchCancelled(Exception):
+    """Raised by a batch that stopped because it exceeded ``SCHEDULER_BATCH_TIMEOUT``."""
+
+
+def holder_id() -> str:
+    """Identity of this process as lease holder; unique even across restarts with a reused PID."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def acquire_lease(name: str, holder: str, ttl: float) -> bool:
+    """Take or extend the lease *name* for *holder*; False while another holder's lease is valid."""
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=ttl)
+    taken = db.session.execute(
+        update(SchedulerLease)
+        .where(SchedulerLease.name == name, or_(SchedulerLease.expires_at < now, SchedulerLease.holder == holder))
+        .values(holder=holder, acquired_at=now, expires_at=expires_at)
+    )
+    db.session.commit()
+    if taken.rowcount == 1:
+        return True
+    if db.session.execute(select(SchedulerLease.name).where(SchedulerLease.name == name)).first():
+        return False
+    db.session.add(SchedulerLease(name=name, holder=holder, acquired_at=now, expires_at=expires_at))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another process created the lease first
+        db.session.rollback()
+        return False
+    return True
+
+
+def release_lease(name: str, holder: str) -> None:
+    """Let the lease expire now so the next trigger of any process can take it."""
+    db.session.execute(
+        update(SchedulerLease)
+        .where(SchedulerLease.name == name, SchedulerLease.holder == holder)
+        .values(expires_at=datetime.utcnow())
+    )
+    db.session.commit()
+
+
+class LeaseKeeper:
+    """Renews a held lease in the background; ``lost`` is set once renewal fails.
+
+    It also keeps the heartbeat of the run batches claimed by the holder fresh, even
+    after the lease is lost, until the block using it ends. Writes go through the
+    engine directly, so the thread needs no app context.
+    """
+
+    def __init__(self, engine, name: str, holder: str, ttl: float):
+        self._engine = engine
+        self.name = name
+        self.holder = holder
+        self.ttl = ttl
+        self._expires_at = datetime.utcnow() + timedelta(seconds=ttl)
+        self.lost = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"lease-{name}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.ttl / 3):
+            if not self.lost.is_set():
+                self._renew()
+            self._beat()
+
+    def _renew(self) -> None:
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.ttl)
+        table = SchedulerLease.__table__
+        try:
+            with self._engine.begin() as conn:
+                renewed = conn.execute(
+                    table.update()
+                    .where(table.c.name == self.name, table.c.holder == self.holder)
+                    .values(expires_at=expires_at)
+                ).rowcount
+        except SQLAlchemyError as e:
+            logger.warning("Lease '%s' konnte nicht verlängert werden: %s", self.name, e)
+            # Still ours until it expires; the next attempt may get through
+            if now >= self._expires_at:
+                self.lost.set()
+            return
+        if renewed == 1:
+            self._expires_at = expires_at
+        else:
+            logger.warning("Lease '%s' wurde von einem anderen Prozess übernommen", self.name)
+            self.lost.set()
+
+    def _beat(self) -> None:
+        table = SchedulerRunBatch.__table__
+        try:
+            with self._engine.begin() as conn:
+                conn.execute(
+                    table.update()
+                    .where(table.c.holder == self.holder, table.c.status == BATCH_RUNNING)
+                    .values(heartbeat_at=datetime.utcnow())
+                )
+        except SQLAlchemyError as e:
+            logger.warning("Heartbeat der Batches von '%s' fehlgeschlagen: %s", self.name, e)
+
+
+@contextmanager
+def leadership(name: str, ttl: float | None = None, release: bool = True) -> Iterator[LeaseKeeper | None]:
+    """Hold the lease *name* for the block; yields None if another process is the leader.
+
+    With ``release=False`` the lease is kept until it expires, so the same cron trigger
+    firing a little later in another process does not run the job a second time.
+    """
+    ttl = ttl or config.SCHEDULER_LEASE_TTL
+    holder = holder_id()
+    if not acquire_lease(name, holder, ttl):
+        logger.info("'%s' läuft bereits in einem anderen Prozess, überspringe", name)
+        yield None
+        return
+    keeper = LeaseKeeper(db.engine, name, holder, ttl)
+    try:
+        yield keeper
+    finally:
+        keeper.stop()
+        if release and not keeper.lost.is_set():
+            try:
+                release_lease(name, holder)
+            except SQLAlchemyError as e:
+                db.session.rollback()
+                logger.warning("Lease '%s' konnte nicht freigegeben werden: %s", name, e)
+
+
+def partition(user_ids: list[int], size: int) -> list[list[int]]:
+    size = max(1, size)
+    return [user_ids[i : i + size] for i in range(0, len(user_ids), size)]
+
+
+def _latest_run(job: str) -> SchedulerRun | None:
+    return (
+        SchedulerRun.query.filter_by(job=job)
+        .order_by(SchedulerRun.started_at.desc(), SchedulerRun.id.desc())
+        .populate_existing()
+        .first()
+    )
+
+
+def _start_run(job: str, holder: str, user_ids: list[int]) -> SchedulerRun:
+    now = datetime.utcnow()
+    batches = partition(sorted(set(user_ids)), config.SCHEDULER_BATCH_SIZE)
+    run = SchedulerRun(
+        job=job,
+        status=RUN_RUNNING,
+        holder=holder,
+        batches_total=len(batches),
+        users_total=sum(len(batch) for batch in batches),
+        started_at=now,
+        heartbeat_at=now,
+    )
+    db.session.add(run)
+    db.session.flush()
+    for batch_no, batch in enumerate(batches):
+        db.session.add(SchedulerRunBatch(run_id=run.id, batch_no=batch_no, user_ids_json=json.dumps(batch)))
+    db.session.commit()
+    logger.info("Lauf %d von '%s' gestartet: %d Nutzer in %d Batches", run.id, job, run.users_total, len(batches))
+    return run
+
+
+def _claim(run: SchedulerRun, lease: LeaseKeeper) -> list[tuple[int, list[int]]]:
+    """Claim the run's pending batches and those of holders whose heartbeat expired."""
+    now = datetime.utcnow()
+    stale = now - timedelta(seconds=lease.ttl)
+    db.session.execute(
+        update(SchedulerRunBatch)
+        .where(
+            SchedulerRunBatch.run_id == run.id,
+            or_(
+                SchedulerRunBatch.status == BATCH_PENDING,
+                (SchedulerRunBatch.status == BATCH_RUNNING) & (SchedulerRunBatch.heartbeat_at < stale),
+            ),
+        )
+        .values(status=BATCH_RUNNING, holder=lease.holder, heartbeat_at=now)
+    )
+    db.session.commit()
+    # Plain values for the pool threads: ORM objects expire on every checkpoint commit
+    return [
+        (batch.id, batch.user_ids())
+        for batch in run.batches.filter_by(status=BATCH_RUNNING, holder=lease.holder).order_by(
+            SchedulerRunBatch.batch_no
+        )
+    ]
+
+
+def _tally(run: SchedulerRun) -> None:
+    """Recount the run's counters from its finished batches.
+
+    Batches of a demoted leader are checkpointed by that process while the next leader
+    works on the rest, so the counters are derived rather than incremented.
+    """
+    stats: Counter = Counter()
+    run.batches_failed = run.users_processed = run.users_failed = 0
+    for batch in run.batches.filter(SchedulerRunBatch.status.in_((BATCH_DONE, BATCH_FAILED))):
+        size = len(batch.user_ids())
+        if batch.status == BATCH_FAILED:
+            run.batches_failed += 1
+            run.users_failed += size
+            continue
+        result = json.loads(batch.stats_json) if batch.stats_json else {}
+        run.users_processed += size
+        run.users_failed += result.get("failed", 0)
+        stats.update(result)
+    run.stats_json = json.dumps(stats)
+    run.heartbeat_at = datetime.utcnow()
+
+
+def _process(app: Flask, run: SchedulerRun, process_batch: BatchProcessor, lease: LeaseKeeper) -> None:
+    """Work off the batches this leader can claim, checkpointing each one as its result arrives."""
+    claimed = _claim(run, lease)
+    skipped = object()
+
+    def work(item: tuple[int, list[int]]) -> dict | object:
+        # A demoted leader finishes the running batches but starts no new ones
+        if lease.lost.is_set():
+            return skipped
+        cancelled = threading.Event()
+        deadline = threading.Timer(config.SCHEDULER_BATCH_TIMEOUT, cancelled.set)
+        deadline.daemon = True
+        deadline.start()
+        try:
+            with app.app_context():
+                return process_batch(item[1], cancelled)
+        finally:
+            deadline.cancel()
+
+    # No timeout here: a batch is only checkpointed after its thread has returned
+    results = map_bounded(
+        work, claimed, max_workers=config.SCHEDULER_WORKERS, thread_name_prefix=f"scheduler-{run.job}"
+    )
+    for (batch_id, _), result, error in results:
+        batch = db.session.get(SchedulerRunBatch, batch_id, populate_existing=True)
+        if batch.holder != lease.holder:
+            # Our heartbeat expired and another leader claimed the batch
+            continue
+        if result is skipped:
+            batch.status = BATCH_PENDING
+            batch.holder = None
+            db.session.commit()
+            continue
+        batch.attempts += 1
+        batch.finished_at = datetime.utcnow()
+        if error:
+            logger.error("Batch %d von Lauf %d fehlgeschlagen: %s", batch.batch_no, run.id, error)
+            batch.status = BATCH_FAILED
+            batch.error = str(error)
+        else:
+            batch.status = BATCH_DONE
+            batch.stats_json = json.dumps(result or {})
+        _tally(run)
+        db.session.commit()
+
+    if lease.lost.is_set():
+        # The new leader resumes the remaining batches
+        logger.warning("Lease verloren, Lauf %d wird an den neuen Leader übergeben", run.id)
+        return
+    if run.batches.filter(SchedulerRunBatch.status.in_((BATCH_PENDING, BATCH_RUNNING))).count():
+        logger.info("Lauf %d wartet auf Batches eines anderen Prozesses", run.id)
+        return
+
+    _tally(run)
+    run.status = RUN_FAILED if run.batches_failed else RUN_SUCCEEDED
+    run.finished_at = datetime.utcnow()
+    db.session.commit()
+    summary = run.to_dict()
+    logger.info(
+        "Lauf %d von '%s' beendet (%s): %d/%d Nutzer in %.1fs (%.2f Nutzer/s), %d fehlgeschlagene Batches",
+        run.id,
+        run.job,
+        run.status,
+        run.users_processed,
+        run.users_total,
+        summary["duration_seconds"],
+        summary["users_per_second"],
+        run.batches_failed,
+    )
+
+
+def run_partitioned(
+    app: Flask,
+    job: str,
+    list_user_ids: Callable[[], list[int]],
+    process_batch: BatchProcessor,
+    interval: timedelta,
+) -> dict | None:
+    """Run *job* once per *interval* across all processes, in user batches.
+
+    ``process_batch(user_ids, cancelled)`` runs in an app context on a pool thread and
+    returns counters (summed into the run's stats; ``failed`` counts failed users). It
+    should stop without writing more once ``cancelled`` is set (batch timeout) by
+    raising ``BatchCancelled``, which fails the batch. An interrupted run is finished
+    first. Returns the summary of the last run worked on, or None if this process did
+    nothing.
+    """
+    with app.app_context(), leadership(job) as lease:
+        if lease is None:
+            return None
+        run = _latest_run(job)
+        resumed = None
+        if run is not None and run.status == RUN_RUNNING:
+            run.resumed += 1
+            run.holder = lease.holder
+            run.heartbeat_at = datetime.utcnow()
+            db.session.commit()
+            logger.info("Setze unterbrochenen Lauf %d von '%s' fort", run.id, job)
+            _process(app, run, process_batch, lease)
+            if run.status == RUN_RUNNING:
+                return run.to_dict()
+            resumed = run.to_dict()
+
+        if run is not None and run.started_at > datetime.utcnow() - interval * DUE_FRACTION:
+            logger.info("'%s' wurde zuletzt um %s gestartet, noch nicht fällig", job, run.started_at)
+            return resumed
+
+        run = _start_run(job, lease.holder, list_user_ids())
+        _process(app, run, process_batch, lease)
+        return run.to_dict()
+
+
+def scheduler_run_stats() -> dict[str, dict]:
+    """Latest run of every scheduled job with its duration, throughput and failures."""
+    latest = select(SchedulerRun.job, func.max(SchedulerRun.id).label("id")).group_by(SchedulerRun.job).subquery()
+    runs = SchedulerRun.query.join(latest, SchedulerRun.id == latest.c.id).all()
+    return {run.job: run.to_dict() for run in runs}
+
+
+def prune_runs(retention_days: int) -> int:
+    """Delete finished runs (and their batches) older than *retention_days*."""
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    old = select(SchedulerRun.id).where(SchedulerRun.finished_at.is_not(None), SchedulerRun.started_at < cutoff)
+    db.session.execute(delete(SchedulerRunBatch).where(SchedulerRunBatch.run_id.in_(old)))
+    deleted = db.session.execute(delete(SchedulerRun).where(SchedulerRun.id.in_(old))).rowcount
+    db.session.commit()
+    return deleted
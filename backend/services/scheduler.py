@@ -1,25 +1,36 @@
 """
 Background Scheduler Service.
 
-Runs periodic tasks via APScheduler (cleanup daily at 3 AM, job search every 6 hours).
+Runs periodic tasks via APScheduler (cleanup daily at 3 AM, posting index pruning at 3:30 AM,
+job search every 6 hours). Every process starts the scheduler; a database lease makes sure
+each task runs on one process only (see ``services.scheduled_runs``).
 """
 
 import logging
 import os
+import threading
+from datetime import timedelta
 
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 from flask import Flask
 
+from config import config
+from services.scheduled_runs import BatchCancelled, leadership, prune_runs, run_partitioned
+
 logger = logging.getLogger(__name__)
 
 scheduler = BackgroundScheduler()
 
+AUTO_SEARCH_INTERVAL_HOURS = 6
+
 
 def cleanup_old_recommendations(app: Flask) -> None:
-    """Remove recommendations older than 30 days."""
-    with app.app_context():
+    """Remove recommendations older than 30 days and old scheduler run history."""
+    with app.app_context(), leadership("cleanup_old_recommendations", release=False) as lease:
+        if lease is None:
+            return
         try:
             from services.job_recommender import JobRecommender
 
@@ -27,50 +38,106 @@ def cleanup_old_recommendations(app: Flask) -> None:
             deleted = recommender.cleanup_old_recommendations(days=30)
             if deleted:
                 logger.info("Cleaned up %d old recommendations", deleted)
+            pruned = prune_runs(retention_days=config.SCHEDULER_RUN_RETENTION_DAYS)
+            if pruned:
+                logger.info("Pruned %d old scheduler runs", pruned)
         except Exception as e:
             logger.error("Error cleaning up recommendations: %s", e)
 
 
-def auto_search_jobs(app: Flask) -> None:
-    """Automatically search for jobs for all users with skills."""
-    with app.app_context():
+def prune_posting_index(app: Flask) -> None:
+    """Remove postings the searches have not returned for POSTING_INDEX_RETENTION_DAYS."""
+    with app.app_context(), leadership("prune_posting_index", release=False) as lease:
+        if lease is None:
+            return
         try:
-            from models import User, UserSkill, db
-            from services.job_recommender import JobRecommender
+            from services.posting_index import get_posting_index
 
-            recommender = JobRecommender()
+            index = get_posting_index()
+            if index is None:
+                return
+            deleted = index.prune(retention_days=config.POSTING_INDEX_RETENTION_DAYS)
+            if deleted:
+                logger.info("Pruned %d job postings from the local index", deleted)
+        except Exception as e:
+            logger.error("Error pruning job posting index: %s", e)
 
-            users_with_skills = (
-                db.session.query(User)
-                .join(UserSkill, User.id == UserSkill.user_id)
-                .filter(User.is_active == True)  # noqa: E712
-                .distinct()
-                .all()
-            )
 
-            for user in users_with_skills:
-                try:
-                    result = recommender.search_and_score_jobs(
+def users_with_skills() -> list[int]:
+    """IDs of the active users with at least one skill."""
+    from models import User, UserSkill, db
+
+    rows = (
+        db.session.query(User.id)
+        .join(UserSkill, User.id == UserSkill.user_id)
+        .filter(User.is_active == True)  # noqa: E712
+        .distinct()
+        .all()
+    )
+    return [row[0] for row in rows]
+
+
+def search_jobs_for_users(user_ids: list[int], cancelled: threading.Event | None = None) -> dict:
+    """Search and score jobs for each user of a batch (per-user mode); stops between users once *cancelled*."""
+    from models import User, UserSkill, db
+    from services.job_recommender import JobRecommender
+
+    recommender = JobRecommender()
+
+    users = (
+        db.session.query(User)
+        .join(UserSkill, User.id == UserSkill.user_id)
+        .filter(User.is_active == True, User.id.in_(user_ids))  # noqa: E712
+        .distinct()
+        .all()
+    )
+
+    failed = 0
+    for user in users:
+        if cancelled is not None and cancelled.is_set():
+            raise BatchCancelled("Batch-Zeitlimit überschritten")
+        try:
+            result = recommender.search_and_score_jobs(
+                user_id=user.id,
+                location=user.preferred_location or "",
+                working_time=user.preferred_working_time or "",
+                max_results=5,
+            )
+            for job_data in result.get("results", []):
+                if job_data.get("fit_score", 0) >= JobRecommender.MIN_FIT_SCORE:
+                    recommender.create_recommendation(
                         user_id=user.id,
-                        location=user.preferred_location or "",
-                        working_time=user.preferred_working_time or "",
-                        max_results=5,
+                        job_data=job_data,
+                        fit_score=job_data["fit_score"],
+                        fit_category=job_data["fit_category"],
                     )
-                    for job_data in result.get("results", []):
-                        if job_data.get("fit_score", 0) >= JobRecommender.MIN_FIT_SCORE:
-                            recommender.create_recommendation(
-                                user_id=user.id,
-                                job_data=job_data,
-                                fit_score=job_data["fit_score"],
-                                fit_category=job_data["fit_category"],
-                            )
-                except Exception as e:
-                    logger.error("Error searching jobs for user %s: %s", user.id, e)
-                    continue
-
-            logger.info("Auto-search completed for %d users", len(users_with_skills))
         except Exception as e:
-            logger.error("Error in auto_search_jobs: %s", e)
+            logger.error("Error searching jobs for user %s: %s", user.id, e)
+            failed += 1
+
+    return {"users": len(users), "failed": failed}
+
+
+def reverse_match_users(user_ids: list[int], cancelled: threading.Event | None = None) -> dict:
+    """Route the postings that are new to the batch's users (past their routing watermark) by matching skills."""
+    from services.reverse_matcher import ReverseMatcher
+
+    return ReverseMatcher().run(user_ids=user_ids, cancelled=cancelled)
+
+
+def auto_search_jobs(app: Flask) -> None:
+    """Automatically search for jobs for all users with skills, in batches on the leader process."""
+    process_batch = reverse_match_users if config.AUTO_SEARCH_MODE == "reverse" else search_jobs_for_users
+    try:
+        run_partitioned(
+            app,
+            "auto_search_jobs",
+            users_with_skills,
+            process_batch,
+            interval=timedelta(hours=AUTO_SEARCH_INTERVAL_HOURS),
+        )
+    except Exception as e:
+        logger.error("Error in auto_search_jobs: %s", e)
 
 
 def init_scheduler(app: Flask) -> None:
@@ -92,17 +159,26 @@ def init_scheduler(app: Flask) -> None:
         replace_existing=True,
     )
 
+    scheduler.add_job(
+        func=prune_posting_index,
+        args=[app],
+        trigger=CronTrigger(hour=3, minute=30),
+        id="prune_posting_index",
+        name="Prune local job posting index",
+        replace_existing=True,
+    )
+
     scheduler.add_job(
         func=auto_search_jobs,
         args=[app],
-        trigger=IntervalTrigger(hours=6),
+        trigger=IntervalTrigger(hours=AUTO_SEARCH_INTERVAL_HOURS),
         id="auto_search_jobs",
         name="Auto-search jobs for users",
         replace_existing=True,
     )
 
     scheduler.start()
-    logger.info("Background scheduler started with 2 jobs")
+    logger.info("Background scheduler started with 3 jobs")
 
 
 def shutdown_scheduler() -> None:
@@ -0,0 +1,204 @@
+"""Pool of long-lived cloudscraper sessions, keyed by host.
+
+A fresh ``cloudscraper.create_scraper()`` per fetch repeats the TLS setup and, on
+Cloudflare-protected boards, the challenge solve; its clearance cookies are thrown away
+with the session. Pooled sessions keep their connections and cookie jar, so repeated
+fetches from one host only pay for the challenge once.
+
+- A session is used by one thread at a time (``with pool.session(host) as scraper``).
+- Sessions older than ``CLOUDSCRAPER_SESSION_MAX_AGE`` are rotated, expired cookies are
+  dropped at checkout, and a session whose request raised is discarded.
+- At most ``CLOUDSCRAPER_POOL_SIZE`` sessions are pooled per process; beyond that the
+  least recently used idle session is evicted, or a throwaway session is used when all
+  are busy. A size of 0 disables pooling.
+- The pool is rebuilt after a fork, so gunicorn workers never share the master's sockets.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+import cloudscraper
+import requests
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+
+def create_cloudscraper() -> requests.Session:
+    return cloudscraper.create_scraper(browser={"browser": "chrome", "platform": "linux"})
+
+
+@dataclass
+class _PooledSession:
+    host: str
+    scraper: requests.Session
+    pooled: bool
+    created: float
+    last_used: float
+
+
+class CloudscraperPool:
+    """Thread-safe checkout/checkin of per-host cloudscraper sessions."""
+
+    def __init__(
+        self,
+        max_sessions: int,
+        max_age: float,
+        factory: Callable[[], requests.Session] = create_cloudscraper,
+    ):
+        self.max_sessions = max_sessions
+        self.max_age = max_age
+        self.factory = factory
+        self._idle: dict[str, list[_PooledSession]] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+        self._stats = {"created": 0, "reused": 0, "expired": 0, "failed": 0, "evicted": 0, "unpooled": 0}
+
+    @contextmanager
+    def session(self, host: str) -> Iterator[requests.Session]:
+        """Check out a session for *host*; it goes back to the pool unless the block raised."""
+        entry = self._checkout(host)
+        try:
+            yield entry.scraper
+        except BaseException:
+            self._discard(entry, "failed")
+            raise
+        self._checkin(entry)
+
+    def _expired(self, entry: _PooledSession, now: float) -> bool:
+        return now - entry.created >= self.max_age
+
+    def _checkout(self, host: str) -> _PooledSession:
+        now = time.monotonic()
+        stale = []
+        entry = None
+        pooled = False
+        with self._lock:
+            idle = self._idle.get(host, [])
+            while idle:
+                candidate = idle.pop()
+                if self._expired(candidate, now):
+                    stale.append(candidate)
+                    continue
+                entry = candidate
+                break
+            if not idle:
+                self._idle.pop(host, None)
+            self._size -= len(stale)
+            self._stats["expired"] += len(stale)
+            if entry is not None:
+                self._stats["reused"] += 1
+            else:
+                pooled = self._reserve_slot(stale)
+        for old in stale:
+            old.scraper.close()
+
+        if entry is not None:
+            entry.scraper.cookies.clear_expired_cookies()
+            return entry
+        try:
+            scraper = self.factory()
+        except BaseException:
+            if pooled:
+                with self._lock:
+                    self._size -= 1
+            raise
+        with self._lock:
+            self._stats["created"] += 1
+            if not pooled:
+                self._stats["unpooled"] += 1
+        logger.debug("cloudscraper-Session für %s angelegt (gepoolt: %s)", host, pooled)
+        now = time.monotonic()
+        return _PooledSession(host=host, scraper=scraper, pooled=pooled, created=now, last_used=now)
+
+    def _reserve_slot(self, closing: list[_PooledSession]) -> bool:
+        """Claim a pool slot for a new session, evicting the least recently used idle one if full.
+
+        Evicted sessions are appended to *closing*. Returns False when every slot is busy.
+        Called with the lock held.
+        """
+        if self._size >= self.max_sessions:
+            candidates = [entry for entries in self._idle.values() for entry in entries]
+            if not candidates:
+                return False
+            victim = min(candidates, key=lambda entry: entry.last_used)
+            self._idle[victim.host].remove(victim)
+            if not self._idle[victim.host]:
+                del self._idle[victim.host]
+            self._size -= 1
+            self._stats["evicted"] += 1
+            closing.append(victim)
+        self._size += 1
+        return True
+
+    def _checkin(self, entry: _PooledSession) -> None:
+        if not entry.pooled:
+            entry.scraper.close()
+            return
+        now = time.monotonic()
+        if self._expired(entry, now):
+            self._discard(entry, "expired")
+            return
+        entry.last_used = now
+        with self._lock:
+            self._idle.setdefault(entry.host, []).append(entry)
+
+    def _discard(self, entry: _PooledSession, reason: str) -> None:
+        with self._lock:
+            self._stats[reason] += 1
+            if entry.pooled:
+                self._size -= 1
+        entry.scraper.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            idle = sum(len(entries) for entries in self._idle.values())
+            stats["idle"] = idle
+            stats["in_use"] = self._size - idle
+            stats["hosts"] = len(self._idle)
+        checkouts = stats["created"] + stats["reused"]
+        stats["reuse_rate"] = round(stats["reused"] / checkouts, 3) if checkouts else 0.0
+        return stats
+
+    def close(self) -> None:
+        """Close all idle sessions (shutdown hook and tests)."""
+        with self._lock:
+            entries = [entry for entries in self._idle.values() for entry in entries]
+            self._idle.clear()
+            self._size -= len(entries)
+        for entry in entries:
+            entry.scraper.close()
+
+
+_pool: CloudscraperPool | None = None
+_owner_pid: int | None = None
+_pool_lock = threading.Lock()
+
+
+def get_cloudscraper_pool() -> CloudscraperPool:
+    """Return this process's cloudscraper pool."""
+    global _pool, _owner_pid
+    pid = os.getpid()
+    with _pool_lock:
+        if _pool is None or _owner_pid != pid:
+            # Inherited across fork: drop without closing the parent's sockets
+            _pool = CloudscraperPool(
+                max_sessions=config.CLOUDSCRAPER_POOL_SIZE,
+                max_age=config.CLOUDSCRAPER_SESSION_MAX_AGE,
+            )
+            _owner_pid = pid
+        return _pool
+
+
+def cloudscraper_pool_stats() -> dict | None:
+    """Return the pool counters of this process, or None before its first cloudscraper fetch."""
+    with _pool_lock:
+        pool = _pool if _owner_pid == os.getpid() else None
+    return pool.stats() if pool else None
@@ -2,6 +2,7 @@
 
 from services.scrapers.arbeitsagentur import ArbeitsagenturParser
 from services.scrapers.base import JobBoardParser
+from services.scrapers.document import ParsedPage
 from services.scrapers.generic import GenericJobParser
 from services.scrapers.indeed import IndeedParser
 from services.scrapers.softgarden import SoftgardenParser
@@ -13,6 +14,7 @@ __all__ = [
     "GenericJobParser",
     "IndeedParser",
     "JobBoardParser",
+    "ParsedPage",
     "SoftgardenParser",
     "StepStoneParser",
     "XingParser",
@@ -18,6 +18,9 @@ from services.scrapers.base import (
 class ArbeitsagenturParser(JobBoardParser):
     """Parser for Bundesagentur fur Arbeit job postings."""
 
+    # Contact person, reference number and the external posting link are only in the HTML
+    STOP_AT_JSON_LD = False
+
     # Anti-bot headers for Arbeitsagentur
     HEADERS = {
         "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
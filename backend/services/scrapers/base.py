@@ -10,6 +10,9 @@ from bs4 import BeautifulSoup
 class JobBoardParser(ABC):
     """Abstract base class for job board specific parsers."""
 
+    # Whether a streamed download may stop at a usable JSON-LD JobPosting (see WebScraper._read_body)
+    STOP_AT_JSON_LD = True
+
     @staticmethod
     @abstractmethod
     def matches_url(url: str) -> bool:
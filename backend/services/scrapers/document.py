@@ -0,0 +1,198 @@
+"""Parse-once document model for fetched job postings.
+
+A posting page is decoded and parsed into one tree. The board parsers read that tree,
+and the cleaned text and links are derived from it without modifying it (skipping
+script/style/nav/header/footer subtrees), so no second tree is needed for them.
+
+The charset comes from the Content-Type header, a BOM or the ``<meta>`` declaration in
+the first bytes, then a strict UTF-8 attempt; statistical detection over the whole body
+(``response.apparent_encoding``) is the last resort only. The tree is built with lxml
+when it is installed and with ``html.parser`` otherwise.
+
+``JobPostingScanner`` lets a streamed download stop once the body read so far holds a
+usable JSON-LD ``JobPosting``.
+"""
+
+import codecs
+import json
+import re
+from functools import cached_property
+from typing import Any
+from urllib.parse import urljoin
+
+import requests
+from bs4 import BeautifulSoup, CData, NavigableString, Tag
+
+try:
+    import lxml  # noqa: F401
+
+    DEFAULT_PARSER = "lxml"
+except ImportError:
+    DEFAULT_PARSER = "html.parser"
+
+# Subtrees that do not belong to the posting text or its links
+HIDDEN_TAGS = frozenset({"script", "style", "nav", "header", "footer"})
+# The string types get_text() includes; comments, doctypes and script/style strings are not text
+TEXT_STRING_TYPES = frozenset({NavigableString, CData})
+
+APPLICATION_KEYWORDS = ("bewerbung", "apply", "application", "bewerben", "job", "karriere")
+
+# <meta charset> / http-equiv declarations must appear within the first 1024 bytes; allow some slack
+_META_SCAN_BYTES = 4096
+_HEADER_CHARSET = re.compile(r"charset\s*=\s*[\"']?([\w.:-]+)", re.IGNORECASE)
+_META_CHARSET = re.compile(rb"<meta[^>]+charset\s*=\s*[\"']?\s*([\w.:-]+)", re.IGNORECASE)
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+def _known_codec(name: str | None) -> str | None:
+    if not name:
+        return None
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return None
+
+
+def resolve_charset(response: requests.Response) -> str:
+    """Return the charset for *response*'s body without scanning the whole body if possible."""
+    match = _HEADER_CHARSET.search(response.headers.get("Content-Type", ""))
+    charset = _known_codec(match.group(1)) if match else None
+    if charset:
+        return charset
+
+    body = response.content
+    for bom, name in _BOMS:
+        if body.startswith(bom):
+            return name
+
+    match = _META_CHARSET.search(body[:_META_SCAN_BYTES])
+    charset = _known_codec(match.group(1).decode("ascii", "ignore")) if match else None
+    if charset:
+        return charset
+
+    try:
+        body.decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    return _known_codec(response.apparent_encoding) or "windows-1252"
+
+
+class ParsedPage:
+    """One parsed posting page: the tree for the board parsers plus cleaned text and links."""
+
+    def __init__(self, html: str, url: str, parser: str | None = None, encoding: str | None = None):
+        self.url = url
+        self.encoding = encoding
+        self.soup = BeautifulSoup(html, parser or DEFAULT_PARSER)
+
+    @classmethod
+    def from_response(cls, response: requests.Response, url: str, parser: str | None = None) -> "ParsedPage":
+        encoding = resolve_charset(response)
+        return cls(response.content.decode(encoding, errors="replace"), url, parser, encoding)
+
+    def _visible(self, root: Tag):
+        """Yield visible strings and tags below *root* in document order, skipping HIDDEN_TAGS."""
+        stack = [iter(root.contents)]
+        while stack:
+            node = next(stack[-1], None)
+            if node is None:
+                stack.pop()
+            elif isinstance(node, Tag):
+                if node.name not in HIDDEN_TAGS:
+                    yield node
+                    stack.append(iter(node.contents))
+            elif type(node) in TEXT_STRING_TYPES:
+                yield node
+
+    @cached_property
+    def _content(self) -> tuple[list[str], list[Tag]]:
+        strings, anchors = [], []
+        for node in self._visible(self.soup):
+            if isinstance(node, Tag):
+                if node.name == "a" and node.get("href") is not None:
+                    anchors.append(node)
+            else:
+                stripped = node.strip()
+                if stripped:
+                    strings.append(stripped)
+        return strings, anchors
+
+    @cached_property
+    def text(self) -> str:
+        """Page text one line per text node, without empty lines."""
+        text = "\n".join(self._content[0])
+        return "\n".join(line.strip() for line in text.splitlines() if line.strip())
+
+    @cached_property
+    def links(self) -> dict[str, list[dict[str, Any]]]:
+        """Visible links as ``all_links``, ``email_links`` and ``application_links``."""
+        all_links, email_links, application_links = [], [], []
+        for anchor in self._content[1]:
+            href = str(anchor["href"])
+            link_text = "".join(
+                node.strip() for node in self._visible(anchor) if not isinstance(node, Tag) and node.strip()
+            )
+            absolute_url = urljoin(self.url, href)
+            all_links.append({"url": absolute_url, "text": link_text})
+
+            if href.startswith("mailto:"):
+                email = href.replace("mailto:", "").split("?")[0]
+                email_links.append({"email": email, "text": link_text})
+
+            if any(keyword in href.lower() or keyword in link_text.lower() for keyword in APPLICATION_KEYWORDS):
+                application_links.append({"url": absolute_url, "text": link_text})
+        return {"all_links": all_links, "email_links": email_links, "application_links": application_links}
+
+
+class JobPostingScanner:
+    """Incrementally look for a complete JSON-LD ``JobPosting`` with title and description.
+
+    Call ``scan(buffer)`` with the growing body after every chunk; only bytes after the
+    last complete ``<script>`` block are searched again. Accepts the same shapes as
+    ``extract_json_ld`` (a posting object or a list containing one), so whatever stops
+    the download is also found by the board parsers.
+    """
+
+    _OPEN = re.compile(rb"<script[^>]*application/ld\+json[^>]*>", re.IGNORECASE)
+    _CLOSE = re.compile(rb"</script\s*>", re.IGNORECASE)
+    # Longest opening tag we expect to be split across chunks
+    _OVERLAP = 512
+
+    def __init__(self):
+        self._pos = 0
+
+    def scan(self, buffer: bytes | bytearray) -> bool:
+        while True:
+            opening = self._OPEN.search(buffer, self._pos)
+            if opening is None:
+                self._pos = max(self._pos, len(buffer) - self._OVERLAP)
+                return False
+            closing = self._CLOSE.search(buffer, opening.end())
+            if closing is None:
+                self._pos = opening.start()
+                return False
+            self._pos = closing.end()
+            if self._usable(bytes(buffer[opening.end() : closing.start()])):
+                return True
+
+    @staticmethod
+    def _usable(raw: bytes) -> bool:
+        try:
+            data = json.loads(raw.decode("utf-8", errors="replace"))
+        except ValueError:
+            return False
+        candidates = data if isinstance(data, list) else [data]
+        return any(
+            isinstance(item, dict)
+            and item.get("@type") == "JobPosting"
+            and isinstance(item.get("title"), str)
+            and item["title"].strip()
+            and isinstance(item.get("description"), str)
+            and item["description"].strip()
+            for item in candidates
+        )
@@ -0,0 +1,124 @@
+"""One-pass index over a parsed page for the generic extraction strategies.
+
+The generic strategies used to run their own ``find``/``find_all``/``select`` sweeps,
+class-regex matches and full ``get_text()`` passes over the same tree. ``DOMIndex``
+walks the tree once and records, in document order:
+
+- every tag matching one of a fixed table of ``Selector`` entries,
+- the first tag of selected names (``<title>``, ``<h1>``, ...),
+- the first ``<meta>`` per ``property`` and per ``name``,
+- the JSON-LD ``<script>`` tags,
+- the page text, identical to ``soup.get_text()``.
+
+Strategies then look up candidates instead of searching the tree again. Selectors
+follow BeautifulSoup's attribute matching: a compiled pattern is searched in the
+value, a string must be equal, ``True`` only requires the attribute, and multi-valued
+attributes (``class``) match on any single value or the space-joined value.
+"""
+
+import re
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from functools import cached_property
+
+from bs4 import BeautifulSoup, Tag
+
+
+@dataclass(frozen=True)
+class Selector:
+    """Match tags by one attribute: a regex (search), an exact string, or True for presence."""
+
+    attr: str
+    pattern: re.Pattern | str | bool
+
+    def matches_value(self, value) -> bool:
+        if self.pattern is True:
+            return True
+        if isinstance(value, list | tuple):
+            return any(self._matches_one(item) for item in value) or self._matches_one(" ".join(value))
+        return self._matches_one(value)
+
+    def _matches_one(self, value: str) -> bool:
+        if isinstance(self.pattern, re.Pattern):
+            return self.pattern.search(value) is not None
+        return value == self.pattern
+
+
+def css_class(name: str) -> Selector:
+    """Selector for ``.name`` (one whitespace-separated class token)."""
+    return Selector("class", re.compile(rf"^{re.escape(name)}$"))
+
+
+class DOMIndex:
+    """Candidate tags for a selector table, collected in a single walk over *soup*."""
+
+    def __init__(
+        self,
+        soup: BeautifulSoup,
+        selectors: Iterable[Selector] = (),
+        tag_names: Iterable[str] = (),
+    ):
+        self.soup = soup
+        by_attr: dict[str, list[Selector]] = defaultdict(list)
+        for selector in dict.fromkeys(selectors):
+            by_attr[selector.attr].append(selector)
+        wanted_names = frozenset(tag_names)
+
+        self._hits: dict[Selector, list[Tag]] = {selector: [] for group in by_attr.values() for selector in group}
+        self._first_tags: dict[str, Tag] = {}
+        self._meta_property: dict[str, Tag] = {}
+        self._meta_name: dict[str, Tag] = {}
+        self.json_ld_scripts: list[Tag] = []
+        self._strings: list[str] = []
+
+        # The string types soup.get_text() joins (no comments, script or style contents)
+        string_types = soup.interesting_string_types or Tag.MAIN_CONTENT_STRING_TYPES
+        if isinstance(string_types, type):
+            string_types = {string_types}
+        for node in soup.descendants:
+            if isinstance(node, Tag):
+                name = node.name
+                if name in wanted_names and name not in self._first_tags:
+                    self._first_tags[name] = node
+                attrs = node.attrs
+                if name == "meta":
+                    self._index_meta(node)
+                elif name == "script" and attrs.get("type") == "application/ld+json":
+                    self.json_ld_scripts.append(node)
+                for attr, value in attrs.items():
+                    for selector in by_attr.get(attr, ()):
+                        if value is not None and selector.matches_value(value):
+                            self._hits[selector].append(node)
+            elif type(node) in string_types:
+                self._strings.append(node)
+
+    def _index_meta(self, meta: Tag) -> None:
+        prop = meta.get("property")
+        if isinstance(prop, str):
+            self._meta_property.setdefault(prop, meta)
+        name = meta.get("name")
+        if isinstance(name, str):
+            self._meta_name.setdefault(name, meta)
+
+    def first(self, selector: Selector) -> Tag | None:
+        hits = self._hits[selector]
+        return hits[0] if hits else None
+
+    def all(self, selector: Selector) -> list[Tag]:
+        return self._hits[selector]
+
+    def first_tag(self, name: str) -> Tag | None:
+        """First ``<name>`` tag; *name* must have been passed in ``tag_names``."""
+        return self._first_tags.get(name)
+
+    def meta_property(self, prop: str) -> Tag | None:
+        return self._meta_property.get(prop)
+
+    def meta_name(self, name: str) -> Tag | None:
+        return self._meta_name.get(name)
+
+    @cached_property
+    def text(self) -> str:
+        """The page text, as ``soup.get_text()`` returns it."""
+        return "".join(self._strings)
@@ -5,6 +5,7 @@ from typing import Any
 from bs4 import BeautifulSoup
 
 from services.scrapers.base import parse_date
+from services.scrapers.dom_index import DOMIndex
 from services.scrapers.generic_extractors import (
     apply_heuristics,
     clean_text,
@@ -12,6 +13,7 @@ from services.scrapers.generic_extractors import (
     extract_html_patterns,
     extract_meta_tags,
     extract_opengraph,
+    index_page,
     is_search_results_page,
 )
 
@@ -30,7 +32,8 @@ class GenericJobParser:
     6. Heuristics (first h1, domain-based company name)
 
     Returns partial data - extracts whatever is available rather than
-    requiring all fields to be present.
+    requiring all fields to be present. The tree is walked once (``index_page``);
+    the strategies look up their candidates in that index.
     """
 
     def parse(self, soup: BeautifulSoup, url: str) -> dict[str, Any]:
@@ -51,8 +54,10 @@ class GenericJobParser:
             "extraction_methods": [],  # Track which methods succeeded
         }
 
+        index = index_page(soup)
+
         # Strategy 1: JSON-LD Schema.org
-        json_ld_data = self._extract_json_ld(soup)
+        json_ld_data = self._extract_json_ld(index)
         if json_ld_data:
             result = self._parse_json_ld(json_ld_data, result)
             if any(result.get(k) for k in ["title", "company", "description"]):
@@ -60,37 +65,37 @@ class GenericJobParser:
                 logger.debug("GenericJobParser: Extracted data via JSON-LD")
 
         # Strategy 2: OpenGraph meta tags
-        result, og_extracted = extract_opengraph(soup, result)
+        result, og_extracted = extract_opengraph(index, result)
         if og_extracted:
             result["extraction_methods"].append("opengraph")
             logger.debug("GenericJobParser: Extracted data via OpenGraph")
 
         # Strategy 3: Standard meta tags
-        result, meta_extracted = extract_meta_tags(soup, result)
+        result, meta_extracted = extract_meta_tags(index, result)
         if meta_extracted:
             result["extraction_methods"].append("meta-tags")
             logger.debug("GenericJobParser: Extracted data via meta tags")
 
         # Strategy 4: Title tag parsing
-        result, title_extracted = extract_from_title_tag(soup, result)
+        result, title_extracted = extract_from_title_tag(index, result)
         if title_extracted:
             result["extraction_methods"].append("title-tag")
             logger.debug("GenericJobParser: Extracted data via title tag")
 
         # Strategy 5: Common HTML patterns
-        result, html_extracted = extract_html_patterns(soup, result, url)
+        result, html_extracted = extract_html_patterns(index, result, url)
         if html_extracted:
             result["extraction_methods"].append("html-patterns")
             logger.debug("GenericJobParser: Extracted data via HTML patterns")
 
         # Strategy 6: Heuristics
-        result, heuristic_used = apply_heuristics(soup, result, url)
+        result, heuristic_used = apply_heuristics(index, result, url)
         if heuristic_used:
             result["extraction_methods"].append("heuristics")
             logger.debug("GenericJobParser: Applied heuristic extraction")
 
         # Check if this appears to be a search results page
-        if is_search_results_page(soup, url):
+        if is_search_results_page(index, url):
             result["is_search_results_page"] = True
             logger.warning(
                 f"GenericJobParser: URL appears to be a search results page, not a single job posting: {url}"
@@ -104,15 +109,14 @@ class GenericJobParser:
         else:
             logger.warning(f"GenericJobParser: No structured data found for {url}")
 
-        # Remove internal tracking field from final result
-        del result["extraction_methods"]
+        # Remove internal tracking field from final result; kept on the parser for benchmarks
+        self.extraction_methods = result.pop("extraction_methods")
 
         return result
 
-    def _extract_json_ld(self, soup: BeautifulSoup) -> dict[str, Any] | None:
+    def _extract_json_ld(self, index: DOMIndex) -> dict[str, Any] | None:
         """Extract JSON-LD structured data with @type JobPosting."""
-        scripts = soup.find_all("script", type="application/ld+json")
-        for script in scripts:
+        for script in index.json_ld_scripts:
             try:
                 if not script.string:
                     continue
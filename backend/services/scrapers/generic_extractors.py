@@ -1,6 +1,8 @@
 """Extraction strategies for the generic job parser.
 
-Each function takes (soup, result, ...) and returns the updated result dict.
+Each function takes (index, result, ...) and returns the updated result dict. The
+``DOMIndex`` from ``index_page`` holds the candidates of every selector below, collected
+in one walk over the tree, so the strategies do not search the tree themselves.
 """
 
 import re
@@ -8,6 +10,8 @@ from urllib.parse import urlparse
 
 from bs4 import BeautifulSoup, Tag
 
+from services.scrapers.dom_index import DOMIndex, Selector, css_class
+
 JOB_BOARD_NAMES = {
     "linkedin",
     "indeed",
@@ -30,6 +34,59 @@ _TRAILING_JOB_BOARD_RE = re.compile(
 )
 
 
+# Selector tables, each in priority order
+TITLE_SELECTORS = (
+    Selector("data-testid", re.compile(r"job[-_]?title", re.I)),
+    Selector("class", re.compile(r"job[-_]?title|position[-_]?title|posting[-_]?title", re.I)),
+    Selector("itemprop", "title"),
+    Selector("data-qa", re.compile(r"job[-_]?title", re.I)),
+)
+COMPANY_SELECTORS = (
+    Selector("data-testid", re.compile(r"company[-_]?name|employer", re.I)),
+    Selector("class", re.compile(r"company[-_]?name|employer[-_]?name|hiring[-_]?company", re.I)),
+    Selector("itemprop", "hiringOrganization"),
+    Selector("data-company", True),
+    Selector("data-qa", re.compile(r"company", re.I)),
+)
+LOCATION_SELECTORS = (
+    Selector("data-testid", re.compile(r"job[-_]?location|location", re.I)),
+    Selector("class", re.compile(r"job[-_]?location|location|arbeitsort|standort", re.I)),
+    Selector("itemprop", "jobLocation"),
+    Selector("data-location", True),
+)
+DESCRIPTION_SELECTORS = (
+    Selector("data-testid", re.compile(r"job[-_]?description|description", re.I)),
+    Selector("class", re.compile(r"job[-_]?description|description[-_]?content|posting[-_]?description", re.I)),
+    Selector("itemprop", "description"),
+    Selector("id", re.compile(r"job[-_]?description", re.I)),
+)
+EMPLOYMENT_SELECTOR = Selector("class", re.compile(r"type|tag|badge|chip|label|employment", re.I))
+# [data-job-id], .job-card, .job-listing, .job-item, [data-testid*='job-card'], .search-result, .stellenangebot
+JOB_CARD_SELECTORS = (
+    Selector("data-job-id", True),
+    css_class("job-card"),
+    css_class("job-listing"),
+    css_class("job-item"),
+    Selector("data-testid", re.compile(re.escape("job-card"))),
+    css_class("search-result"),
+    css_class("stellenangebot"),
+)
+INDEX_SELECTORS = (
+    *TITLE_SELECTORS,
+    *COMPANY_SELECTORS,
+    *LOCATION_SELECTORS,
+    *DESCRIPTION_SELECTORS,
+    EMPLOYMENT_SELECTOR,
+    *JOB_CARD_SELECTORS,
+)
+INDEX_TAG_NAMES = ("title", "h1", "article", "main")
+
+
+def index_page(soup: BeautifulSoup) -> DOMIndex:
+    """Collect the candidates of all generic strategies in one walk over *soup*."""
+    return DOMIndex(soup, INDEX_SELECTORS, INDEX_TAG_NAMES)
+
+
 def clean_text(text: str | None) -> str | None:
     """Clean extracted text: strip whitespace, normalize spaces, decode entities."""
     if not text:
@@ -56,12 +113,12 @@ def clean_company_from_title(company: str | None) -> str | None:
     return cleaned
 
 
-def extract_opengraph(soup: BeautifulSoup, result: dict) -> tuple[dict, bool]:
+def extract_opengraph(index: DOMIndex, result: dict) -> tuple[dict, bool]:
     """Extract data from OpenGraph meta tags. Returns (result, extracted)."""
     extracted = False
 
     if not result["title"]:
-        og_title = soup.find("meta", property="og:title")
+        og_title = index.meta_property("og:title")
         if isinstance(og_title, Tag):
             content = og_title.get("content")
             if content:
@@ -69,7 +126,7 @@ def extract_opengraph(soup: BeautifulSoup, result: dict) -> tuple[dict, bool]:
                 extracted = True
 
     if not result["description"]:
-        og_desc = soup.find("meta", property="og:description")
+        og_desc = index.meta_property("og:description")
         if isinstance(og_desc, Tag):
             content = og_desc.get("content")
             if content:
@@ -77,7 +134,7 @@ def extract_opengraph(soup: BeautifulSoup, result: dict) -> tuple[dict, bool]:
                 extracted = True
 
     if not result["company"]:
-        og_site = soup.find("meta", property="og:site_name")
+        og_site = index.meta_property("og:site_name")
         if isinstance(og_site, Tag):
             content = og_site.get("content")
             if content and str(content).strip().lower() not in JOB_BOARD_NAMES:
@@ -87,12 +144,12 @@ def extract_opengraph(soup: BeautifulSoup, result: dict) -> tuple[dict, bool]:
     return result, extracted
 
 
-def extract_meta_tags(soup: BeautifulSoup, result: dict) -> tuple[dict, bool]:
+def extract_meta_tags(index: DOMIndex, result: dict) -> tuple[dict, bool]:
     """Extract data from standard meta tags. Returns (result, extracted)."""
     extracted = False
 
     if not result["title"]:
-        meta_title = soup.find("meta", attrs={"name": "title"})
+        meta_title = index.meta_name("title")
         if isinstance(meta_title, Tag):
             content = meta_title.get("content")
             if content:
@@ -100,7 +157,7 @@ def extract_meta_tags(soup: BeautifulSoup, result: dict) -> tuple[dict, bool]:
                 extracted = True
 
     if not result["description"]:
-        meta_desc = soup.find("meta", attrs={"name": "description"})
+        meta_desc = index.meta_name("description")
         if isinstance(meta_desc, Tag):
             content = meta_desc.get("content")
             if content:
@@ -108,7 +165,7 @@ def extract_meta_tags(soup: BeautifulSoup, result: dict) -> tuple[dict, bool]:
                 extracted = True
 
     if not result["company"]:
-        meta_author = soup.find("meta", attrs={"name": "author"})
+        meta_author = index.meta_name("author")
         if isinstance(meta_author, Tag):
             content = meta_author.get("content")
             if content:
@@ -118,7 +175,7 @@ def extract_meta_tags(soup: BeautifulSoup, result: dict) -> tuple[dict, bool]:
     return result, extracted
 
 
-def extract_from_title_tag(soup: BeautifulSoup, result: dict) -> tuple[dict, bool]:
+def extract_from_title_tag(index: DOMIndex, result: dict) -> tuple[dict, bool]:
     """Extract job title and company from <title> tag.
 
     Common patterns:
@@ -130,7 +187,7 @@ def extract_from_title_tag(soup: BeautifulSoup, result: dict) -> tuple[dict, boo
     if result["title"] and result["company"]:
         return result, False
 
-    title_tag = soup.find("title")
+    title_tag = index.first_tag("title")
     if not title_tag:
         return result, False
 
@@ -192,20 +249,14 @@ def extract_from_title_tag(soup: BeautifulSoup, result: dict) -> tuple[dict, boo
     return result, extracted
 
 
-def extract_html_patterns(soup: BeautifulSoup, result: dict, url: str) -> tuple[dict, bool]:
+def extract_html_patterns(index: DOMIndex, result: dict, url: str) -> tuple[dict, bool]:
     """Extract data using common HTML patterns and selectors."""
     extracted = False
 
     # Job title selectors (in priority order)
     if not result["title"]:
-        title_selectors = [
-            {"attrs": {"data-testid": re.compile(r"job[-_]?title", re.I)}},
-            {"class_": re.compile(r"job[-_]?title|position[-_]?title|posting[-_]?title", re.I)},
-            {"attrs": {"itemprop": "title"}},
-            {"attrs": {"data-qa": re.compile(r"job[-_]?title", re.I)}},
-        ]
-        for selector in title_selectors:
-            elem = soup.find(**selector)
+        for selector in TITLE_SELECTORS:
+            elem = index.first(selector)
             if elem:
                 result["title"] = clean_text(elem.get_text())
                 extracted = True
@@ -213,15 +264,8 @@ def extract_html_patterns(soup: BeautifulSoup, result: dict, url: str) -> tuple[
 
     # Company name selectors
     if not result["company"]:
-        company_selectors = [
-            {"attrs": {"data-testid": re.compile(r"company[-_]?name|employer", re.I)}},
-            {"class_": re.compile(r"company[-_]?name|employer[-_]?name|hiring[-_]?company", re.I)},
-            {"attrs": {"itemprop": "hiringOrganization"}},
-            {"attrs": {"data-company": True}},
-            {"attrs": {"data-qa": re.compile(r"company", re.I)}},
-        ]
-        for selector in company_selectors:
-            elem = soup.find(**selector)
+        for selector in COMPANY_SELECTORS:
+            elem = index.first(selector)
             if elem:
                 name_elem = elem.find(attrs={"itemprop": "name"})
                 if name_elem:
@@ -233,14 +277,8 @@ def extract_html_patterns(soup: BeautifulSoup, result: dict, url: str) -> tuple[
 
     # Location selectors
     if not result["location"]:
-        location_selectors = [
-            {"attrs": {"data-testid": re.compile(r"job[-_]?location|location", re.I)}},
-            {"class_": re.compile(r"job[-_]?location|location|arbeitsort|standort", re.I)},
-            {"attrs": {"itemprop": "jobLocation"}},
-            {"attrs": {"data-location": True}},
-        ]
-        for selector in location_selectors:
-            elem = soup.find(**selector)
+        for selector in LOCATION_SELECTORS:
+            elem = index.first(selector)
             if elem:
                 addr_elem = elem.find(attrs={"itemprop": "address"})
                 if addr_elem:
@@ -252,14 +290,8 @@ def extract_html_patterns(soup: BeautifulSoup, result: dict, url: str) -> tuple[
 
     # Job description selectors
     if not result["description"]:
-        desc_selectors = [
-            {"attrs": {"data-testid": re.compile(r"job[-_]?description|description", re.I)}},
-            {"class_": re.compile(r"job[-_]?description|description[-_]?content|posting[-_]?description", re.I)},
-            {"attrs": {"itemprop": "description"}},
-            {"attrs": {"id": re.compile(r"job[-_]?description", re.I)}},
-        ]
-        for selector in desc_selectors:
-            elem = soup.find(**selector)
+        for selector in DESCRIPTION_SELECTORS:
+            elem = index.first(selector)
             if elem:
                 result["description"] = clean_text(elem.get_text(separator="\n"))
                 extracted = True
@@ -267,7 +299,7 @@ def extract_html_patterns(soup: BeautifulSoup, result: dict, url: str) -> tuple[
 
         if not result["description"]:
             for tag in ["article", "main"]:
-                elem = soup.find(tag)
+                elem = index.first_tag(tag)
                 if elem:
                     text = elem.get_text(separator="\n", strip=True)
                     if len(text) > 200:
@@ -297,7 +329,7 @@ def extract_html_patterns(soup: BeautifulSoup, result: dict, url: str) -> tuple[
             "werkstudent": "Werkstudent",
             "minijob": "Minijob",
         }
-        for elem in soup.find_all(class_=re.compile(r"type|tag|badge|chip|label|employment", re.I)):
+        for elem in index.all(EMPLOYMENT_SELECTOR):
             text = elem.get_text(strip=True).lower()
             for keyword, label in emp_keywords.items():
                 if keyword in text:
@@ -309,7 +341,7 @@ def extract_html_patterns(soup: BeautifulSoup, result: dict, url: str) -> tuple[
 
     # Contact email
     if not result["contact_email"]:
-        page_text = soup.get_text()
+        page_text = index.text
         email_pattern = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
         emails = email_pattern.findall(page_text)
         blocked_patterns = [
@@ -333,13 +365,13 @@ def extract_html_patterns(soup: BeautifulSoup, result: dict, url: str) -> tuple[
     return result, extracted
 
 
-def apply_heuristics(soup: BeautifulSoup, result: dict, url: str) -> tuple[dict, bool]:
+def apply_heuristics(index: DOMIndex, result: dict, url: str) -> tuple[dict, bool]:
     """Apply heuristic extraction as last resort."""
     used = False
 
     # First h1 as job title
     if not result["title"]:
-        h1 = soup.find("h1")
+        h1 = index.first_tag("h1")
         if h1:
             title_text = h1.get_text(strip=True)
             generic_headings = ["jobs", "karriere", "career", "stellenangebote", "home"]
@@ -382,7 +414,7 @@ def apply_heuristics(soup: BeautifulSoup, result: dict, url: str) -> tuple[dict,
 
     # Look for salary patterns in page text
     if not result["salary"]:
-        page_text = soup.get_text()
+        page_text = index.text
         salary_patterns = [
             r"(\d{1,3}(?:[.,]\d{3})*)\s*[-–bis]+\s*(\d{1,3}(?:[.,]\d{3})*)\s*(?:€|EUR|Euro)",
             r"(?:ab|from|starting)\s+(\d{1,3}(?:[.,]\d{3})*)\s*(?:€|EUR|Euro)",
@@ -398,7 +430,7 @@ def apply_heuristics(soup: BeautifulSoup, result: dict, url: str) -> tuple[dict,
     return result, used
 
 
-def is_search_results_page(soup: BeautifulSoup, url: str) -> bool:
+def is_search_results_page(index: DOMIndex, url: str) -> bool:
     """Detect if URL is a search results page rather than a single job posting."""
     indicators = 0
 
@@ -406,22 +438,10 @@ def is_search_results_page(soup: BeautifulSoup, url: str) -> bool:
     if any(pattern in url_lower for pattern in ["/search", "/jobs?", "/suche", "?q=", "&q=", "/results"]):
         indicators += 1
 
-    job_card_selectors = [
-        "[data-job-id]",
-        ".job-card",
-        ".job-listing",
-        ".job-item",
-        "[data-testid*='job-card']",
-        ".search-result",
-        ".stellenangebot",
-    ]
-    for selector in job_card_selectors:
-        cards = soup.select(selector)
-        if len(cards) > 3:
-            indicators += 1
-            break
+    if any(len(index.all(selector)) > 3 for selector in JOB_CARD_SELECTORS):
+        indicators += 1
 
-    page_text = soup.get_text()
+    page_text = index.text
     search_patterns = [
         r"aktuell\s+\d+\s+offen",
         r"\d+\s+jobs?\s+gefunden",
@@ -0,0 +1,154 @@
+"""Request coalescing ("singleflight") for identical in-flight calls.
+
+Concurrent callers with the same key wait on one leader call and share its result
+or exception instead of firing duplicate requests. Works across threads of a
+worker; an optional file-lock backend extends it across workers on one host, where
+followers in other processes pick the result up from the durable LLM cache.
+"""
+
+import copy
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from config import config
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+        self.waiters = 0
+
+
+class FileLockBackend:
+    """Cross-process exclusive locks via ``fcntl.flock`` on files under *lock_dir*.
+
+    Keys are hashed onto a fixed number of lock files so the directory stays bounded;
+    unrelated keys on the same stripe merely serialise across workers.
+    """
+
+    def __init__(self, lock_dir: str, stripes: int = 1024, poll_interval: float = 0.05):
+        self.lock_dir = lock_dir
+        self.stripes = stripes
+        self.poll_interval = poll_interval
+        os.makedirs(lock_dir, exist_ok=True)
+
+    @contextmanager
+    def lock(self, key: str, timeout: float) -> Iterator[bool]:
+        """Hold the lock for *key*; yields False (unlocked) if it was not acquired in time."""
+        stripe = int(hashlib.sha256(key.encode("utf-8")).hexdigest(), 16) % self.stripes
+        path = os.path.join(self.lock_dir, f"{stripe:04d}.lock")
+        deadline = time.monotonic() + timeout
+        with open(path, "a+") as handle:
+            acquired = False
+            while True:
+                try:
+                    fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    acquired = True
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        break
+                    time.sleep(self.poll_interval)
+            try:
+                yield acquired
+            finally:
+                if acquired:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key onto a single execution."""
+
+    def __init__(self, lock_backend: FileLockBackend | None = None):
+        self.lock_backend = lock_backend
+        self._calls: dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self._stats = {"leaders": 0, "coalesced": 0, "timeouts": 0}
+
+    def do(self, key: str, fn: Callable[[], Any], timeout: float = 120.0) -> Any:
+        """Run *fn* once for all concurrent callers of *key* and return its result.
+
+        Followers receive a deep copy of the leader's result, or re-raise its exception.
+        A follower that waits longer than *timeout* seconds raises ``TimeoutError``;
+        the leader itself is never interrupted.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = _Call()
+                self._calls[key] = call
+                self._stats["leaders"] += 1
+            else:
+                call.waiters += 1
+                self._stats["coalesced"] += 1
+
+        if not is_leader:
+            if not call.done.wait(timeout):
+                with self._lock:
+                    self._stats["timeouts"] += 1
+                logger.warning("Warten auf laufenden Aufruf abgebrochen nach %.1fs", timeout)
+                raise TimeoutError(f"Gemeinsamer Aufruf nicht innerhalb von {timeout}s abgeschlossen")
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        result = None
+        try:
+            if self.lock_backend is not None:
+                with self.lock_backend.lock(key, timeout):
+                    result = fn()
+            else:
+                result = fn()
+            return result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+                has_waiters = call.waiters > 0
+            if has_waiters and call.error is None:
+                # Snapshot before the leader's caller can mutate the returned object
+                call.result = copy.deepcopy(result)
+            call.done.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._calls)
+        return stats
+
+
+_singleflight: SingleFlight | None = None
+_singleflight_lock = threading.Lock()
+
+
+def get_llm_singleflight() -> SingleFlight:
+    """Return the process-wide coalescer for LLM calls (cross-worker if configured)."""
+    global _singleflight
+    if _singleflight is None:
+        with _singleflight_lock:
+            if _singleflight is None:
+                backend = None
+                if config.LLM_SINGLEFLIGHT_CROSS_WORKER and config.CACHE_DIR and fcntl is not None:
+                    backend = FileLockBackend(os.path.join(config.CACHE_DIR, "locks"))
+                _singleflight = SingleFlight(lock_backend=backend)
+    return _singleflight
@@ -27,6 +27,9 @@ class SkillExtractor:
         "zertifikate": "certifications",
     }
 
+    # Responses derive from the CV (personal data): memory tier only, for an hour
+    CACHE_TTL = 3600
+
     def __init__(self):
         self.client = AIClient()
 
@@ -43,6 +46,8 @@ class SkillExtractor:
                 max_tokens=2000,
                 temperature=0.2,
                 model=self.client.model,
+                cache_ttl=self.CACHE_TTL,
+                cache_durable=False,
             )
 
             skills = data.get("skills", [])
@@ -0,0 +1,154 @@
+"""Token frame batching and SSE throughput counters.
+
+Streamed Kimi output arrives as one callback per token. Emitting each as its own SSE
+event means a JSON dump, an event-log entry and a socket write per token; ``TokenBatcher``
+coalesces consecutive tokens of the same kind into frames instead. The frontend appends
+``text`` either way, so frames are wire-compatible with single-token events.
+"""
+
+import threading
+import time
+from collections.abc import Callable
+
+from config import config
+
+
+class TokenBatcher:
+    """Coalesce ``thinking``/``content`` tokens into frames before handing them to *emit*.
+
+    A frame is sent once it holds ``max_bytes`` of text or its oldest token is older than
+    ``window`` seconds, when the token kind changes, and before every other event, so
+    stage transitions never overtake buffered text. A flusher thread, started with the
+    first frame, sends frames whose window ran out while no further token arrived. Call
+    ``close()`` when the stream ends. A window of 0 forwards every token unbatched.
+    """
+
+    def __init__(self, emit: Callable[[dict], None], window: float | None = None, max_bytes: int | None = None):
+        self._emit = emit
+        self.window = config.SSE_TOKEN_BATCH_WINDOW_MS / 1000 if window is None else window
+        self.max_bytes = config.SSE_TOKEN_BATCH_MAX_BYTES if max_bytes is None else max_bytes
+        self._lock = threading.Condition()
+        self._kind: str | None = None
+        self._parts: list[str] = []
+        self._size = 0
+        self._started = 0.0
+        self._closed = False
+        self._flusher: threading.Thread | None = None
+
+    def token(self, kind: str, text: str) -> None:
+        if not text:
+            return
+        with self._lock:
+            if self.window <= 0:
+                _stats.record_frame(1)
+                self._emit({"type": kind, "text": text})
+                return
+            now = time.monotonic()
+            if self._kind != kind:
+                self._flush_locked()
+                self._kind = kind
+                self._started = now
+                self._start_flusher_locked()
+            self._parts.append(text)
+            self._size += len(text.encode("utf-8"))
+            if self._size >= self.max_bytes or now - self._started >= self.window:
+                self._flush_locked()
+
+    def emit(self, event: dict) -> None:
+        """Forward a non-token event (progress step, ``thinking_done``) after the pending frame."""
+        with self._lock:
+            self._flush_locked()
+            self._emit(event)
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def close(self) -> None:
+        """Send the pending frame and stop the flusher thread."""
+        with self._lock:
+            self._flush_locked()
+            self._closed = True
+            self._lock.notify()
+
+    def _start_flusher_locked(self) -> None:
+        if self._flusher is None and not self._closed:
+            self._flusher = threading.Thread(target=self._flush_when_due, name="sse-token-frames", daemon=True)
+            self._flusher.start()
+        else:
+            self._lock.notify()
+
+    def _flush_when_due(self) -> None:
+        with self._lock:
+            while not self._closed:
+                if not self._parts:
+                    self._lock.wait()
+                    continue
+                remaining = self._started + self.window - time.monotonic()
+                if remaining > 0:
+                    self._lock.wait(remaining)
+                else:
+                    self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._parts:
+            return
+        _stats.record_frame(len(self._parts))
+        event = {"type": self._kind, "text": "".join(self._parts)}
+        self._kind, self._parts, self._size = None, [], 0
+        self._emit(event)
+
+
+class _StreamStats:
+    """Per-process SSE counters; events per second over the last ``RATE_WINDOW`` seconds."""
+
+    RATE_WINDOW = 60
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.events_sent = 0
+        self.bytes_sent = 0
+        self.tokens = 0
+        self.token_frames = 0
+        self._buckets: dict[int, int] = {}
+
+    def record_frame(self, tokens: int) -> None:
+        with self._lock:
+            self.tokens += tokens
+            self.token_frames += 1
+
+    def record_sent(self, nbytes: int) -> None:
+        second = int(time.monotonic())
+        with self._lock:
+            self.events_sent += 1
+            self.bytes_sent += nbytes
+            self._buckets[second] = self._buckets.get(second, 0) + 1
+            if len(self._buckets) > self.RATE_WINDOW:
+                cutoff = second - self.RATE_WINDOW
+                self._buckets = {s: n for s, n in self._buckets.items() if s > cutoff}
+
+    def snapshot(self) -> dict:
+        cutoff = int(time.monotonic()) - self.RATE_WINDOW
+        with self._lock:
+            recent = sum(n for s, n in self._buckets.items() if s > cutoff)
+            return {
+                "events_sent": self.events_sent,
+                "bytes_sent": self.bytes_sent,
+                "events_per_second": round(recent / self.RATE_WINDOW, 2),
+                "tokens": self.tokens,
+                "token_frames": self.token_frames,
+                "tokens_per_frame": round(self.tokens / self.token_frames, 1) if self.token_frames else 0.0,
+            }
+
+
+_stats = _StreamStats()
+
+
+def record_sse_sent(nbytes: int) -> None:
+    """Count one SSE event of *nbytes* written to a client."""
+    _stats.record_sent(nbytes)
+
+
+def stream_stats() -> dict:
+    """Return SSE throughput and token batching counters for this process."""
+    return _stats.snapshot()
@@ -1,13 +1,16 @@
 import logging
 import os
 import re
+import time
 from typing import Any
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urlparse
 
-import cloudscraper
 import requests
-from bs4 import BeautifulSoup
 
+from config import config
+from services.fetch_strategy import CLOUDSCRAPER, DIRECT, SCRAPER_API, get_fetch_strategy
+from services.http_cache import get_http_cache
+from services.scraper_sessions import get_cloudscraper_pool
 from services.scrapers import (
     ArbeitsagenturParser,
     GenericJobParser,
@@ -17,6 +20,7 @@ from services.scrapers import (
     StepStoneParser,
     XingParser,
 )
+from services.scrapers.document import JobPostingScanner, ParsedPage
 
 # Re-export parser classes for backward compatibility
 __all__ = [
@@ -42,11 +46,16 @@ JOB_BOARD_PARSERS: list[type[JobBoardParser]] = [
 ]
 
 
+# Streamed page bodies are read in chunks of this size
+_CHUNK_BYTES = 16 * 1024
+
+
 class WebScraper:
     SCRAPER_API_BASE = "https://api.scraperapi.com"
 
-    def __init__(self, timeout: int = 15) -> None:
+    def __init__(self, timeout: int = 15, max_page_bytes: int | None = None) -> None:
         self.timeout = timeout
+        self.max_page_bytes = max_page_bytes or config.SCRAPER_MAX_PAGE_BYTES
         self.scraper_api_key = os.getenv("SCRAPER_API_KEY")
         self.session = requests.Session()
         self.session.headers.update(
@@ -58,87 +67,158 @@ class WebScraper:
             }
         )
 
-    def _fetch_via_scraper_api(self, url: str) -> requests.Response | None:
+    def _fetch_via_scraper_api(self, url: str, stop_at_job_posting: bool = False) -> requests.Response | None:
         """Fetch a page through ScraperAPI proxy. Returns None if not configured."""
         if not self.scraper_api_key:
             return None
         proxy_url = f"{self.SCRAPER_API_BASE}?api_key={self.scraper_api_key}&url={url}&country_code=de"
         try:
-            response = self.session.get(proxy_url, timeout=max(self.timeout, 30))
+            response = self.session.get(proxy_url, timeout=max(self.timeout, 30), stream=True)
             response.raise_for_status()
+            self._read_body(response, stop_at_job_posting)
             logger.info("ScraperAPI success for %s", urlparse(url).netloc)
             return response
         except Exception as e:
             logger.warning("ScraperAPI failed for %s: %s", urlparse(url).netloc, e)
             return None
 
-    def _fetch_page(self, url: str, headers: dict | None = None) -> requests.Response:
-        """Fetch a page with environment-aware fallback strategy.
+    def _fetch_page(
+        self, url: str, headers: dict | None = None, stop_at_job_posting: bool = False
+    ) -> requests.Response:
+        """Fetch a page through the shared HTTP cache (see services/http_cache.py).
+
+        Fresh entries are served without a request; stale ones with an ETag/Last-Modified
+        are revalidated with a conditional request, and a 304 serves the stored body.
+        With *stop_at_job_posting* the download may end at a usable JSON-LD JobPosting
+        (see ``_read_body``); such partial bodies are not cached.
+        """
+        cache = get_http_cache()
+        if cache is None:
+            return self._fetch_page_uncached(url, headers, stop_at_job_posting)
+
+        page = cache.get(url)
+        if page is not None and page.fresh:
+            logger.debug("HTTP-Cache-Treffer für %s", urlparse(url).netloc)
+            return page.to_response()
+
+        validators = page.validators() if page is not None else {}
+        request_headers = {**(headers or {}), **validators} if validators else headers
+        response = self._fetch_page_uncached(url, request_headers, stop_at_job_posting)
+        if response.status_code == 304 and page is not None:
+            cache.record("revalidated")
+            return cache.refresh(page).to_response()
+        cache.record("misses")
+        cache.put(url, response)
+        return response
+
+    def _default_chain(self) -> list[str]:
+        """Fetch methods in environment-aware default order.
 
         Production (datacenter IP): ScraperAPI -> cloudscraper -> direct (last resort)
         Development (residential IP): direct -> ScraperAPI -> cloudscraper
         """
-        is_production = os.getenv("FLASK_ENV") == "production"
+        if os.getenv("FLASK_ENV") == "production" and self.scraper_api_key:
+            return [SCRAPER_API, CLOUDSCRAPER, DIRECT]
+        if self.scraper_api_key:
+            return [DIRECT, SCRAPER_API, CLOUDSCRAPER]
+        return [DIRECT, CLOUDSCRAPER]
+
+    def _fetch_page_uncached(
+        self, url: str, headers: dict | None = None, stop_at_job_posting: bool = False
+    ) -> requests.Response:
+        """Fetch a page, trying the methods in the order learned for its host (see services/fetch_strategy.py).
+
+        Direct request errors other than connection problems, timeouts and 403 are final
+        (e.g. a 404 means the posting is gone). If every method fails, the direct
+        request's error is raised.
+        """
+        host = urlparse(url).netloc
+        strategy = get_fetch_strategy()
+        chain = self._default_chain()
+        if strategy is not None:
+            chain = strategy.order(host, chain)
+
+        direct_error: Exception | None = None
+        for attempt, method in enumerate(chain):
+            started = time.monotonic()
+            try:
+                response = self._fetch_with(method, url, headers, stop_at_job_posting)
+            except (requests.HTTPError, requests.ConnectionError, requests.Timeout) as e:
+                is_403 = isinstance(e, requests.HTTPError) and e.response is not None and e.response.status_code == 403
+                if not (is_403 or isinstance(e, requests.ConnectionError | requests.Timeout)):
+                    raise
+                if strategy is not None:
+                    strategy.record(host, method, False, time.monotonic() - started)
+                logger.info("Direct request to %s failed (%s)", host, type(e).__name__)
+                direct_error = e
+                continue
+            if strategy is not None:
+                strategy.record(host, method, response is not None, time.monotonic() - started, attempt == 0)
+            if response is not None:
+                return response
+
+        if direct_error is None:
+            raise requests.ConnectionError(f"Alle Abrufmethoden für {host} fehlgeschlagen")
+        raise direct_error
+
+    def _fetch_with(
+        self, method: str, url: str, headers: dict | None, stop_at_job_posting: bool = False
+    ) -> requests.Response | None:
+        """Run one fetch *method*; proxy methods return None on failure, direct requests raise."""
+        if method == SCRAPER_API:
+            return self._fetch_via_scraper_api(url, stop_at_job_posting)
+        if method == CLOUDSCRAPER:
+            return self._fetch_via_cloudscraper(url, stop_at_job_posting)
+        logger.info("Trying direct request for %s", urlparse(url).netloc)
+        response = self.session.get(url, timeout=self.timeout, headers=headers, stream=True)
+        response.raise_for_status()
+        return self._read_body(response, stop_at_job_posting)
 
-        if is_production and self.scraper_api_key:
-            return self._fetch_page_production(url, headers)
-        return self._fetch_page_dev(url, headers)
+    def _read_body(self, response: requests.Response, stop_at_job_posting: bool = False) -> requests.Response:
+        """Read a streamed body into ``response.content``, at most ``max_page_bytes``.
+
+        With *stop_at_job_posting* reading ends as soon as the body holds a usable JSON-LD
+        JobPosting. ``response.truncated`` tells callers what they got: None for the whole
+        body, ``"size_limit"`` or ``"job_posting"`` for a partial one.
+        """
+        scanner = JobPostingScanner() if stop_at_job_posting else None
+        chunks = response.iter_content(_CHUNK_BYTES) if response.raw is not None else [response.content]
+        body = bytearray()
+        truncated = None
+        try:
+            for chunk in chunks:
+                body += chunk
+                if len(body) > self.max_page_bytes:
+                    del body[self.max_page_bytes :]
+                    truncated = "size_limit"
+                    logger.warning(
+                        "Seite %s nach %d Bytes abgeschnitten", urlparse(response.url).netloc, self.max_page_bytes
+                    )
+                    break
+                if scanner is not None and scanner.scan(body):
+                    truncated = "job_posting"
+                    break
+        finally:
+            # Releases the connection; an unread remainder is discarded with it
+            response.close()
+        response._content = bytes(body)
+        response._content_consumed = True
+        response.truncated = truncated
+        return response
 
-    def _fetch_via_cloudscraper(self, url: str) -> requests.Response | None:
+    def _fetch_via_cloudscraper(self, url: str, stop_at_job_posting: bool = False) -> requests.Response | None:
         """Fetch a page using cloudscraper for anti-bot bypass. Returns None on failure."""
         logger.info("Trying cloudscraper for %s", urlparse(url).netloc)
         try:
-            scraper = cloudscraper.create_scraper(browser={"browser": "chrome", "platform": "linux"})
-            response = scraper.get(url, timeout=self.timeout)
-            response.raise_for_status()
+            # Pooled per host: the clearance cookies of a solved challenge are reused
+            with get_cloudscraper_pool().session(urlparse(url).netloc) as scraper:
+                response = scraper.get(url, timeout=self.timeout, stream=True)
+                response.raise_for_status()
+                self._read_body(response, stop_at_job_posting)
             return response
         except Exception:
             return None
 
-    def _fetch_page_production(self, url: str, headers: dict | None = None) -> requests.Response:
-        """Production: ScraperAPI first (datacenter IP gets blocked by job boards)."""
-        # Attempt 1: ScraperAPI (residential IP rotation)
-        api_response = self._fetch_via_scraper_api(url)
-        if api_response is not None:
-            return api_response
-
-        # Attempt 2: cloudscraper (anti-bot bypass)
-        cs_response = self._fetch_via_cloudscraper(url)
-        if cs_response is not None:
-            return cs_response
-
-        # Attempt 3: Direct request (last resort)
-        logger.info("Trying direct request for %s", urlparse(url).netloc)
-        response = self.session.get(url, timeout=self.timeout, headers=headers)
-        response.raise_for_status()
-        return response
-
-    def _fetch_page_dev(self, url: str, headers: dict | None = None) -> requests.Response:
-        """Development: direct request first (residential IP usually works)."""
-        # Attempt 1: Direct request
-        try:
-            response = self.session.get(url, timeout=self.timeout, headers=headers)
-            response.raise_for_status()
-            return response
-        except (requests.HTTPError, requests.ConnectionError, requests.Timeout) as e:
-            is_403 = isinstance(e, requests.HTTPError) and e.response is not None and e.response.status_code == 403
-            is_retriable = isinstance(e, requests.ConnectionError | requests.Timeout) or is_403
-            if not is_retriable:
-                raise
-            logger.info("Direct request to %s failed (%s)", urlparse(url).netloc, type(e).__name__)
-
-            # Attempt 2: ScraperAPI (residential IP rotation)
-            api_response = self._fetch_via_scraper_api(url)
-            if api_response is not None:
-                return api_response
-
-            # Attempt 3: cloudscraper (anti-bot bypass)
-            cs_response = self._fetch_via_cloudscraper(url)
-            if cs_response is not None:
-                return cs_response
-
-            raise e from None  # Re-raise the original error if all attempts fail
-
     @staticmethod
     def _make_http_error(e: requests.HTTPError) -> Exception:
         """Convert HTTPError to user-friendly German error message."""
@@ -185,53 +265,13 @@ class WebScraper:
         url = self._normalize_arbeitsagentur_url(url)
         try:
             response = self._fetch_page(url)
-            response.encoding = response.apparent_encoding
-
-            soup = BeautifulSoup(response.text, "html.parser")
-
-            # Entferne Script/Style Tags
-            for script in soup(["script", "style", "nav", "header", "footer"]):
-                script.decompose()
-
-            # Extrahiere Text
-            text = soup.get_text(separator="\n", strip=True)
-
-            # Bereinige Text (mehrfache Leerzeilen)
-            lines = [line.strip() for line in text.splitlines() if line.strip()]
-            clean_text = "\n".join(lines)
-
-            # Extrahiere alle Links
-            all_links = []
-            email_links = []
-            application_links = []
-
-            for link in soup.find_all("a", href=True):
-                href = link["href"]
-                link_text = link.get_text(strip=True)
-
-                # Absolute URL
-                absolute_url = urljoin(url, href)
-
-                all_links.append({"url": absolute_url, "text": link_text})
-
-                # Email Links
-                if href.startswith("mailto:"):
-                    email = href.replace("mailto:", "").split("?")[0]
-                    email_links.append({"email": email, "text": link_text})
-
-                # Bewerbungs-Links (Heuristik)
-                if any(
-                    keyword in href.lower() or keyword in link_text.lower()
-                    for keyword in ["bewerbung", "apply", "application", "bewerben", "job", "karriere"]
-                ):
-                    application_links.append({"url": absolute_url, "text": link_text})
+            page = ParsedPage.from_response(response, url)
 
             return {
-                "text": clean_text,
-                "all_links": all_links,
-                "email_links": email_links,
-                "application_links": application_links,
+                "text": page.text,
+                **page.links,
                 "source_url": url,
+                "truncated": getattr(response, "truncated", None),
             }
 
         except requests.HTTPError as e:
@@ -253,7 +293,9 @@ class WebScraper:
         company = domain.split(".")[0]
         return company.capitalize()
 
-    def fetch_structured_job_posting(self, url: str, _follow_external: bool = True) -> dict[str, Any]:
+    def fetch_structured_job_posting(
+        self, url: str, _follow_external: bool = True, stop_at_job_posting: bool = False
+    ) -> dict[str, Any]:
         """
         Fetched und parst eine Stellenanzeige mit job-board-spezifischem Parser.
 
@@ -276,6 +318,11 @@ class WebScraper:
             - salary: Gehalt (falls angegeben)
             - text: Volltext der Seite (für Kompatibilität)
             - all_links, email_links, application_links: Extrahierte Links
+            - truncated: None bei vollständiger Seite, sonst "size_limit" oder "job_posting"
+
+        Mit ``stop_at_job_posting`` endet der Download, sobald ein JSON-LD JobPosting mit
+        Titel und Beschreibung gelesen wurde (nur für Aufrufer, denen die strukturierten
+        Felder genügen; ``text`` und Links decken dann nur den gelesenen Teil ab).
         """
         url = self._normalize_arbeitsagentur_url(url)
         try:
@@ -286,56 +333,28 @@ class WebScraper:
                     request_headers = parser_class.HEADERS
                     break
 
-            response = self._fetch_page(url, headers=request_headers)
-            response.encoding = response.apparent_encoding
-
-            # Parse HTML - keep original soup for structured parsing
-            soup_for_parsing = BeautifulSoup(response.text, "html.parser")
+            board_parser = next((p for p in JOB_BOARD_PARSERS if p.matches_url(url)), None)
+            if board_parser is not None and not board_parser.STOP_AT_JSON_LD:
+                stop_at_job_posting = False
+            response = self._fetch_page(url, headers=request_headers, stop_at_job_posting=stop_at_job_posting)
+            # One tree serves the board parser as well as the text and link extraction
+            page = ParsedPage.from_response(response, url)
 
             # Try job-board-specific parser first
             structured_data = None
             for parser_class in JOB_BOARD_PARSERS:
                 if parser_class.matches_url(url):
                     parser = parser_class()
-                    structured_data = parser.parse(soup_for_parsing, url)
+                    structured_data = parser.parse(page.soup, url)
                     break
 
             # Fallback to generic parser if no specific parser matched
             if not structured_data:
                 generic_parser = GenericJobParser()
-                structured_data = generic_parser.parse(soup_for_parsing, url)
-
-            # Create clean soup for text extraction (removes scripts etc.)
-            soup_for_text = BeautifulSoup(response.text, "html.parser")
-            for script in soup_for_text(["script", "style", "nav", "header", "footer"]):
-                script.decompose()
-
-            # Extract clean text
-            text = soup_for_text.get_text(separator="\n", strip=True)
-            lines = [line.strip() for line in text.splitlines() if line.strip()]
-            clean_text = "\n".join(lines)
-
-            # Extract links from clean soup
-            all_links = []
-            email_links = []
-            application_links = []
-
-            for link in soup_for_text.find_all("a", href=True):
-                href = link["href"]
-                link_text = link.get_text(strip=True)
-                absolute_url = urljoin(url, href)
-
-                all_links.append({"url": absolute_url, "text": link_text})
-
-                if href.startswith("mailto:"):
-                    email = href.replace("mailto:", "").split("?")[0]
-                    email_links.append({"email": email, "text": link_text})
+                structured_data = generic_parser.parse(page.soup, url)
 
-                if any(
-                    keyword in href.lower() or keyword in link_text.lower()
-                    for keyword in ["bewerbung", "apply", "application", "bewerben", "job", "karriere"]
-                ):
-                    application_links.append({"url": absolute_url, "text": link_text})
+            links = page.links
+            email_links = links["email_links"]
 
             # Build result combining structured data with generic data
             result = {
@@ -353,11 +372,10 @@ class WebScraper:
                 "application_deadline": None,
                 "employment_type": None,
                 "salary": None,
-                "text": clean_text,
-                "all_links": all_links,
-                "email_links": email_links,
-                "application_links": application_links,
+                "text": page.text,
+                **links,
                 "source_url": url,
+                "truncated": getattr(response, "truncated", None),
             }
 
             # Merge structured data if available
@@ -3,6 +3,7 @@ Pytest fixtures for obojobs backend tests.
 """
 
 import os
+import tempfile
 
 import pytest
 
@@ -13,6 +14,18 @@ os.environ["SECRET_KEY"] = "test-secret-key"
 os.environ["JWT_SECRET_KEY"] = "test-jwt-secret-key"
 os.environ["MAIL_USERNAME"] = ""
 os.environ["MAIL_PASSWORD"] = ""
+os.environ["LLM_CACHE_ENABLED"] = "false"
+os.environ["HTTP_CACHE_ENABLED"] = "false"
+os.environ["FETCH_STRATEGY_ENABLED"] = "false"
+os.environ["BA_SEARCH_CACHE_ENABLED"] = "false"
+os.environ["POSTING_INDEX_ENABLED"] = "false"
+os.environ["CACHE_DIR"] = ""
+# Keep uploaded/generated files out of the repository's uploads/ directory
+os.environ["UPLOAD_FOLDER"] = tempfile.mkdtemp(prefix="obojobs-test-uploads-")
+os.environ["LLM_CIRCUIT_BREAKER_ENABLED"] = "false"
+os.environ["LLM_RETRY_BUDGET_ENABLED"] = "false"
+# Tests mock generate_anschreiben/generate_email_body; combined mode is covered in test_combined_generation.py
+os.environ["LLM_COMBINED_EMAIL_ENABLED"] = "false"
 
 from app import create_app
 from models import User, db
@@ -228,6 +228,22 @@ class TestAdminStats:
         assert data["signups_last_7_days"] == 1
 
 
+class TestAdminMetrics:
+    """Test GET /api/admin/metrics."""
+
+    def test_non_admin_returns_403(self, client, auth_headers):
+        response = client.get("/api/admin/metrics", headers=auth_headers)
+        assert response.status_code == 403
+
+    def test_metrics_shape(self, client, admin_headers):
+        response = client.get("/api/admin/metrics", headers=admin_headers)
+        assert response.status_code == 200
+        data = response.get_json()
+        assert "pid" in data
+        assert "ai_transports" in data
+        assert data["llm_cache"] is None  # disabled in tests
+
+
 class TestAdminUsers:
     """Test GET /api/admin/users."""
 
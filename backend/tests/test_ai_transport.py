@@ -0,0 +1,87 @@
+"""Tests for the process-wide pooled LLM HTTP transports."""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+
+from services import ai_transport
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def clean_transports():
+    ai_transport.close_transports()
+    yield
+    ai_transport.close_transports()
+
+
+class TestGetHttpClient:
+    def test_same_client_per_provider(self):
+        first = ai_transport.get_http_client("openrouter", timeout=5)
+        assert ai_transport.get_http_client("openrouter", timeout=5) is first
+        assert ai_transport.get_http_client("fireworks", timeout=5) is not first
+
+    def test_rebuilt_after_fork(self):
+        parent_client = ai_transport.get_http_client("openrouter", timeout=5)
+        with patch("services.ai_transport.os.getpid", return_value=-1):
+            child_client = ai_transport.get_http_client("openrouter", timeout=5)
+        assert child_client is not parent_client
+        assert not parent_client.is_closed
+
+    def test_rebuilt_when_closed(self):
+        client = ai_transport.get_http_client("openrouter", timeout=5)
+        client.close()
+        assert ai_transport.get_http_client("openrouter", timeout=5) is not client
+
+    def test_ai_clients_share_transport(self):
+        with (
+            patch("services.ai_client.OpenAI") as mock_openai,
+            patch("services.ai_client.config") as mock_config,
+        ):
+            mock_config.OPENROUTER_API_KEY = "key"
+            mock_config.FIREWORKS_API_KEY = "key"
+            from services.ai_client import AIClient
+
+            AIClient()
+            AIClient()
+
+        http_clients = [call.kwargs["http_client"] for call in mock_openai.call_args_list]
+        assert http_clients[0] is http_clients[2]
+        assert http_clients[1] is http_clients[3]
+
+
+class TestTransportStats:
+    def test_keep_alive_connections_are_reused(self, local_server):
+        client = ai_transport.get_http_client("openrouter", timeout=5)
+        for _ in range(3):
+            assert client.get(local_server).status_code == 200
+
+        stats = ai_transport.transport_stats()["openrouter"]
+        assert stats["requests"] == 3
+        assert stats["new_connections"] == 1
+        assert stats["reused_connections"] == 2
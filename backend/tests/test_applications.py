@@ -270,6 +270,26 @@ class TestQuickExtract:
         assert data["data"]["title"] == "Python Developer"
         assert data["data"]["portal"] == "StepStone"
 
+    @patch("routes.applications.scraping.WebScraper")
+    def test_success_includes_industry_classification(self, mock_scraper_class, client, auth_headers):
+        mock_scraper = MagicMock()
+        mock_scraper.detect_job_board.return_value = "stepstone"
+        mock_scraper.fetch_structured_job_posting.return_value = {
+            "company": "Test GmbH",
+            "title": "Python Developer",
+            "description": "Python Entwickler für Backend und Cloud (Docker, Kubernetes). Junges Startup.",
+        }
+        mock_scraper_class.return_value = mock_scraper
+
+        response = client.post(
+            "/api/applications/quick-extract",
+            json={"url": "https://www.stepstone.de/job/123"},
+            headers=auth_headers,
+        )
+        data = response.get_json()["data"]
+        assert data["branche"] == "it_software"
+        assert data["unternehmensgroesse"] == "kmu"
+
     @patch("routes.applications.scraping.WebScraper")
     def test_empty_extraction(self, mock_scraper_class, client, auth_headers):
         mock_scraper = MagicMock()
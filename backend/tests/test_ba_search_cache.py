@@ -0,0 +1,198 @@
+"""Tests for the shared Bundesagentur search result cache."""
+
+import copy
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from services.ba_search_cache import BASearchCache, search_cache_key
+from services.bundesagentur_client import BundesagenturClient
+from services.local_store import SQLiteKVStore
+
+RESPONSE = {
+    "maxErgebnisse": 1,
+    "stellenangebote": [
+        {"refnr": "10000-1", "titel": "Python Entwickler", "arbeitgeber": "Test GmbH", "arbeitsort": {"ort": "Berlin"}}
+    ],
+}
+
+
+def _wait_for(condition, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Bedingung nicht erfüllt"
+        time.sleep(0.01)
+
+
+class TestSearchCacheKey:
+    def test_keyword_and_location_are_normalized(self):
+        a = search_cache_key({"was": "Python  Entwickler", "wo": "Berlin ", "umkreis": 50, "page": 1})
+        b = search_cache_key({"page": 1, "umkreis": 50, "wo": "berlin", "was": "python entwickler"})
+
+        assert a == b
+
+    def test_radius_is_ignored_without_location(self):
+        assert search_cache_key({"was": "python", "umkreis": 50}) == search_cache_key({"was": "python"})
+
+    def test_paging_and_filters_are_part_of_the_key(self):
+        base = {"was": "python", "wo": "berlin", "umkreis": 50, "page": 1, "size": 25}
+
+        assert search_cache_key(base) != search_cache_key({**base, "page": 2})
+        assert search_cache_key(base) != search_cache_key({**base, "umkreis": 25})
+        assert search_cache_key(base) != search_cache_key({**base, "arbeitszeit": "vz"})
+
+
+class TestBASearchCache:
+    def test_fresh_entry_is_served_without_loader(self):
+        cache = BASearchCache(ttl=60, stale_ttl=60)
+        loader = MagicMock(return_value=RESPONSE)
+
+        assert cache.fetch("k", loader) == RESPONSE
+        assert cache.fetch("k", loader) == RESPONSE
+        assert loader.call_count == 1
+        assert cache.stats()["hit_rate"] == 0.5
+
+    def test_hits_are_independent_copies(self):
+        cache = BASearchCache(ttl=60, stale_ttl=60)
+        cache.fetch("k", lambda: copy.deepcopy(RESPONSE))["stellenangebote"].clear()
+
+        assert cache.fetch("k", dict)["stellenangebote"] == RESPONSE["stellenangebote"]
+
+    def test_errors_are_not_cached(self):
+        cache = BASearchCache(ttl=60, stale_ttl=60)
+
+        with pytest.raises(requests.ConnectionError):
+            cache.fetch("k", MagicMock(side_effect=requests.ConnectionError("weg")))
+        assert cache.fetch("k", lambda: RESPONSE) == RESPONSE
+        assert cache.stats()["misses"] == 2
+
+    def test_stale_entry_is_served_and_refreshed_once(self):
+        cache = BASearchCache(ttl=0, stale_ttl=60)
+        cache.put("k", {"maxErgebnisse": 0, "stellenangebote": []})
+        release = threading.Event()
+        calls = []
+
+        def loader():
+            calls.append(1)
+            release.wait(2)
+            return RESPONSE
+
+        assert cache.fetch("k", loader)["maxErgebnisse"] == 0
+        assert cache.fetch("k", loader)["maxErgebnisse"] == 0
+        release.set()
+        _wait_for(lambda: cache.stats()["refreshing"] == 0)
+
+        assert len(calls) == 1
+        assert cache.stats()["stale_hits"] == 2
+        assert cache.stats()["writes"] == 2
+
+    def test_failed_refresh_keeps_stale_entry(self):
+        cache = BASearchCache(ttl=0, stale_ttl=60)
+        cache.put("k", RESPONSE)
+
+        assert cache.fetch("k", MagicMock(side_effect=requests.Timeout())) == RESPONSE
+        _wait_for(lambda: cache.stats()["refresh_failures"] == 1)
+        assert cache.fetch("k", dict) == RESPONSE
+
+    def test_entries_past_stale_window_are_reloaded(self):
+        cache = BASearchCache(ttl=0, stale_ttl=0)
+        cache.put("k", {"maxErgebnisse": 0, "stellenangebote": []})
+
+        assert cache.fetch("k", lambda: RESPONSE) == RESPONSE
+        assert cache.stats()["misses"] == 1
+
+    def test_concurrent_misses_share_one_request(self):
+        cache = BASearchCache(ttl=60, stale_ttl=60)
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def loader():
+            calls.append(1)
+            started.set()
+            release.wait(2)
+            return RESPONSE
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.fetch("k", loader))) for _ in range(4)]
+        threads[0].start()
+        started.wait(2)
+        for thread in threads[1:]:
+            thread.start()
+        _wait_for(lambda: cache.stats()["misses"] == 4)
+        release.set()
+        for thread in threads:
+            thread.join(2)
+
+        assert len(calls) == 1
+        assert results == [RESPONSE] * 4
+
+    def test_memory_tier_evicts_least_recently_used(self):
+        cache = BASearchCache(ttl=60, stale_ttl=60, memory_max_entries=2)
+        for key in ("a", "b", "c"):
+            cache.put(key, RESPONSE)
+
+        assert cache.stats()["memory_entries"] == 2
+        assert cache.fetch("a", lambda: {"maxErgebnisse": 0}) == {"maxErgebnisse": 0}
+
+    def test_store_tier_is_shared_between_processes(self, tmp_path):
+        path = str(tmp_path / "ba.sqlite3")
+        BASearchCache(ttl=60, stale_ttl=60, store=SQLiteKVStore(path, table="ba_searches")).put("k", RESPONSE)
+
+        other = BASearchCache(ttl=60, stale_ttl=60, store=SQLiteKVStore(path, table="ba_searches"))
+        loader = MagicMock()
+
+        assert other.fetch("k", loader) == RESPONSE
+        loader.assert_not_called()
+        assert other.stats()["store_hits"] == 1
+
+    def test_corrupt_store_entry_is_a_miss(self, tmp_path):
+        store = SQLiteKVStore(str(tmp_path / "ba.sqlite3"), table="ba_searches")
+        store.set("k", b"kaputt", ttl=60)
+
+        assert BASearchCache(ttl=60, stale_ttl=60, store=store).fetch("k", lambda: RESPONSE) == RESPONSE
+
+
+class TestClientCaching:
+    def _session(self):
+        session = MagicMock()
+        session.get.return_value.json.return_value = RESPONSE
+        return session
+
+    def test_same_search_of_different_users_hits_api_once(self):
+        session = self._session()
+        cache = BASearchCache(ttl=60, stale_ttl=60)
+
+        with patch("services.bundesagentur_client.get_ba_search_cache", return_value=cache):
+            first, total = BundesagenturClient(session=session).search_jobs("Python", location="Berlin")
+            second, _ = BundesagenturClient(session=session).search_jobs("python ", location="berlin")
+
+        assert session.get.call_count == 1
+        assert total == 1
+        assert [job.refnr for job in second] == [job.refnr for job in first] == ["10000-1"]
+
+    def test_api_errors_are_not_cached(self):
+        session = self._session()
+        session.get.return_value.raise_for_status.side_effect = [requests.HTTPError("503"), None]
+        cache = BASearchCache(ttl=60, stale_ttl=60)
+
+        with patch("services.bundesagentur_client.get_ba_search_cache", return_value=cache):
+            client = BundesagenturClient(session=session)
+            assert client.search_jobs("Python") == ([], 0)
+            jobs, total = client.search_jobs("Python")
+
+        assert total == 1
+        assert session.get.call_count == 2
+
+    def test_disabled_cache_requests_every_time(self):
+        session = self._session()
+
+        with patch("services.bundesagentur_client.get_ba_search_cache", return_value=None):
+            client = BundesagenturClient(session=session)
+            client.search_jobs("Python")
+            client.search_jobs("Python")
+
+        assert session.get.call_count == 2
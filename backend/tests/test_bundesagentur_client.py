@@ -3,7 +3,7 @@
 import warnings
 from unittest.mock import MagicMock, patch
 
-from services.bundesagentur_client import BundesagenturClient, BundesagenturJob
+from services.bundesagentur_client import BundesagenturClient, BundesagenturJob, get_ba_session
 
 
 class TestBundesagenturJob:
@@ -143,3 +143,36 @@ class TestBundesagenturClient:
     def test_parse_arbeitsort_none(self):
         result = self.client._parse_arbeitsort(None)
         assert result == ""
+
+
+class TestSharedSession:
+    def test_clients_share_one_pooled_session(self):
+        first, second = BundesagenturClient(), BundesagenturClient()
+
+        assert first.session is second.session is get_ba_session()
+        assert first.session.headers["X-API-Key"] == BundesagenturClient.API_KEY
+
+    def test_pool_blocks_at_connection_cap(self):
+        with (
+            patch("services.bundesagentur_client._session", None),
+            patch("services.bundesagentur_client.config.BA_MAX_CONNECTIONS", 3),
+        ):
+            adapter = get_ba_session().get_adapter(BundesagenturClient.BASE_URL)
+
+        assert adapter._pool_maxsize == 3
+        assert adapter._pool_block is True
+
+    def test_session_is_rebuilt_after_fork(self):
+        session = get_ba_session()
+        with patch("services.bundesagentur_client._owner_pid", -1):
+            assert get_ba_session() is not session
+
+    @patch("services.bundesagentur_client.requests.Session.get")
+    def test_search_uses_per_query_timeout(self, mock_get):
+        mock_get.return_value.json.return_value = {"maxErgebnisse": 0, "stellenangebote": []}
+
+        BundesagenturClient().search_jobs("Python", timeout=4)
+        BundesagenturClient().search_jobs("Python")
+
+        assert mock_get.call_args_list[0].kwargs["timeout"] == 4
+        assert mock_get.call_args_list[1].kwargs["timeout"] == 15
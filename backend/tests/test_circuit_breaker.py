@@ -0,0 +1,161 @@
+"""Tests for provider circuit breakers and the retry budget."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from services.retry import RetryBudget, retry_with_backoff
+
+
+class TestCircuitBreaker:
+    def test_opens_on_error_rate(self):
+        breaker = CircuitBreaker("test", min_calls=4, error_rate_threshold=0.5)
+        breaker.record_success(0.1)
+        breaker.record_success(0.1)
+        breaker.record_failure(0.1)
+        breaker.record_failure(0.1)
+
+        assert breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        assert breaker.stats()["rejected"] == 1
+
+    def test_opens_on_slow_calls(self):
+        breaker = CircuitBreaker("test", min_calls=3, slow_call_seconds=1.0, slow_rate_threshold=0.6)
+        for _ in range(3):
+            breaker.record_success(5.0)
+        assert breaker.state == CircuitBreaker.OPEN
+
+    def test_stays_closed_below_min_calls(self):
+        breaker = CircuitBreaker("test", min_calls=5)
+        for _ in range(4):
+            breaker.record_failure(0.1)
+        assert breaker.state == CircuitBreaker.CLOSED
+        breaker.before_call()
+
+    def test_half_open_probe_closes_circuit(self):
+        breaker = CircuitBreaker("test", min_calls=1, open_seconds=0)
+        breaker.record_failure(0.1)
+        assert breaker.state == CircuitBreaker.OPEN
+
+        breaker.before_call()  # probe allowed
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        breaker.record_success(0.1)
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_allows_single_probe(self):
+        breaker = CircuitBreaker("test", min_calls=1, open_seconds=0.05)
+        breaker.record_failure(0.1)
+        with patch("services.circuit_breaker.time.monotonic", return_value=breaker._opened_at + 0.06):
+            breaker.before_call()
+            with pytest.raises(CircuitOpenError):
+                breaker.before_call()
+
+    def test_failed_probe_reopens(self):
+        breaker = CircuitBreaker("test", min_calls=1, open_seconds=0)
+        breaker.record_failure(0.1)
+        breaker.before_call()
+        breaker.record_failure(0.1)
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.stats()["opened"] == 2
+
+
+class TestRetryBudget:
+    def test_budget_limits_retries(self):
+        budget = RetryBudget(ratio=0.0, min_retries=1)
+        assert budget.try_acquire_retry()
+        assert not budget.try_acquire_retry()
+        assert budget.stats()["exhausted"] == 1
+
+    def test_budget_grows_with_traffic(self):
+        budget = RetryBudget(ratio=0.5, min_retries=0)
+        for _ in range(4):
+            budget.record_attempt()
+        assert budget.try_acquire_retry()
+        assert budget.try_acquire_retry()
+        assert not budget.try_acquire_retry()
+
+    def test_disabled_budget_always_allows(self):
+        budget = RetryBudget(ratio=0.0, min_retries=0, enabled=False)
+        assert budget.try_acquire_retry()
+
+    @patch("services.retry.time.sleep")
+    def test_exhausted_budget_stops_retrying(self, mock_sleep):
+        func = MagicMock(side_effect=RuntimeError("down"))
+        func.__name__ = "func"
+        wrapped = retry_with_backoff(max_attempts=3, budget=RetryBudget(ratio=0.0, min_retries=0))(func)
+
+        with pytest.raises(RuntimeError):
+            wrapped()
+        assert func.call_count == 1
+        mock_sleep.assert_not_called()
+
+    @patch("services.retry.time.sleep")
+    def test_non_retryable_is_raised_immediately(self, mock_sleep):
+        func = MagicMock(side_effect=CircuitOpenError("openrouter", 10))
+        func.__name__ = "func"
+        wrapped = retry_with_backoff(max_attempts=3, non_retryable=(CircuitOpenError,))(func)
+
+        with pytest.raises(CircuitOpenError):
+            wrapped()
+        assert func.call_count == 1
+        mock_sleep.assert_not_called()
+
+
+class TestAIClientBreaker:
+    def _client(self):
+        with (
+            patch("services.ai_client.OpenAI"),
+            patch("services.ai_client.config") as mock_config,
+        ):
+            mock_config.OPENROUTER_API_KEY = "key"
+            mock_config.FIREWORKS_API_KEY = "key"
+            from services.ai_client import AIClient
+
+            return AIClient()
+
+    def test_open_circuit_fails_fast_without_provider_call(self):
+        client = self._client()
+        breaker = CircuitBreaker("openrouter", min_calls=1)
+        breaker.record_failure(0.1)
+
+        with patch("services.ai_client.get_breaker", return_value=breaker), patch("services.retry.time.sleep"):
+            with pytest.raises(CircuitOpenError):
+                client._call_api_with_retry([{"role": "user", "content": "x"}], max_tokens=10, temperature=0.1)
+        client.client.chat.completions.create.assert_not_called()
+
+    def test_extraction_falls_back_to_defaults_when_open(self):
+        client = self._client()
+        breaker = CircuitBreaker("openrouter", min_calls=1)
+        breaker.record_failure(0.1)
+
+        with patch("services.ai_client.get_breaker", return_value=breaker):
+            details = client.extract_bewerbung_details("Stellenanzeige", "Firma GmbH")
+
+        assert details["firma"] == "Firma GmbH"
+        assert details["warnings"]
+
+    def test_stream_records_failure(self):
+        client = self._client()
+        client.kimi_client.chat.completions.create.side_effect = RuntimeError("fireworks down")
+        breaker = CircuitBreaker("fireworks", min_calls=1)
+
+        with patch("services.ai_streaming.get_breaker", return_value=breaker):
+            with pytest.raises(RuntimeError):
+                client.generate_anschreiben_stream(
+                    cv_text="CV",
+                    stellenanzeige_text="Job",
+                    firma_name="Firma",
+                    position="Dev",
+                    ansprechpartner="Sehr geehrte Damen und Herren",
+                )
+            with pytest.raises(CircuitOpenError):
+                client.generate_anschreiben_stream(
+                    cv_text="CV",
+                    stellenanzeige_text="Job",
+                    firma_name="Firma",
+                    position="Dev",
+                    ansprechpartner="Sehr geehrte Damen und Herren",
+                )
+        assert client.kimi_client.chat.completions.create.call_count == 1
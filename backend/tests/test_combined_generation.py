@@ -0,0 +1,233 @@
+"""Tests for single-call letter + email body generation."""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from services.anschreiben_text import EmailSectionFilter, split_letter_and_email
+from services.output_validator import OutputValidator
+from services.prompts import EMAIL_SECTION_MARKER, build_anschreiben_messages
+
+LETTER = "Sehr geehrte Frau Schmidt,\n\nIch bringe drei Jahre Python mit.\n\nViele Grüße\nMax Mustermann"
+EMAIL = (
+    "Sehr geehrte Frau Schmidt,\n\nanbei sende ich Ihnen meine Bewerbung als Python Developer bei der Test GmbH. "
+    "Im Anhang finden Sie mein Anschreiben und meinen Lebenslauf. Über die Gelegenheit zu einem persönlichen "
+    "Gespräch würde ich mich freuen.\n\nMit freundlichen Grüßen"
+)
+COMBINED = f"{LETTER}\n\n{EMAIL_SECTION_MARKER}\n{EMAIL}"
+
+LETTER_KWARGS = {
+    "cv_text": "CV",
+    "stellenanzeige_text": "Job",
+    "firma_name": "Test GmbH",
+    "position": "Python Developer",
+    "ansprechpartner": "Sehr geehrte Frau Schmidt",
+}
+
+
+def _chunk(content):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content, reasoning_content=None))])
+
+
+class TestSplitLetterAndEmail:
+    def test_splits_sections(self):
+        letter, email = split_letter_and_email(COMBINED)
+        assert letter == LETTER
+        assert email == EMAIL
+
+    def test_missing_marker_keeps_letter(self):
+        assert split_letter_and_email(LETTER) == (LETTER, None)
+
+    def test_empty_email_section(self):
+        assert split_letter_and_email(f"{LETTER}\n{EMAIL_SECTION_MARKER}\n") == (LETTER, None)
+
+    def test_tolerates_marker_variants_and_strips_signature(self):
+        text = f"{LETTER}\n\n**== E-Mail ==**\n{EMAIL}\nMax Mustermann"
+        letter, email = split_letter_and_email(text)
+        assert letter == LETTER
+        assert email == EMAIL
+
+
+class TestEmailSectionFilter:
+    @pytest.mark.parametrize("chunk_size", [1, 3, 7, 1000])
+    def test_forwards_only_letter(self, chunk_size):
+        received = []
+        stream_filter = EmailSectionFilter(received.append)
+        for i in range(0, len(COMBINED), chunk_size):
+            stream_filter.feed(COMBINED[i : i + chunk_size])
+        stream_filter.flush()
+
+        assert "".join(received) == LETTER
+
+    @pytest.mark.parametrize("marker", ["=== EMAIL ===", "==E-MAIL==", "**=== E-Mail ===**"])
+    @pytest.mark.parametrize("chunk_size", [1, 4, 1000])
+    def test_withholds_email_after_marker_variant(self, marker, chunk_size):
+        text = f"{LETTER}\n\n{marker}\n{EMAIL}"
+        received = []
+        stream_filter = EmailSectionFilter(received.append)
+        for i in range(0, len(text), chunk_size):
+            stream_filter.feed(text[i : i + chunk_size])
+        stream_filter.flush()
+
+        assert "".join(received) == LETTER == split_letter_and_email(text)[0]
+
+    def test_marker_as_last_line_is_dropped(self):
+        received = []
+        stream_filter = EmailSectionFilter(received.append)
+        stream_filter.feed(f"{LETTER}\n=== E-MAIL ===")
+        stream_filter.flush()
+        assert "".join(received) == LETTER
+
+    def test_marker_text_inside_a_line_is_letter_text(self):
+        received = []
+        stream_filter = EmailSectionFilter(received.append)
+        stream_filter.feed("Siehe == E-MAIL == unten\nGruß")
+        stream_filter.flush()
+        assert "".join(received) == "Siehe == E-MAIL == unten\nGruß"
+
+    def test_flushes_held_back_text_without_marker(self):
+        received = []
+        stream_filter = EmailSectionFilter(received.append)
+        stream_filter.feed("Viele Grüße ==")
+        stream_filter.flush()
+        assert "".join(received) == "Viele Grüße =="
+
+
+class TestPrompt:
+    def test_email_instructions_only_when_requested(self):
+        plain = build_anschreiben_messages(**LETTER_KWARGS)
+        combined = build_anschreiben_messages(**LETTER_KWARGS, with_email=True)
+        assert EMAIL_SECTION_MARKER not in plain[0]["content"]
+        assert EMAIL_SECTION_MARKER in combined[0]["content"]
+
+
+class TestValidateEmailBody:
+    def test_valid(self):
+        assert OutputValidator().validate_email_body(EMAIL).is_valid
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "Sehr geehrte Frau Schmidt, danke.",
+            "Anbei meine Bewerbung. " * 10 + "Mit freundlichen Grüßen",
+            EMAIL.replace("Mit freundlichen Grüßen", "Tschüss"),
+            "Betreff: Bewerbung\n" + EMAIL,
+        ],
+    )
+    def test_invalid(self, text):
+        assert not OutputValidator().validate_email_body(text).is_valid
+
+
+class TestAIClientCombined:
+    def _client(self):
+        with (
+            patch("services.ai_client.OpenAI"),
+            patch("services.ai_client.config") as mock_config,
+        ):
+            mock_config.OPENROUTER_API_KEY = "key"
+            mock_config.FIREWORKS_API_KEY = "key"
+            from services.ai_client import AIClient
+
+            client = AIClient()
+        client.kimi_client = MagicMock()
+        return client
+
+    def test_qwen_single_call(self):
+        client = self._client()
+        with patch.object(client, "_call_api_with_retry", return_value=COMBINED) as call:
+            letter, email = client.generate_anschreiben_with_email(model="qwen", **LETTER_KWARGS)
+
+        call.assert_called_once()
+        assert letter.startswith("Sehr geehrte Frau Schmidt")
+        assert EMAIL_SECTION_MARKER not in letter
+        assert email == EMAIL
+
+    def test_kimi_streams_letter_only(self):
+        client = self._client()
+        client.kimi_client.chat.completions.create.return_value = iter(
+            [_chunk(COMBINED[i : i + 5]) for i in range(0, len(COMBINED), 5)]
+        )
+        streamed = []
+
+        letter, email = client.generate_anschreiben_with_email(
+            model="kimi", content_callback=streamed.append, **LETTER_KWARGS
+        )
+
+        assert "".join(streamed) == LETTER
+        assert email == EMAIL
+        assert "Mit freundlichen Grüßen" not in letter
+
+    def test_missing_email_section(self):
+        client = self._client()
+        with patch.object(client, "_call_api_with_retry", return_value=LETTER):
+            letter, email = client.generate_anschreiben_with_email(model="qwen", **LETTER_KWARGS)
+        assert letter
+        assert email is None
+
+    def test_email_section_only(self):
+        client = self._client()
+        with patch.object(client, "_call_api_with_retry", return_value=f"{EMAIL_SECTION_MARKER}\n{EMAIL}"):
+            assert client.generate_anschreiben_with_email(model="qwen", **LETTER_KWARGS) == (None, None)
+
+
+class TestGeneratorCombined:
+    def _generator(self, draft):
+        from services.generator import BewerbungsGenerator
+
+        gen = BewerbungsGenerator.__new__(BewerbungsGenerator)
+        gen.api_client = MagicMock()
+        gen.api_client.generate_anschreiben_with_email.return_value = (LETTER, draft)
+        gen.api_client.generate_email_body.return_value = "Separat generierte E-Mail\n\nMit freundlichen Grüßen"
+        gen.validator = OutputValidator()
+        gen.thinking_callback = None
+        gen.content_callback = None
+        gen._email_body_draft = None
+        gen.user = SimpleNamespace(full_name="Max", email="max@example.com", phone=None, city=None, website=None)
+        return gen
+
+    def _run(self, gen):
+        details = {"position": "Python Developer", "ansprechpartner": "Sehr geehrte Frau Schmidt"}
+        with patch("services.generator.config") as mock_config:
+            mock_config.LLM_COMBINED_EMAIL_ENABLED = True
+            body = gen._generate_body("qwen", LETTER_KWARGS)
+        _, email_text = gen._generate_email_data("Test GmbH", details, body)
+        return email_text
+
+    def test_uses_email_from_same_response(self):
+        gen = self._generator(EMAIL)
+        email_text = self._run(gen)
+
+        assert email_text.startswith(EMAIL)
+        gen.api_client.generate_email_body.assert_not_called()
+        gen.api_client.generate_anschreiben.assert_not_called()
+
+    def test_falls_back_to_separate_call_on_invalid_draft(self):
+        gen = self._generator("kaputt")
+        email_text = self._run(gen)
+
+        gen.api_client.generate_email_body.assert_called_once()
+        assert email_text.startswith("Separat generierte E-Mail")
+
+    def test_falls_back_when_no_draft(self):
+        gen = self._generator(None)
+        self._run(gen)
+        gen.api_client.generate_email_body.assert_called_once()
+
+    def test_letter_missing_from_combined_response_uses_letter_call(self):
+        gen = self._generator(None)
+        gen.api_client.generate_anschreiben_with_email.return_value = (None, None)
+        gen.api_client.generate_anschreiben.return_value = LETTER
+
+        self._run(gen)
+
+        gen.api_client.generate_anschreiben.assert_called_once_with(**LETTER_KWARGS)
+        gen.api_client.generate_email_body.assert_called_once()
+
+    def test_no_letter_at_all_raises_user_message(self):
+        gen = self._generator(None)
+        gen.api_client.generate_anschreiben_with_email.return_value = (None, None)
+        gen.api_client.generate_anschreiben.return_value = None
+
+        with pytest.raises(ValueError, match="Anschreiben konnte nicht generiert werden"):
+            self._run(gen)
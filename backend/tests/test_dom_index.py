@@ -0,0 +1,93 @@
+"""Tests for the one-pass DOM index used by the generic job parser."""
+
+import re
+from unittest.mock import patch
+
+import pytest
+from bs4 import BeautifulSoup
+
+from services.scrapers.dom_index import DOMIndex, Selector, css_class
+from services.scrapers.generic import GenericJobParser
+
+HTML = """
+<html><head>
+<title>Python Entwickler - Beispiel GmbH</title>
+<meta property="og:title" content="Erster OG-Titel">
+<meta property="og:title" content="Zweiter OG-Titel">
+<meta name="description" content="Kurzbeschreibung">
+<script type="application/ld+json">{"@type": "JobPosting", "title": "Python Entwickler"}</script>
+<script>var tracking = "nicht im Text";</script>
+<style>.x { color: red }</style>
+</head><body>
+<!-- Kommentar -->
+<h1>Python Entwickler</h1>
+<div class="card job-card" data-job-id="1">Eins</div>
+<div class="job-card" data-job-id="">Zwei</div>
+<span class="job-card-footer" itemprop="title">Drei</span>
+<p data-testid="Job_Title">Vier</p>
+</body></html>
+"""
+
+
+@pytest.fixture(params=["html.parser", "lxml"])
+def soup(request):
+    return BeautifulSoup(HTML, request.param)
+
+
+class TestDOMIndex:
+    def test_text_matches_get_text(self, soup):
+        index = DOMIndex(soup)
+
+        assert index.text == soup.get_text()
+        assert "nicht im Text" not in index.text
+        assert "Kommentar" not in index.text
+
+    def test_class_token_matches_like_css(self, soup):
+        selector = css_class("job-card")
+        index = DOMIndex(soup, [selector])
+
+        assert [tag.get_text() for tag in index.all(selector)] == ["Eins", "Zwei"]
+        assert index.all(selector) == soup.select(".job-card")
+
+    def test_regex_exact_and_presence_follow_find(self, soup):
+        selectors = [
+            Selector("class", re.compile(r"job[-_]card", re.I)),
+            Selector("data-testid", re.compile(r"job[-_]?title", re.I)),
+            Selector("itemprop", "title"),
+            Selector("data-job-id", True),
+        ]
+        index = DOMIndex(soup, selectors)
+
+        assert index.all(selectors[0]) == soup.find_all(class_=selectors[0].pattern)
+        assert index.first(selectors[1]) is soup.find(attrs={"data-testid": selectors[1].pattern})
+        assert index.first(selectors[2]) is soup.find(attrs={"itemprop": "title"})
+        assert len(index.all(selectors[3])) == 2
+
+    def test_first_meta_tags_and_json_ld(self, soup):
+        index = DOMIndex(soup, tag_names=["title", "h1"])
+
+        assert index.meta_property("og:title")["content"] == "Erster OG-Titel"
+        assert index.meta_name("description")["content"] == "Kurzbeschreibung"
+        assert index.meta_name("author") is None
+        assert len(index.json_ld_scripts) == 1
+        assert index.first_tag("h1").get_text() == "Python Entwickler"
+        assert index.first_tag("article") is None
+
+    def test_duplicate_selectors_are_indexed_once(self, soup):
+        selector = css_class("job-card")
+
+        assert len(DOMIndex(soup, [selector, css_class("job-card")]).all(selector)) == 2
+
+
+class TestGenericParserSinglePass:
+    def test_strategies_do_not_search_the_whole_tree(self, soup):
+        with (
+            patch.object(soup, "find", side_effect=AssertionError("find")),
+            patch.object(soup, "find_all", side_effect=AssertionError("find_all")),
+            patch.object(soup, "select", side_effect=AssertionError("select")),
+            patch.object(soup, "get_text", side_effect=AssertionError("get_text")),
+        ):
+            result = GenericJobParser().parse(soup, "https://beispiel.de/jobs/python")
+
+        assert result["title"] == "Python Entwickler"
+        assert result["company"] == "Beispiel GmbH"
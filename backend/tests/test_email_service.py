@@ -61,6 +61,7 @@ class TestSendEmail:
         mock_server.login.assert_called_once_with("user@gmail.com", "password")
         mock_server.sendmail.assert_called_once()
         mock_server.quit.assert_called_once()
+        mock_server.close.assert_called_once()
 
     @patch("services.email_service.smtplib.SMTP")
     @patch("services.email_service.config")
@@ -76,6 +77,19 @@ class TestSendEmail:
         result = _send_email("to@test.com", "Subject", "<p>Body</p>")
         assert result is False
 
+    @patch("services.email_service.smtplib.SMTP")
+    @patch("services.email_service.config")
+    def test_closes_connection_when_sending_fails(self, mock_config, mock_smtp_cls):
+        mock_config.MAIL_USERNAME = "user@gmail.com"
+        mock_config.MAIL_PASSWORD = "password"
+        mock_server = MagicMock()
+        mock_server.sendmail.side_effect = OSError("connection reset")
+        mock_smtp_cls.return_value = mock_server
+
+        result = _send_email("to@test.com", "Subject", "<p>Body</p>")
+        assert result is False
+        mock_server.close.assert_called_once()
+
 
 class TestSendVerificationEmail:
     """Tests for send_verification_email."""
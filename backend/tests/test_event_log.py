@@ -0,0 +1,178 @@
+"""Tests for replayable SSE event logs and Last-Event-ID reconnects."""
+
+import json
+import threading
+from unittest.mock import patch
+
+from services.event_log import (
+    KEEPALIVE_EVENT,
+    EventLog,
+    EventLogRegistry,
+    SQLiteEventStore,
+    get_event_log_registry,
+)
+
+
+def _collect(iterator):
+    return [(event_id, event) for event_id, event in iterator]
+
+
+class TestEventLog:
+    def test_ids_increase_and_replay_after_id(self):
+        log = EventLog("log", user_id=1, max_events=100)
+        assert log.append({"step": 1}) == 1
+        assert log.append({"step": 2}) == 2
+        log.close({"type": "complete"})
+
+        assert _collect(log.subscribe(after_id=1)) == [(2, {"step": 2}), (3, {"type": "complete"})]
+
+    def test_ring_buffer_drops_oldest_events(self):
+        log = EventLog("log", user_id=1, max_events=2)
+        for step in range(1, 5):
+            log.append({"step": step})
+        log.close({"type": "complete"})
+
+        assert [event_id for event_id, _ in log.subscribe()] == [4, 5]
+
+    def test_appends_after_close_are_ignored(self):
+        log = EventLog("log", user_id=1, max_events=10)
+        log.close({"type": "error", "error": "kaputt"})
+
+        assert log.append({"step": 1}) is None
+        assert _collect(log.subscribe()) == [(1, {"type": "error", "error": "kaputt"})]
+
+    def test_multiple_subscribers_follow_live_events(self):
+        log = EventLog("log", user_id=1, max_events=100)
+        results = [[], []]
+        started = threading.Barrier(3)
+
+        def follow(target):
+            started.wait()
+            target.extend(log.subscribe(keepalive=5.0))
+
+        threads = [threading.Thread(target=follow, args=(results[i],)) for i in range(2)]
+        for thread in threads:
+            thread.start()
+        started.wait()
+        log.append({"step": 1})
+        log.close({"type": "complete"})
+        for thread in threads:
+            thread.join(timeout=5)
+
+        assert results[0] == results[1] == [(1, {"step": 1}), (2, {"type": "complete"})]
+
+    def test_idle_subscriber_gets_keepalive(self):
+        log = EventLog("log", user_id=1, max_events=10)
+
+        assert next(log.subscribe(keepalive=0.01)) == (None, KEEPALIVE_EVENT)
+
+
+class TestEventLogRegistry:
+    def test_closed_logs_are_pruned_after_retention(self):
+        registry = EventLogRegistry(max_events=10, retention=0)
+        log = registry.create(user_id=1)
+        log.close({"type": "complete"})
+
+        registry.create(user_id=1)
+
+        assert registry.get(log.id) is None
+        assert registry.stats() == {"open": 1, "retained": 0, "shared": False}
+
+    def test_open_logs_are_kept(self):
+        registry = EventLogRegistry(max_events=10, retention=0)
+        log = registry.create(user_id=1)
+        registry.create(user_id=1)
+
+        assert registry.get(log.id) is log
+
+
+class TestSQLiteEventStore:
+    def test_other_worker_replays_shared_events(self, tmp_path):
+        store = SQLiteEventStore(str(tmp_path / "events.sqlite3"), retention=600)
+        log = EventLog("shared", user_id=7, max_events=10, store=store)
+        log.append({"step": 1})
+        log.append({"step": 2})
+        log.close({"type": "complete"})
+
+        other = SQLiteEventStore(str(tmp_path / "events.sqlite3"), retention=600)
+        assert other.owner("shared") == 7
+        assert _collect(other.subscribe("shared", after_id=1, poll_interval=0)) == [
+            (2, {"step": 2}),
+            (3, {"type": "complete"}),
+        ]
+
+    def test_stalled_log_ends_with_error(self, tmp_path):
+        store = SQLiteEventStore(str(tmp_path / "events.sqlite3"), retention=600)
+        store.append("stalled", 7, 1, {"step": 1})
+
+        with patch("services.event_log.config") as mock_config:
+            mock_config.SSE_EVENT_LOG_STALL_TIMEOUT = 0
+            events = _collect(store.subscribe("stalled", poll_interval=0))
+
+        assert events[0] == (1, {"step": 1})
+        assert events[-1][0] is None
+        assert events[-1][1]["type"] == "error"
+
+    def test_unwritable_path_is_swallowed(self, tmp_path):
+        blocker = tmp_path / "file"
+        blocker.write_text("x")
+        store = SQLiteEventStore(str(blocker / "events.sqlite3"), retention=600)
+
+        store.append("log", 1, 1, {"step": 1})
+        assert store.owner("log") is None
+        assert store.read("log", 0) == []
+
+
+class TestResumeRoutes:
+    def _stream_events(self, response):
+        return [
+            json.loads(line[6:]) for line in response.get_data(as_text=True).split("\n") if line.startswith("data: ")
+        ]
+
+    def _run_stream(self, client, auth_headers):
+        def fake_generation(payload, emit):
+            emit({"step": 1, "total_steps": 7, "message": "Stellenanzeige wird geladen..."})
+            emit({"type": "content", "text": "Sehr geehrte"})
+            return {"success": True, "pdf_path": "x.pdf"}
+
+        with patch("routes.applications.generation.run_url_generation", side_effect=fake_generation):
+            response = client.post(
+                "/api/applications/generate-from-url-stream",
+                json={"url": "https://example.com/job"},
+                headers=auth_headers,
+            )
+            return self._stream_events(response)
+
+    def test_stream_events_carry_ids(self, app, client, auth_headers):
+        with patch("routes.applications.generation.run_url_generation", return_value={"success": True}):
+            response = client.post(
+                "/api/applications/generate-from-url-stream",
+                json={"url": "https://example.com/job"},
+                headers=auth_headers,
+            )
+            body = response.get_data(as_text=True)
+
+        assert body.startswith("id: 1\ndata: ")
+        assert "id: 2\ndata: " in body
+
+    def test_reconnect_with_last_event_id_replays_missed_events(self, app, client, auth_headers):
+        job_id = self._run_stream(client, auth_headers)[0]["job_id"]
+
+        response = client.get(
+            f"/api/applications/generation-jobs/{job_id}/stream",
+            headers={**auth_headers, "Last-Event-ID": "2"},
+        )
+
+        assert response.status_code == 200
+        assert response.get_data(as_text=True).startswith("id: 3\n")
+        events = self._stream_events(response)
+        assert events[0] == {"type": "content", "text": "Sehr geehrte"}
+        assert events[-1] == {"type": "complete", "success": True, "pdf_path": "x.pdf"}
+
+    def test_reconnect_to_foreign_stream_is_not_found(self, app, client, auth_headers):
+        log = get_event_log_registry().create(user_id=999999)
+        log.close({"type": "complete"})
+
+        response = client.get(f"/api/applications/generation-jobs/{log.id}/stream", headers=auth_headers)
+
+        assert response.status_code == 404
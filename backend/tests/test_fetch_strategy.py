@@ -0,0 +1,164 @@
+"""Tests for per-host fetch method ordering (services/fetch_strategy.py) in WebScraper."""
+
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from services.fetch_strategy import CLOUDSCRAPER, DIRECT, SCRAPER_API, FetchStrategyMemory, MethodRecord
+from services.local_store import SQLiteKVStore
+from services.web_scraper import WebScraper
+
+HOST = "www.stepstone.de"
+URL = f"https://{HOST}/stellenangebote--Python-Entwickler-123.html"
+DEV_CHAIN = [DIRECT, SCRAPER_API, CLOUDSCRAPER]
+
+
+def _memory(**overrides) -> FetchStrategyMemory:
+    options = {"half_life": 3600, "min_weight": 0.5, "proxy_cost": 3.0}
+    options.update(overrides)
+    return FetchStrategyMemory(**options)
+
+
+def _ok() -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response._content = b"<html><body>Stelle</body></html>"
+    return response
+
+
+def _http_error(status: int) -> requests.HTTPError:
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(f"{status}", response=response)
+
+
+class TestFetchStrategyMemory:
+    def test_unknown_host_keeps_default_chain(self):
+        assert _memory().order(HOST, DEV_CHAIN) == DEV_CHAIN
+
+    def test_working_method_moves_first_and_failing_one_last(self):
+        memory = _memory()
+        memory.record(HOST, DIRECT, False, 15.0)
+        memory.record(HOST, CLOUDSCRAPER, True, 2.0)
+
+        assert memory.order(HOST, DEV_CHAIN) == [CLOUDSCRAPER, SCRAPER_API, DIRECT]
+
+    def test_cheaper_of_two_working_methods_wins(self):
+        memory = _memory()
+        for _ in range(3):
+            memory.record(HOST, SCRAPER_API, True, 2.0)
+            memory.record(HOST, CLOUDSCRAPER, True, 3.0)
+
+        # 2s + 3s proxy cost is more than 3s
+        assert memory.order(HOST, [SCRAPER_API, CLOUDSCRAPER, DIRECT]) == [CLOUDSCRAPER, SCRAPER_API, DIRECT]
+
+    def test_evidence_decays_back_to_default_order(self):
+        memory = _memory(half_life=60)
+        memory.record(HOST, DIRECT, False, 15.0)
+        memory.record(HOST, CLOUDSCRAPER, True, 2.0)
+
+        with patch("services.fetch_strategy.time.time", return_value=time.time() + 120):
+            assert memory.order(HOST, DEV_CHAIN) == DEV_CHAIN
+
+    def test_latency_is_a_moving_average(self):
+        memory = _memory()
+        memory.record(HOST, DIRECT, True, 1.0)
+        memory.record(HOST, DIRECT, True, 2.0)
+
+        assert memory._load(HOST)[DIRECT].latency == pytest.approx(1.3)
+
+    def test_records_survive_restart_and_are_shared(self, tmp_path):
+        path = str(tmp_path / "fetch_strategy.sqlite3")
+        _memory(store=SQLiteKVStore(path, table="hosts")).record(HOST, CLOUDSCRAPER, True, 2.0)
+
+        restarted = _memory(store=SQLiteKVStore(path, table="hosts"))
+
+        assert restarted.order(HOST, [DIRECT, CLOUDSCRAPER]) == [CLOUDSCRAPER, DIRECT]
+
+    def test_corrupt_store_entry_is_ignored(self, tmp_path):
+        store = SQLiteKVStore(str(tmp_path / "fetch_strategy.sqlite3"), table="hosts")
+        store.set(HOST, "kaputt", ttl=60)
+
+        assert _memory(store=store).order(HOST, DEV_CHAIN) == DEV_CHAIN
+        assert store.get(HOST) is None
+
+    def test_concurrent_records_are_not_lost(self, tmp_path):
+        path = str(tmp_path / "fetch_strategy.sqlite3")
+        workers = [_memory(store=SQLiteKVStore(path, table="hosts")) for _ in range(2)]
+
+        def record(memory):
+            for _ in range(25):
+                memory.record(HOST, DIRECT, True, 1.0)
+
+        threads = [threading.Thread(target=record, args=(memory,)) for memory in workers for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert workers[0]._load(HOST)[DIRECT].successes == pytest.approx(100, rel=0.01)
+
+    def test_success_chance_prior(self):
+        assert MethodRecord().success_chance == 0.5
+        assert MethodRecord(successes=2).success_chance == 0.75
+
+
+class TestWebScraperFetchChain:
+    @pytest.fixture
+    def scraper(self, monkeypatch):
+        monkeypatch.delenv("FLASK_ENV", raising=False)
+        monkeypatch.setenv("SCRAPER_API_KEY", "key")
+        scraper = WebScraper()
+        scraper.session = MagicMock()
+        return scraper
+
+    def test_blocked_host_goes_straight_to_working_method(self, scraper):
+        memory = _memory()
+        scraper.session.get.side_effect = _http_error(403)
+        with (
+            patch("services.web_scraper.get_fetch_strategy", return_value=memory),
+            patch.object(scraper, "_fetch_via_scraper_api", return_value=None),
+            patch.object(scraper, "_fetch_via_cloudscraper", return_value=_ok()) as cloud,
+        ):
+            scraper._fetch_page_uncached(URL)
+            scraper.session.get.reset_mock()
+            scraper._fetch_page_uncached(URL)
+
+        scraper.session.get.assert_not_called()
+        assert cloud.call_count == 2
+        assert memory.stats()["first_try_success"] == 1
+        assert memory.stats()["reordered"] == 1
+
+    def test_final_direct_error_is_raised_without_fallback(self, scraper):
+        scraper.session.get.side_effect = _http_error(404)
+        with (
+            patch("services.web_scraper.get_fetch_strategy", return_value=_memory()),
+            patch.object(scraper, "_fetch_via_cloudscraper") as cloud,
+            pytest.raises(requests.HTTPError),
+        ):
+            scraper._fetch_page_uncached(URL)
+
+        cloud.assert_not_called()
+
+    def test_all_methods_failing_raises_direct_error(self, scraper):
+        scraper.session.get.side_effect = requests.ConnectionError("weg")
+        with (
+            patch("services.web_scraper.get_fetch_strategy", return_value=None),
+            patch.object(scraper, "_fetch_via_scraper_api", return_value=None),
+            patch.object(scraper, "_fetch_via_cloudscraper", return_value=None),
+            pytest.raises(requests.ConnectionError, match="weg"),
+        ):
+            scraper._fetch_page_uncached(URL)
+
+    def test_production_default_chain_starts_with_scraper_api(self, scraper, monkeypatch):
+        monkeypatch.setenv("FLASK_ENV", "production")
+
+        assert scraper._default_chain() == [SCRAPER_API, CLOUDSCRAPER, DIRECT]
+
+    def test_without_api_key_scraper_api_is_skipped(self, monkeypatch):
+        monkeypatch.delenv("SCRAPER_API_KEY", raising=False)
+
+        assert WebScraper()._default_chain() == [DIRECT, CLOUDSCRAPER]
@@ -2,6 +2,7 @@
 
 import os
 import tempfile
+import threading
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -270,6 +271,58 @@ class TestGenerateBewerbung:
             assert app_record.status == "erstellt"
             assert app_record.betreff == "Bewerbung als Senior Developer - Max Mustermann"
 
+    @patch("services.generator.create_anschreiben_pdf")
+    @patch("services.generator.AIClient")
+    def test_progress_events_in_order_with_stage_timings(self, mock_api_cls, mock_pdf, app, test_user):
+        """Concurrent pipeline stages still report steps 1..7 in order."""
+        with app.app_context():
+            mock_api = MagicMock()
+            mock_api.generate_anschreiben.return_value = "Sehr geehrte Damen und Herren,\n\nBody.\n\nMFG\nMax"
+            mock_api.generate_email_body.return_value = None
+
+            gen = _make_prepared_generator(test_user, mock_api)
+            events = []
+            gen.progress_callback = events.append
+
+            gen.generate_bewerbung(
+                stellenanzeige_path="https://example.com/job",
+                firma_name="Test GmbH",
+                user_details={"position": "Developer", "description": "A job posting about development"},
+            )
+
+            assert [e["step"] for e in events] == [1, 2, 3, 4, 5, 6, 7]
+            assert all(e["total_steps"] == 7 for e in events)
+            assert "posting" in events[-1]["stage_timings"]
+            assert {"posting", "details", "letter", "pdf", "email", "save"} <= set(gen.stage_timings)
+
+    @patch("services.generator.create_anschreiben_pdf")
+    @patch("services.generator.AIClient")
+    def test_email_stage_gets_user_fields_read_on_request_thread(self, mock_api_cls, mock_pdf, app, test_user):
+        """Pool stages receive plain contact values instead of reading the ORM user."""
+        with app.app_context():
+            mock_api = MagicMock()
+            mock_api.generate_anschreiben.return_value = "Sehr geehrte Damen und Herren,\n\nBody.\n\nMFG\nMax"
+            mock_api.generate_email_body.return_value = None
+            gen = _make_prepared_generator(test_user, mock_api)
+            request_thread = threading.get_ident()
+            contact_threads = []
+            read_contact = gen._user_contact_kwargs
+
+            def user_contact_kwargs():
+                contact_threads.append(threading.get_ident())
+                return read_contact()
+
+            gen._user_contact_kwargs = user_contact_kwargs
+            gen.generate_bewerbung(
+                stellenanzeige_path="https://example.com/job",
+                firma_name="Test GmbH",
+                user_details={"position": "Developer", "description": "A job posting about development"},
+            )
+
+            assert contact_threads == [request_thread]
+            app_record = Application.query.filter_by(user_id=test_user["id"]).first()
+            assert app_record.betreff == "Bewerbung als Developer - Max Mustermann"
+
     @patch("services.generator.create_anschreiben_pdf")
     @patch("services.generator.AIClient")
     def test_generate_with_url_extraction(self, mock_api_cls, mock_pdf, app, test_user):
@@ -0,0 +1,207 @@
+"""Tests for hedged cover letter requests."""
+
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from services.ai_streaming import stream_completion
+from services.hedging import HedgeCancelled, Hedger, LatencyTracker
+from services.retry import RetryBudget
+
+
+def _attempt(result=None, first_token_after=0.0, finish_after=0.0, error=None):
+    """Fake attempt that emits its first token and result after the given delays."""
+    state = {"cancelled": False}
+
+    def run(cancel, on_first_token):
+        if cancel.wait(first_token_after):
+            state["cancelled"] = True
+            raise HedgeCancelled("cancelled")
+        on_first_token()
+        if cancel.wait(finish_after):
+            state["cancelled"] = True
+            raise HedgeCancelled("cancelled")
+        if error is not None:
+            raise error
+        return result
+
+    run.state = state
+    return run
+
+
+def _chunk(content):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content, reasoning_content=None))])
+
+
+class TestLatencyTracker:
+    def test_percentile(self):
+        tracker = LatencyTracker()
+        for value in range(1, 101):
+            tracker.record(float(value))
+        assert tracker.percentile(95) == 96.0
+        assert tracker.percentile(50) == 51.0
+
+    def test_empty(self):
+        assert LatencyTracker().percentile(95) is None
+
+
+class TestHedger:
+    def test_fast_primary_is_not_hedged(self):
+        hedger = Hedger("test", default_delay=1.0)
+        secondary = MagicMock()
+
+        assert hedger.run(_attempt("primary"), secondary) == "primary"
+        secondary.assert_not_called()
+        stats = hedger.stats()
+        assert stats["hedged"] == 0
+        assert stats["primary_wins"] == 1
+
+    def test_slow_primary_is_hedged_and_cancelled(self):
+        hedger = Hedger("test", default_delay=0.05)
+        primary = _attempt("primary", first_token_after=5.0)
+
+        start = time.monotonic()
+        assert hedger.run(primary, _attempt("secondary")) == "secondary"
+        assert time.monotonic() - start < 2.0
+
+        stats = hedger.stats()
+        assert stats["hedged"] == 1
+        assert stats["secondary_wins"] == 1
+        assert stats["hedge_rate"] == 1.0
+        # Censored sample for the primary that never produced a token
+        assert stats["ttft_samples"] == 1
+        deadline = time.monotonic() + 2
+        while not primary.state["cancelled"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert primary.state["cancelled"]
+
+    def test_primary_with_first_token_records_one_sample(self):
+        hedger = Hedger("test", default_delay=0.05)
+        primary = _attempt("primary", first_token_after=0.1, finish_after=5.0)
+
+        assert hedger.run(primary, _attempt("secondary", finish_after=0.4)) == "secondary"
+
+        # The primary's real TTFT only, no additional censored sample when it loses the race
+        assert hedger.stats()["ttft_samples"] == 1
+        assert hedger.ttft.percentile(50) < 0.4
+
+    def test_primary_streaming_in_time_is_not_hedged(self):
+        hedger = Hedger("test", default_delay=0.2)
+        secondary = MagicMock()
+
+        result = hedger.run(_attempt("primary", first_token_after=0.0, finish_after=0.4), secondary)
+
+        assert result == "primary"
+        secondary.assert_not_called()
+
+    def test_primary_failure_falls_back_to_secondary(self):
+        hedger = Hedger("test", default_delay=5.0)
+
+        result = hedger.run(_attempt(error=RuntimeError("down")), _attempt("secondary"))
+
+        assert result == "secondary"
+        assert hedger.stats()["fallbacks"] == 1
+        assert hedger.stats()["hedged"] == 0
+
+    def test_both_failing_raises_primary_error(self):
+        hedger = Hedger("test", default_delay=5.0)
+
+        with pytest.raises(RuntimeError, match="primary down"):
+            hedger.run(_attempt(error=RuntimeError("primary down")), _attempt(error=ValueError("secondary down")))
+        assert hedger.stats()["failures"] == 1
+
+    def test_delay_adapts_to_percentile(self):
+        hedger = Hedger("test", percentile=90, min_samples=10, default_delay=10.0, min_delay=0.0)
+        assert hedger.hedge_delay() == 10.0
+        for value in range(10):
+            hedger.ttft.record(value / 10)
+        assert hedger.hedge_delay() == pytest.approx(0.9)
+
+    def test_budget_caps_hedges(self):
+        hedger = Hedger("test", default_delay=0.01, budget=RetryBudget(ratio=0.0, min_retries=0))
+        secondary = MagicMock()
+
+        assert hedger.run(_attempt("primary", first_token_after=0.1), secondary) == "primary"
+        secondary.assert_not_called()
+        assert hedger.stats()["budget_denied"] == 1
+
+
+class TestStreamCompletion:
+    def test_concatenates_content_and_signals_first_token(self):
+        client = MagicMock()
+        client.chat.completions.create.return_value = iter([_chunk("Sehr "), _chunk("geehrte")])
+        first_token = MagicMock()
+
+        result = stream_completion(client, "openrouter", on_first_token=first_token, model="m", messages=[])
+
+        assert result == "Sehr geehrte"
+        first_token.assert_called_once()
+        assert client.chat.completions.create.call_args.kwargs["stream"] is True
+
+    def test_cancel_closes_stream(self):
+        cancel = threading.Event()
+        response = MagicMock()
+
+        def chunks():
+            yield _chunk("a")
+            cancel.set()
+            yield _chunk("b")
+
+        response.__iter__.side_effect = lambda: chunks()
+        client = MagicMock()
+        client.chat.completions.create.return_value = response
+
+        with pytest.raises(HedgeCancelled):
+            stream_completion(client, "openrouter", cancel=cancel, model="m", messages=[])
+        response.close.assert_called_once()
+
+
+class TestAIClientHedging:
+    def _client(self):
+        with (
+            patch("services.ai_client.OpenAI"),
+            patch("services.ai_client.config") as mock_config,
+        ):
+            mock_config.OPENROUTER_API_KEY = "key"
+            mock_config.FIREWORKS_API_KEY = "key"
+            from services.ai_client import AIClient
+
+            return AIClient()
+
+    def test_generate_anschreiben_uses_hedger_when_enabled(self):
+        client = self._client()
+        client.kimi_client = MagicMock()
+        client.client.chat.completions.create.return_value = iter([_chunk("Sehr geehrte Damen und Herren,\n\nText.")])
+
+        with patch("services.ai_client.get_anschreiben_hedger", return_value=Hedger("test", default_delay=5.0)):
+            result = client.generate_anschreiben(
+                cv_text="CV",
+                stellenanzeige_text="Job",
+                firma_name="Firma",
+                position="Dev",
+                ansprechpartner="Sehr geehrte Damen und Herren",
+            )
+
+        assert result.startswith("Sehr geehrte Damen und Herren")
+        client.kimi_client.chat.completions.create.assert_not_called()
+
+    def test_generate_anschreiben_without_hedger_uses_retry_path(self):
+        client = self._client()
+
+        with (
+            patch("services.ai_client.get_anschreiben_hedger", return_value=None),
+            patch.object(client, "_call_api_with_retry", return_value="Sehr geehrte Frau Test,\n\nText.") as call,
+        ):
+            result = client.generate_anschreiben(
+                cv_text="CV",
+                stellenanzeige_text="Job",
+                firma_name="Firma",
+                position="Dev",
+                ansprechpartner="Sehr geehrte Frau Test",
+            )
+
+        call.assert_called_once()
+        assert result.startswith("Sehr geehrte Frau Test")
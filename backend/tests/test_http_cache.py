@@ -0,0 +1,144 @@
+"""Tests for the shared HTTP response cache in front of WebScraper."""
+
+import time
+from unittest.mock import patch
+
+import requests
+
+from services.http_cache import CachedPage, HTTPResponseCache
+from services.local_store import SQLiteKVStore
+from services.web_scraper import WebScraper
+
+PAGE = "<html><body><h1>Python Entwickler (m/w/d)</h1><p>Wir suchen dich.</p></body></html>"
+
+
+def _response(body: str = PAGE, status: int = 200, headers: dict | None = None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response._content = body.encode("utf-8")
+    response.headers.update({"Content-Type": "text/html; charset=utf-8", **(headers or {})})
+    response.encoding = "utf-8"
+    return response
+
+
+def _cache(**overrides) -> HTTPResponseCache:
+    options = {"ttl": 900, "stale_ttl": 86400, "max_entry_bytes": 1_000_000, "memory_max_bytes": 10_000_000}
+    options.update(overrides)
+    return HTTPResponseCache(**options)
+
+
+class TestHTTPResponseCache:
+    def test_stores_and_rebuilds_response(self):
+        cache = _cache()
+        cache.put("https://example.com/job#apply", _response(headers={"ETag": '"v1"'}))
+
+        page = cache.get("https://example.com/job")
+
+        assert page.fresh
+        response = page.to_response()
+        assert response.status_code == 200
+        assert response.text == PAGE
+        assert response.headers["etag"] == '"v1"'
+        assert cache.stats()["memory_hits"] == 1
+
+    def test_no_store_and_errors_are_not_cached(self):
+        cache = _cache()
+        cache.put("https://example.com/a", _response(headers={"Cache-Control": "private, no-store"}))
+        cache.put("https://example.com/b", _response(status=404))
+
+        assert cache.get("https://example.com/a") is None
+        assert cache.get("https://example.com/b") is None
+
+    def test_oversized_bodies_are_skipped(self):
+        cache = _cache(max_entry_bytes=10)
+        cache.put("https://example.com/job", _response())
+
+        assert cache.get("https://example.com/job") is None
+        assert cache.stats()["too_large"] == 1
+
+    def test_memory_tier_evicts_least_recently_used_by_bytes(self):
+        size = len(PAGE.encode("utf-8"))
+        cache = _cache(memory_max_bytes=size * 2)
+        cache.put("https://example.com/1", _response())
+        cache.put("https://example.com/2", _response())
+        cache.get("https://example.com/1")
+        cache.put("https://example.com/3", _response())
+
+        assert cache.get("https://example.com/2") is None
+        assert cache.get("https://example.com/1") is not None
+        assert cache.stats()["memory_bytes"] == size * 2
+
+    def test_entries_past_stale_window_are_dropped(self):
+        cache = _cache(ttl=0, stale_ttl=0)
+        cache.put("https://example.com/job", _response())
+
+        assert cache.get("https://example.com/job") is None
+
+    def test_store_tier_is_shared_between_processes(self, tmp_path):
+        path = str(tmp_path / "http.sqlite3")
+        _cache(store=SQLiteKVStore(path, table="http_responses")).put(
+            "https://example.com/job", _response(headers={"Last-Modified": "Mon, 12 Oct 2026 08:00:00 GMT"})
+        )
+
+        other = _cache(store=SQLiteKVStore(path, table="http_responses"))
+        page = other.get("https://example.com/job")
+
+        assert page.body == PAGE.encode("utf-8")
+        assert page.validators() == {"If-Modified-Since": "Mon, 12 Oct 2026 08:00:00 GMT"}
+        assert other.stats()["store_hits"] == 1
+
+    def test_corrupt_store_entry_is_a_miss(self, tmp_path):
+        store = SQLiteKVStore(str(tmp_path / "http.sqlite3"), table="http_responses")
+        store.set("https://example.com/job", b"kaputt", ttl=60)
+
+        assert _cache(store=store).get("https://example.com/job") is None
+        assert store.get("https://example.com/job") is None
+
+
+class TestWebScraperCaching:
+    def test_repeated_fetches_hit_network_once(self):
+        scraper = WebScraper()
+        with (
+            patch("services.web_scraper.get_http_cache", return_value=_cache()),
+            patch.object(scraper, "_fetch_page_uncached", return_value=_response()) as fetch,
+        ):
+            first = scraper.fetch_job_posting("https://example.com/job")
+            second = scraper.fetch_structured_job_posting("https://example.com/job")
+
+        assert fetch.call_count == 1
+        assert first["text"] == second["text"]
+        assert "Python Entwickler (m/w/d)" in second["text"]
+
+    def test_stale_entry_is_revalidated_with_etag(self):
+        cache = _cache()
+        cache.put("https://example.com/job", _response(headers={"ETag": '"v1"'}))
+        cache.get("https://example.com/job").fresh_until = time.time() - 1
+        scraper = WebScraper()
+        with (
+            patch("services.web_scraper.get_http_cache", return_value=cache),
+            patch.object(scraper, "_fetch_page_uncached", return_value=_response("", status=304)) as fetch,
+        ):
+            response = scraper._fetch_page("https://example.com/job", headers={"Accept": "text/html"})
+
+        assert fetch.call_args.args[1] == {"Accept": "text/html", "If-None-Match": '"v1"'}
+        assert response.text == PAGE
+        assert cache.get("https://example.com/job").fresh
+        assert cache.stats()["revalidated"] == 1
+
+    def test_disabled_cache_fetches_every_time(self):
+        scraper = WebScraper()
+        with (
+            patch("services.web_scraper.get_http_cache", return_value=None),
+            patch.object(scraper, "_fetch_page_uncached", return_value=_response()) as fetch,
+        ):
+            scraper._fetch_page("https://example.com/job")
+            scraper._fetch_page("https://example.com/job")
+
+        assert fetch.call_count == 2
+
+    def test_cached_page_roundtrip(self):
+        page = CachedPage(url="u", body=b"x" * 1000, headers={"ETag": "e"}, encoding="utf-8", fresh_until=1.0)
+
+        restored = CachedPage.load(page.dump())
+
+        assert restored == page
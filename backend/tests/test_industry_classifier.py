@@ -0,0 +1,158 @@
+"""Tests for the local industry/company-size classifier."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from services.industry_classifier import IndustryClassifier, classify_industry, classify_industry_local
+
+IT_POSTING = (
+    "Wir suchen einen Senior Python Entwickler (m/w/d) für unser Backend-Team. "
+    "Du arbeitest mit Django, Docker und Kubernetes in der Cloud."
+)
+PFLEGE_POSTING = (
+    "Für unsere Klinik suchen wir eine examinierte Pflegefachkraft (m/w/d) für die Intensivstation "
+    "im Schichtdienst. Das Krankenhaus gehört zu einem Verbund mit über 5.000 Beschäftigten."
+)
+UNCLEAR_POSTING = "Wir suchen eine Bürokraft für Ablage, Post und Telefon. Bewirb dich jetzt bei uns."
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    return IndustryClassifier()
+
+
+class TestIndustryClassifier:
+    @pytest.mark.parametrize(
+        "text,expected",
+        [
+            (IT_POSTING, "it_software"),
+            (PFLEGE_POSTING, "gesundheit"),
+            (
+                "Als Konstrukteur im Maschinenbau entwickelst du mit SolidWorks neue Anlagen für die Fertigung.",
+                "maschinenbau",
+            ),
+            (
+                "Marketing Manager (m/w/d): Du planst Kampagnen auf Social Media und verantwortest Content und SEO.",
+                "marketing",
+            ),
+            (
+                "Als Consultant in der Unternehmensberatung begleitest du Klienten bei Strategie und Transformation.",
+                "consulting",
+            ),
+        ],
+    )
+    def test_classifies_branche(self, classifier, text, expected):
+        result = classifier.classify(text)
+        assert result.branche == expected
+        assert result.confidence >= 0.5
+
+    def test_unclear_posting_has_no_branche(self, classifier):
+        result = classifier.classify(UNCLEAR_POSTING)
+        assert result.branche is None
+        assert result.confidence == 0.0
+
+    def test_size_from_employee_count(self, classifier):
+        assert classifier.classify(PFLEGE_POSTING).unternehmensgroesse == "konzern"
+        assert classifier.classify("Unser Unternehmen mit 35 Mitarbeitern sucht Hilfe.").unternehmensgroesse == "kmu"
+
+    def test_team_size_is_not_company_size(self, classifier):
+        assert classifier.classify("Du arbeitest mit 5 Mitarbeitern im Team.").unternehmensgroesse is None
+        assert classifier.classify("Du arbeitest mit 5 Kollegen zusammen.").unternehmensgroesse is None
+
+    def test_size_threshold_matches_llm_prompt(self, classifier):
+        from services.industry_rules import KONZERN_MIN_EMPLOYEES
+        from services.prompts import create_industry_prompt
+
+        assert f"under {KONZERN_MIN_EMPLOYEES} employees" in create_industry_prompt("")
+        assert classifier.classify("Unser Unternehmen hat 300 Mitarbeitende.").unternehmensgroesse == "kmu"
+        assert classifier.classify("Unser Unternehmen hat 600 Mitarbeitende.").unternehmensgroesse == "konzern"
+
+    def test_size_from_keywords(self, classifier):
+        assert classifier.classify("Wir sind ein junges Startup mit flachen Hierarchien.").unternehmensgroesse == "kmu"
+        assert classifier.classify("Weltweit agierender, börsennotierter Konzern.").unternehmensgroesse == "konzern"
+
+    def test_single_size_keyword_is_unsure(self, classifier):
+        result = classifier.classify("Wir sind ein international tätiges Unternehmen und suchen einen Sachbearbeiter.")
+        assert result.unternehmensgroesse is None
+        assert result.size_confidence == 0.0
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "Vertriebsmitarbeiter (m/w/d) im Außendienst. Du bringst Praxiserfahrung im Verkauf mit "
+            "und erhältst eine intensive Einarbeitung.",
+            "Buchhalter (m/w/d) für Kreditoren und Monatsabschluss, Arbeit im Schichtbetrieb, "
+            "gute Kommunikationsfähigkeit und Betreuung unserer Lieferanten.",
+        ],
+    )
+    def test_generic_terms_do_not_pick_gesundheit(self, classifier, text):
+        assert classifier.classify(text).branche is None
+
+    def test_single_signal_stays_below_threshold(self, classifier):
+        result = classifier.classify("Wir suchen Unterstützung im Krankenhaus.")
+        assert result.confidence < 0.5
+        assert classify_industry_local("Wir suchen Unterstützung im Krankenhaus.")["branche"] is None
+
+    def test_empty_text(self, classifier):
+        result = classifier.classify("")
+        assert result.branche is None
+        assert result.unternehmensgroesse is None
+
+
+class TestClassifyIndustry:
+    def test_local_result_skips_llm(self):
+        api_client = MagicMock()
+        result = classify_industry(IT_POSTING, api_client)
+        assert result["branche"] == "it_software"
+        api_client.classify_industry.assert_not_called()
+
+    def test_llm_fallback_when_unsure(self):
+        api_client = MagicMock()
+        api_client.classify_industry.return_value = {"branche": "marketing", "unternehmensgroesse": "kmu"}
+
+        result = classify_industry(UNCLEAR_POSTING, api_client)
+
+        assert result == {"branche": "marketing", "unternehmensgroesse": "kmu"}
+        api_client.classify_industry.assert_called_once_with(UNCLEAR_POSTING)
+        api_client.extract_bewerbung_details.assert_not_called()
+
+    def test_llm_fallback_ignores_invalid_values(self):
+        api_client = MagicMock()
+        api_client.classify_industry.return_value = {"branche": "landwirtschaft", "unternehmensgroesse": "riesig"}
+        assert classify_industry(UNCLEAR_POSTING, api_client) == {"branche": None, "unternehmensgroesse": None}
+
+    def test_llm_failure_keeps_local_result(self):
+        api_client = MagicMock()
+        api_client.classify_industry.side_effect = RuntimeError("down")
+        assert classify_industry(UNCLEAR_POSTING, api_client) == {"branche": None, "unternehmensgroesse": None}
+
+    def test_local_only_without_client(self):
+        assert classify_industry_local(UNCLEAR_POSTING) == {"branche": None, "unternehmensgroesse": None}
+
+
+class TestGeneratorUsesPreviewClassification:
+    def _generator(self):
+        from services.generator import BewerbungsGenerator
+
+        gen = BewerbungsGenerator.__new__(BewerbungsGenerator)
+        gen.api_client = MagicMock()
+        gen.warnings = []
+        return gen
+
+    def test_preview_classification_is_reused(self):
+        gen = self._generator()
+        details = gen._extract_details(
+            PFLEGE_POSTING,
+            "Klinikum",
+            {"description": PFLEGE_POSTING, "position": "Pflegefachkraft", "branche": "gesundheit"},
+        )
+        assert details["branche"] == "gesundheit"
+        gen.api_client.extract_bewerbung_details.assert_not_called()
+        gen.api_client.classify_industry.assert_not_called()
+
+    def test_missing_classification_is_computed_without_full_extraction(self):
+        gen = self._generator()
+        details = gen._extract_details(IT_POSTING, "Firma", {"description": IT_POSTING, "position": "Dev"})
+        assert details["branche"] == "it_software"
+        gen.api_client.extract_bewerbung_details.assert_not_called()
@@ -0,0 +1,317 @@
+"""Tests for the durable generation job queue and its endpoints."""
+
+import json
+import threading
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+from models import GenerationJob, db
+from services import job_queue
+from services.job_queue import (
+    ABANDONED_JOB_ERROR,
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    JOB_SUCCEEDED,
+    claim_next_job,
+    cleanup_finished_jobs,
+    enqueue_job,
+    finish_job,
+    iter_job_events,
+    load_events,
+    register_job_handler,
+    requeue_stale_jobs,
+    run_job,
+    run_worker,
+    set_job_application,
+)
+
+
+def _handler(payload, emit):
+    emit({"step": 1, "total_steps": 2, "message": "eins"})
+    emit({"type": "content", "text": payload["text"]})
+    return {"success": True, "echo": payload["text"]}
+
+
+@patch.dict(job_queue._handlers, clear=False)
+class TestJobLifecycle:
+    def test_claim_is_exclusive(self, app, test_user):
+        job = enqueue_job(test_user["id"], "test", {"text": "hallo"})
+
+        claimed = claim_next_job("worker-a")
+        assert claimed.id == job.id
+        assert claimed.status == JOB_RUNNING
+        assert claimed.attempts == 1
+        assert claim_next_job("worker-b") is None
+
+    def test_run_job_persists_events_and_result(self, app, test_user):
+        register_job_handler("test", _handler)
+        job = enqueue_job(test_user["id"], "test", {"text": "hallo"})
+
+        run_job(claim_next_job("worker"))
+
+        db.session.refresh(job)
+        assert job.status == JOB_SUCCEEDED
+        assert json.loads(job.result_json) == {"success": True, "echo": "hallo"}
+        events = load_events(job.id)
+        assert [seq for seq, _ in events] == [1, 2]
+        assert events[1][1] == {"type": "content", "text": "hallo"}
+        assert load_events(job.id, after_seq=1) == events[1:]
+
+    def test_value_error_fails_job_with_message(self, app, test_user):
+        def failing(payload, emit):
+            raise ValueError("Lebenslauf nicht gefunden")
+
+        register_job_handler("test", failing)
+        job = enqueue_job(test_user["id"], "test", {})
+
+        run_job(claim_next_job("worker"))
+
+        db.session.refresh(job)
+        assert job.status == JOB_FAILED
+        assert job.error == "Lebenslauf nicht gefunden"
+
+    def test_unknown_kind_fails(self, app, test_user):
+        job = enqueue_job(test_user["id"], "gibt-es-nicht", {})
+        run_job(claim_next_job("worker"))
+        db.session.refresh(job)
+        assert job.status == JOB_FAILED
+
+    def test_stale_job_is_requeued_then_abandoned(self, app, test_user):
+        on_abandon = MagicMock()
+        register_job_handler("test", _handler, on_abandon=on_abandon)
+        job = enqueue_job(test_user["id"], "test", {"text": "x"})
+
+        for expected in (JOB_QUEUED, JOB_FAILED):
+            claim_next_job("worker")
+            job.heartbeat_at = datetime.utcnow() - timedelta(hours=1)
+            db.session.commit()
+            assert requeue_stale_jobs() == 1
+            db.session.refresh(job)
+            assert job.status == expected
+
+        assert job.error == ABANDONED_JOB_ERROR
+        on_abandon.assert_called_once_with({"text": "x"})
+
+    def test_requeue_skips_job_reclaimed_after_read(self, app, test_user):
+        on_abandon = MagicMock()
+        register_job_handler("test", _handler, on_abandon=on_abandon)
+        job = enqueue_job(test_user["id"], "test", {"text": "x"})
+        claim_next_job("worker-a")
+        job.heartbeat_at = datetime.utcnow() - timedelta(hours=1)
+        job.attempts = 99
+        db.session.commit()
+        real_rollback = db.session.rollback
+
+        def heartbeat_between_read_and_update():
+            # Another worker's heartbeat lands right after the stale read
+            real_rollback()
+            job.heartbeat_at = datetime.utcnow()
+            db.session.commit()
+
+        with patch.object(db.session, "rollback", side_effect=heartbeat_between_read_and_update):
+            assert requeue_stale_jobs() == 0
+
+        db.session.refresh(job)
+        assert job.status == JOB_RUNNING
+        on_abandon.assert_not_called()
+
+    def test_result_of_reclaimed_attempt_is_dropped(self, app, test_user):
+        job = enqueue_job(test_user["id"], "test", {})
+        claim_next_job("worker-a")
+        job.heartbeat_at = datetime.utcnow() - timedelta(hours=1)
+        db.session.commit()
+        requeue_stale_jobs()
+        claim_next_job("worker-b")
+
+        assert finish_job(job.id, "worker-a", result={"success": True}) is False
+
+        db.session.refresh(job)
+        assert job.status == JOB_RUNNING
+        assert job.worker_id == "worker-b"
+
+    def test_rerun_receives_saved_application(self, app, test_user):
+        payloads = []
+
+        def handler(payload, emit):
+            payloads.append(payload)
+            return {"success": True}
+
+        register_job_handler("test", handler)
+        job = enqueue_job(test_user["id"], "test", {"text": "x"})
+        claim_next_job("worker-a")
+        set_job_application(job.id, 42)
+        job.heartbeat_at = datetime.utcnow() - timedelta(hours=1)
+        db.session.commit()
+        requeue_stale_jobs()
+
+        run_job(claim_next_job("worker-b"))
+
+        assert payloads == [{"text": "x", "job_id": job.id, "application_id": 42}]
+
+    def test_cleanup_removes_old_finished_jobs(self, app, test_user):
+        register_job_handler("test", _handler)
+        old = enqueue_job(test_user["id"], "test", {"text": "alt"})
+        run_job(claim_next_job("worker"))
+        old.finished_at = datetime.utcnow() - timedelta(days=30)
+        db.session.commit()
+        old_id = old.id
+        pending_id = enqueue_job(test_user["id"], "test", {"text": "neu"}).id
+
+        assert cleanup_finished_jobs(retention_days=7) == 1
+        assert db.session.get(GenerationJob, pending_id) is not None
+        assert load_events(old_id) == []
+
+    def test_iter_job_events_replays_and_ends(self, app, test_user):
+        register_job_handler("test", _handler)
+        job = enqueue_job(test_user["id"], "test", {"text": "hallo"})
+        run_job(claim_next_job("worker"))
+
+        items = list(iter_job_events(job.id, after_seq=1, poll_interval=0.01))
+
+        assert items[0] == (2, {"type": "content", "text": "hallo"})
+        assert items[-1] == (None, {"type": "complete", "success": True, "echo": "hallo"})
+
+    def test_worker_processes_queued_job(self, app, test_user):
+        done = threading.Event()
+
+        def handler(payload, emit):
+            done.set()
+            return {"ok": True}
+
+        register_job_handler("test", handler)
+        job = enqueue_job(test_user["id"], "test", {})
+        stop = threading.Event()
+        worker = threading.Thread(target=run_worker, args=(app,), kwargs={"concurrency": 1, "stop": stop})
+        worker.start()
+        try:
+            assert done.wait(5)
+        finally:
+            stop.set()
+            worker.join(5)
+
+        db.session.refresh(job)
+        assert job.status == JOB_SUCCEEDED
+
+
+class TestGenerationJobRoutes:
+    def _stream_events(self, response):
+        return [
+            json.loads(line[6:]) for line in response.get_data(as_text=True).split("\n") if line.startswith("data: ")
+        ]
+
+    def test_stream_enqueues_when_queue_enabled(self, app, client, auth_headers):
+        with (
+            patch("routes.applications.generation.config") as mock_config,
+            patch("routes.applications.generation.job_event_stream") as stream,
+        ):
+            mock_config.GENERATION_QUEUE_ENABLED = True
+            stream.return_value = app.response_class("", mimetype="text/event-stream")
+            response = client.post(
+                "/api/applications/generate-from-url-stream",
+                json={"url": "https://example.com/job", "model": "kimi"},
+                headers=auth_headers,
+            )
+
+        assert response.status_code == 200
+        job = GenerationJob.query.one()
+        assert job.status == JOB_QUEUED
+        assert json.loads(job.payload_json)["model"] == "kimi"
+        assert stream.call_args.kwargs["initial_event"] == {"type": "job", "job_id": job.id}
+
+    def test_stream_runs_in_process_by_default(self, app, client, auth_headers):
+        def fake_generation(payload, emit):
+            emit({"step": 1, "total_steps": 7, "message": "Stellenanzeige wird geladen..."})
+            return {"success": True, "pdf_path": "x.pdf"}
+
+        with patch("routes.applications.generation.run_url_generation", side_effect=fake_generation):
+            response = client.post(
+                "/api/applications/generate-from-url-stream",
+                json={"url": "https://example.com/job"},
+                headers=auth_headers,
+            )
+            events = self._stream_events(response)
+
+        assert events[0]["type"] == "job"
+        assert events[1]["step"] == 1
+        assert events[-1] == {"type": "complete", "success": True, "pdf_path": "x.pdf"}
+        assert GenerationJob.query.count() == 0
+
+    def test_reattach_replays_finished_job(self, app, client, auth_headers, test_user):
+        with patch.dict(job_queue._handlers, clear=False):
+            register_job_handler("test", _handler)
+            job = enqueue_job(test_user["id"], "test", {"text": "hallo"})
+            run_job(claim_next_job("worker"))
+
+        response = client.get(f"/api/applications/generation-jobs/{job.id}/stream?after=1", headers=auth_headers)
+        body = response.get_data(as_text=True)
+
+        assert body.startswith("id: 2\n")
+        events = self._stream_events(response)
+        assert events[0] == {"type": "content", "text": "hallo"}
+        assert events[-1]["type"] == "complete"
+
+    def test_poll_returns_state_and_events(self, app, client, auth_headers, test_user):
+        job = enqueue_job(test_user["id"], "test", {})
+        claim_next_job("worker")
+        finish_job(job.id, "worker", result={"success": True})
+
+        response = client.get(f"/api/applications/generation-jobs/{job.id}", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.json["job"]["status"] == JOB_SUCCEEDED
+        assert response.json["job"]["result"] == {"success": True}
+        assert response.json["events"] == []
+
+    def test_rerun_returns_application_saved_by_earlier_attempt(self, app, test_user):
+        from models import Application
+        from routes.applications.generation import _refund_abandoned_generation, run_url_generation
+
+        saved = Application(user_id=test_user["id"], firma="Test GmbH", position="Dev", pdf_path="x.pdf")
+        db.session.add(saved)
+        db.session.commit()
+        payload = {
+            "user_id": test_user["id"],
+            "url": "https://example.com/job",
+            "job_id": "j",
+            "application_id": saved.id,
+        }
+
+        with (
+            patch("routes.applications.generation.BewerbungsGenerator") as generator,
+            patch("routes.applications.generation.decrement_application_count") as refund,
+        ):
+            result = run_url_generation(payload, MagicMock())
+            _refund_abandoned_generation(payload)
+
+        generator.assert_not_called()
+        refund.assert_not_called()
+        assert result["application"]["id"] == saved.id
+        assert result["pdf_path"] == "x.pdf"
+
+    def test_saved_application_is_recorded_on_the_job(self, app, test_user):
+        from services.generator import BewerbungsGenerator
+
+        job = enqueue_job(test_user["id"], "test", {})
+        generator = BewerbungsGenerator.__new__(BewerbungsGenerator)
+        generator.user_id = test_user["id"]
+        generator.extracted_links = None
+        generator.on_application_saved = lambda application_id: set_job_application(job.id, application_id)
+        details = {"position": "Dev", "ansprechpartner": "Damen und Herren", "quelle": "Test"}
+
+        generator._save_application("Test GmbH", details, "x.pdf", "Betreff", "Text", "Brief", "Anzeige")
+
+        db.session.refresh(job)
+        assert job.application_id is not None
+
+    def test_other_users_job_is_not_found(self, app, client, auth_headers, test_user):
+        from models import User
+
+        other = User(email="other@example.com", full_name="Other")
+        other.set_password("TestPass123")
+        db.session.add(other)
+        db.session.commit()
+        job = enqueue_job(other.id, "test", {})
+
+        assert client.get(f"/api/applications/generation-jobs/{job.id}", headers=auth_headers).status_code == 404
+        assert client.get(f"/api/applications/generation-jobs/{job.id}/stream", headers=auth_headers).status_code == 404
@@ -0,0 +1,181 @@
+"""Tests for JobRecommender search scoring."""
+
+import time
+from unittest.mock import MagicMock, patch
+
+from services.bundesagentur_client import BundesagenturJob
+from services.concurrency import map_bounded
+
+
+def _make_job(idx, description="Wir suchen Verstärkung mit Python, Django und PostgreSQL Erfahrung im Team."):
+    return BundesagenturJob(
+        refnr=f"10000-{idx}",
+        titel=f"Python Developer {idx}",
+        beruf="Softwareentwickler",
+        arbeitgeber="Tech GmbH",
+        beschreibung=description,
+    )
+
+
+def _make_recommender(jobs):
+    with (
+        patch("services.job_recommender.WebScraper"),
+        patch("services.job_recommender.RequirementAnalyzer"),
+        patch("services.job_recommender.BundesagenturClient"),
+    ):
+        from services.job_recommender import JobRecommender
+
+        recommender = JobRecommender()
+    recommender.ba_client.search_jobs.return_value = (jobs, len(jobs))
+    recommender.check_duplicate = MagicMock(return_value=False)
+    recommender.fit_calculator = MagicMock()
+    recommender.fit_calculator.calculate_fit_from_dicts.side_effect = lambda skills, reqs: {
+        "score": reqs[0]["score"],
+        "category": "gut",
+        "matched": [],
+        "missing": [],
+    }
+    return recommender
+
+
+class TestMapBounded:
+    def test_preserves_input_order(self):
+        def slow_identity(x):
+            time.sleep(0.05 if x == 0 else 0)
+            return x
+
+        results = [result for _, result, _ in map_bounded(slow_identity, range(5), max_workers=5)]
+        assert results == [0, 1, 2, 3, 4]
+
+    def test_runs_concurrently(self):
+        start = time.monotonic()
+        list(map_bounded(lambda _: time.sleep(0.1), range(5), max_workers=5))
+        assert time.monotonic() - start < 0.4
+
+    def test_errors_are_yielded(self):
+        def fail_on_two(x):
+            if x == 2:
+                raise ValueError("boom")
+            return x
+
+        outcomes = list(map_bounded(fail_on_two, range(3), max_workers=2))
+        assert outcomes[1] == (1, 1, None)
+        assert isinstance(outcomes[2][2], ValueError)
+
+    def test_timeout_is_reported(self):
+        outcomes = list(map_bounded(lambda _: time.sleep(0.3), [1], timeout=0.05))
+        assert isinstance(outcomes[0][2], TimeoutError)
+
+    def test_timeouts_run_concurrently(self):
+        start = time.monotonic()
+        outcomes = list(map_bounded(lambda _: time.sleep(0.5), range(4), max_workers=4, timeout=0.1))
+        assert all(isinstance(error, TimeoutError) for _, _, error in outcomes)
+        assert time.monotonic() - start < 0.3
+
+    def test_queued_call_gets_full_timeout(self):
+        outcomes = list(map_bounded(lambda x: time.sleep(0.15) or x, range(2), max_workers=1, timeout=0.2))
+        assert outcomes == [(0, 0, None), (1, 1, None)]
+
+    def test_early_stop_cancels_pending_work(self):
+        calls = []
+
+        def record(x):
+            calls.append(x)
+            time.sleep(0.05)
+            return x
+
+        gen = map_bounded(record, range(20), max_workers=2)
+        for _, result, _ in gen:
+            if result == 1:
+                break
+        gen.close()
+        time.sleep(0.2)
+        assert len(calls) < 20
+
+
+class TestSearchAndScoreJobs:
+    @patch("services.job_recommender.UserSkill")
+    def test_scores_in_parallel_and_keeps_order(self, mock_skill):
+        mock_skill.query.filter_by.return_value.all.return_value = [MagicMock()]
+        jobs = [_make_job(i) for i in range(4)]
+        recommender = _make_recommender(jobs)
+
+        def analyze(job_text):
+            time.sleep(0.1)
+            return [{"score": 60}]
+
+        recommender.requirement_analyzer.analyze_requirements.side_effect = analyze
+
+        start = time.monotonic()
+        result = recommender.search_and_score_jobs(user_id=1, keywords="Python", max_results=4)
+        elapsed = time.monotonic() - start
+
+        assert [r["title"] for r in result["results"]] == [f"Python Developer {i}" for i in range(4)]
+        assert all(r["fit_score"] == 60 for r in result["results"])
+        assert elapsed < 0.35
+
+    @patch("services.job_recommender.UserSkill")
+    def test_stops_after_max_results(self, mock_skill):
+        mock_skill.query.filter_by.return_value.all.return_value = [MagicMock()]
+        recommender = _make_recommender([_make_job(i) for i in range(6)])
+        recommender.requirement_analyzer.analyze_requirements.return_value = [{"score": 70}]
+
+        result = recommender.search_and_score_jobs(user_id=1, keywords="Python", max_results=3)
+
+        assert len(result["results"]) == 3
+
+    @patch("services.job_recommender.UserSkill")
+    def test_falls_back_to_title_score_on_error(self, mock_skill):
+        skill = MagicMock()
+        skill.skill_name = "Python"
+        mock_skill.query.filter_by.return_value.all.return_value = [skill]
+        recommender = _make_recommender([_make_job(1)])
+        recommender.requirement_analyzer.analyze_requirements.side_effect = RuntimeError("API down")
+
+        result = recommender.search_and_score_jobs(user_id=1, keywords="Python", max_results=1)
+
+        assert result["results"][0]["fit_score"] == 50
+        assert result["results"][0]["missing_skills"] == []
+
+
+class TestParallelKeywordSearch:
+    def test_keywords_are_searched_in_parallel_and_merged_in_order(self):
+        recommender = _make_recommender([])
+        results = {
+            "Python": [_make_job(1), _make_job(2)],
+            "Django": [_make_job(2), _make_job(3)],
+            "SQL": [_make_job(4)],
+        }
+
+        def search(keywords, **params):
+            time.sleep(0.3 if keywords == "Python" else 0.1)
+            return results[keywords], len(results[keywords]) * 10
+
+        recommender.ba_client.search_jobs.side_effect = search
+
+        start = time.monotonic()
+        jobs, total = recommender._search_deduplicated(["Python", "Django", "SQL"], location="Berlin")
+        elapsed = time.monotonic() - start
+
+        assert [job.refnr for job in jobs] == ["10000-1", "10000-2", "10000-3", "10000-4"]
+        assert total == 50
+        assert elapsed < 0.45
+        assert recommender.ba_client.search_jobs.call_args.kwargs["location"] == "Berlin"
+
+    def test_failing_or_slow_query_is_skipped(self):
+        recommender = _make_recommender([])
+
+        def search(keywords, **params):
+            if keywords == "Kaputt":
+                raise RuntimeError("API down")
+            if keywords == "Langsam":
+                time.sleep(0.5)
+            return [_make_job(keywords)], 1
+
+        recommender.ba_client.search_jobs.side_effect = search
+
+        with patch("services.job_recommender.config.BA_SEARCH_TIMEOUT", 0.1):
+            jobs, total = recommender._search_deduplicated(["Kaputt", "Langsam", "Python"])
+
+        assert [job.refnr for job in jobs] == ["10000-Python"]
+        assert total == 1
@@ -0,0 +1,150 @@
+"""Tests for the LLM response cache and the durable SQLite store."""
+
+import time
+from unittest.mock import MagicMock, patch
+
+from services.llm_cache import MISS, LLMResponseCache
+from services.local_store import SQLiteKVStore
+
+
+def _messages(text="Analysiere diese Stellenanzeige"):
+    return [{"role": "user", "content": text}]
+
+
+class TestSQLiteKVStore:
+    def test_set_and_get(self, tmp_path):
+        store = SQLiteKVStore(str(tmp_path / "cache.sqlite3"), table="entries")
+        store.set("a", "value", ttl=60)
+        assert store.get("a") == "value"
+
+    def test_expired_entries_are_hidden(self, tmp_path):
+        store = SQLiteKVStore(str(tmp_path / "cache.sqlite3"), table="entries")
+        store.set("a", "value", ttl=-1)
+        assert store.get("a") is None
+        assert store.get_entry("a", include_expired=True)[0] == "value"
+
+    def test_prune_enforces_max_entries(self, tmp_path):
+        store = SQLiteKVStore(str(tmp_path / "cache.sqlite3"), table="entries", max_entries=2)
+        for key in ("a", "b", "c"):
+            store.set(key, key, ttl=60)
+            time.sleep(0.01)
+        store.prune()
+        assert store.get("a") is None
+        assert store.get("c") == "c"
+
+    def test_shared_between_instances(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite3")
+        SQLiteKVStore(path, table="entries").set("a", "value", ttl=60)
+        assert SQLiteKVStore(path, table="entries").get("a") == "value"
+
+
+class TestLLMResponseCache:
+    def test_key_depends_on_all_parameters(self):
+        base = LLMResponseCache.make_key("json", "qwen", _messages(), 0.2, 500)
+        assert base == LLMResponseCache.make_key("json", "qwen", _messages(), 0.2, 500)
+        assert base != LLMResponseCache.make_key("json", "qwen", _messages(), 0.3, 500)
+        assert base != LLMResponseCache.make_key("json", "qwen", _messages(), 0.2, 600)
+        assert base != LLMResponseCache.make_key("json", "kimi", _messages(), 0.2, 500)
+        assert base != LLMResponseCache.make_key("json", "qwen", _messages("anders"), 0.2, 500)
+
+    def test_memory_hit_and_miss_counters(self):
+        cache = LLMResponseCache()
+        assert cache.get("k") is MISS
+        cache.set("k", {"a": 1}, ttl=60)
+        assert cache.get("k") == {"a": 1}
+        stats = cache.stats()
+        assert stats["memory_hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_lru_eviction(self):
+        cache = LLMResponseCache(max_entries=2)
+        cache.set("a", 1, ttl=60)
+        cache.set("b", 2, ttl=60)
+        cache.get("a")
+        cache.set("c", 3, ttl=60)
+        assert cache.get("b") is MISS
+        assert cache.get("a") == 1
+
+    def test_store_tier_survives_new_process_cache(self, tmp_path):
+        store = SQLiteKVStore(str(tmp_path / "llm.sqlite3"), table="llm_responses")
+        LLMResponseCache(store=store).set("k", ["x"], ttl=60)
+
+        fresh = LLMResponseCache(store=store)
+        assert fresh.get("k") == ["x"]
+        assert fresh.stats()["store_hits"] == 1
+
+    def test_non_durable_entries_stay_in_memory(self, tmp_path):
+        store = SQLiteKVStore(str(tmp_path / "llm.sqlite3"), table="llm_responses")
+        cache = LLMResponseCache(store=store)
+        cache.set("cv", {"full_name": "Max Mustermann"}, ttl=60, durable=False)
+
+        assert cache.get("cv") == {"full_name": "Max Mustermann"}
+        assert store.get("cv") is None
+        assert LLMResponseCache(store=store).get("cv") is MISS
+
+    def test_returns_independent_copies(self):
+        cache = LLMResponseCache()
+        cache.set("k", {"a": [1]}, ttl=60)
+        cache.get("k")["a"].append(2)
+        assert cache.get("k") == {"a": [1]}
+
+
+class TestAIClientCaching:
+    def _client(self, cache):
+        with patch("services.ai_client.OpenAI"):
+            from services.ai_client import AIClient
+
+            with patch("services.ai_client.config") as mock_config:
+                mock_config.OPENROUTER_API_KEY = "key"
+                mock_config.FIREWORKS_API_KEY = "key"
+                client = AIClient()
+        client.model = "qwen"
+        client._call_api_json = MagicMock(return_value={"skills": []})
+        return client
+
+    def test_cached_call_hits_provider_once(self):
+        cache = LLMResponseCache()
+        client = self._client(cache)
+        with patch("services.ai_client.get_llm_cache", return_value=cache):
+            for _ in range(3):
+                client._call_api_json_with_retry(_messages(), max_tokens=100, temperature=0.1, cache_ttl=60)
+        assert client._call_api_json.call_count == 1
+
+    def test_no_ttl_means_no_caching(self):
+        cache = LLMResponseCache()
+        client = self._client(cache)
+        with patch("services.ai_client.get_llm_cache", return_value=cache):
+            client._call_api_json_with_retry(_messages(), max_tokens=100, temperature=0.1)
+            client._call_api_json_with_retry(_messages(), max_tokens=100, temperature=0.1)
+        assert client._call_api_json.call_count == 2
+
+    def test_bypass_refreshes_entry(self):
+        cache = LLMResponseCache()
+        client = self._client(cache)
+        with patch("services.ai_client.get_llm_cache", return_value=cache):
+            client._call_api_json_with_retry(_messages(), max_tokens=100, temperature=0.1, cache_ttl=60)
+            client._call_api_json.return_value = {"skills": ["Python"]}
+            fresh = client._call_api_json_with_retry(
+                _messages(), max_tokens=100, temperature=0.1, cache_ttl=60, bypass_cache=True
+            )
+            cached = client._call_api_json_with_retry(_messages(), max_tokens=100, temperature=0.1, cache_ttl=60)
+        assert fresh == cached == {"skills": ["Python"]}
+        assert client._call_api_json.call_count == 2
+
+    def test_cv_extraction_is_not_stored_on_disk(self, tmp_path):
+        from services.profile_extractor import ProfileExtractor
+
+        store = SQLiteKVStore(str(tmp_path / "llm.sqlite3"), table="llm_responses")
+        cache = LLMResponseCache(store=store)
+        client = self._client(cache)
+        client._call_api_json.return_value = {"full_name": "Max Mustermann"}
+        with patch("services.profile_extractor.AIClient", return_value=client):
+            extractor = ProfileExtractor()
+        with patch("services.ai_client.get_llm_cache", return_value=cache):
+            extractor.extract_profile_from_cv("Max Mustermann, Berlin")
+            extractor.extract_profile_from_cv("Max Mustermann, Berlin")
+
+        assert client._call_api_json.call_count == 1
+        assert cache.stats()["writes"] == 1
+        assert store._connect().execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0] == 0
@@ -0,0 +1,124 @@
+"""Tests for the parse-once posting document (services/scrapers/document.py)."""
+
+from unittest.mock import PropertyMock, patch
+
+import pytest
+import requests
+from bs4 import BeautifulSoup
+
+from services.scrapers.document import ParsedPage, resolve_charset
+from services.web_scraper import WebScraper
+
+PAGE = """<html><head><title>Stelle</title><script>var tracking = 1;</script><style>p {}</style></head>
+<body><header><a href="/home">Startseite</a></header><nav><a href="/jobs">Alle Jobs</a></nav>
+<h1>Python Entwickler (m/w/d)</h1><!-- Kommentar --><p>Wir suchen
+dich. <b>Jetzt</b></p>
+<a href="mailto:hr@beispiel.de?subject=Bewerbung">Bewerben <span>hier</span><script>x()</script></a>
+<a href="/team">Team</a><template>Vorlage</template><footer>Impressum</footer></body></html>"""
+
+
+def _response(body: bytes, content_type: str = "text/html") -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response._content = body
+    response.headers["Content-Type"] = content_type
+    return response
+
+
+def _two_tree_extraction(html: str, parser: str) -> tuple[str, list]:
+    """The previous extraction: decompose hidden tags on a second tree, then get_text."""
+    soup = BeautifulSoup(html, parser)
+    for tag in soup(["script", "style", "nav", "header", "footer"]):
+        tag.decompose()
+    text = soup.get_text(separator="\n", strip=True)
+    text = "\n".join(line.strip() for line in text.splitlines() if line.strip())
+    return text, [link.get_text(strip=True) for link in soup.find_all("a", href=True)]
+
+
+class TestParsedPage:
+    @pytest.mark.parametrize("parser", ["html.parser", "lxml"])
+    def test_matches_previous_extraction(self, parser):
+        page = ParsedPage(PAGE, "https://beispiel.de/stelle", parser)
+
+        text, link_texts = _two_tree_extraction(PAGE, parser)
+
+        assert page.text == text
+        assert [link["text"] for link in page.links["all_links"]] == link_texts
+
+    def test_extraction_does_not_modify_tree(self):
+        page = ParsedPage(PAGE, "https://beispiel.de/stelle")
+
+        assert "Python Entwickler" in page.text
+        assert page.links["all_links"]
+        assert page.soup.find("script").string == "var tracking = 1;"
+        assert page.soup.find("nav") is not None
+
+    def test_link_groups(self):
+        page = ParsedPage(PAGE, "https://beispiel.de/stelle")
+
+        assert page.links["all_links"] == [
+            {"url": "mailto:hr@beispiel.de?subject=Bewerbung", "text": "Bewerbenhier"},
+            {"url": "https://beispiel.de/team", "text": "Team"},
+        ]
+        assert page.links["email_links"] == [{"email": "hr@beispiel.de", "text": "Bewerbenhier"}]
+        assert [link["text"] for link in page.links["application_links"]] == ["Bewerbenhier"]
+
+    def test_text_skips_hidden_and_comment_nodes(self):
+        text = ParsedPage(PAGE, "https://beispiel.de/stelle").text
+
+        for hidden in ("tracking", "Startseite", "Alle Jobs", "Kommentar", "Vorlage", "Impressum"):
+            assert hidden not in text
+
+
+class TestResolveCharset:
+    def test_header_charset_wins(self):
+        response = _response("Größe".encode("latin-1"), "text/html; charset=ISO-8859-1")
+
+        assert resolve_charset(response) == "iso8859-1"
+
+    def test_meta_charset_without_header_charset(self):
+        body = '<html><head><meta charset="windows-1252"></head><body>Größe</body></html>'.encode("cp1252")
+
+        assert resolve_charset(_response(body)) == "cp1252"
+
+    def test_http_equiv_meta(self):
+        body = b'<meta http-equiv="Content-Type" content="text/html; charset=iso-8859-15"><p>x</p>'
+
+        assert resolve_charset(_response(body)) == "iso8859-15"
+
+    def test_bom(self):
+        assert resolve_charset(_response("<p>Größe</p>".encode("utf-8-sig"))) == "utf-8-sig"
+
+    def test_valid_utf8_skips_detection(self):
+        response = _response("<p>Größe</p>".encode())
+        with patch.object(requests.Response, "apparent_encoding", new_callable=PropertyMock) as detect:
+            assert resolve_charset(response) == "utf-8"
+        detect.assert_not_called()
+
+    def test_unknown_declarations_fall_back_to_detection(self):
+        response = _response('<meta charset="kaputt"><p>Größe</p>'.encode("latin-1"), "text/html; charset=kaputt")
+        with patch.object(requests.Response, "apparent_encoding", new_callable=PropertyMock, return_value="latin-1"):
+            assert resolve_charset(response) == "iso8859-1"
+
+    def test_from_response_decodes_with_resolved_charset(self):
+        body = '<html><head><meta charset="iso-8859-1"></head><body><p>Bäckerei Müller</p></body></html>'
+        page = ParsedPage.from_response(_response(body.encode("latin-1")), "https://beispiel.de")
+
+        assert page.encoding == "iso8859-1"
+        assert page.text == "Bäckerei Müller"
+
+
+class TestWebScraperParsesOnce:
+    def test_structured_fetch_builds_one_tree(self):
+        scraper = WebScraper()
+        response = _response(PAGE.encode(), "text/html; charset=utf-8")
+        with (
+            patch.object(scraper, "_fetch_page", return_value=response),
+            patch("services.scrapers.document.BeautifulSoup", wraps=BeautifulSoup) as build,
+        ):
+            result = scraper.fetch_structured_job_posting("https://beispiel.de/stelle")
+
+        assert build.call_count == 1
+        assert result["title"] == "Stelle"
+        assert result["contact_email"] == "hr@beispiel.de"
+        assert "Wir suchen" in result["text"]
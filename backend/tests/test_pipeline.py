@@ -0,0 +1,80 @@
+"""Tests for the dependency-graph pipeline executor."""
+
+import threading
+
+import pytest
+
+from services.pipeline import PipelineError, Stage, run_pipeline
+
+
+class TestRunPipeline:
+    def test_passes_dependency_results(self):
+        results, timings = run_pipeline(
+            [
+                Stage("a", lambda: 2),
+                Stage("b", lambda a: a * 3, deps=("a",)),
+                Stage("c", lambda a, b: a + b, deps=("a", "b")),
+            ]
+        )
+        assert results == {"a": 2, "b": 6, "c": 8}
+        assert set(timings) == {"a", "b", "c"}
+
+    def test_independent_stages_overlap(self):
+        barrier = threading.Barrier(2, timeout=2)
+
+        def meet():
+            barrier.wait()
+            return True
+
+        # Both stages only finish if they run at the same time
+        results, _ = run_pipeline([Stage("worker", meet), Stage("inline", meet, inline=True)])
+        assert results == {"worker": True, "inline": True}
+
+    def test_inline_stages_run_on_caller_thread(self):
+        caller = threading.get_ident()
+        results, _ = run_pipeline(
+            [
+                Stage("inline", threading.get_ident, inline=True),
+                Stage("worker", threading.get_ident),
+            ]
+        )
+        assert results["inline"] == caller
+        assert results["worker"] != caller
+
+    def test_after_orders_without_passing_result(self):
+        order = []
+        run_pipeline(
+            [
+                Stage("first", lambda: order.append("first"), inline=True),
+                Stage("second", lambda: order.append("second"), after=("first",)),
+            ]
+        )
+        assert order == ["first", "second"]
+
+    def test_error_skips_dependents(self):
+        dependent_calls = []
+
+        def fail():
+            raise ValueError("kaputt")
+
+        with pytest.raises(ValueError, match="kaputt"):
+            run_pipeline([Stage("a", fail), Stage("b", lambda a: dependent_calls.append(a), deps=("a",))])
+        assert dependent_calls == []
+
+    def test_hooks_called_per_stage(self):
+        started, done = [], []
+        run_pipeline(
+            [Stage("a", lambda: 1), Stage("b", lambda a: a, deps=("a",), inline=True)],
+            on_stage_start=started.append,
+            on_stage_done=lambda name, seconds: done.append(name),
+        )
+        assert started == ["a", "b"]
+        assert done == ["a", "b"]
+
+    def test_unknown_dependency(self):
+        with pytest.raises(PipelineError, match="unbekannten"):
+            run_pipeline([Stage("a", lambda b: b, deps=("b",))])
+
+    def test_cycle(self):
+        with pytest.raises(PipelineError, match="Zyklische"):
+            run_pipeline([Stage("a", lambda b: b, deps=("b",)), Stage("b", lambda a: a, deps=("a",))])
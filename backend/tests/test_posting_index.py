@@ -0,0 +1,172 @@
+"""Tests for the local job posting index and its use by JobRecommender."""
+
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from models import JobPosting, JobPostingSearch
+from services.bundesagentur_client import BundesagenturJob, build_search_params
+from services.posting_index import PostingIndex, canonical_url, posting_key
+
+
+def _job(refnr: str, titel: str, ort: str = "Berlin", plz: str = "10115", beschreibung: str = "") -> BundesagenturJob:
+    return BundesagenturJob(
+        refnr=refnr,
+        titel=titel,
+        beruf="Softwareentwickler/in",
+        arbeitgeber="Test GmbH",
+        arbeitsort=ort,
+        arbeitsort_plz=plz,
+        veroeffentlicht_am=datetime.utcnow().date().isoformat(),
+        beschreibung=beschreibung,
+        url=f"https://www.arbeitsagentur.de/jobsuche/jobdetail/{refnr}",
+    )
+
+
+@pytest.fixture
+def index(app):
+    return PostingIndex(max_age=3600)
+
+
+class TestPostingKeys:
+    def test_canonical_url_drops_tracking_and_fragment(self):
+        assert (
+            canonical_url("HTTPS://Example.COM/jobs/42/?utm_source=x&b=2&a=1#apply")
+            == "https://example.com/jobs/42?a=1&b=2"
+        )
+
+    def test_ba_detail_url_maps_to_refnr(self):
+        assert posting_key(url="https://www.arbeitsagentur.de/jobsuche/jobdetail/10000-1?x=1") == "ba:10000-1"
+        assert posting_key(refnr="10000-1") == "ba:10000-1"
+        assert posting_key() is None
+
+
+class TestPostingIndex:
+    def test_ingest_deduplicates_by_refnr(self, index):
+        params = build_search_params("Python", location="Berlin")
+        index.ingest_search(params, [_job("1", "Python Entwickler")], total=1)
+        index.ingest_search(params, [_job("1", "Python Entwickler (m/w/d)")], total=1)
+
+        postings = JobPosting.query.all()
+        assert len(postings) == 1
+        assert postings[0].title == "Python Entwickler (m/w/d)"
+
+    def test_unrecorded_query_is_a_gap_even_with_matching_postings(self, index):
+        jobs = [_job(str(n), f"Python Entwickler {n}") for n in range(3)]
+        index.ingest_search(build_search_params("egal"), jobs, total=3)
+
+        assert index.search(build_search_params("Python", size=3)) is None
+        assert index.search(build_search_params("Python", location="Berlin", size=3)) is None
+        assert index.stats()["gaps"] == 2
+
+    def test_other_radius_or_page_is_a_gap(self, index):
+        params = build_search_params("Python", location="Berlin", radius_km=10, size=1)
+        index.ingest_search(params, [_job("1", "Python Entwickler")], total=30)
+
+        assert index.search(params) is not None
+        assert index.search(build_search_params("Python", location="Berlin", radius_km=100, size=1)) is None
+        assert index.search(build_search_params("Python", location="Berlin", radius_km=10, page=2, size=1)) is None
+
+    def test_recorded_search_is_answered_with_its_total(self, index):
+        params = build_search_params("Python", location="Berlin", size=5)
+        index.ingest_search(params, [_job("1", "Python Entwickler"), _job("2", "Python Dev")], total=2)
+
+        found, total = index.search(build_search_params("python ", location="berlin", size=5))
+
+        assert total == 2
+        assert len(found) == 2
+        assert index.stats()["local_hits"] == 1
+
+    def test_recorded_location_search_replays_postings_from_the_radius(self, index):
+        params = build_search_params("Python", location="Berlin", size=5)
+        jobs = [_job("1", "Python Entwickler"), _job("2", "Python Dev", ort="Potsdam", plz="14467")]
+        index.ingest_search(params, jobs, total=40)
+
+        found, total = index.search(params)
+
+        # Potsdam does not match "Berlin" as text, but the live search returned it
+        assert [job.refnr for job in found] == ["1", "2"]
+        assert total == 40
+        assert index.stats()["local_hits"] == 1
+
+    def test_recorded_search_with_pruned_posting_is_a_gap(self, index):
+        params = build_search_params("Python", location="Berlin", size=5)
+        index.ingest_search(params, [_job("1", "Python Entwickler"), _job("2", "Python Dev")], total=2)
+        JobPosting.query.filter_by(refnr="2").delete()
+
+        assert index.search(params) is None
+
+    def test_empty_live_result_is_not_recorded(self, index):
+        index.ingest_search(build_search_params("Python"), [], total=0)
+
+        assert JobPostingSearch.query.count() == 0
+        assert index.search(build_search_params("Python", size=1)) is None
+
+    def test_stale_search_record_goes_live(self, index):
+        params = build_search_params("Python", size=1)
+        index.ingest_search(params, [_job("1", "Python Entwickler")], total=1)
+
+        JobPosting.query.update({"last_seen_at": datetime.utcnow() - timedelta(hours=2)})
+        JobPostingSearch.query.update({"fetched_at": datetime.utcnow() - timedelta(hours=2)})
+        assert index.search(params) is None
+
+    def test_scraped_posting_keeps_description_against_search_result(self, index):
+        url = "https://www.arbeitsagentur.de/jobsuche/jobdetail/1"
+        index.ingest_job_data(
+            {"title": "Python Entwickler", "url": url, "source": "arbeitsagentur", "description": "Volltext"}
+        )
+        index.ingest_search(build_search_params("Python"), [_job("1", "Python Entwickler")], total=1)
+
+        posting = JobPosting.query.one()
+        assert posting.dedup_key == "ba:1"
+        assert posting.description == "Volltext"
+        assert posting.occupation == "Softwareentwickler/in"
+
+    def test_updates_and_prunes_postings(self, index):
+        index.ingest_search(build_search_params("egal"), [_job("1", "Python Entwickler")], total=1)
+        index.ingest_search(build_search_params("egal"), [_job("1", "Golang Entwickler")], total=1)
+
+        assert [posting.title for posting in JobPosting.query.all()] == ["Golang Entwickler"]
+
+        JobPosting.query.update({"last_seen_at": datetime.utcnow() - timedelta(days=40)})
+        assert index.prune(retention_days=30) == 1
+        assert JobPosting.query.count() == 0
+
+
+class TestRecommenderUsesIndex:
+    def _recommender(self):
+        with (
+            patch("services.job_recommender.WebScraper"),
+            patch("services.job_recommender.RequirementAnalyzer"),
+            patch("services.job_recommender.BundesagenturClient"),
+        ):
+            from services.job_recommender import JobRecommender
+
+            return JobRecommender()
+
+    def test_repeat_search_is_served_locally(self, app):
+        recommender = self._recommender()
+        recommender.ba_client.search_jobs = MagicMock(return_value=([_job("1", "Python Entwickler")], 1))
+
+        with patch("services.job_recommender.get_posting_index", return_value=PostingIndex(max_age=3600)):
+            first = recommender._search_deduplicated(["Python"], location="Berlin", size=10)
+            second = recommender._search_deduplicated(["Python"], location="Berlin", size=10)
+
+        assert recommender.ba_client.search_jobs.call_count == 1
+        assert [job.refnr for job in second[0]] == [job.refnr for job in first[0]] == ["1"]
+        assert second[1] == 1
+
+    def test_only_gaps_go_live_and_order_is_kept(self, app):
+        index = PostingIndex(max_age=3600)
+        index.ingest_search(build_search_params("Java", size=1), [_job("j", "Java Entwickler")], total=1)
+        recommender = self._recommender()
+        recommender.ba_client.search_jobs = MagicMock(return_value=([_job("p", "Python Entwickler")], 1))
+
+        with patch("services.job_recommender.get_posting_index", return_value=index):
+            jobs, total = recommender._search_deduplicated(["Python", "Java"], size=1)
+
+        recommender.ba_client.search_jobs.assert_called_once()
+        assert recommender.ba_client.search_jobs.call_args.kwargs["keywords"] == "Python"
+        assert [job.refnr for job in jobs] == ["p", "j"]
+        assert total == 2
@@ -0,0 +1,266 @@
+"""Tests for reverse matching of new postings to users with overlapping skills."""
+
+import threading
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from models import JobRecommendation, User, UserSkill, db
+from services.bundesagentur_client import BundesagenturJob, build_search_params
+from services.posting_index import PostingIndex
+from services.reverse_matcher import ReverseMatcher, SkillRouter, skill_phrases, tokenize
+from services.scheduled_runs import BatchCancelled
+
+
+def _job(refnr: str, titel: str, ort: str = "Berlin") -> BundesagenturJob:
+    return BundesagenturJob(
+        refnr=refnr,
+        titel=titel,
+        beruf="Softwareentwickler/in",
+        arbeitgeber="Tech GmbH",
+        arbeitsort=ort,
+        veroeffentlicht_am=datetime.utcnow().date().isoformat(),
+        url=f"https://www.arbeitsagentur.de/jobsuche/jobdetail/{refnr}",
+    )
+
+
+def _user(email: str, skills: list[tuple[str, str]], location: str = "", working_time: str = "") -> int:
+    user = User(email=email, full_name=email, preferred_location=location, preferred_working_time=working_time)
+    user.set_password("TestPass123")
+    db.session.add(user)
+    db.session.flush()
+    for name, category in skills:
+        db.session.add(UserSkill(user_id=user.id, skill_name=name, skill_category=category))
+    db.session.commit()
+    return user.id
+
+
+def _matcher(jobs_by_keyword: dict[str, list[BundesagenturJob]]) -> ReverseMatcher:
+    with (
+        patch("services.job_recommender.WebScraper"),
+        patch("services.job_recommender.RequirementAnalyzer"),
+        patch("services.job_recommender.BundesagenturClient"),
+    ):
+        from services.job_recommender import JobRecommender
+
+        recommender = JobRecommender()
+    recommender.requirement_analyzer.analyze_requirements.return_value = None
+    recommender.ba_client.search_jobs = MagicMock(
+        side_effect=lambda keywords, **kwargs: (
+            jobs_by_keyword.get(keywords, []),
+            len(jobs_by_keyword.get(keywords, [])),
+        )
+    )
+    return ReverseMatcher(recommender)
+
+
+def _recommended(user_id: int) -> list[str]:
+    return sorted(r.job_url.rsplit("/", 1)[1] for r in JobRecommendation.query.filter_by(user_id=user_id))
+
+
+class TestSkillRouter:
+    def test_tokens_keep_programming_language_names(self):
+        assert tokenize("C++/C#-Entwickler mit Node.js.") == ["c++", "c#", "entwickler", "mit", "node.js"]
+
+    def test_skill_variations_are_routed(self):
+        assert ("django",) in skill_phrases("Python")
+        assert ("python",) in skill_phrases("Django")
+
+    def test_routes_only_users_with_overlapping_skills(self):
+        skills = [
+            UserSkill(user_id=1, skill_name="Python", skill_category="technical"),
+            UserSkill(user_id=2, skill_name="Machine Learning", skill_category="technical"),
+            UserSkill(user_id=3, skill_name="Deutsch", skill_category="languages"),
+            UserSkill(user_id=4, skill_name="Kubernetes", skill_category="tools"),
+        ]
+        router = SkillRouter(skills)
+
+        assert router.route("Django Entwickler (m/w/d), Deutsch fließend") == {1: 1}
+        assert router.route("Engineer für Machine Learning und Kubernetes") == {2: 1, 4: 1}
+        assert router.route("Maschinenbau Ingenieur") == {}
+
+
+class TestReverseMatcher:
+    def test_postings_reach_only_matching_users(self, app):
+        python_dev = _user("py@example.com", [("Python", "technical")])
+        java_dev = _user("java@example.com", [("Java", "technical")])
+        matcher = _matcher(
+            {"Python": [_job("1", "Python Entwickler")], "Java": [_job("2", "Java Entwickler"), _job("3", "Koch")]}
+        )
+
+        stats = matcher.run()
+
+        assert _recommended(python_dev) == ["1"]
+        assert _recommended(java_dev) == ["2"]
+        assert stats["postings"] == 3
+        assert stats["routed"] == 2
+        assert stats["recommendations"] == 2
+
+    def test_users_without_routing_skills_get_their_own_search_results(self, app):
+        soft_only = _user("soft@example.com", [("Kommunikation", "soft_skills"), ("Englisch", "languages")])
+        python_dev = _user("py@example.com", [("Python", "technical")])
+        matcher = _matcher(
+            {
+                "Kommunikation": [_job("1", "Referent Kommunikation (m/w/d)")],
+                "Python": [_job("2", "Python Entwickler")],
+            }
+        )
+
+        stats = matcher.run()
+
+        assert _recommended(soft_only) == ["1"]
+        assert _recommended(python_dev) == ["2"]
+        assert stats["routed"] == 2
+
+    def test_shared_searches_run_once(self, app):
+        for n in range(3):
+            _user(f"user{n}@example.com", [("Python", "technical")], location="Berlin")
+        matcher = _matcher({"Python": [_job("1", "Python Entwickler")]})
+
+        stats = matcher.run()
+
+        assert matcher.recommender.ba_client.search_jobs.call_count == 1
+        assert stats["searches"] == 1
+        assert JobRecommendation.query.count() == 3
+
+    def test_requirements_are_analyzed_once_per_posting(self, app):
+        for n in range(3):
+            _user(f"user{n}@example.com", [("Python", "technical")])
+        job = _job("1", "Python Entwickler")
+        job.beschreibung = "Wir suchen Verstärkung mit Python, Django und PostgreSQL Erfahrung im Team. " * 2
+        matcher = _matcher({"Python": [job]})
+        analyzer = matcher.recommender.requirement_analyzer.analyze_requirements
+        analyzer.return_value = [{"requirement_text": "Python", "requirement_type": "must_have"}]
+
+        matcher.run()
+
+        analyzer.assert_called_once()
+        assert JobRecommendation.query.count() == 3
+
+    def test_location_and_working_time_preferences(self, app):
+        munich = _user("muc@example.com", [("Python", "technical")], location="München")
+        part_time = _user("tz@example.com", [("Python", "technical")], working_time="tz")
+        anywhere = _user("any@example.com", [("Python", "technical")])
+        jobs = {"Python": [_job("1", "Python Entwickler", ort="Berlin"), _job("2", "Python Dev", ort="München")]}
+
+        _matcher(jobs).run()
+
+        # The München search also returned the Berlin posting (BA radius), so it reaches that user
+        assert _recommended(munich) == ["1", "2"]
+        assert _recommended(part_time) == ["1", "2"]
+        assert _recommended(anywhere) == ["1", "2"]
+
+    def test_town_filter_applies_to_postings_found_for_others(self, app):
+        munich = _user("muc@example.com", [("Python", "technical"), ("Java", "technical")], location="München")
+        _user("ber@example.com", [("Java", "technical")], location="Berlin")
+        matcher = _matcher({"Python": [], "Java": []})
+        matcher.recommender.ba_client.search_jobs.side_effect = lambda keywords, location="", **kwargs: (
+            ([_job("b", "Java Entwickler", ort="Berlin")], 1) if location == "Berlin" else ([], 0)
+        )
+
+        matcher.run()
+
+        assert _recommended(munich) == []
+
+    def test_existing_recommendations_are_not_duplicated(self, app):
+        user_id = _user("py@example.com", [("Python", "technical")])
+        matcher = _matcher({"Python": [_job("1", "Python Entwickler")]})
+
+        matcher.run()
+        matcher.run()
+
+        assert _recommended(user_id) == ["1"]
+
+    def test_postings_routed_in_earlier_cycles_are_skipped(self, app):
+        user_id = _user("py@example.com", [("Python", "technical")])
+        index = PostingIndex(max_age=3600)
+        matcher = _matcher({"Python": [_job("1", "Python Entwickler")]})
+
+        with patch("services.reverse_matcher.get_posting_index", return_value=index):
+            matcher.run()
+            JobRecommendation.query.delete()
+            stats = matcher.run()
+
+        assert stats["routed"] == 0
+        assert _recommended(user_id) == []
+        assert db.session.get(User, user_id).postings_routed_until is not None
+
+    def test_postings_ingested_between_cycles_are_routed_once(self, app):
+        user_id = _user("py@example.com", [("Python", "technical")])
+        index = PostingIndex(max_age=3600)
+        matcher = _matcher({})
+
+        with patch("services.reverse_matcher.get_posting_index", return_value=index):
+            matcher.run()
+            # An interactive search after the cycle's watermark
+            index.ingest_search(build_search_params("Python", ""), [_job("1", "Python Entwickler")], 1)
+            matcher.run()
+            routed = _recommended(user_id)
+            JobRecommendation.query.delete()
+            matcher.run()
+
+        assert routed == ["1"]
+        assert _recommended(user_id) == []
+
+    def test_new_user_gets_postings_routed_to_others_before(self, app):
+        _user("early@example.com", [("Python", "technical")])
+        index = PostingIndex(max_age=3600)
+        matcher = _matcher({"Python": [_job("1", "Python Entwickler")]})
+
+        with patch("services.reverse_matcher.get_posting_index", return_value=index):
+            matcher.run()
+            late = _user("late@example.com", [("Python", "technical")])
+            matcher.run()
+
+        assert _recommended(late) == ["1"]
+
+    def test_cancelled_cycle_writes_nothing(self, app):
+        user_id = _user("py@example.com", [("Python", "technical")])
+        matcher = _matcher({"Python": [_job("1", "Python Entwickler")]})
+        cancelled = threading.Event()
+        cancelled.set()
+
+        with pytest.raises(BatchCancelled):
+            matcher.run(cancelled=cancelled)
+
+        assert _recommended(user_id) == []
+        assert db.session.get(User, user_id).postings_routed_until is None
+
+    def test_cancellation_stops_remaining_searches(self, app):
+        _user("py@example.com", [("Python", "technical"), ("Django", "technical"), ("Flask", "technical")])
+        matcher = _matcher({})
+        cancelled = threading.Event()
+
+        def search(keywords, **kwargs):
+            cancelled.set()
+            return [], 0
+
+        matcher.recommender.ba_client.search_jobs.side_effect = search
+
+        with (
+            patch("services.reverse_matcher.config.BA_SEARCH_WORKERS", 1),
+            pytest.raises(BatchCancelled),
+        ):
+            matcher.run(cancelled=cancelled)
+
+        assert matcher.recommender.ba_client.search_jobs.call_count == 1
+
+    def test_cancellation_stops_remaining_analyses(self, app):
+        user_id = _user("py@example.com", [("Python", "technical")])
+        matcher = _matcher({"Python": [_job(str(refnr), "Python Entwickler") for refnr in range(3)]})
+        cancelled = threading.Event()
+
+        def analyze(candidate):
+            cancelled.set()
+
+        matcher.recommender._analyze_candidate = MagicMock(side_effect=analyze)
+
+        with (
+            patch("services.reverse_matcher.config.RECOMMENDER_SCORING_WORKERS", 1),
+            pytest.raises(BatchCancelled),
+        ):
+            matcher.run(cancelled=cancelled)
+
+        assert matcher.recommender._analyze_candidate.call_count == 1
+        assert _recommended(user_id) == []
@@ -0,0 +1,287 @@
+"""Tests for leader election and resumable, partitioned scheduler runs."""
+
+import threading
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from models import SchedulerLease, SchedulerRun, SchedulerRunBatch, db
+from services.scheduled_runs import (
+    BatchCancelled,
+    LeaseKeeper,
+    _start_run,
+    acquire_lease,
+    leadership,
+    partition,
+    prune_runs,
+    release_lease,
+    run_partitioned,
+    scheduler_run_stats,
+)
+
+INTERVAL = timedelta(hours=6)
+
+
+@pytest.fixture
+def small_batches():
+    with patch("services.scheduled_runs.config.SCHEDULER_BATCH_SIZE", 2):
+        yield
+
+
+def _recorder(fail_on: int | None = None):
+    calls = []
+
+    def process_batch(user_ids, cancelled):
+        calls.append(list(user_ids))
+        if fail_on in user_ids:
+            raise RuntimeError("kaputt")
+        return {"users": len(user_ids), "recommendations": 1}
+
+    return process_batch, calls
+
+
+def _runs() -> list[SchedulerRun]:
+    return SchedulerRun.query.order_by(SchedulerRun.id).populate_existing().all()
+
+
+class TestLease:
+    def test_only_one_holder_at_a_time(self, app):
+        assert acquire_lease("job", "a", ttl=60)
+        assert not acquire_lease("job", "b", ttl=60)
+        # The holder may extend its own lease
+        assert acquire_lease("job", "a", ttl=60)
+
+    def test_expired_lease_is_taken_over(self, app):
+        assert acquire_lease("job", "a", ttl=60)
+        SchedulerLease.query.update({"expires_at": datetime.utcnow() - timedelta(seconds=1)})
+        db.session.commit()
+
+        assert acquire_lease("job", "b", ttl=60)
+        assert db.session.get(SchedulerLease, "job", populate_existing=True).holder == "b"
+
+    def test_released_lease_is_free(self, app):
+        acquire_lease("job", "a", ttl=60)
+        release_lease("job", "a")
+
+        assert acquire_lease("job", "b", ttl=60)
+
+    def test_keeper_notices_takeover(self, app):
+        acquire_lease("job", "a", ttl=600)
+        keeper = LeaseKeeper(db.engine, "job", "a", ttl=600)
+        try:
+            keeper._renew()
+            assert not keeper.lost.is_set()
+
+            SchedulerLease.query.update({"holder": "b"})
+            db.session.commit()
+            keeper._renew()
+            assert keeper.lost.is_set()
+        finally:
+            keeper.stop()
+
+    def test_leadership_yields_none_for_followers(self, app):
+        acquire_lease("job", "other", ttl=60)
+
+        with leadership("job") as lease:
+            assert lease is None
+
+    def test_lease_kept_after_block_without_release(self, app):
+        with leadership("job", release=False) as lease:
+            assert lease is not None
+
+        assert not acquire_lease("job", "other", ttl=60)
+
+
+class TestRunPartitioned:
+    def test_users_are_processed_in_batches(self, app, small_batches):
+        process_batch, calls = _recorder()
+
+        summary = run_partitioned(app, "auto_search_jobs", lambda: [5, 3, 1, 4, 2], process_batch, INTERVAL)
+
+        assert sorted(calls) == [[1, 2], [3, 4], [5]]
+        assert summary["status"] == "succeeded"
+        assert summary["batches_total"] == 3
+        assert summary["users_processed"] == 5
+        assert summary["stats"] == {"users": 5, "recommendations": 3}
+        assert summary["users_per_second"] >= 0
+        assert SchedulerRunBatch.query.filter_by(status="done").count() == 3
+
+    def test_run_is_skipped_until_due(self, app, small_batches):
+        process_batch, calls = _recorder()
+        run_partitioned(app, "auto_search_jobs", lambda: [1], process_batch, INTERVAL)
+
+        assert run_partitioned(app, "auto_search_jobs", lambda: [1], process_batch, INTERVAL) is None
+        assert len(calls) == 1
+
+    def test_due_run_starts_a_new_run(self, app, small_batches):
+        process_batch, calls = _recorder()
+        run_partitioned(app, "auto_search_jobs", lambda: [1], process_batch, INTERVAL)
+        SchedulerRun.query.update({"started_at": datetime.utcnow() - timedelta(hours=7)})
+        db.session.commit()
+
+        run_partitioned(app, "auto_search_jobs", lambda: [1], process_batch, INTERVAL)
+
+        assert calls == [[1], [1]]
+        assert len(_runs()) == 2
+
+    def test_failed_batches_are_recorded(self, app, small_batches):
+        process_batch, calls = _recorder(fail_on=3)
+
+        summary = run_partitioned(app, "auto_search_jobs", lambda: [1, 2, 3, 4, 5], process_batch, INTERVAL)
+
+        assert len(calls) == 3
+        assert summary["status"] == "failed"
+        assert summary["batches_failed"] == 1
+        assert summary["users_failed"] == 2
+        assert summary["users_processed"] == 3
+        failed = SchedulerRunBatch.query.filter_by(status="failed").one()
+        assert failed.user_ids() == [3, 4]
+        assert failed.error == "kaputt"
+
+    def test_interrupted_run_is_resumed(self, app, small_batches):
+        run = _start_run("auto_search_jobs", "dead-leader", [1, 2, 3, 4, 5])
+        first = run.batches.filter_by(batch_no=0).one()
+        first.status = "done"
+        run.users_processed = 2
+        db.session.commit()
+        process_batch, calls = _recorder()
+
+        summary = run_partitioned(app, "auto_search_jobs", lambda: [1, 2, 3, 4, 5], process_batch, INTERVAL)
+
+        assert sorted(calls) == [[3, 4], [5]]
+        assert summary["id"] == run.id
+        assert summary["resumed"] == 1
+        assert summary["status"] == "succeeded"
+        assert summary["users_processed"] == 5
+        assert len(_runs()) == 1
+
+    def test_lost_lease_hands_run_over(self, app, small_batches):
+        keeper = MagicMock(holder="me", ttl=300, lost=threading.Event())
+        context = MagicMock()
+        context.return_value.__enter__ = MagicMock(return_value=keeper)
+        context.return_value.__exit__ = MagicMock(return_value=False)
+        calls = []
+
+        def process_batch(user_ids, cancelled):
+            calls.append(list(user_ids))
+            keeper.lost.set()
+            return {}
+
+        with (
+            patch("services.scheduled_runs.leadership", context),
+            patch("services.scheduled_runs.config.SCHEDULER_WORKERS", 1),
+        ):
+            summary = run_partitioned(app, "auto_search_jobs", lambda: [1, 2, 3], process_batch, INTERVAL)
+
+        # The running batch is finished, the next one is left to the new leader
+        assert calls == [[1, 2]]
+        assert summary["status"] == "running"
+        assert summary["users_processed"] == 2
+        pending = SchedulerRunBatch.query.filter_by(status="pending").one()
+        assert pending.user_ids() == [3]
+        assert pending.holder is None
+
+    def test_timed_out_batch_is_checkpointed_after_it_stops(self, app, small_batches):
+        finished = []
+
+        def process_batch(user_ids, cancelled):
+            assert cancelled.wait(5)
+            finished.append(list(user_ids))
+            raise BatchCancelled("Batch-Zeitlimit überschritten")
+
+        with (
+            patch("services.scheduled_runs.config.SCHEDULER_BATCH_TIMEOUT", 0.05),
+            patch("services.scheduled_runs.config.SCHEDULER_WORKERS", 1),
+        ):
+            summary = run_partitioned(app, "auto_search_jobs", lambda: [1, 2, 3], process_batch, INTERVAL)
+
+        # Both batches returned before the run was tallied
+        assert finished == [[1, 2], [3]]
+        assert summary["status"] == "failed"
+        assert summary["batches_failed"] == 2
+        assert {batch.error for batch in SchedulerRunBatch.query} == {"Batch-Zeitlimit überschritten"}
+
+    def test_batches_claimed_by_a_live_leader_are_skipped(self, app, small_batches):
+        run = _start_run("auto_search_jobs", "old-leader", [1, 2, 3])
+        claimed = run.batches.filter_by(batch_no=0).one()
+        claimed.status = "running"
+        claimed.holder = "old-leader"
+        claimed.heartbeat_at = datetime.utcnow()
+        db.session.commit()
+        process_batch, calls = _recorder()
+
+        summary = run_partitioned(app, "auto_search_jobs", lambda: [1, 2, 3], process_batch, INTERVAL)
+
+        assert calls == [[3]]
+        assert summary["status"] == "running"
+        assert db.session.get(SchedulerRunBatch, claimed.id, populate_existing=True).holder == "old-leader"
+
+    def test_batches_with_expired_heartbeat_are_taken_over(self, app, small_batches):
+        run = _start_run("auto_search_jobs", "dead-leader", [1, 2, 3])
+        claimed = run.batches.filter_by(batch_no=0).one()
+        claimed.status = "running"
+        claimed.holder = "dead-leader"
+        claimed.heartbeat_at = datetime.utcnow() - timedelta(hours=1)
+        db.session.commit()
+        process_batch, calls = _recorder()
+
+        summary = run_partitioned(app, "auto_search_jobs", lambda: [1, 2, 3], process_batch, INTERVAL)
+
+        assert sorted(calls) == [[1, 2], [3]]
+        assert summary["status"] == "succeeded"
+        assert summary["users_processed"] == 3
+
+    def test_keeper_heartbeats_claimed_batches(self, app):
+        run = _start_run("auto_search_jobs", "me", [1])
+        batch = run.batches.one()
+        batch.status = "running"
+        batch.holder = "me"
+        batch.heartbeat_at = datetime.utcnow() - timedelta(hours=1)
+        db.session.commit()
+        keeper = LeaseKeeper(db.engine, "auto_search_jobs", "me", ttl=600)
+        try:
+            keeper._beat()
+        finally:
+            keeper.stop()
+
+        heartbeat = db.session.get(SchedulerRunBatch, batch.id, populate_existing=True).heartbeat_at
+        assert heartbeat > datetime.utcnow() - timedelta(minutes=1)
+
+    def test_follower_does_nothing(self, app):
+        acquire_lease("auto_search_jobs", "leader", ttl=60)
+        process_batch, calls = _recorder()
+
+        assert run_partitioned(app, "auto_search_jobs", lambda: [1], process_batch, INTERVAL) is None
+        assert calls == []
+        assert _runs() == []
+
+    def test_batches(self):
+        assert partition([1, 2, 3], 2) == [[1, 2], [3]]
+        assert partition([], 2) == []
+
+
+class TestRunMetrics:
+    def test_latest_run_per_job(self, app):
+        process_batch, _ = _recorder()
+        run_partitioned(app, "auto_search_jobs", lambda: [1], process_batch, INTERVAL)
+        SchedulerRun.query.update({"started_at": datetime.utcnow() - timedelta(hours=7)})
+        db.session.commit()
+        latest = run_partitioned(app, "auto_search_jobs", lambda: [1, 2], process_batch, INTERVAL)
+
+        stats = scheduler_run_stats()
+
+        assert list(stats) == ["auto_search_jobs"]
+        assert stats["auto_search_jobs"]["id"] == latest["id"]
+        assert stats["auto_search_jobs"]["users_total"] == 2
+
+    def test_prune_removes_old_finished_runs(self, app):
+        process_batch, _ = _recorder()
+        run_partitioned(app, "auto_search_jobs", lambda: [1, 2], process_batch, INTERVAL)
+        SchedulerRun.query.update({"started_at": datetime.utcnow() - timedelta(days=40)})
+        db.session.commit()
+        _start_run("other_job", "leader", [1])
+
+        assert prune_runs(retention_days=30) == 1
+        assert [run.job for run in _runs()] == ["other_job"]
+        assert SchedulerRunBatch.query.count() == 1
@@ -1,6 +1,7 @@
 """Tests for the background scheduler."""
 
 import os
+from datetime import timedelta
 from unittest.mock import MagicMock, patch
 
 
@@ -88,6 +89,12 @@ class TestSchedulerInit:
 
 
 class TestCleanupJob:
+    def _leadership(self, lease):
+        context = MagicMock()
+        context.return_value.__enter__ = MagicMock(return_value=lease)
+        context.return_value.__exit__ = MagicMock(return_value=False)
+        return context
+
     def test_cleanup_old_recommendations(self):
         from services.scheduler import cleanup_old_recommendations
 
@@ -98,24 +105,35 @@ class TestCleanupJob:
         mock_recommender = MagicMock()
         mock_recommender.cleanup_old_recommendations.return_value = 5
 
-        with patch.dict("sys.modules", {}):
-            with patch("services.job_recommender.JobRecommender", return_value=mock_recommender):
-                cleanup_old_recommendations(app)
+        with (
+            patch("services.scheduler.leadership", self._leadership(MagicMock())),
+            patch("services.scheduler.prune_runs", return_value=2) as mock_prune,
+            patch("services.job_recommender.JobRecommender", return_value=mock_recommender),
+        ):
+            cleanup_old_recommendations(app)
 
+        mock_recommender.cleanup_old_recommendations.assert_called_once_with(days=30)
+        mock_prune.assert_called_once()
 
-class TestAutoSearchJob:
-    def _make_app(self):
-        app = MagicMock()
-        app.app_context.return_value.__enter__ = MagicMock(return_value=None)
-        app.app_context.return_value.__exit__ = MagicMock(return_value=False)
-        return app
+    def test_cleanup_skipped_without_lease(self):
+        from services.scheduler import cleanup_old_recommendations
+
+        mock_recommender = MagicMock()
 
+        with (
+            patch("services.scheduler.leadership", self._leadership(None)),
+            patch("services.job_recommender.JobRecommender", return_value=mock_recommender),
+        ):
+            cleanup_old_recommendations(MagicMock())
+
+        mock_recommender.cleanup_old_recommendations.assert_not_called()
+
+
+class TestAutoSearchJob:
     def _run_auto_search(self, mock_recommender, mock_users):
-        """Run auto_search_jobs with mocked dependencies."""
+        """Run one per-user search batch with mocked dependencies."""
         from services.job_recommender import JobRecommender
-        from services.scheduler import auto_search_jobs
-
-        app = self._make_app()
+        from services.scheduler import search_jobs_for_users
 
         mock_db_query = MagicMock()
         mock_db_query.join.return_value.filter.return_value.distinct.return_value.all.return_value = mock_users
@@ -130,7 +148,7 @@ class TestAutoSearchJob:
             patch("services.job_recommender.JobRecommender", mock_class),
         ):
             mock_db.session.query.return_value = mock_db_query
-            auto_search_jobs(app)
+            return search_jobs_for_users([user.id for user in mock_users])
 
     def test_no_users_skips_search(self):
         """No users with skills means no searches."""
@@ -218,3 +236,65 @@ class TestAutoSearchJob:
         mock_recommender.search_and_score_jobs.assert_called_once_with(
             user_id=2, location="", working_time="", max_results=5
         )
+
+    def test_failed_users_are_counted(self):
+        mock_recommender = MagicMock()
+        mock_recommender.search_and_score_jobs.side_effect = [RuntimeError("kaputt"), _make_search_results()]
+
+        stats = self._run_auto_search(mock_recommender, mock_users=[_make_mock_user(1), _make_mock_user(2)])
+
+        assert stats == {"users": 2, "failed": 1}
+
+
+class TestAutoSearchDispatch:
+    def test_reverse_mode_runs_partitioned_reverse_matching(self):
+        from services.scheduler import (
+            AUTO_SEARCH_INTERVAL_HOURS,
+            auto_search_jobs,
+            reverse_match_users,
+            users_with_skills,
+        )
+
+        app = MagicMock()
+        with (
+            patch("services.scheduler.config.AUTO_SEARCH_MODE", "reverse"),
+            patch("services.scheduler.run_partitioned") as mock_run,
+        ):
+            auto_search_jobs(app)
+
+        mock_run.assert_called_once_with(
+            app,
+            "auto_search_jobs",
+            users_with_skills,
+            reverse_match_users,
+            interval=timedelta(hours=AUTO_SEARCH_INTERVAL_HOURS),
+        )
+
+    def test_per_user_mode_runs_partitioned_search(self):
+        from services.scheduler import auto_search_jobs, search_jobs_for_users
+
+        with (
+            patch("services.scheduler.config.AUTO_SEARCH_MODE", "per_user"),
+            patch("services.scheduler.run_partitioned") as mock_run,
+        ):
+            auto_search_jobs(MagicMock())
+
+        assert mock_run.call_args.args[3] is search_jobs_for_users
+
+    def test_reverse_batch_runs_matcher_for_its_users(self):
+        from services.scheduler import reverse_match_users
+
+        mock_matcher = MagicMock()
+        mock_matcher.run.return_value = {"recommendations": 2}
+
+        with patch("services.reverse_matcher.ReverseMatcher", return_value=mock_matcher):
+            stats = reverse_match_users([1, 2])
+
+        mock_matcher.run.assert_called_once_with(user_ids=[1, 2], cancelled=None)
+        assert stats == {"recommendations": 2}
+
+    def test_run_errors_are_logged(self):
+        from services.scheduler import auto_search_jobs
+
+        with patch("services.scheduler.run_partitioned", side_effect=RuntimeError("kaputt")):
+            auto_search_jobs(MagicMock())
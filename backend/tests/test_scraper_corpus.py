@@ -0,0 +1,46 @@
+"""Regression test over the saved-page corpus of benchmarks/scraper_benchmark.py."""
+
+import importlib.util
+import os
+
+import pytest
+
+BENCHMARK_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "benchmarks", "scraper_benchmark.py")
+_spec = importlib.util.spec_from_file_location("scraper_benchmark", BENCHMARK_PATH)
+scraper_benchmark = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(scraper_benchmark)
+
+PAGES = scraper_benchmark.load_corpus()
+
+
+class TestScraperCorpus:
+    def test_corpus_covers_every_board(self):
+        boards = {page.board for page in PAGES}
+
+        assert boards == {"stepstone", "indeed", "xing", "softgarden", "arbeitsagentur", "generic"}
+
+    @pytest.mark.parametrize("page", PAGES, ids=[page.name for page in PAGES])
+    def test_golden_fields(self, page):
+        result, generic = scraper_benchmark.parse_page(page)
+        checks = scraper_benchmark.check_page(page, result, generic)
+
+        regressions = [
+            f"{check.field}: expected {check.expected!r}, got {check.actual!r}"
+            for check in checks
+            if not check.ok and not check.known_failure
+        ]
+        assert not regressions
+
+    def test_non_utf8_page_is_decoded_from_meta_charset(self):
+        page = next(page for page in PAGES if page.name == "softgarden_cp1252")
+        result, _ = scraper_benchmark.parse_page(page)
+
+        assert result["company"] == "Zeitverlag Süd GmbH"
+        assert "–" in result["description"]
+
+    def test_run_page_reports_time_and_allocations(self):
+        run = scraper_benchmark.run_page(PAGES[0], repeat=1)
+
+        assert run.seconds > 0
+        assert run.peak_bytes > 0
+        assert not run.regressions
@@ -0,0 +1,124 @@
+"""Tests for the per-host cloudscraper session pool."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from services.scraper_sessions import CloudscraperPool
+from services.web_scraper import WebScraper
+
+
+def _pool(max_sessions: int = 4, max_age: float = 600) -> CloudscraperPool:
+    return CloudscraperPool(max_sessions=max_sessions, max_age=max_age, factory=lambda: MagicMock())
+
+
+class TestCloudscraperPool:
+    def test_session_is_reused_per_host(self):
+        pool = _pool()
+        with pool.session("www.stepstone.de") as first:
+            pass
+        with pool.session("www.stepstone.de") as second:
+            pass
+        with pool.session("de.indeed.com") as other:
+            pass
+
+        assert first is second
+        assert other is not first
+        assert pool.stats()["reused"] == 1
+        assert pool.stats()["idle"] == 2
+
+    def test_concurrent_checkouts_get_separate_sessions(self):
+        pool = _pool()
+        with pool.session("www.stepstone.de") as first, pool.session("www.stepstone.de") as second:
+            assert first is not second
+            assert pool.stats()["in_use"] == 2
+
+    def test_failed_session_is_discarded(self):
+        pool = _pool()
+        with pytest.raises(requests.HTTPError), pool.session("www.stepstone.de") as scraper:
+            raise requests.HTTPError("403")
+
+        scraper.close.assert_called_once()
+        with pool.session("www.stepstone.de") as fresh:
+            assert fresh is not scraper
+        assert pool.stats()["failed"] == 1
+
+    def test_old_sessions_are_rotated(self):
+        pool = _pool(max_age=60)
+        with patch("services.scraper_sessions.time.monotonic", return_value=1000.0), pool.session("a") as old:
+            pass
+        with patch("services.scraper_sessions.time.monotonic", return_value=1100.0), pool.session("a") as new:
+            pass
+
+        assert new is not old
+        old.close.assert_called_once()
+        assert pool.stats()["expired"] == 1
+
+    def test_expired_cookies_are_dropped_on_checkout(self):
+        pool = _pool()
+        with pool.session("a") as scraper:
+            pass
+        with pool.session("a"):
+            pass
+
+        scraper.cookies.clear_expired_cookies.assert_called_once()
+
+    def test_full_pool_evicts_least_recently_used_idle_session(self):
+        pool = _pool(max_sessions=2)
+        with pool.session("a") as a:
+            pass
+        with pool.session("b"):
+            pass
+        with pool.session("c"):
+            pass
+
+        a.close.assert_called_once()
+        assert pool.stats()["evicted"] == 1
+        assert pool.stats()["idle"] == 2
+
+    def test_busy_pool_hands_out_throwaway_session(self):
+        pool = _pool(max_sessions=1)
+        with pool.session("a"), pool.session("b") as extra:
+            pass
+
+        extra.close.assert_called_once()
+        assert pool.stats()["unpooled"] == 1
+        assert pool.stats()["idle"] == 1
+
+    def test_size_zero_disables_pooling(self):
+        pool = _pool(max_sessions=0)
+        with pool.session("a") as first:
+            pass
+        with pool.session("a") as second:
+            pass
+
+        assert first is not second
+        assert pool.stats()["reused"] == 0
+
+
+class TestWebScraperCloudscraper:
+    def test_fetches_reuse_pooled_session(self):
+        pool = _pool()
+        response = MagicMock(status_code=200)
+        with patch("services.web_scraper.get_cloudscraper_pool", return_value=pool):
+            scraper = WebScraper()
+            with pool.session("www.stepstone.de") as session:
+                session.get.return_value = response
+            first = scraper._fetch_via_cloudscraper("https://www.stepstone.de/job-1")
+            second = scraper._fetch_via_cloudscraper("https://www.stepstone.de/job-2")
+
+        assert first is response and second is response
+        assert session.get.call_count == 2
+        assert pool.stats()["created"] == 1
+
+    def test_blocked_fetch_returns_none_and_drops_session(self):
+        pool = _pool()
+        with patch("services.web_scraper.get_cloudscraper_pool", return_value=pool):
+            with pool.session("www.stepstone.de") as session:
+                session.get.return_value.raise_for_status.side_effect = requests.HTTPError("403")
+
+            assert WebScraper()._fetch_via_cloudscraper("https://www.stepstone.de/job-1") is None
+
+        session.close.assert_called_once()
+        assert pool.stats()["idle"] == 0
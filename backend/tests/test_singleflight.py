@@ -0,0 +1,127 @@
+"""Tests for request coalescing of identical in-flight calls."""
+
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from services.singleflight import FileLockBackend, SingleFlight
+
+
+def _run_concurrently(target, count):
+    results, errors = [], []
+
+    def runner():
+        try:
+            results.append(target())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=runner) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+class TestSingleFlight:
+    def test_concurrent_callers_share_one_call(self):
+        flight = SingleFlight()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.1)
+            return {"skills": ["Python"]}
+
+        results, errors = _run_concurrently(lambda: flight.do("k", slow), 5)
+
+        assert not errors
+        assert len(calls) == 1
+        assert results == [{"skills": ["Python"]}] * 5
+        assert flight.stats()["coalesced"] == 4
+
+    def test_followers_get_independent_copies(self):
+        flight = SingleFlight()
+
+        def slow():
+            time.sleep(0.05)
+            return {"items": []}
+
+        results, _ = _run_concurrently(lambda: flight.do("k", slow), 3)
+        results[0]["items"].append("x")
+        assert results[1] == {"items": []}
+
+    def test_error_is_propagated_to_followers(self):
+        flight = SingleFlight()
+
+        def failing():
+            time.sleep(0.05)
+            raise RuntimeError("provider down")
+
+        results, errors = _run_concurrently(lambda: flight.do("k", failing), 3)
+
+        assert not results
+        assert len(errors) == 3
+        assert all(isinstance(e, RuntimeError) for e in errors)
+
+    def test_follower_timeout(self):
+        flight = SingleFlight()
+        started = threading.Event()
+
+        def slow():
+            started.set()
+            time.sleep(0.3)
+            return 1
+
+        leader = threading.Thread(target=lambda: flight.do("k", slow))
+        leader.start()
+        started.wait()
+        with pytest.raises(TimeoutError):
+            flight.do("k", slow, timeout=0.05)
+        leader.join()
+
+    def test_sequential_calls_are_not_coalesced(self):
+        flight = SingleFlight()
+        fn = MagicMock(return_value=1)
+        flight.do("k", fn)
+        flight.do("k", fn)
+        assert fn.call_count == 2
+
+    def test_file_lock_backend(self, tmp_path):
+        flight = SingleFlight(lock_backend=FileLockBackend(str(tmp_path)))
+        assert flight.do("k", lambda: 42) == 42
+
+
+class TestAIClientCoalescing:
+    def test_identical_cached_calls_are_coalesced(self):
+        with (
+            patch("services.ai_client.OpenAI"),
+            patch("services.ai_client.config") as mock_config,
+        ):
+            mock_config.OPENROUTER_API_KEY = "key"
+            mock_config.FIREWORKS_API_KEY = "key"
+            mock_config.LLM_SINGLEFLIGHT_TIMEOUT = 5
+            from services.ai_client import AIClient
+
+            client = AIClient()
+            client.model = "qwen"
+
+            def slow_call(**kwargs):
+                time.sleep(0.1)
+                return {"ok": True}
+
+            client._call_api_json = MagicMock(side_effect=slow_call)
+            messages = [{"role": "user", "content": "Stellenanzeige"}]
+
+            with patch("services.ai_client.get_llm_singleflight", return_value=SingleFlight()):
+                results, errors = _run_concurrently(
+                    lambda: client._call_api_json_with_retry(messages, max_tokens=10, temperature=0.1, cache_ttl=60),
+                    4,
+                )
+
+        assert not errors
+        assert results == [{"ok": True}] * 4
+        assert client._call_api_json.call_count == 1
@@ -0,0 +1,124 @@
+"""Tests for token frame batching and SSE throughput counters."""
+
+import time
+from unittest.mock import patch
+
+from services import stream_frames
+from services.stream_frames import TokenBatcher, _StreamStats, record_sse_sent, stream_stats
+
+
+class TestTokenBatcher:
+    def test_tokens_are_coalesced_until_size_limit(self):
+        sent = []
+        frames = TokenBatcher(sent.append, window=60, max_bytes=10)
+
+        for token in ["Sehr ", "geehrte ", "Damen"]:
+            frames.token("content", token)
+
+        assert sent == [{"type": "content", "text": "Sehr geehrte "}]
+        frames.flush()
+        assert sent[-1] == {"type": "content", "text": "Damen"}
+
+    def test_window_elapsed_sends_frame(self):
+        sent = []
+        frames = TokenBatcher(sent.append, window=0.05, max_bytes=10_000)
+
+        frames.token("thinking", "a")
+        frames.token("thinking", "b")
+        assert sent == []
+        time.sleep(0.06)
+        frames.token("thinking", "c")
+        frames.close()
+
+        assert sent[0]["text"].startswith("ab")
+        assert "".join(frame["text"] for frame in sent) == "abc"
+
+    def test_window_elapses_without_further_tokens(self):
+        sent = []
+        frames = TokenBatcher(sent.append, window=0.05, max_bytes=10_000)
+
+        frames.token("content", "Sehr ")
+        frames.token("content", "geehrte")
+        time.sleep(0.2)
+
+        assert sent == [{"type": "content", "text": "Sehr geehrte"}]
+        frames.token("content", " Damen")
+        time.sleep(0.2)
+        assert sent[-1] == {"type": "content", "text": " Damen"}
+        frames.close()
+
+    def test_close_sends_pending_frame_and_stops_flusher(self):
+        sent = []
+        frames = TokenBatcher(sent.append, window=60, max_bytes=10_000)
+
+        frames.token("content", "Hallo")
+        frames.close()
+        frames._flusher.join(timeout=1)
+
+        assert sent == [{"type": "content", "text": "Hallo"}]
+        assert not frames._flusher.is_alive()
+
+    def test_kind_change_and_stage_events_flush_pending_tokens(self):
+        sent = []
+        frames = TokenBatcher(sent.append, window=60, max_bytes=10_000)
+
+        frames.token("thinking", "hmm")
+        frames.token("content", "Hallo")
+        frames.emit({"step": 5, "total_steps": 7, "message": "PDF wird erstellt..."})
+
+        assert sent == [
+            {"type": "thinking", "text": "hmm"},
+            {"type": "content", "text": "Hallo"},
+            {"step": 5, "total_steps": 7, "message": "PDF wird erstellt..."},
+        ]
+
+    def test_zero_window_forwards_every_token(self):
+        sent = []
+        frames = TokenBatcher(sent.append, window=0, max_bytes=256)
+
+        frames.token("content", "a")
+        frames.token("content", "b")
+
+        assert sent == [{"type": "content", "text": "a"}, {"type": "content", "text": "b"}]
+
+    def test_flush_without_tokens_sends_nothing(self):
+        sent = []
+        TokenBatcher(sent.append, window=60, max_bytes=256).flush()
+
+        assert sent == []
+
+
+class TestStreamStats:
+    def test_counts_bytes_events_and_frames(self):
+        stats = _StreamStats()
+        stats.record_sent(100)
+        stats.record_sent(50)
+        stats.record_frame(4)
+
+        snapshot = stats.snapshot()
+
+        assert snapshot["events_sent"] == 2
+        assert snapshot["bytes_sent"] == 150
+        assert snapshot["events_per_second"] == round(2 / _StreamStats.RATE_WINDOW, 2)
+        assert snapshot["tokens_per_frame"] == 4.0
+
+    def test_module_counters(self):
+        with patch.object(stream_frames, "_stats", _StreamStats()):
+            record_sse_sent(42)
+            assert stream_stats()["bytes_sent"] == 42
+
+    def test_sse_responses_are_counted(self, app, client, auth_headers):
+        with (
+            patch.object(stream_frames, "_stats", _StreamStats()),
+            patch("routes.applications.generation.run_url_generation", return_value={"success": True}),
+        ):
+            response = client.post(
+                "/api/applications/generate-from-url-stream",
+                json={"url": "https://example.com/job"},
+                headers=auth_headers,
+            )
+            body = response.get_data(as_text=True)
+            stats = stream_stats()
+
+        assert stats["events_sent"] == 2
+        assert stats["bytes_sent"] == len(body.encode("utf-8"))
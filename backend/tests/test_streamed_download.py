@@ -0,0 +1,131 @@
+"""Tests for streamed page downloads with size cap and early JSON-LD stop."""
+
+import io
+import json
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from services.http_cache import HTTPResponseCache
+from services.scrapers.document import JobPostingScanner
+from services.web_scraper import WebScraper
+
+POSTING = {
+    "@type": "JobPosting",
+    "title": "Python Entwickler (m/w/d)",
+    "description": "Wir suchen eine erfahrene Entwicklerin oder einen erfahrenen Entwickler für unser Team.",
+    "hiringOrganization": {"name": "Beispiel GmbH"},
+}
+FILLER = "<div class='listing'>" + "x" * 1000 + "</div>"
+
+
+def _page(posting: dict | None = POSTING, filler_blocks: int = 500) -> bytes:
+    json_ld = f'<script type="application/ld+json">{json.dumps(posting)}</script>' if posting else ""
+    body = FILLER * filler_blocks
+    return f"<html><head><title>Stelle</title>{json_ld}</head><body>{body}</body></html>".encode()
+
+
+def _streamed(body: bytes) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.raw = io.BytesIO(body)
+    response.headers["Content-Type"] = "text/html; charset=utf-8"
+    response.url = "https://www.stepstone.de/stellenangebote--1.html"
+    return response
+
+
+def _scraper(body: bytes, max_page_bytes: int = 5 * 1024 * 1024) -> WebScraper:
+    scraper = WebScraper(max_page_bytes=max_page_bytes)
+    scraper.session = MagicMock()
+    scraper.session.get.side_effect = lambda *args, **kwargs: _streamed(body)
+    return scraper
+
+
+class TestJobPostingScanner:
+    def test_finds_posting_split_across_chunks(self):
+        body = _page(filler_blocks=0)
+        scanner = JobPostingScanner()
+        buffer = bytearray()
+        found_at = None
+        for start in range(0, len(body), 7):
+            buffer += body[start : start + 7]
+            if scanner.scan(buffer):
+                found_at = len(buffer)
+                break
+
+        assert found_at is not None
+        assert found_at >= body.index(b"</script>") + len("</script>")
+
+    def test_ignores_incomplete_and_other_types(self):
+        scanner = JobPostingScanner()
+
+        assert not scanner.scan(_page({"@type": "Organization", "name": "Beispiel GmbH"}, filler_blocks=0))
+        assert not scanner.scan(_page({**POSTING, "description": ""}, filler_blocks=0))
+        assert JobPostingScanner().scan(_page([POSTING], filler_blocks=0))
+
+
+class TestStreamedDownload:
+    def test_full_download_is_complete(self):
+        body = _page()
+        response = _scraper(body)._fetch_with("direct", "https://www.stepstone.de/stellenangebote--1.html", None)
+
+        assert response.content == body
+        assert response.truncated is None
+
+    def test_size_cap_truncates_body(self):
+        response = _scraper(_page(), max_page_bytes=10_000)._fetch_with("direct", "https://example.com/job", None)
+
+        assert len(response.content) == 10_000
+        assert response.truncated == "size_limit"
+
+    def test_stops_after_json_ld_posting(self):
+        body = _page()
+        response = _scraper(body)._fetch_with("direct", "https://example.com/job", None, stop_at_job_posting=True)
+
+        assert response.truncated == "job_posting"
+        assert len(response.content) < len(body) // 10
+        assert b"</script>" in response.content
+
+    def test_without_usable_posting_reads_everything(self):
+        body = _page({**POSTING, "title": None})
+        response = _scraper(body)._fetch_with("direct", "https://example.com/job", None, stop_at_job_posting=True)
+
+        assert response.content == body
+        assert response.truncated is None
+
+    def test_structured_fetch_reports_truncation(self):
+        scraper = _scraper(_page())
+        with patch("services.web_scraper.get_fetch_strategy", return_value=None):
+            result = scraper.fetch_structured_job_posting(
+                "https://www.stepstone.de/stellenangebote--1.html", stop_at_job_posting=True
+            )
+
+        assert result["truncated"] == "job_posting"
+        assert result["title"] == "Python Entwickler (m/w/d)"
+        assert result["company"] == "Beispiel GmbH"
+        assert result["description"].startswith("Wir suchen")
+
+    def test_arbeitsagentur_pages_are_read_completely(self):
+        body = _page(filler_blocks=20)
+        scraper = _scraper(body)
+        with patch("services.web_scraper.get_fetch_strategy", return_value=None):
+            result = scraper.fetch_structured_job_posting(
+                "https://www.arbeitsagentur.de/jobsuche/jobdetail/10000-1",
+                _follow_external=False,
+                stop_at_job_posting=True,
+            )
+
+        assert result["truncated"] is None
+
+    def test_partial_bodies_are_not_cached(self):
+        cache = HTTPResponseCache(ttl=900, stale_ttl=0, max_entry_bytes=10_000_000, memory_max_bytes=10_000_000)
+        scraper = _scraper(_page())
+        with (
+            patch("services.web_scraper.get_http_cache", return_value=cache),
+            patch("services.web_scraper.get_fetch_strategy", return_value=None),
+        ):
+            scraper._fetch_page("https://example.com/job", stop_at_job_posting=True)
+            assert cache.get("https://example.com/job") is None
+
+            scraper._fetch_page("https://example.com/job")
+            assert cache.get("https://example.com/job") is not None
@@ -1,6 +1,7 @@
 import { ref, computed } from 'vue'
 import api from '../api/client'
 import { getFullLocale } from '../i18n'
+import { streamGeneration } from '../utils/generationStream'
 
 const DEFAULT_MODEL = 'qwen'
 
@@ -19,58 +20,17 @@ const SOURCE_LABELS = {
 }
 
 /**
- * Streams a cover letter generation via SSE from the backend.
+ * Streams a cover letter generation via SSE from the backend, reporting step messages.
  * Returns the complete event payload on success, or throws on error.
  */
-async function streamGeneration(payload, onProgress) {
-  const token = localStorage.getItem('token')
-  const response = await fetch('/api/applications/generate-from-url-stream', {
-    method: 'POST',
-    headers: {
-      'Content-Type': 'application/json',
-      'Authorization': `Bearer ${token}`,
-    },
-    body: JSON.stringify(payload),
+async function generateFromRecommendation(payload, onProgress) {
+  const result = await streamGeneration(payload, (event) => {
+    if (event.step && event.message) onProgress(event.message)
   })
-
-  const contentType = response.headers.get('content-type') || ''
-  if (!contentType.includes('text/event-stream')) {
-    const errorData = await response.json()
-    throw new Error(errorData.error || 'Fehler bei der Generierung')
-  }
-
-  const reader = response.body.getReader()
-  const decoder = new TextDecoder()
-  let buffer = ''
-
-  while (true) {
-    const { done, value } = await reader.read()
-    if (done) throw new Error('Fehler bei der Generierung')
-
-    buffer += decoder.decode(value, { stream: true })
-    const chunks = buffer.split('\n\n')
-    buffer = chunks.pop()
-
-    for (const chunk of chunks) {
-      if (!chunk.startsWith('data: ')) continue
-
-      let event
-      try { event = JSON.parse(chunk.slice(6)) } catch { continue }
-
-      if (event.type === 'complete') {
-        if (event.success === false) {
-          throw new Error(event.error || 'Fehler bei der Generierung')
-        }
-        return event
-      }
-      if (event.type === 'error') {
-        throw new Error(event.error || 'Fehler bei der Generierung')
-      }
-      if (event.step && event.message && typeof onProgress === 'function') {
-        onProgress(event.message)
-      }
-    }
+  if (result.success === false) {
+    throw new Error(result.error || 'Fehler bei der Generierung')
   }
+  return result
 }
 
 // Shared state (module-level singleton)
@@ -203,7 +163,7 @@ export function useJobRecommendations() {
     }
 
     try {
-      const result = await streamGeneration(
+      const result = await generateFromRecommendation(
         {
           url: rec.job_url,
           tone: 'modern',
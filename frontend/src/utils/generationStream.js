@@ -0,0 +1,119 @@
+const RECONNECT_DELAYS_MS = [1000, 2000, 4000]
+
+function serverError(message) {
+  const err = new Error(message || 'Fehler bei der Generierung')
+  err.isServerError = true
+  return err
+}
+
+function authHeaders(extra = {}) {
+  return { 'Authorization': `Bearer ${localStorage.getItem('token')}`, ...extra }
+}
+
+/**
+ * Read SSE frames from a fetch response, tracking the stream's job id and last event id.
+ * Resolves with the `complete` event, rejects with `isServerError` on `error` events and
+ * with a plain Error when the connection drops.
+ * @param {Response} response
+ * @param {{ jobId: string|null, lastEventId: number }} cursor - updated while reading
+ * @param {(event: object) => void} onEvent
+ * @returns {Promise<object>}
+ */
+async function readEvents(response, cursor, onEvent) {
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+
+  while (true) {
+    const { done, value } = await reader.read()
+    if (done) throw new Error('Stream ended without result')
+
+    buffer += decoder.decode(value, { stream: true })
+    const chunks = buffer.split('\n\n')
+    buffer = chunks.pop()
+
+    for (const chunk of chunks) {
+      let data = null
+      for (const line of chunk.split('\n')) {
+        if (line.startsWith('id: ')) cursor.lastEventId = Number(line.slice(4)) || cursor.lastEventId
+        else if (line.startsWith('data: ')) data = line.slice(6)
+      }
+      if (data === null) continue
+
+      let event
+      try { event = JSON.parse(data) } catch { continue }
+
+      if (event.type === 'job') {
+        cursor.jobId = event.job_id
+        continue
+      }
+      if (event.type === 'complete') return event
+      if (event.type === 'error') throw serverError(event.error)
+      if (event.type === 'keepalive') continue
+      onEvent(event)
+    }
+  }
+}
+
+/**
+ * Reattach to a running generation after the last received event, with backoff.
+ * Throws an error carrying `jobId` when all attempts fail.
+ * @param {{ jobId: string, lastEventId: number }} cursor
+ * @returns {Promise<Response>}
+ */
+async function reconnect(cursor) {
+  for (const delay of RECONNECT_DELAYS_MS) {
+    await new Promise(resolve => setTimeout(resolve, delay))
+    try {
+      const response = await fetch(`/api/applications/generation-jobs/${cursor.jobId}/stream`, {
+        headers: authHeaders({ 'Last-Event-ID': String(cursor.lastEventId) }),
+      })
+      if (response.status === 404) throw serverError('Generierung nicht mehr verfügbar. Bitte versuche es erneut.')
+      if (response.ok) return response
+    } catch (err) {
+      if (err.isServerError) throw err
+    }
+  }
+  const err = new Error(
+    'Verbindung unterbrochen. Die Bewerbung wird im Hintergrund fertiggestellt – prüfe gleich deine Bewerbungen.'
+  )
+  err.jobId = cursor.jobId
+  throw err
+}
+
+/**
+ * Start an application generation and follow its SSE progress stream.
+ *
+ * When the connection drops mid-generation, reattaches to the same generation with
+ * `Last-Event-ID` (the server replays missed events) instead of starting a new one.
+ * Errors thrown after the generation started carry `jobId`; callers must not start a
+ * second, paid generation for them.
+ * @param {object} payload - body for /applications/generate-from-url-stream
+ * @param {(event: object) => void} onEvent - progress, thinking and content events
+ * @returns {Promise<object>} the `complete` event
+ */
+export async function streamGeneration(payload, onEvent = () => {}) {
+  const response = await fetch('/api/applications/generate-from-url-stream', {
+    method: 'POST',
+    headers: authHeaders({ 'Content-Type': 'application/json' }),
+    body: JSON.stringify(payload),
+  })
+
+  const contentType = response.headers.get('content-type') || ''
+  if (!contentType.includes('text/event-stream')) {
+    const errorData = await response.json()
+    throw serverError(errorData.error || 'Unbekannter Fehler')
+  }
+
+  const cursor = { jobId: null, lastEventId: 0 }
+  let current = response
+
+  while (true) {
+    try {
+      return await readEvents(current, cursor, onEvent)
+    } catch (err) {
+      if (err.isServerError || !cursor.jobId) throw err
+      current = await reconnect(cursor)
+    }
+  }
+}